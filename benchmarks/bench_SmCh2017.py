@@ -0,0 +1,48 @@
+"""Per-evaluation cost of the SmCh2017 light-curve kernels.
+
+calc_lc_break_direct is the legacy per-time integration, timed for
+comparison only; it is not accurate for steep heating slopes.
+
+Run as ``python benchmarks/bench_SmCh2017.py [nsamples]``, or with the
+other benchmarks through run_benchmarks.py.
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from gwemlightcurves.KNModels.io import SmCh2017
+
+def make_samples(nsamples, seed=0):
+    rng = np.random.RandomState(seed)
+    mej = 10**rng.uniform(-3, -1, nsamples)
+    vej = rng.uniform(0.05, 0.3, nsamples)
+    slope_r = rng.uniform(-1.5, -1.1, nsamples)
+    kappa_r = 10**rng.uniform(-1, 2, nsamples)
+    return mej, vej, slope_r, kappa_r
+
+def time_direct(nsamples=20, repeat=3):
+    mej, vej, slope_r, kappa_r = make_samples(nsamples)
+    def run():
+        for i in range(nsamples):
+            SmCh2017.calc_lc_break_direct(0.1, 14.0, 0.1, mej[i], vej[i],
+                                          slope_r[i], kappa_r[i], 10.0,
+                                          slope_r[i])
+    return min(timeit.repeat(run, number=1, repeat=repeat))/nsamples
+
+def time_batch(nsamples=100, repeat=3):
+    mej, vej, slope_r, kappa_r = make_samples(nsamples)
+    def run():
+        SmCh2017.calc_lc_break_batch(0.1, 14.0, 0.1, mej, vej, slope_r,
+                                     kappa_r, 10.0, slope_r)
+    return min(timeit.repeat(run, number=1, repeat=repeat))/nsamples
+
+if __name__ == "__main__":
+    nsamples = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with np.errstate(all='ignore'):
+        direct = time_direct(min(nsamples, 20))
+        batch = time_batch(nsamples)
+    print("calc_lc_break_direct: %.3e s per light curve" % direct)
+    print("calc_lc_break_batch:  %.3e s per light curve (%d samples)" % (batch, nsamples))
+    print("speed up: %.1f" % (direct/batch))
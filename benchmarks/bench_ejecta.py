@@ -0,0 +1,81 @@
+"""Per-sample cost of the EjectaFits on large batches of binaries.
+
+The fits are evaluated on arrays of random BNS (DiUj2017, Di2018b,
+CoDi2019, PaDi2019) and NSBH (KaKy2016, KrFo2019) parameters, as the
+embright and KNTable jobs do.
+
+Run as ``python benchmarks/bench_ejecta.py [nsamples]``, or with the
+other benchmarks through run_benchmarks.py.
+"""
+
+import os, sys
+import timeit
+
+import numpy as np
+
+from gwemlightcurves.EjectaFits import DiUj2017, Di2018b, CoDi2019, PaDi2019, KaKy2016, KrFo2019
+
+def make_bns(nsamples, seed=0):
+    rng = np.random.RandomState(seed)
+    m1 = rng.uniform(1.2, 1.8, nsamples)
+    m2 = rng.uniform(1.0, 1.2, nsamples)
+    c1 = rng.uniform(0.12, 0.2, nsamples)
+    c2 = rng.uniform(0.12, 0.2, nsamples)
+    mb1 = m1*(1+0.6*c1/(1.-0.5*c1))
+    mb2 = m2*(1+0.6*c2/(1.-0.5*c2))
+    return m1, mb1, c1, m2, mb2, c2
+
+def make_nsbh(nsamples, seed=0):
+    rng = np.random.RandomState(seed)
+    q = rng.uniform(3.0, 8.0, nsamples)
+    chi_eff = rng.uniform(0.0, 0.9, nsamples)
+    c = rng.uniform(0.12, 0.2, nsamples)
+    mns = rng.uniform(1.2, 1.6, nsamples)
+    mb = mns*(1+0.6*c/(1.-0.5*c))
+    return q, chi_eff, c, mb, mns
+
+def best_time(run, nsamples, repeat):
+    with np.errstate(all='ignore'):
+        return min(timeit.repeat(run, number=1, repeat=repeat))/nsamples
+
+def bns_time(fit, nsamples, repeat):
+    m1, mb1, c1, m2, mb2, c2 = make_bns(nsamples)
+    def run():
+        if fit is DiUj2017:
+            fit.calc_meje(m1, mb1, c1, m2, mb2, c2)
+        else:
+            fit.calc_meje(m1, c1, m2, c2)
+        fit.calc_vej(m1, c1, m2, c2)
+    return best_time(run, nsamples, repeat)
+
+def time_DiUj2017(nsamples=100000, repeat=3):
+    return bns_time(DiUj2017, nsamples, repeat)
+
+def time_Di2018b(nsamples=100000, repeat=3):
+    return bns_time(Di2018b, nsamples, repeat)
+
+def time_CoDi2019(nsamples=100000, repeat=3):
+    return bns_time(CoDi2019, nsamples, repeat)
+
+def time_PaDi2019(nsamples=100000, repeat=3):
+    return bns_time(PaDi2019, nsamples, repeat)
+
+def time_KaKy2016(nsamples=100000, repeat=3):
+    q, chi_eff, c, mb, mns = make_nsbh(nsamples)
+    def run():
+        KaKy2016.calc_meje(q, chi_eff, c, mb, mns)
+        KaKy2016.calc_vave(q)
+    return best_time(run, nsamples, repeat)
+
+def time_KrFo2019(nsamples=100000, repeat=3):
+    q, chi_eff, c, mb, mns = make_nsbh(nsamples)
+    def run():
+        KrFo2019.calc_meje(q, chi_eff, c, mns)
+        KrFo2019.calc_vave(q)
+    return best_time(run, nsamples, repeat)
+
+if __name__ == "__main__":
+    nsamples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name in ["DiUj2017", "Di2018b", "CoDi2019", "PaDi2019", "KaKy2016", "KrFo2019"]:
+        seconds = globals()["time_%s" % name](nsamples)
+        print("%-10s %.3e s per sample (%d samples)" % (name, seconds, nsamples))
@@ -0,0 +1,54 @@
+"""Cost of the EOS ensemble lookups of marginalize_eos_spec and run_EOS.
+
+The ensemble is the unit test GP draws of embright_gwlc, repeated to the
+size of the spectral ensemble (2396 EOS).  time_values interpolates one
+EOS at a time with numpy.interp, time_lookup does the same (N, K) batch
+with EOSEnsemble.lookup; both are in seconds per (mass, EOS) pair.
+
+Run as ``python benchmarks/bench_eos.py``, or with the other benchmarks
+through run_benchmarks.py.
+"""
+
+import os, sys
+import glob
+import timeit
+
+import numpy as np
+
+from gwemlightcurves.EOS import ensemble
+
+EOS_SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gwemlightcurves",
+                           "embright_gwlc", "EOS_samples_unit_test")
+
+def make_ensemble(neos=2396):
+    filenames = sorted(glob.glob(os.path.join(EOS_SAMPLES, "MACROdraw-*-0.csv")))
+    branches = [[ensemble.read_branch(filename)] for filename in filenames]
+    return ensemble.EOSEnsemble.from_branches([branches[ii % len(branches)] for ii in range(neos)])
+
+def make_draws(eos_ensemble, nmasses, ndraws, seed=0):
+    rng = np.random.RandomState(seed)
+    masses = rng.uniform(1.0, 2.0, size=(nmasses, 1))
+    indices = rng.randint(0, len(eos_ensemble), size=(nmasses, ndraws))
+    return masses, indices
+
+def time_values(nmasses=10, ndraws=100, repeat=3):
+    eos_ensemble = make_ensemble()
+    masses, indices = make_draws(eos_ensemble, nmasses, ndraws)
+    def run():
+        for ii in range(nmasses):
+            for jj in range(ndraws):
+                eos_ensemble.values(indices[ii,jj], masses[ii])
+    return min(timeit.repeat(run, number=1, repeat=repeat))/(nmasses*ndraws)
+
+def time_lookup(nmasses=100, ndraws=100, repeat=3):
+    eos_ensemble = make_ensemble()
+    masses, indices = make_draws(eos_ensemble, nmasses, ndraws)
+    eos_ensemble.search_keys()
+    def run():
+        eos_ensemble.lookup(indices, masses)
+    return min(timeit.repeat(run, number=1, repeat=repeat))/(nmasses*ndraws)
+
+if __name__ == "__main__":
+    for name in ["values", "lookup"]:
+        seconds = globals()["time_%s" % name]()
+        print("%-10s %.3e s per (mass, EOS) pair" % (name, seconds))
@@ -0,0 +1,45 @@
+"""End-to-end cost of a KNTable.model run on 1000 binaries.
+
+The table holds random BNS masses and compactnesses, as the embright
+jobs produce them, and KNTable.model("Me2017", ...) computes the ejecta
+with the DiUj2017 fits and the light curves of all samples.
+
+Run as ``python benchmarks/bench_kntable.py [nsamples]``, or with the
+other benchmarks through run_benchmarks.py.
+"""
+
+import os, sys
+import timeit
+
+import numpy as np
+
+from gwemlightcurves.KNModels import KNTable
+
+def make_table(nsamples, seed=0):
+    rng = np.random.RandomState(seed)
+    samples = KNTable()
+    samples['m1'] = rng.uniform(1.2, 1.8, nsamples)
+    samples['m2'] = rng.uniform(1.0, 1.2, nsamples)
+    samples['c1'] = rng.uniform(0.12, 0.2, nsamples)
+    samples['c2'] = rng.uniform(0.12, 0.2, nsamples)
+    samples['mb1'] = samples['m1']*(1+0.6*samples['c1']/(1.-0.5*samples['c1']))
+    samples['mb2'] = samples['m2']*(1+0.6*samples['c2']/(1.-0.5*samples['c2']))
+    samples['beta'] = 3.0
+    samples['kappa_r'] = 10.0
+    samples['tini'] = 0.1
+    samples['tmax'] = 14.0
+    samples['dt'] = 0.1
+    return samples
+
+def time_Me2017(nsamples=1000, repeat=3):
+    """Seconds per KNTable.model run (not per sample)."""
+
+    samples = make_table(nsamples)
+    def run():
+        KNTable.model('Me2017', samples.copy())
+    with np.errstate(all='ignore'):
+        return min(timeit.repeat(run, number=1, repeat=repeat))
+
+if __name__ == "__main__":
+    nsamples = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print("KNTable.model('Me2017'): %.3e s per run (%d samples)" % (time_Me2017(nsamples), nsamples))
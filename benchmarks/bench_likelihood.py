@@ -0,0 +1,45 @@
+"""Per-call cost of the light-curve likelihood on GW170817.
+
+calc_prob compares a fixed Me2017 light curve with the AT2017gfo
+photometry of lightcurves/GW170817.dat, prepared as
+run_lightcurves_models.py does.  The observations are compiled before
+the timed runs, so this is the cost paid at every sampler step.
+
+Run as ``python benchmarks/bench_likelihood.py [ncalls]``, or with the
+other benchmarks through run_benchmarks.py.
+"""
+
+import os, sys
+import timeit
+
+import numpy as np
+
+from gwemlightcurves.KNModels.io import Me2017
+from gwemlightcurves.sampler import events, loglike
+from gwemlightcurves.sampler.context import LikelihoodContext
+
+lightcurvesDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lightcurves')
+T0, distance = 57982.5285236896, 40.0
+
+def make_context(filters=["u", "g", "r", "i", "z", "y", "J", "H", "K"]):
+    data_out = events.load_event(os.path.join(lightcurvesDir, "GW170817.dat"), T0=T0,
+                                 distance=distance, filters=filters, tmin=0.0, tmax=14.0)
+    context = LikelihoodContext(data_out=data_out, filters=list(data_out.keys()),
+                                doLightcurves=1, errorbudget=1.0)
+    # compile the observations outside of the timed runs
+    context.observations
+    return context
+
+def time_calc_prob(ncalls=1000, repeat=3):
+    context = make_context()
+    with np.errstate(all='ignore'):
+        tmag, lbol, mag, Tobs = Me2017.calc_lc(0.1, 14.0, 0.1, 0.03, 0.2, 3.0, 1.0)
+    def run():
+        for i in range(ncalls):
+            loglike.calc_prob(tmag, lbol, mag, 0.0, 0.0, errorbudget=1.0, context=context)
+    with np.errstate(all='ignore'):
+        return min(timeit.repeat(run, number=1, repeat=repeat))/ncalls
+
+if __name__ == "__main__":
+    ncalls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print("calc_prob: %.3e s per call" % time_calc_prob(ncalls))
@@ -0,0 +1,106 @@
+"""Per-light-curve cost of the analytic KNModels.
+
+Each benchmark evaluates ``calc_lc_batch`` on a batch of random samples
+and returns the best time per light curve.  WoKo2017 is run on a
+synthetic table in the layout of the Wollaeger et al. files, so that no
+data outside of the repository is needed.
+
+Run as ``python benchmarks/bench_models.py [nsamples]``, or with the
+other benchmarks through run_benchmarks.py.
+"""
+
+import os, sys
+import atexit
+import shutil
+import tempfile
+import timeit
+
+import numpy as np
+
+from gwemlightcurves.KNModels.io import Me2017, DiUj2017, KaKy2016, SmCh2017, WoKo2017
+
+tini, tmax, dt = 0.1, 14.0, 0.1
+
+def make_samples(nsamples, seed=0):
+    rng = np.random.RandomState(seed)
+    samples = {}
+    samples["mej"] = 10**rng.uniform(-3, -1, nsamples)
+    samples["vej"] = rng.uniform(0.05, 0.3, nsamples)
+    samples["kappa_r"] = 10**rng.uniform(-1, 2, nsamples)
+    samples["beta"] = rng.uniform(1.0, 5.0, nsamples)
+    samples["slope_r"] = rng.uniform(-1.5, -1.1, nsamples)
+    samples["theta_r"] = rng.uniform(0.0, 90.0, nsamples)
+    return samples
+
+def best_time(run, nsamples, repeat):
+    with np.errstate(all='ignore'):
+        return min(timeit.repeat(run, number=1, repeat=repeat))/nsamples
+
+def time_Me2017(nsamples=100, repeat=3):
+    s = make_samples(nsamples)
+    def run():
+        Me2017.calc_lc_batch(tini, tmax, dt, s["mej"], s["vej"], s["beta"], s["kappa_r"])
+    return best_time(run, nsamples, repeat)
+
+def time_DiUj2017(nsamples=100, repeat=3):
+    s = make_samples(nsamples)
+    ones = np.ones(nsamples)
+    def run():
+        DiUj2017.calc_lc_batch(tini, tmax, dt, s["mej"], s["vej"], 0.00*ones,
+                               0.2*ones, 3.14*ones, 10.0*ones, 1.58*(10**10)*ones,
+                               1.2*ones, 0.5*ones, 1)
+    return best_time(run, nsamples, repeat)
+
+def time_KaKy2016(nsamples=100, repeat=3):
+    s = make_samples(nsamples)
+    ones = np.ones(nsamples)
+    def run():
+        KaKy2016.calc_lc_batch(tini, tmax, dt, s["mej"], s["vej"], 0.00*ones,
+                               0.2*ones, 3.14*ones, 10.0*ones, 1.58*(10**10)*ones,
+                               1.2*ones, 0.5*ones)
+    return best_time(run, nsamples, repeat)
+
+def time_SmCh2017(nsamples=100, repeat=3):
+    s = make_samples(nsamples)
+    def run():
+        SmCh2017.calc_lc_batch(tini, tmax, dt, s["mej"], s["vej"], s["slope_r"], s["kappa_r"])
+    return best_time(run, nsamples, repeat)
+
+_modelfile = None
+
+def synthetic_modelfile():
+    """Synthetic WoKo2017 table, written once per process."""
+
+    global _modelfile
+    if _modelfile is None:
+        rng = np.random.RandomState(0)
+        nt, nbins = 30, 54
+        t = np.linspace(0.05, 20, nt)
+        slices = []
+        for ii in range(9):
+            if ii == 0:
+                data = 10**rng.uniform(38, 42, (nt, nbins))
+            else:
+                data = rng.uniform(-16, -10, (nt, nbins))
+            slices.append(np.column_stack([np.full(nt, ii), t, data]))
+        tmpdir = tempfile.mkdtemp()
+        atexit.register(shutil.rmtree, tmpdir, True)
+        _modelfile = os.path.join(tmpdir, 'DZ2_mags_2017-03-20.dat')
+        np.savetxt(_modelfile, np.vstack(slices))
+    return _modelfile
+
+def time_WoKo2017(nsamples=100, repeat=3):
+    s = make_samples(nsamples)
+    modelfile = synthetic_modelfile()
+    # parse the table outside of the timed runs
+    WoKo2017.get_model(modelfile=modelfile)
+    def run():
+        WoKo2017.calc_lc_batch(tini, tmax, dt, s["mej"], s["vej"], s["theta_r"],
+                               s["kappa_r"], modelfile=modelfile)
+    return best_time(run, nsamples, repeat)
+
+if __name__ == "__main__":
+    nsamples = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    for name in ["Me2017", "DiUj2017", "KaKy2016", "SmCh2017", "WoKo2017"]:
+        seconds = globals()["time_%s" % name](nsamples)
+        print("%-10s %.3e s per light curve (%d samples)" % (name, seconds, nsamples))
@@ -0,0 +1,81 @@
+"""Per-light-curve cost of the SVD/GP surrogate models.
+
+The surrogates are the synthetic two-parameter models of
+tests/test_svd_utils.py, trained when the module is first used, so that
+no model grid in ../output is needed.  calc_lc is timed one sample at a
+time as in the samplers, calc_lc_batch on the whole batch, with the
+sklearn and the frozen GPs.
+
+Run as ``python benchmarks/bench_svd.py [nsamples]``, or with the other
+benchmarks through run_benchmarks.py.
+"""
+
+import os, sys
+import timeit
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gwemlightcurves import svd_utils
+from tests.test_svd_utils import make_svd_models
+
+tini, tmax, dt = 0.0, 14.0, 0.1
+
+_models = {}
+
+def get_models(frozen=False):
+    if not frozen in _models:
+        if not False in _models:
+            # the GP hyperparameter fits of the toy models do not converge
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                _models[False] = make_svd_models()
+        svd_mag_model, svd_lbol_model = _models[False]
+        if frozen:
+            _models[True] = (svd_utils.freeze_svd_model(svd_mag_model),
+                             svd_utils.freeze_svd_model(svd_lbol_model))
+    return _models[frozen]
+
+def make_samples(nsamples, seed=1):
+    rng = np.random.RandomState(seed)
+    return np.vstack((rng.uniform(-3.0, -1.0, size=nsamples),
+                      rng.uniform(0.0, 1.0, size=nsamples))).T
+
+def time_calc_lc(nsamples=20, repeat=3):
+    svd_mag_model, svd_lbol_model = get_models()
+    param_matrix = make_samples(nsamples)
+    def run():
+        for param_list in param_matrix:
+            svd_utils.calc_lc(tini, tmax, dt, param_list,
+                              svd_mag_model=svd_mag_model,
+                              svd_lbol_model=svd_lbol_model)
+    return min(timeit.repeat(run, number=1, repeat=repeat))/nsamples
+
+def time_calc_lc_batch(nsamples=100, repeat=3):
+    svd_mag_model, svd_lbol_model = get_models()
+    param_matrix = make_samples(nsamples)
+    def run():
+        svd_utils.calc_lc_batch(tini, tmax, dt, param_matrix,
+                                svd_mag_model=svd_mag_model,
+                                svd_lbol_model=svd_lbol_model)
+    return min(timeit.repeat(run, number=1, repeat=repeat))/nsamples
+
+def time_calc_lc_batch_frozen(nsamples=100, repeat=3):
+    svd_mag_model, svd_lbol_model = get_models(frozen=True)
+    param_matrix = make_samples(nsamples)
+    def run():
+        svd_utils.calc_lc_batch(tini, tmax, dt, param_matrix,
+                                svd_mag_model=svd_mag_model,
+                                svd_lbol_model=svd_lbol_model)
+    return min(timeit.repeat(run, number=1, repeat=repeat))/nsamples
+
+if __name__ == "__main__":
+    nsamples = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    direct = time_calc_lc(min(nsamples, 20))
+    batch = time_calc_lc_batch(nsamples)
+    frozen = time_calc_lc_batch_frozen(nsamples)
+    print("calc_lc:                   %.3e s per light curve" % direct)
+    print("calc_lc_batch:             %.3e s per light curve (%d samples)" % (batch, nsamples))
+    print("calc_lc_batch, frozen GPs: %.3e s per light curve (%d samples)" % (frozen, nsamples))
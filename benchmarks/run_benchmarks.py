@@ -0,0 +1,142 @@
+#!/usr/bin/python
+"""Run the benchmarks and save the timings as JSON.
+
+Every ``time_*`` function of the benchmarks/bench_*.py modules is run
+with its default arguments; each returns the best of a few repeats, in
+seconds per light curve, likelihood call, sample or run as documented in
+its module.  The results are written, with the commit and the versions
+of the main dependencies, to ``benchmarks/results/<commit>.json`` so
+that runs on different commits can be compared:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py -k bench_models --compare benchmarks/results/0b18c64.json
+"""
+
+import os, sys
+import glob
+import importlib
+import json
+import platform
+import subprocess
+import time
+import warnings
+import optparse
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchmarkDir, '..'))
+sys.path.insert(0, benchmarkDir)
+
+def parse_commandline():
+    """
+    Parse the options given on the command-line.
+    """
+    parser = optparse.OptionParser()
+
+    parser.add_option("-o", "--outputFile", default=None,
+                      help="JSON file of the results, by default benchmarks/results/<commit>.json")
+    parser.add_option("-k", "--keyword", default=None,
+                      help="Only run the benchmarks whose name contains this string")
+    parser.add_option("--compare", default=None,
+                      help="JSON file of an earlier run to compare with")
+    parser.add_option("--threshold", default=1.1, type=float,
+                      help="Ratio to the earlier run above which a benchmark is flagged")
+
+    opts, args = parser.parse_args()
+
+    return opts
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                         cwd=benchmarkDir, stderr=subprocess.DEVNULL)
+        status = subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                         cwd=benchmarkDir, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit.decode().strip(), len(status.strip()) > 0
+
+def versions():
+    versions = {"python": platform.python_version()}
+    for name in ["numpy", "scipy", "astropy", "sklearn"]:
+        try:
+            versions[name] = importlib.import_module(name).__version__
+        except ImportError:
+            versions[name] = None
+    return versions
+
+def find_benchmarks(keyword=None):
+    """List of (name, function) of the time_* functions of the bench_*.py modules."""
+
+    benchmarks = []
+    for filename in sorted(glob.glob(os.path.join(benchmarkDir, "bench_*.py"))):
+        modname = os.path.splitext(os.path.basename(filename))[0]
+        module = importlib.import_module(modname)
+        for attr in sorted(dir(module)):
+            function = getattr(module, attr)
+            if not attr.startswith("time_") or not callable(function):
+                continue
+            name = "%s.%s" % (modname, attr)
+            if keyword is not None and not keyword in name:
+                continue
+            benchmarks.append((name, function))
+    return benchmarks
+
+def run_benchmarks(benchmarks):
+    results = {}
+    for name, function in benchmarks:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results[name] = function()
+        print("%-45s %.3e s" % (name, results[name]))
+    return results
+
+def compare(results, filename, threshold=1.1):
+    """Print the ratio of the new timings to those of ``filename``."""
+
+    old = json.load(open(filename))
+    print("")
+    print("Compared with %s (commit %s):" % (filename, old.get("commit")))
+    nslower = 0
+    for name in sorted(results):
+        if not name in old["results"]:
+            continue
+        ratio = results[name]/old["results"][name]
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            nslower = nslower + 1
+        elif ratio < 1.0/threshold:
+            flag = "  faster"
+        print("%-45s %8.2f%s" % (name, ratio, flag))
+    return nslower
+
+def main():
+    opts = parse_commandline()
+
+    commit, dirty = git_commit()
+    outputFile = opts.outputFile
+    if outputFile is None:
+        resultsDir = os.path.join(benchmarkDir, "results")
+        if not os.path.isdir(resultsDir):
+            os.makedirs(resultsDir)
+        outputFile = os.path.join(resultsDir, "%s%s.json" % (commit, "-dirty" if dirty else ""))
+
+    results = run_benchmarks(find_benchmarks(opts.keyword))
+    data = {"commit": commit,
+            "dirty": dirty,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "machine": platform.node(),
+            "platform": platform.platform(),
+            "versions": versions(),
+            "results": results}
+    with open(outputFile, 'w') as fid:
+        json.dump(data, fid, indent=2, sort_keys=True)
+    print("Results written to %s" % outputFile)
+
+    if opts.compare is not None:
+        nslower = compare(results, opts.compare, threshold=opts.threshold)
+        if nslower > 0:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
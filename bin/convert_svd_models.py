@@ -0,0 +1,74 @@
+
+# Convert pickled svd_*_model dictionaries in <outputDir>/svdmodels into the
+# memory-mappable surrogate store read by svd_utils.load_surrogate.
+# Colour models (<colormodel>.pkl, as used by Ka2017inc) are converted with
+# --colormodels.  The Cholesky factors needed for the surrogate
+# uncertainties (return_uncertainty, coverrors) are stored unless --noStd.
+
+import os, sys, shutil
+import optparse
+
+from gwemlightcurves import svd_utils
+
+def parse_commandline():
+    """
+    Parse the options given on the command-line.
+    """
+    parser = optparse.OptionParser()
+
+    parser.add_option("-o","--outputDir",default="../output")
+    parser.add_option("-m","--models",default="Bu2019inc")
+    parser.add_option("-k","--kinds",default="mag,lbol")
+    parser.add_option("-c","--colormodels",default="")
+    parser.add_option("--doStd",  action="store_true", default=True)
+    parser.add_option("--noStd",  action="store_false", dest="doStd")
+    parser.add_option("--doOverwrite",  action="store_true", default=False)
+
+    opts, args = parser.parse_args()
+
+    return opts
+
+# Parse command line
+opts = parse_commandline()
+
+ModelPath = '%s/svdmodels'%(opts.outputDir)
+
+models = opts.models.split(",")
+kinds = opts.kinds.split(",")
+
+for model in models:
+    for kind in kinds:
+        modelfile = os.path.join(ModelPath,'%s_%s.pkl' % (model, kind))
+        if not os.path.isfile(modelfile):
+            print('No pickle found at %s, skipping...' % modelfile)
+            continue
+
+        surrogatepath = svd_utils.get_surrogate_path(model, kind, modelpath=ModelPath)
+        if os.path.isdir(surrogatepath):
+            if not opts.doOverwrite:
+                print('%s exists, skipping...' % surrogatepath)
+                continue
+            shutil.rmtree(surrogatepath)
+
+        print('Converting %s...' % modelfile)
+        surrogatepath = svd_utils.convert_surrogate(model, kind, modelpath=ModelPath, store_std=opts.doStd)
+        print('Wrote %s' % surrogatepath)
+
+colormodels = [colormodel for colormodel in opts.colormodels.split(",") if colormodel]
+
+for colormodel in colormodels:
+    modelfile = os.path.join(ModelPath,'%s.pkl' % colormodel)
+    if not os.path.isfile(modelfile):
+        print('No pickle found at %s, skipping...' % modelfile)
+        continue
+
+    surrogatepath = svd_utils.get_color_surrogate_path(colormodel, modelpath=ModelPath)
+    if os.path.isdir(surrogatepath):
+        if not opts.doOverwrite:
+            print('%s exists, skipping...' % surrogatepath)
+            continue
+        shutil.rmtree(surrogatepath)
+
+    print('Converting %s...' % modelfile)
+    surrogatepath = svd_utils.convert_color_surrogate(colormodel, modelpath=ModelPath, store_std=opts.doStd)
+    print('Wrote %s' % surrogatepath)
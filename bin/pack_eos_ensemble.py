@@ -0,0 +1,62 @@
+# Pack a nonparametric EOS ensemble (the spectral macro-spec_%dcr.csv draws or
+# the GP MACROdraw-<eos>-<branch>.csv branches) into the single store read by
+# gwemlightcurves.EOS.ensemble.load_ensemble.  The gw170817-spec and
+# gw170817-gp kinds are the ensembles of EM_Counterpart.
+
+import os, sys
+import optparse
+
+from gwemlightcurves.EOS import ensemble
+
+def parse_commandline():
+    """
+    Parse the options given on the command-line.
+    """
+    parser = optparse.OptionParser()
+
+    parser.add_option("-k","--kind",default="spec",help="spec, gp, gw170817-spec or gw170817-gp")
+    parser.add_option("-e","--eosDir",default=None,
+                      help="CSV directory of the ensemble, by default the one run_EOS and marginalize_eos_spec read")
+    parser.add_option("-p","--posterior",default=ensemble.GP_POSTERIOR,
+                      help="EOS posterior with the eos and logweight_total columns (gp)")
+    parser.add_option("-n","--nsamples",default=2396,type=int,help="Number of spectral EOS draws (spec, 2395 for gw170817-spec)")
+    parser.add_option("-o","--outputFile",default=None,help="Store to write, by default <eosDir>.npz")
+    parser.add_option("--doOverwrite",  action="store_true", default=False)
+
+    opts, args = parser.parse_args()
+
+    return opts
+
+# Parse command line
+opts = parse_commandline()
+
+eosDirs = {"spec": ensemble.SPEC_MACRO_DIR,
+           "gp": ensemble.GP_DIR,
+           "gw170817-spec": ensemble.GW170817_SPEC_DIR,
+           "gw170817-gp": ensemble.GW170817_GP_DIR}
+if not opts.kind in eosDirs:
+    print('Kind %s unknown, use one of %s' % (opts.kind, ", ".join(sorted(eosDirs.keys()))))
+    exit(1)
+eosDir = opts.eosDir
+if eosDir is None:
+    eosDir = eosDirs[opts.kind]
+
+outputFile = opts.outputFile
+if outputFile is None:
+    outputFile = ensemble.ensemble_file(eosDir)
+if os.path.isfile(outputFile) and not opts.doOverwrite:
+    print('%s exists, use --doOverwrite to replace it' % outputFile)
+    exit(0)
+
+print('Reading %s...' % eosDir)
+if opts.kind in ["spec", "gw170817-spec"]:
+    eos_ensemble = ensemble.ingest_spec(eosDir, nsamples=opts.nsamples)
+elif opts.kind == "gp":
+    eos_ensemble = ensemble.ingest_gp(eosDir, opts.posterior)
+else:
+    eos_ensemble = ensemble.ingest_gp(eosDir, branch_file=ensemble.gw170817_branch_file,
+                                      ids=ensemble.gw170817_ids(eosDir))
+
+eos_ensemble.save(outputFile)
+print('Wrote %s (%d EOS, up to %d branches of %d points)' % (outputFile, len(eos_ensemble),
+      eos_ensemble.M.shape[1], eos_ensemble.M.shape[2]))
@@ -0,0 +1,38 @@
+# Pack the EOS tables of <inputDir>/Monica, <inputDir>/Wolfgang and
+# <inputDir>/lalsim, with their spline coefficients, into the eos_tables.npz
+# bundle read by get_eos_list and the calc_* methods of KNTable.  Rerun it
+# after changing a table.
+
+import os, sys
+import optparse
+
+import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
+
+def parse_commandline():
+    """
+    Parse the options given on the command-line.
+    """
+    parser = optparse.OptionParser()
+
+    parser.add_option("-i","--inputDir",default="../input")
+    parser.add_option("-o","--outputFile",default=None,help="Bundle to write, by default <inputDir>/eos_tables.npz")
+    parser.add_option("--doOverwrite",  action="store_true", default=False)
+
+    opts, args = parser.parse_args()
+
+    return opts
+
+# Parse command line
+opts = parse_commandline()
+
+outputFile = opts.outputFile
+if outputFile is None:
+    outputFile = os.path.join(opts.inputDir, et.BUNDLE_NAME)
+if os.path.isfile(outputFile) and not opts.doOverwrite:
+    print('%s exists, use --doOverwrite to replace it' % outputFile)
+    exit(0)
+
+entries = et.pack_eos_tables(opts.inputDir)
+et.save_eos_bundle(entries, outputFile)
+neos = len(set(name.rsplit("/", 1)[0] for name in entries if name != "version"))
+print('Wrote %s (%d EOS tables)' % (outputFile, neos))
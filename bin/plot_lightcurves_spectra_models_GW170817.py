@@ -159,17 +159,7 @@ data = np.loadtxt(multifile)
 tmag2 = tmag2 + t0_best2
 
 outputDir = "../output"
-ModelPath = '%s/svdmodels'%(outputDir)
-
-modelfile = os.path.join(ModelPath,'Ka2017_mag.pkl')
-with open(modelfile, 'rb') as handle:
-    svd_mag_model = pickle.load(handle)
-Global.svd_mag_model = svd_mag_model
-
-modelfile = os.path.join(ModelPath,'Ka2017_lbol.pkl')
-with open(modelfile, 'rb') as handle:
-    svd_lbol_model = pickle.load(handle)
-Global.svd_lbol_model = svd_lbol_model
+Global.ModelPath = '%s/svdmodels'%(outputDir)
 
 mej_1, vej_1, Xlan_1, mej_2, vej_2, Xlan_2, loglikelihood = 10**data[:,0], data[:,1], 10**data[:,2], 10**data[:,3], data[:,4], 10**data[:,5], data[:,6],
 idx = np.argmax(loglikelihood)
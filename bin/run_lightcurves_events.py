@@ -0,0 +1,90 @@
+#!/usr/bin/python
+
+import os, sys, glob
+import optparse
+import numpy as np
+
+from gwemlightcurves import profiler
+from gwemlightcurves.sampler import events
+
+def parse_commandline():
+    """
+    Parse the options given on the command-line.
+    """
+    parser = optparse.OptionParser(usage="%prog [options] event1.dat event2.dat ...")
+
+    parser.add_option("-p","--plotDir",default="../plots")
+    parser.add_option("-l","--lightcurvesDir",default="../lightcurves")
+    parser.add_option("--events",default="",help="comma separated event names in lightcurvesDir, or a glob")
+    parser.add_option("--catalog",default="",help="file with name, filters, T0 and distance per event, e.g. ../lightcurves/GRB.dat")
+    parser.add_option("--distance",default=-1.0,type=float)
+    parser.add_option("--T0",default=0.0,type=float)
+    parser.add_option("-m","--model",default="Ka2017")
+    parser.add_option("--mode",default="ejecta")
+    parser.add_option("-e","--errorbudget",default=1.0,type=float)
+    parser.add_option("-f","--filters",default="g,r,i,z")
+    parser.add_option("--tmax",default=7.0,type=float)
+    parser.add_option("--tmin",default=0.05,type=float)
+    parser.add_option("--doFixZPT0",  action="store_true", default=False)
+    parser.add_option("--doWaveformExtrapolate",  action="store_true", default=False)
+    parser.add_option("--n_live_points",default=100,type=int)
+    parser.add_option("--n_coeff",default=10,type=int)
+    parser.add_option("--gptype",default="sklearn")
+    parser.add_option("--evidence_tolerance",default=0.5,type=float)
+    parser.add_option("--max_iter",default=0,type=int)
+    parser.add_option("--sampler",default="nested",help="multinest, nested or ensemble")
+    parser.add_option("--n_proc",default=1,type=int,help="number of events fitted at the same time")
+    parser.add_option("--doProfile",  action="store_true", default=False, help="time the likelihood stages, also enabled by GWEMLIGHTCURVES_PROFILE=1")
+
+    opts, args = parser.parse_args()
+
+    return opts, args
+
+# Parse command line
+opts, filenames = parse_commandline()
+
+if opts.doProfile:
+    profiler.enable()
+
+for name in filter(None, opts.events.split(",")):
+    if any(c in name for c in "*?["):
+        filenames = filenames + sorted(glob.glob(os.path.join(opts.lightcurvesDir, name)))
+    else:
+        filenames.append(os.path.join(opts.lightcurvesDir, "%s.dat" % name))
+if len(filenames) == 0:
+    print("No events to fit...")
+    exit(0)
+
+if opts.doFixZPT0:
+    ZPRange = 0.1
+else:
+    ZPRange = 5.0
+
+if opts.distance > 0:
+    distance = opts.distance
+else:
+    distance = None
+if opts.catalog:
+    catalog = opts.catalog
+else:
+    catalog = None
+
+plotDir = os.path.join(opts.plotDir, "events", opts.model, opts.mode,
+                       "_".join(opts.filters.split(",")),
+                       "%.0f_%.0f" % (opts.tmin, opts.tmax), "%.2f" % opts.errorbudget)
+if not os.path.isdir(plotDir):
+    os.makedirs(plotDir)
+
+summary = events.fit_events(opts.model, filenames, plotDir, mode=opts.mode,
+                            catalog=catalog, filters=opts.filters.split(","),
+                            T0=opts.T0, distance=distance,
+                            tmin=opts.tmin, tmax=opts.tmax,
+                            sampler=opts.sampler, n_proc=opts.n_proc,
+                            n_live_points=opts.n_live_points,
+                            evidence_tolerance=opts.evidence_tolerance,
+                            max_iter=opts.max_iter,
+                            errorbudget=opts.errorbudget, ZPRange=ZPRange, T0Range=0.1,
+                            doWaveformExtrapolate=opts.doWaveformExtrapolate,
+                            n_coeff=opts.n_coeff, gptype=opts.gptype)
+summary.pprint(max_lines=-1, max_width=-1)
+print("Summary written to %s" % os.path.join(plotDir, "summary.dat"))
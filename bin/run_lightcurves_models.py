@@ -20,17 +20,12 @@ plt.rcParams['text.usetex'] = True
 
 import corner
 
-try:
-    from tensorflow.keras.models import load_model
-except:
-    print('Install tensorflow if you want to use it...')
-
 import pymultinest
 from gwemlightcurves.sampler import *
 from gwemlightcurves.KNModels import KNTable
 from gwemlightcurves.sampler import run
 from gwemlightcurves import __version__
-from gwemlightcurves import svd_utils, lightcurve_utils, ztf_utils, Global
+from gwemlightcurves import svd_utils, lightcurve_utils, ztf_utils, profiler, Global
 
 def parse_commandline():
     """
@@ -73,6 +68,9 @@ def parse_commandline():
     parser.add_option("--n_coeff",default=10,type=int)
     parser.add_option("--evidence_tolerance",default=0.5,type=float)
     parser.add_option("--max_iter",default=0,type=int)
+    parser.add_option("--sampler",default="multinest",help="multinest, nested or ensemble")
+    parser.add_option("--n_cpu",default=1,type=int)
+    parser.add_option("--doProfile",  action="store_true", default=False, help="time the likelihood stages, also enabled by GWEMLIGHTCURVES_PROFILE=1")
 
     parser.add_option("--doFixXlan",  action="store_true", default=False) 
     parser.add_option("--Xlan",default=1e-9,type=float) 
@@ -95,6 +93,9 @@ def parse_commandline():
 # Parse command line
 opts = parse_commandline()
 
+if opts.doProfile:
+    profiler.enable()
+
 if not opts.model in ["DiUj2017","KaKy2016","Me2017","Me2017_A","Me2017x2","SmCh2017","WoKo2017","BaKa2016","Ka2017","Ka2017_A","Ka2017inc","Ka2017x2","Ka2017x2inc","Ka2017x3","Ka2017x3inc","RoFe2017","BoxFit","TrPi2018","Ka2017_TrPi2018","Ka2017_TrPi2018_A","Bu2019","Bu2019inc","Bu2019lf","Bu2019lr","Bu2019lm","Bu2019inc_TrPi2018","Bu2019rp","Bu2019rps","Bu2021ka"]:
     print("Model must be either: DiUj2017,KaKy2016,Me2017,Me2017_A,Me2017x2,SmCh2017,WoKo2017,BaKa2016, Ka2017, Ka2017inc, Ka2017_A, Ka2017x2, Ka2017x2inc, Ka2017x3, Ka2017x3inc, RoFe2017, BoxFit, TrPi2018, Ka2017_TrPi2018, Ka2017_TrPi2018_A, Bu2019, Bu2019inc, Bu2019lf, Bu2019lr, Bu2019lm, Bu2019inc_TrPi2018,Bu2019rp,Bu2019rps, Bu2021ka")
     exit(0)
@@ -426,161 +427,12 @@ if opts.doFixXlan:
     Global.phi = opts.phi
 
 if opts.model in ["Ka2017", "Ka2017inc", "Ka2017_A", "Ka2017x2", "Ka2017x2inc", "Ka2017x3", "Ka2017x3inc", "Ka2017_TrPi2018", "Ka2017_TrPi2018_A", "Bu2019", "Bu2019inc", "Bu2019inc_TrPi2018", "Bu2019lf", "Bu2019lr", "Bu2019lm", "Bu2019rp","Bu2019rps", "Bu2021ka"]:
-    ModelPath = '%s/svdmodels'%(opts.outputDir)
+    Global.ModelPath = '%s/svdmodels'%(opts.outputDir)
 
     if opts.model == "Bu2019":
-        modelfile = os.path.join(ModelPath,'Bu2019_phi%d_mag.pkl' % opts.phi)
-        with open(modelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        Global.svd_mag_model = svd_mag_model    
-            
-        modelfile = os.path.join(ModelPath,'Bu2019_phi%d_lbol.pkl' % opts.phi)
-        with open(modelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-        Global.svd_lbol_model = svd_lbol_model
-    elif opts.model in ["Bu2019inc","Bu2019inc_TrPi2018"]:
-        modelfile = os.path.join(ModelPath,'Bu2019inc_mag.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        Global.svd_mag_model = svd_mag_model    
-            
-        modelfile = os.path.join(ModelPath,'Bu2019inc_lbol.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-        Global.svd_lbol_model = svd_lbol_model
-    elif opts.model == "Bu2019lf":
-        modelfile = os.path.join(ModelPath,'Bu2019lf_mag.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        Global.svd_mag_model = svd_mag_model
-
-        modelfile = os.path.join(ModelPath,'Bu2019lf_lbol.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-        Global.svd_lbol_model = svd_lbol_model
-    elif opts.model == "Bu2019lr":
-        modelfile = os.path.join(ModelPath,'Bu2019lr_mag.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        Global.svd_mag_model = svd_mag_model
-
-        modelfile = os.path.join(ModelPath,'Bu2019lr_lbol.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-        Global.svd_lbol_model = svd_lbol_model
-    elif opts.model == "Bu2019rp":
-        modelfile = os.path.join(ModelPath,'Bu2019rp_mag.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        Global.svd_mag_model = svd_mag_model
-
-        modelfile = os.path.join(ModelPath,'Bu2019rp_lbol.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-        Global.svd_lbol_model = svd_lbol_model
-    elif opts.model == "Bu2019lm":
-        if opts.gptype == "sklearn":
-            magmodelfile = os.path.join(ModelPath,'Bu2019lm_mag.pkl')
-            lbolmodelfile = os.path.join(ModelPath,'Bu2019lm_lbol.pkl')
-        elif opts.gptype == "gp_api":
-            magmodelfile = os.path.join(ModelPath,'Bu2019lm_mag_gpapi.pkl')
-            lbolmodelfile = os.path.join(ModelPath,'Bu2019lm_lbol_gpapi.pkl')
-        elif opts.gptype == "tensorflow":
-            magmodelfile = os.path.join(ModelPath,'Bu2019lm_mag_tf.pkl')
-            lbolmodelfile = os.path.join(ModelPath,'Bu2019lm_lbol_tf.pkl')
-
-        with open(magmodelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        with open(lbolmodelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-
-        if opts.gptype == "gp_api":
-            for filt in svd_mag_model.keys():
-                for ii in range(len(svd_mag_model[filt]["gps"])):
-                    svd_mag_model[filt]["gps"][ii] = svd_utils.load_gpapi(svd_mag_model[filt]["gps"][ii])
-            for ii in range(len(svd_lbol_model["gps"])):
-                svd_lbol_model["gps"][ii] = svd_utils.load_gpapi(svd_lbol_model["gps"][ii])
-
-        elif opts.gptype == "tensorflow":
-            outdir = magmodelfile.replace(".pkl","")
-            for filt in svd_mag_model.keys():
-                outfile = os.path.join(outdir, f'{filt}.h5')
-                svd_mag_model[filt]['model'] = load_model(outfile)
-            outdir = lbolmodelfile.replace(".pkl","")
-            outfile = os.path.join(outdir, 'model.h5')
-            svd_lbol_model['model'] = load_model(outfile)
-
-        Global.svd_mag_model = svd_mag_model
-        Global.svd_lbol_model = svd_lbol_model
-    elif opts.model == "Bu2021ka":
-        if opts.gptype == "sklearn":
-            magmodelfile = os.path.join(ModelPath,'Bu2021ka_mag.pkl')
-            lbolmodelfile = os.path.join(ModelPath,'Bu2021ka_lbol.pkl')
-        elif opts.gptype == "gp_api":
-            magmodelfile = os.path.join(ModelPath,'Bu2021ka_mag_gpapi.pkl')
-            lbolmodelfile = os.path.join(ModelPath,'Bu2021ka_lbol_gpapi.pkl')
-        elif opts.gptype == "tensorflow":
-            magmodelfile = os.path.join(ModelPath,'Bu2021ka_mag_tf.pkl')
-            lbolmodelfile = os.path.join(ModelPath,'Bu2021ka_lbol_tf.pkl')
-
-        with open(magmodelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        with open(lbolmodelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-
-        if opts.gptype == "gp_api":
-            for filt in svd_mag_model.keys():
-                for ii in range(len(svd_mag_model[filt]["gps"])):
-                    svd_mag_model[filt]["gps"][ii] = svd_utils.load_gpapi(svd_mag_model[filt]["gps"][ii])
-            for ii in range(len(svd_lbol_model["gps"])):
-                svd_lbol_model["gps"][ii] = svd_utils.load_gpapi(svd_lbol_model["gps"][ii])
-        elif opts.gptype == "tensorflow":
-            outdir = magmodelfile.replace(".pkl","")
-            for filt in svd_mag_model.keys():
-                outfile = os.path.join(outdir, f'{filt}.h5')
-                svd_mag_model[filt]['model'] = load_model(outfile)
-            outdir = lbolmodelfile.replace(".pkl","")
-            outfile = os.path.join(outdir, 'model.h5')
-            svd_lbol_model['model'] = load_model(outfile)
-
-        Global.svd_mag_model = svd_mag_model
-        Global.svd_lbol_model = svd_lbol_model
-    elif opts.model == "Bu2019rps":
-        modelfile = os.path.join(ModelPath,'Bu2019rps_mag.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        Global.svd_mag_model = svd_mag_model
-
-        modelfile = os.path.join(ModelPath,'Bu2019rps_lbol.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-        Global.svd_lbol_model = svd_lbol_model
-    else:
-        modelfile = os.path.join(ModelPath,'Ka2017_mag.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_mag_model = pickle.load(handle)
-        Global.svd_mag_model = svd_mag_model    
-    
-        modelfile = os.path.join(ModelPath,'Ka2017_lbol.pkl')
-        with open(modelfile, 'rb') as handle:
-            svd_lbol_model = pickle.load(handle)
-        Global.svd_lbol_model = svd_lbol_model
-
-    if opts.model in ["Ka2017inc"]:
-        modelfile = os.path.join(ModelPath,'%s.pkl' % colormodel)
-        with open(modelfile, 'rb') as handle:
-            svd_mag_color_model = pickle.load(handle)
-        Global.svd_mag_color_model = svd_mag_color_model
-    elif opts.model in ["Ka2017x2inc","Ka2017x3inc"]:
-        Global.svd_mag_color_models = []
-        for colorm in colormodel:
-            if colorm == "a1.0":
-                Global.svd_mag_color_models.append("a1.0")
-            else:
-                modelfile = os.path.join(ModelPath,'%s.pkl' % colorm)
-                with open(modelfile, 'rb') as handle:
-                    svd_mag_color_model = pickle.load(handle)
-                Global.svd_mag_color_models.append(svd_mag_color_model)
+        Global.phi = opts.phi
+    elif opts.model in ["Ka2017inc","Ka2017x2inc","Ka2017x3inc"]:
+        Global.colormodel = colormodel
 
 data, tmag, lbol, mag, t0_best, zp_best, n_params, labels, best = run.multinest(opts,plotDir)
 truths = lightcurve_utils.get_truths(opts.name,opts.model,n_params,opts.doEjecta)
@@ -20,7 +20,7 @@ import corner
 from gwemlightcurves.KNModels import KNTable
 from gwemlightcurves.sampler import run
 from gwemlightcurves import __version__
-from gwemlightcurves import lightcurve_utils, Global
+from gwemlightcurves import lightcurve_utils, profiler, Global
 
 def parse_commandline():
     """
@@ -52,6 +52,7 @@ def parse_commandline():
     parser.add_option("--tmin",default=0.05,type=float)
     parser.add_option("--dt",default=0.05,type=float)
     parser.add_option("--n_live_points",default=100,type=int)
+    parser.add_option("--doProfile",  action="store_true", default=False, help="time the likelihood stages, also enabled by GWEMLIGHTCURVES_PROFILE=1")
 
     opts, args = parser.parse_args()
 
@@ -60,6 +61,9 @@ def parse_commandline():
 # Parse command line
 opts = parse_commandline()
 
+if opts.doProfile:
+    profiler.enable()
+
 if not opts.model in ["DiUj2017","KaKy2016","Me2017","SmCh2017","WoKo2017","BaKa2016","Ka2017","Ka2017x2","RoFe2017"]:
     print "Model must be either: DiUj2017,KaKy2016,Me2017,SmCh2017,WoKo2017,BaKa2016, Ka2017, Ka2017x2, RoFe2017"
     exit(0)
@@ -244,17 +248,7 @@ Global.T0Range = T0Range
 Global.doLuminosity = 1
 
 if opts.model == "Ka2017" or opts.model == "Ka2017x2":
-    ModelPath = '%s/svdmodels'%(opts.outputDir)
-
-    modelfile = os.path.join(ModelPath,'Ka2017_mag.pkl')
-    with open(modelfile, 'rb') as handle:
-        svd_mag_model = pickle.load(handle)
-    Global.svd_mag_model = svd_mag_model
-
-    modelfile = os.path.join(ModelPath,'Ka2017_lbol.pkl')
-    with open(modelfile, 'rb') as handle:
-        svd_lbol_model = pickle.load(handle)
-    Global.svd_lbol_model = svd_lbol_model
+    Global.ModelPath = '%s/svdmodels'%(opts.outputDir)
 
 data, tmag, lbol, mag, t0_best, zp_best, n_params, labels, best = run.multinest(opts,plotDir)
 truths = lightcurve_utils.get_truths(opts.name,opts.model,n_params,opts.doEjecta)
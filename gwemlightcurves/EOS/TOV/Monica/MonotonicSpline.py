@@ -4,45 +4,37 @@ import numpy as np
 def interpolate(x_values,y_values):
     """
     https://uglyduckling.nl/library_files/PRE-PRINT-UD-2014-03.pdf
+
+    consts[i] are the first, second and third order coefficients of the
+    cubic between x_values[i] and x_values[i+1] (zero for the last row).
     """
     #make sure the x and y arrays are the same size
     if len(x_values)!=len(y_values):
         print("X and Y arrays must be the same length!")
         return
 
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
     n=len(x_values)
-    h=np.zeros(n)
-    m=np.zeros(n)
-    beta=np.zeros(n)
-    #l=np.zeros(n)
-    #mu=np.zeros(n)
-    #z=np.zeros(n)
     consts=np.zeros((n,3))
-
-    for i in np.arange(0,n-1,1):
-        h[i]=x_values[i+1]-x_values[i]
-        if h[i]==0:
-            h[i]=10**-4
-        m[i]=(y_values[i+1]-y_values[i])/h[i]
-
-    consts[0,0]=0.
-    consts[n-1,0]=0.
-
-    for i in np.arange(1,n-1,1):
-       if (m[i-1]*m[i]<=0.):
-           consts[i,0]=0.
-       elif (m[i-1]*m[i]>0.):
-          beta[i]=(3.*m[i-1]*m[i])/(max(m[i-1],m[i])+2.*min(m[i-1],m[i]))
-          if np.sign(m[i-1])==1 and np.sign(m[i])==1:
-             consts[i,0]= min(max(0.,beta[i]),3.*min(m[i-1],m[i]))
-          elif np.sign(m[i-1])==-1 and np.sign(m[i])==-1:
-             consts[i,0]=max(min(0.,beta[i]),3.*max(m[i-1],m[i]))
-          else:
-             print("We have a problem")
-
-    for i in np.arange(0,n-1,1):
-       consts[i,1]=(3*m[i]-consts[i+1,0]-2.*consts[i,0])/h[i]
-       consts[i,2]=(consts[i+1,0]+consts[i,0]-2.*m[i])/h[i]**2
+    if n < 2:
+        return consts
+
+    h=np.diff(x_values)
+    h[h==0]=10**-4
+    m=np.diff(y_values)/h
+
+    # slopes at the interior points, zero at the ends and at the extrema
+    mp, mn = m[:-1], m[1:]
+    mmin, mmax = np.minimum(mp,mn), np.maximum(mp,mn)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta=(3.*mp*mn)/(mmax+2.*mmin)
+    slopes=np.where(mp>0., np.minimum(np.maximum(0.,beta),3.*mmin),
+                    np.maximum(np.minimum(0.,beta),3.*mmax))
+    consts[1:n-1,0]=np.where(mp*mn>0., slopes, 0.)
+
+    consts[:n-1,1]=(3*m-consts[1:,0]-2.*consts[:n-1,0])/h
+    consts[:n-1,2]=(consts[1:,0]+consts[:n-1,0]-2.*m)/h**2
 
     return consts
 
@@ -1,26 +1,217 @@
+import os
+import re
+import sys
+import glob
+
 import numpy as np
+from distutils.spawn import find_executable
+from astropy.table import Table
+
+import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
+
 #do not extrapolate
 def values_from_table(mass, mass_table, value_table, consts):
     """
+    Values of the spline ``consts`` of value_table(mass_table) at ``mass``.
+
+    Masses in the table take the table value, masses above it 1e-6 and
+    masses below it 0.  The table may turn over past its maximum mass:
+    a mass between two increasing table values takes the cubic of that
+    interval, of the last one if there are several.
     """
-    value = np.zeros(mass.size)
-    for (idx, imass) in enumerate(mass):
-        # Check if mass is larger than largest value in table and set to constant
-        if imass > mass_table.max():
-            value[idx] = 10**-6
-            continue
+    mass = np.asarray(mass, dtype=float)
+    mass_table = np.asarray(mass_table, dtype=float)
+    value_table = np.asarray(value_table, dtype=float)
+    value = np.zeros(mass.shape)
 
-        # check if any of the masses are in the table exactly
-        if imass in mass_table:
-            value[idx] = value_table[idx]
+    # finally extrapolate if mass is in between to mass_table values, over each increasing run of the table
+    increasing = np.where(np.diff(mass_table) > 0)[0]
+    for run in np.split(increasing, np.where(np.diff(increasing) > 1)[0] + 1):
+        if len(run) == 0:
             continue
+        xs = mass_table[run[0]:run[-1] + 2]
+        idx = np.clip(np.searchsorted(xs, mass, side='right') - 1, 0, len(xs) - 2)
+        inside = (mass > xs[idx]) & (mass < xs[idx + 1])
+        idx_table = run[0] + idx[inside]
+        dm = mass[inside] - mass_table[idx_table]
+        value[inside] = value_table[idx_table] + consts[idx_table,0] * dm + consts[idx_table,1] * dm**2 + consts[idx_table,2] * dm**3
 
-        # finally extrapolate if mass is in between to mass_table values
-        for (idx_table, tmp) in enumerate(mass_table):
-            if mass_table.size != idx_table + 1:
-                if (mass_table[idx_table] < imass and mass_table[idx_table + 1] > imass):
+    # check if any of the masses are in the table exactly
+    order = np.argsort(mass_table, kind='mergesort')
+    pos = np.clip(np.searchsorted(mass_table[order], mass), 0, len(mass_table) - 1)
+    exact = mass_table[order][pos] == mass
+    value[exact] = value_table[order][pos][exact]
 
-                    value[idx] = value_table[idx_table] + consts[idx_table,0] * (imass - mass_table[idx_table]) + consts[idx_table,1] * (imass - mass_table[idx_table])**2 + consts[idx_table,2] *(imass - mass_table[idx_table])**3
+    # Check if mass is larger than largest value in table and set to constant
+    value[mass > mass_table.max()] = 10**-6
 
-                    continue
     return value
+
+# table of each TOV solver and its mass column
+TABLES = {"Monica": ("%s_mr.dat", "mass"),
+          "Wolfgang": ("%s.tidal.seq", "grav_mass"),
+          "lalsim": ("%s_lalsim_mr.dat", "mass")}
+
+# The tables of input/Monica, input/Wolfgang and input/lalsim are packed by
+# pack_eos_tables.py into one bundle, eos_tables.npz, holding for every
+# (TOV, EOS) the columns of its table and their spline coefficients
+# against its mass column, under "<TOV>/<EOS>/<column>" and
+# "<TOV>/<EOS>/<column>.spline".  The density columns are interpolated
+# in log10, "log10_<column>".  It is looked up on $PATH as the tables are, then in
+# the input/ directory of a source checkout, then in the share/gwemlightcurves
+# directory of an installation, and read once per process; without it the
+# tables are read one by one.  Rerun pack_eos_tables.py after changing a
+# table: a bundle older than the tables next to it is not used.
+BUNDLE_VERSION = 1
+BUNDLE_NAME = "eos_tables.npz"
+# tables written within this many seconds after the bundle, as by the
+# checkout that wrote the bundle, do not make it stale
+BUNDLE_MTIME_SLACK = 2.0
+LOG_COLUMNS = ["rho_c", "baryon_mass_density"]
+
+def read_eos_table(filename):
+    """
+    Columns of an EOS table, as a dict of arrays.
+
+    The column names are those of the commented header, without units
+    such as "radius (km)".
+    """
+    with open(filename) as fid:
+        header = fid.readline()
+    data = np.atleast_2d(np.loadtxt(filename))
+    names = re.sub(r"\(.*?\)", " ", header.lstrip("#")).split()
+    if len(names) != data.shape[1]:
+        raise ValueError('Cannot read the header of %s' % filename)
+    return dict((name, data[:,ii]) for ii, name in enumerate(names))
+
+def pack_eos_tables(inputDir):
+    """
+    Bundle entries of the tables of inputDir/Monica, inputDir/Wolfgang and inputDir/lalsim.
+    """
+    entries = {"version": np.array(BUNDLE_VERSION)}
+    for TOV, (pattern, mass_column) in TABLES.items():
+        suffix = pattern % ""
+        filenames = glob.glob(os.path.join(inputDir, TOV, "*" + suffix))
+        for filename in sorted(filenames):
+            EOS = os.path.basename(filename)[:-len(suffix)]
+            if TOV == "Monica" and "lalsim" in EOS:
+                continue
+            columns = read_eos_table(filename)
+            for column in LOG_COLUMNS:
+                if column in columns:
+                    columns["log10_" + column] = np.log10(columns[column])
+            for column, values in columns.items():
+                name = "%s/%s/%s" % (TOV, EOS, column)
+                entries[name] = values
+                # the densities are interpolated in log10
+                if column != mass_column and not column in LOG_COLUMNS:
+                    with np.errstate(all='ignore'):
+                        entries[name + ".spline"] = ms.interpolate(columns[mass_column], values)
+    return entries
+
+def save_eos_bundle(entries, filename):
+    """
+    Write the bundle entries to filename, replacing it atomically.
+    """
+    dirname = os.path.dirname(os.path.abspath(filename))
+    tmpname = os.path.join(dirname, ".%s.tmp%d.npz" % (os.path.basename(filename), os.getpid()))
+    np.savez(tmpname, **entries)
+    os.replace(tmpname, filename)
+
+def bundle_path():
+    """
+    Path of eos_tables.npz, None if it has not been built.
+    """
+    filename = find_executable(BUNDLE_NAME)
+    if filename is None:
+        for dirname in [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "input"),
+                        os.path.join(sys.prefix, "share", "gwemlightcurves")]:
+            filename = os.path.join(dirname, BUNDLE_NAME)
+            if os.path.isfile(filename):
+                break
+        else:
+            return None
+    return os.path.normpath(filename)
+
+def bundle_is_stale(filename):
+    """
+    Whether a table of the Monica, Wolfgang or lalsim directory next to the
+    bundle ``filename`` is newer than it.
+    """
+    mtime = os.path.getmtime(filename) + BUNDLE_MTIME_SLACK
+    dirname = os.path.dirname(os.path.abspath(filename))
+    for TOV, (pattern, mass_column) in TABLES.items():
+        for tablename in glob.glob(os.path.join(dirname, TOV, pattern % "*")):
+            if os.path.getmtime(tablename) > mtime:
+                return True
+    return False
+
+# {TOV: {EOS: {column: array}}} of the bundle, once read
+_bundle = {}
+
+def load_eos_bundle(filename=None):
+    """
+    Index of the bundle ``filename`` (by default bundle_path()), None without
+    a bundle or if it is older than the tables.
+    """
+    if not "index" in _bundle:
+        if filename is None:
+            filename = bundle_path()
+        if filename is not None and bundle_is_stale(filename):
+            print('EOS bundle %s is older than the tables, reading the tables; rerun pack_eos_tables.py' % filename)
+            filename = None
+        index = None
+        if filename is not None:
+            index = {}
+            with np.load(filename) as data:
+                if int(data["version"]) > BUNDLE_VERSION:
+                    raise ValueError('EOS bundle %s has version %d, this version of gwemlightcurves reads up to %d' % (filename, int(data["version"]), BUNDLE_VERSION))
+                for name in data.files:
+                    if name == "version":
+                        continue
+                    TOV, EOS, column = name.split("/")
+                    index.setdefault(TOV, {}).setdefault(EOS, {})[column] = data[name]
+        _bundle["index"] = index
+    return _bundle["index"]
+
+def eos_list(TOV):
+    """
+    EOS of the bundle for TOV, None without a bundle.
+    """
+    index = load_eos_bundle()
+    if index is None:
+        return None
+    return sorted(index.get(TOV, {}).keys())
+
+# splines read in this process, keyed by (EOS, TOV, column, log)
+_splines = {}
+
+def table_spline(EOS, TOV, column, log=False):
+    """
+    Mass and ``column`` (its log10 if ``log``) of the ``EOS`` table of ``TOV``,
+    with their spline coefficients, from the bundle or else computed once
+    per process from the table.
+    """
+    key = (EOS, TOV, column, log)
+    if not key in _splines:
+        filename, mass_column = TABLES[TOV]
+        name = "log10_" + column if log else column
+        index = load_eos_bundle()
+        if index is not None and EOS in index.get(TOV, {}) and name + ".spline" in index[TOV][EOS]:
+            entry = index[TOV][EOS]
+            _splines[key] = (entry[mass_column], entry[name], entry[name + ".spline"])
+        else:
+            MassRadiusBaryMassTable = Table.read(find_executable(filename % EOS), format='ascii')
+            mass_table = np.array(MassRadiusBaryMassTable[mass_column], dtype=float)
+            value_table = np.array(MassRadiusBaryMassTable[column], dtype=float)
+            if log:
+                value_table = np.log10(value_table)
+            _splines[key] = (mass_table, value_table, ms.interpolate(mass_table, value_table))
+    return _splines[key]
+
+def values_from_eos(mass, EOS, TOV, column, log=False):
+    """
+    ``column`` of the ``EOS`` table of ``TOV`` at ``mass``, see values_from_table.
+    """
+    mass_table, value_table, consts = table_spline(EOS, TOV, column, log=log)
+    return values_from_table(mass, mass_table, value_table, consts)
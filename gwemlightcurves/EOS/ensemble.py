@@ -0,0 +1,320 @@
+"""Binary store of a nonparametric EOS ensemble.
+
+pack_eos_ensemble.py ingests the CSV files of an ensemble
+(``macro-spec_%dcr.csv`` for the spectral ensemble, the
+``MACROdraw-<eos>-<branch>.csv`` stable branches for the GP ensemble)
+into a single ``.npz`` file holding, for every EOS and stable branch, the
+M, Lambda, R and Mb curves, padded to a common length, with the maximum
+mass and the sampling weight of every EOS.  load_ensemble reads it once per process
+and keeps all the curves in memory.
+
+EOSEnsemble.lookup interpolates the curves of many EOS draws at many
+masses in one call, and EOSEnsemble.draw samples EOS for a batch of
+binaries, redrawing those without a valid Lambda or maximum mass.
+
+Layout (``n_eos`` EOS, up to ``n_branch`` branches of up to ``n_point``
+points):
+
+ids, weights, Mmax : (n_eos,)
+    EOS identifiers (draw index or GP EOS number), sampling weights and
+    maximum mass over all branches.
+nbranch : (n_eos,)
+    Number of stable branches of each EOS.
+npoint : (n_eos, n_branch)
+    Number of points of each branch, 0 for missing branches.
+M, Lambda, R, Mb : (n_eos, n_branch, n_point)
+    Each branch is cut at its maximum mass and sorted in mass.  M is
+    padded with +inf, so every row stays sorted, the other curves with
+    0, the value the loaders use outside of a branch.  R and Mb are 0
+    when the ensemble files do not have them.
+"""
+
+import os, sys
+import glob
+
+import numpy as np
+
+ENSEMBLE_VERSION = 1
+COLUMNS = ["M", "Lambda", "R", "Mb"]
+
+# CSV directories of the ensembles used by the loaders; their stores are
+# ensemble_file(<directory>)
+SPEC_NSSTRUC_DIR = "/home/philippe.landry/nseos/eos/spec/macro_nsstruc"
+SPEC_MACRO_DIR = "/home/philippe.landry/nseos/eos/spec/macro"
+GP_DIR = "/home/philippe.landry/nseos/eos/gp/mrgagn"
+GP_POSTERIOR = "/home/philippe.landry/nseos/eos_post_PSRs+GW170817+J0030.csv"
+# the GW170817 ensembles of EM_Counterpart
+GW170817_SPEC_DIR = "/home/philippe.landry/gw170817eos/spec/macro"
+GW170817_GP_DIR = "/home/philippe.landry/gw170817eos/gp/macro"
+
+def ensemble_file(eosdir):
+    """Default store of the ensemble in the directory ``eosdir``."""
+
+    return os.path.normpath(eosdir) + ".npz"
+
+def read_branch(filename):
+    """M, Lambda, R and Mb of the stable part of one CSV branch.
+
+    The branch is cut at its maximum mass, which is kept, and sorted in
+    mass.  The CSV readers this replaces dropped the maximum-mass point
+    (``[0:mmax]``), so a branch now reaches the Mmax of its EOS.
+    """
+
+    data_out = np.genfromtxt(filename, names=True, delimiter=",")
+    marray = np.atleast_1d(data_out["M"])
+    mmax = np.argmax(marray)
+    curves = []
+    for column in COLUMNS:
+        if column in data_out.dtype.names:
+            curves.append(np.atleast_1d(data_out[column])[:mmax+1])
+        else:
+            curves.append(np.zeros(mmax+1))
+    idx = np.argsort(curves[0], kind="mergesort")
+    return [curve[idx] for curve in curves]
+
+class EOSEnsemble(object):
+    """In-memory EOS ensemble, see the module documentation for the layout."""
+
+    def __init__(self, ids, weights, Mmax, nbranch, npoint, M, Lambda, R, Mb):
+        self.ids = np.asarray(ids)
+        self.weights = np.asarray(weights, dtype=float)
+        self.Mmax = np.asarray(Mmax, dtype=float)
+        self.nbranch = np.asarray(nbranch, dtype=int)
+        self.npoint = np.asarray(npoint, dtype=int)
+        self.M = np.asarray(M, dtype=float)
+        self.Lambda = np.asarray(Lambda, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        self.Mb = np.asarray(Mb, dtype=float)
+        self._keys = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_branches(cls, branches, ids=None, weights=None):
+        """Pack ``branches``, a list per EOS of read_branch results."""
+
+        n_eos = len(branches)
+        n_branch = max([len(b) for b in branches] + [1])
+        n_point = max([len(curves[0]) for b in branches for curves in b] + [1])
+        if ids is None:
+            ids = np.arange(n_eos)
+        if weights is None:
+            weights = np.ones(n_eos)
+
+        npoint = np.zeros((n_eos, n_branch), dtype=int)
+        M = np.inf*np.ones((n_eos, n_branch, n_point))
+        Lambda = np.zeros((n_eos, n_branch, n_point))
+        R = np.zeros((n_eos, n_branch, n_point))
+        Mb = np.zeros((n_eos, n_branch, n_point))
+        Mmax = -np.ones(n_eos)
+        for ii, eos_branches in enumerate(branches):
+            for jj, (marray, larray, rarray, mbararray) in enumerate(eos_branches):
+                n = len(marray)
+                npoint[ii,jj] = n
+                M[ii,jj,:n], Lambda[ii,jj,:n] = marray, larray
+                R[ii,jj,:n], Mb[ii,jj,:n] = rarray, mbararray
+                if n > 0:
+                    Mmax[ii] = max(Mmax[ii], marray[-1])
+        nbranch = np.sum(npoint > 0, axis=1)
+
+        return cls(ids, weights, Mmax, nbranch, npoint, M, Lambda, R, Mb)
+
+    def save(self, filename):
+        """Write the ensemble to ``filename`` (.npz), replacing it atomically."""
+
+        dirname = os.path.dirname(os.path.abspath(filename))
+        tmpname = os.path.join(dirname, ".%s.tmp%d.npz" % (os.path.basename(filename), os.getpid()))
+        np.savez(tmpname, version=ENSEMBLE_VERSION, ids=self.ids, weights=self.weights,
+                 Mmax=self.Mmax, nbranch=self.nbranch, npoint=self.npoint,
+                 M=self.M, Lambda=self.Lambda, R=self.R, Mb=self.Mb)
+        os.replace(tmpname, filename)
+
+    @classmethod
+    def read(cls, filename):
+        with np.load(filename) as data:
+            if int(data["version"]) > ENSEMBLE_VERSION:
+                raise ValueError('EOS ensemble %s has version %d, this version of gwemlightcurves reads up to %d' % (filename, int(data["version"]), ENSEMBLE_VERSION))
+            return cls(*[data[name] for name in ["ids", "weights", "Mmax", "nbranch", "npoint",
+                                                 "M", "Lambda", "R", "Mb"]])
+
+    def probabilities(self):
+        return self.weights/np.sum(self.weights)
+
+    def branch(self, index, branch=0):
+        """M, Lambda, R and Mb of one branch, without the padding."""
+
+        n = self.npoint[index,branch]
+        return (self.M[index,branch,:n], self.Lambda[index,branch,:n],
+                self.R[index,branch,:n], self.Mb[index,branch,:n])
+
+    def random_indices(self, size, probabilities=None):
+        """EOS indices drawn uniformly, or with ``probabilities``."""
+
+        if probabilities is None:
+            return np.random.randint(0, len(self), size=size)
+        return np.random.choice(np.arange(0,len(self)), size=size, replace=True, p=probabilities)
+
+    def search_keys(self):
+        """Sorted keys of all the branches, for one np.searchsorted.
+
+        Every (EOS, branch) row of M, with its padding replaced by a finite
+        mass above all others (also returned, flattened), is shifted by ``row*stride`` so that the
+        flattened array stays sorted and each row occupies its own interval
+        of keys.
+        """
+
+        if self._keys is None:
+            finite = np.isfinite(self.M)
+            if np.any(finite):
+                lo, hi = min(0.0, np.min(self.M[finite])), np.max(self.M[finite]) + 1.0
+            else:
+                lo, hi = 0.0, 1.0
+            stride = hi - lo + 1.0
+            rows = np.arange(self.M.shape[0]*self.M.shape[1]).reshape(self.M.shape[:2] + (1,))
+            Mflat = np.where(finite, self.M, hi).ravel()
+            keys = Mflat - lo + rows.ravel().repeat(self.M.shape[2])*stride
+            self._keys = (keys, Mflat, lo, hi, stride)
+        return self._keys
+
+    def lookup(self, indices, masses):
+        """Lambda, R and Mb of the EOS ``indices`` at ``masses``, batched.
+
+        ``indices`` and ``masses`` are broadcast together, e.g. (K,) EOS
+        draws against (N, 1) masses give (N, K) arrays.  As in values,
+        each is the maximum over the stable branches, 0 outside of all
+        branches and -1 for an EOS without any; the points of all the
+        branches are found with a single np.searchsorted.
+        """
+
+        keys, Mflat, lo, hi, stride = self.search_keys()
+        n_branch, n_point = self.M.shape[1:]
+        indices, masses = np.broadcast_arrays(np.asarray(indices, dtype=int), np.asarray(masses, dtype=float))
+        shape = indices.shape
+
+        # one row per (sample, branch)
+        rows = indices.reshape(-1, 1)*n_branch + np.arange(n_branch)
+        q = masses.reshape(-1, 1)*np.ones(n_branch)
+        npoint = self.npoint.ravel()[rows]
+        start = rows*n_point
+        last = start + np.maximum(npoint, 1) - 1
+        inside = (npoint > 0) & (q >= Mflat[start]) & (q <= Mflat[last])
+
+        pos = np.searchsorted(keys, np.clip(q, lo, hi) - lo + rows*stride, side='right') - 1
+        pos = np.clip(pos, start, np.maximum(last - 1, start))
+        nxt = np.minimum(pos + 1, last)
+        dM = Mflat[nxt] - Mflat[pos]
+        t = np.where(dM > 0, (q - Mflat[pos])/np.where(dM > 0, dM, 1.0), 0.0)
+
+        values = []
+        for curve in [self.Lambda, self.R, self.Mb]:
+            flat = curve.ravel()
+            branch_values = np.where(inside, flat[pos] + t*(flat[nxt] - flat[pos]), 0.0)
+            branch_values = np.where(npoint > 0, branch_values, -1.0)
+            values.append(np.max(branch_values, axis=1).reshape(shape))
+        return tuple(values)
+
+    def values(self, index, masses):
+        """Lambda, R and Mb of EOS ``index`` at ``masses``.
+
+        Each is the maximum over the stable branches (the least compact
+        one), 0 outside of all branches, and -1 if the EOS has none.
+        """
+
+        return self.lookup(index, np.atleast_1d(masses))
+
+    def draw(self, masses, size, probabilities=None):
+        """``size`` EOS draws for every row of ``masses``, a list of (N,) arrays.
+
+        EOS returning a negative Lambda at one of the masses, or a negative
+        maximum mass, are redrawn, all the rejected draws at once.  Returns
+        the (N, size) indices and the lists of (N, size) Lambda, R and Mb at
+        each of the masses.
+        """
+
+        if np.all(self.Mmax < 0):
+            raise ValueError('No EOS of the ensemble has a stable branch')
+
+        masses = [np.reshape(np.asarray(m, dtype=float), (-1, 1)) for m in masses]
+        indices = self.random_indices((len(masses[0]), size), probabilities)
+        values = [self.lookup(indices, m) for m in masses]
+        rejected = self.Mmax[indices] < 0
+        for lambdas, radii, mbaryons in values:
+            rejected = rejected | (lambdas < 0)
+
+        while np.any(rejected):
+            idx = np.where(rejected)
+            indices[idx] = self.random_indices(len(idx[0]), probabilities)
+            redrawn = self.Mmax[indices[idx]] < 0
+            for m, value in zip(masses, values):
+                new = self.lookup(indices[idx], m[idx[0], 0])
+                for array, new_values in zip(value, new):
+                    array[idx] = new_values
+                redrawn = redrawn | (new[0] < 0)
+            rejected[idx] = redrawn
+
+        return (indices, [value[0] for value in values], [value[1] for value in values],
+                [value[2] for value in values])
+
+def ingest_spec(eosdir, nsamples=2396, pattern="macro-spec_%dcr.csv"):
+    """Ensemble of the spectral EOS draws 0 ... nsamples-1 in ``eosdir``."""
+
+    branches = []
+    for jj in range(nsamples):
+        branches.append([read_branch(os.path.join(eosdir, pattern % jj))])
+    return EOSEnsemble.from_branches(branches)
+
+def gp_branch_file(eosdir, eos, phasetr):
+    return os.path.join(eosdir, "DRAWmod1000-%06d/MACROdraw-%06d/MACROdraw-%06d-%d.csv" % (eos/1000, eos, eos, phasetr))
+
+def gw170817_branch_file(eosdir, eos, phasetr):
+    return os.path.join(eosdir, "MACROdraw-%06d-%d.csv" % (eos, phasetr))
+
+def gw170817_ids(eosdir):
+    """GP EOS numbers of the MACROdraw-<eos>-0.csv files in ``eosdir``."""
+
+    filenames = glob.glob(os.path.join(eosdir, "MACROdraw-*-0.csv"))
+    return np.array(sorted([int(os.path.basename(filename).split("-")[1]) for filename in filenames]))
+
+def ingest_gp(eosdir, posterior=None, branch_file=gp_branch_file, ids=None):
+    """Ensemble of the GP EOS draws of ``posterior``, weighted by logweight_total.
+
+    Without a posterior, the EOS ``ids`` are used with equal weights.
+    Every EOS has the stable branches ``branch_file(eosdir, eos, 0)``,
+    ``branch_file(eosdir, eos, 1)``, ... that exist.
+    """
+
+    if posterior is not None:
+        eospostdat = np.genfromtxt(posterior, names=True, dtype=None, delimiter=",")
+        idxs = np.atleast_1d(eospostdat["eos"])
+        weights = np.exp(np.atleast_1d(eospostdat["logweight_total"]))
+    elif ids is not None:
+        idxs = np.asarray(ids)
+        weights = np.ones(len(idxs))
+    else:
+        raise ValueError('ingest_gp needs a posterior or the EOS ids')
+
+    branches = []
+    for eos in idxs:
+        eos_branches = []
+        phasetr = 0
+        eospath = branch_file(eosdir, eos, phasetr)
+        while os.path.isfile(eospath):
+            eos_branches.append(read_branch(eospath))
+            phasetr += 1
+            eospath = branch_file(eosdir, eos, phasetr)
+        branches.append(eos_branches)
+    return EOSEnsemble.from_branches(branches, ids=idxs, weights=weights)
+
+# stores read in this process, keyed by absolute path
+_ensembles = {}
+
+def load_ensemble(filename):
+    """The EOSEnsemble in ``filename``, read once per process."""
+
+    filename = os.path.abspath(filename)
+    if not filename in _ensembles:
+        if not os.path.isfile(filename):
+            raise IOError('No EOS ensemble found at %s; create it with pack_eos_ensemble.py' % filename)
+        _ensembles[filename] = EOSEnsemble.read(filename)
+    return _ensembles[filename]
@@ -0,0 +1,214 @@
+"""Cached TOV families of the lalsimulation equations of state.
+
+The families used by EOS4ParameterPiecewisePolytrope,
+construct_eos_from_polytrope and get_lalsim_eos are made once per
+process, keyed by EOS name, polytrope parameters or table file:
+polytrope_family, named_family and table_family return a TOVFamily
+holding the lalsimulation objects and R(M), k2(M) and Lambda(M) sampled
+on a dense mass grid, up to the maximum mass.  Its radiusofm, k2ofm and lambdaofm take arrays of masses and
+interpolate the grid, without calling lalsimulation again.
+"""
+
+import os, sys
+import tempfile
+
+import numpy as np
+from distutils.spawn import find_executable
+
+try:
+    import lal
+    G = lal.G_SI; c = lal.C_SI; msun = lal.MSUN_SI
+except:
+    import astropy.units as u
+    import astropy.constants as C
+    G = C.G.value; c = C.c.value; msun = u.M_sun.to(u.kg)
+
+NGRID = 1000
+
+def tidal_deformability(m, r, k2):
+    """Lambda of stars of mass ``m`` (solar masses), radius ``r`` (km) and Love number ``k2``."""
+
+    return (2./3.)*k2*( (c**2*r*1000.0)/(G*m*msun) )**5
+
+class TOVFamily(object):
+    """R(M), k2(M) and Lambda(M) of a family of TOV stars on a mass grid.
+
+    Outside of the grid, i.e. below the lightest or above the heaviest
+    stable star, the queries return -1 as the lalsimulation calls failed
+    before.
+    """
+
+    def __init__(self, masses, radii, k2s, eos=None, fam=None, name=None):
+        self.masses = np.asarray(masses, dtype=float)
+        self.radii = np.asarray(radii, dtype=float)
+        self.k2s = np.asarray(k2s, dtype=float)
+        self.lambdas = tidal_deformability(self.masses, self.radii, self.k2s)
+        self.eos, self.fam, self.name = eos, fam, name
+        self.mmin, self.mmax = self.masses[0], self.masses[-1]
+
+    @classmethod
+    def from_lalsim(cls, eos, fam, name=None, ngrid=NGRID):
+        """Sample the lalsimulation family ``fam`` of ``eos`` on ``ngrid`` masses.
+
+        The grid is denser towards the maximum mass, where R(M) and k2(M)
+        turn over.
+        """
+        import lalsimulation
+
+        mmax = lalsimulation.SimNeutronStarMaximumMass(fam)/msun
+        try:
+            mmin = lalsimulation.SimNeutronStarFamMinimumMass(fam)/msun
+        except:
+            mmin = 0.1
+        x = np.linspace(0.0, 1.0, ngrid)
+        grid = mmin + (mmax - mmin)*(1.0 - (1.0 - x)**2)
+
+        masses, radii, k2s = [], [], []
+        for m in grid:
+            try:
+                r = lalsimulation.SimNeutronStarRadius(m*msun, fam)/1000.0
+                k2 = lalsimulation.SimNeutronStarLoveNumberK2(m*msun, fam)
+            except:
+                continue
+            masses.append(m)
+            radii.append(r)
+            k2s.append(k2)
+        if len(masses) < 2:
+            raise ValueError('Could not sample the TOV family of %s' % name)
+
+        return cls(masses, radii, k2s, eos=eos, fam=fam, name=name)
+
+    def interpolate(self, m, values, log=False):
+        m = np.asarray(m, dtype=float)
+        if log:
+            out = np.exp(np.interp(m, self.masses, np.log(values)))
+        else:
+            out = np.interp(m, self.masses, values)
+        out = np.where((m < self.mmin) | (m > self.mmax), -1.0, out)
+        if out.ndim == 0:
+            return float(out)
+        return out
+
+    def radiusofm(self, m):
+        """Radius in km.
+        """
+        return self.interpolate(m, self.radii)
+
+    def k2ofm(self, m):
+        """Dimensionless Love number.
+        """
+        return self.interpolate(m, self.k2s)
+
+    def lambdaofm(self, m):
+        """Dimensionless tidal deformability.
+        """
+        return self.interpolate(m, self.lambdas, log=True)
+
+    def maxmass(self):
+        """Fuction to return the max mass
+        """
+
+        return self.mmax
+
+# families made in this process, keyed by ("polytrope", parameters),
+# ("name", name) or ("table", absolute path)
+_families = {}
+_polytrope_table = {}
+
+def polytrope_parameters(eos_name):
+    """logP1 (SI), gamma1, gamma2 and gamma3 of ``eos_name`` in polytrope_table.dat.
+
+    The name is matched without regard to case.
+    """
+
+    if not _polytrope_table:
+        filename = find_executable('polytrope_table.dat')
+        if filename is None:
+            raise ValueError('Check to make sure polytrope_table.dat '
+                             'has been installed correctly '
+                             '(try `which polytrope_table.dat`)')
+        polytable = np.genfromtxt(filename, dtype=None, names=True, encoding="utf-8")
+        for row in np.atleast_1d(polytable):
+            # logP1 is in cgs, lalsimulation uses SI units
+            _polytrope_table[str(row['eos']).lower()] = (float(row['logP1']) - 1.,
+                float(row['gamma1']), float(row['gamma2']), float(row['gamma3']))
+
+    if not eos_name.lower() in _polytrope_table:
+        raise ValueError('EOS %s is not in polytrope_table.dat' % eos_name)
+    return _polytrope_table[eos_name.lower()]
+
+def polytrope_family(eos_name=None, parameters=None, ngrid=NGRID):
+    """TOVFamily of a 4-parameter piecewise polytrope.
+
+    Either ``eos_name``, looked up in polytrope_table.dat, or the
+    ``parameters`` (logP1 in SI, gamma1, gamma2, gamma3) are given.
+    """
+
+    if parameters is None:
+        parameters = polytrope_parameters(eos_name)
+    parameters = tuple(float(p) for p in parameters)
+    key = ("polytrope", parameters, ngrid)
+    if not key in _families:
+        import lalsimulation
+        eos = lalsimulation.SimNeutronStarEOS4ParameterPiecewisePolytrope(*parameters)
+        fam = lalsimulation.CreateSimNeutronStarFamily(eos)
+        _families[key] = TOVFamily.from_lalsim(eos, fam, name=eos_name, ngrid=ngrid)
+    return _families[key]
+
+def named_family(eos_name, ngrid=NGRID):
+    """TOVFamily of the lalsimulation EOS ``eos_name``."""
+
+    key = ("name", eos_name, ngrid)
+    if not key in _families:
+        import lalsimulation
+        eos = lalsimulation.SimNeutronStarEOSByName(eos_name)
+        fam = lalsimulation.CreateSimNeutronStarFamily(eos)
+        _families[key] = TOVFamily.from_lalsim(eos, fam, name=eos_name, ngrid=ngrid)
+    return _families[key]
+
+def read_eos_table(filename):
+    """Pressure and energy density (geometric units) of an Ozel EOS table.
+
+    The densities are converted from cgs, and the points at which the
+    pressure or the energy density do not increase are dropped, as
+    lalsimulation needs monotonic tables.
+    """
+    # NOTE: Adapted from code by Monica Rizzo
+    bdens, press, edens = np.loadtxt(filename, unpack=True)
+    press *= 7.42591549e-25
+    edens *= 7.42591549e-25
+
+    if not np.all(np.diff(press) > 0):
+        keep_idx = np.where(np.diff(press) > 0)[0] + 1
+        keep_idx = np.concatenate(([0], keep_idx))
+        press = press[keep_idx]
+        edens = edens[keep_idx]
+    assert np.all(np.diff(press) > 0)
+    if not np.all(np.diff(edens) > 0):
+        keep_idx = np.where(np.diff(edens) > 0)[0] + 1
+        keep_idx = np.concatenate(([0], keep_idx))
+        press = press[keep_idx]
+        edens = edens[keep_idx]
+    assert np.all(np.diff(edens) > 0)
+
+    return press, edens
+
+def table_family(filename, ngrid=NGRID):
+    """TOVFamily of the EOS table ``filename``.
+
+    lalsimulation only reads tabulated EOS from files: the converted
+    table goes through a temporary file, removed once the EOS is read.
+    """
+
+    key = ("table", os.path.abspath(filename), ngrid)
+    if not key in _families:
+        import lalsimulation
+        press, edens = read_eos_table(filename)
+        eos_name = os.path.splitext(os.path.basename(filename))[0].upper()
+        with tempfile.NamedTemporaryFile(mode='w', suffix=".dat") as fid:
+            np.savetxt(fid, np.transpose((press, edens)), delimiter='\t')
+            fid.flush()
+            eos = lalsimulation.SimNeutronStarEOSFromFile(fid.name)
+        fam = lalsimulation.CreateSimNeutronStarFamily(eos)
+        _families[key] = TOVFamily.from_lalsim(eos, fam, name=eos_name, ngrid=ngrid)
+    return _families[key]
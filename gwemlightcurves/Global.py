@@ -11,11 +11,12 @@ mdyn = -1
 doLuminosity = 0
 doLightcurves = 0
 filters = 0
-svd_mag_model = 0
-svd_lbol_model = 0
-svd_spec_model = 0 
-svd_mag_color_model = 0
-svd_mag_color_models = []
+# data_out compiled by sampler.observations.get_observations
+observations = 0
+# directory of the surrogate models the KNModels loaders read (and cache in
+# gwemlightcurves.surrogate_cache), and the colour model(s) of the *inc fits
+ModelPath = 0
+colormodel = 0
 doWaveformExtrapolate = 0
 doAbsorption = 0
 n_coeff = 0
@@ -7,28 +7,24 @@ import scipy.interpolate
 from scipy.interpolate import interpolate as interp
 from scipy.interpolate import griddata
 
-from .model import register_model
+from .model import register_model, register_model_fn
 from .. import KNTable
 
 from gwemlightcurves import lightcurve_utils, Global, svd_utils
 from gwemlightcurves.EjectaFits.DiUj2017 import calc_meje, calc_vej
 
-def get_BaKa2016_model(table, **kwargs):
+def load_BaKa2016_surrogates(table, **kwargs):
+    """Surrogate models of BaKa2016, see svd_utils.load_surrogates."""
+    return svd_utils.load_surrogates("BaKa2016", table, n_coeff=100, modelfiles=False, **kwargs)
 
-    if not 'n_coeff' in table.colnames:
-        table['n_coeff'] = 100
+def get_BaKa2016_model(table, **kwargs):
 
-    if not Global.svd_mag_model == 0:
-        svd_mag_model = Global.svd_mag_model
+    if 'return_uncertainty' in kwargs:
+        return_uncertainty = kwargs['return_uncertainty']
     else:
-        svd_mag_model = svd_utils.calc_svd_mag(table['tini'][0], table['tmax'][0], table['dt'][0], model = "BaKa2016", n_coeff = table['n_coeff'][0])
-        Global.svd_mag_model = svd_mag_model
+        return_uncertainty = False
 
-    if not Global.svd_lbol_model == 0:
-        svd_lbol_model = Global.svd_lbol_model
-    else:
-        svd_lbol_model = svd_utils.calc_svd_lbol(table['tini'][0], table['tmax'][0], table['dt'][0], model = "BaKa2016", n_coeff = table['n_coeff'][0])
-        Global.svd_lbol_model = svd_lbol_model
+    svd_mag_model, svd_lbol_model = load_BaKa2016_surrogates(table, **kwargs)
 
     if not 'mej' in table.colnames:
         # calc the mass of ejecta
@@ -50,11 +46,35 @@ def get_BaKa2016_model(table, **kwargs):
     table['lbol'] = [np.zeros(timeseries.size)]
     table['mag'] =  [np.zeros([9, timeseries.size])]
 
-    # calc lightcurve for each sample
-    for isample in range(len(table)):
-        table['t'][isample], table['lbol'][isample], table['mag'][isample] = svd_utils.calc_lc(table['tini'][isample], table['tmax'][isample],table['dt'][isample], [np.log10(table['mej'][isample]),table['vej'][isample]],svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "BaKa2016")
+    # calc lightcurve for all samples at once
+    param_matrix = np.vstack((np.log10(table['mej']),table['vej'])).T
+    if return_uncertainty:
+        tt, lbol, mag, mag_err = svd_utils.calc_lc_batch(table['tini'][0], table['tmax'][0], table['dt'][0], param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "BaKa2016", return_uncertainty=True)
+        table['mag_err'] = mag_err
+    else:
+        tt, lbol, mag = svd_utils.calc_lc_batch(table['tini'][0], table['tmax'][0], table['dt'][0], param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "BaKa2016")
+    table['t'][:] = tt
+    table['lbol'][:] = lbol
+    table['mag'][:] = mag
 
     return table
 
+def get_BaKa2016_model_fn(table, **kwargs):
+    """Direct evaluation of BaKa2016 for one sample, see `register_model_fn`."""
+
+    svd_mag_model, svd_lbol_model = load_BaKa2016_surrogates(table, **kwargs)
+    tini, tmax, dt = table['tini'][0], table['tmax'][0], table['dt'][0]
+
+    def model_fn(params):
+        mej, vej = params
+        if not mej > 0: return [], [], []
+        param_matrix = [[np.log10(mej),vej]]
+        tt, lbol, mag = svd_utils.calc_lc_batch(tini, tmax, dt, param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "BaKa2016")
+        return tt, lbol[0], mag[0]
+
+    return model_fn
+
 register_model('BaKa2016', KNTable, get_BaKa2016_model,
                  usage="table")
+register_model_fn('BaKa2016', KNTable, get_BaKa2016_model_fn,
+                  ['mej', 'vej'])
@@ -6,26 +6,17 @@ import scipy.interpolate
 from scipy.interpolate import interpolate as interp
 from scipy.interpolate import griddata
 
-from .model import register_model
+from .model import register_model, register_model_fn
 from .. import KNTable
 
 from gwemlightcurves import lightcurve_utils, Global, svd_utils
 from gwemlightcurves.EjectaFits.DiUj2017 import calc_meje, calc_vej
 
-def get_Bu2019inc_model(table, **kwargs):
-
-    if 'LoadModel' in kwargs: 
-        LoadModel = kwargs['LoadModel']
-    else:
-        LoadModel = False
+def load_Bu2019inc_surrogates(table, **kwargs):
+    """Surrogate models of Bu2019inc, see svd_utils.load_surrogates."""
+    return svd_utils.load_surrogates("Bu2019inc", table, **kwargs)
 
-    if 'SaveModel' in kwargs:
-        SaveModel = kwargs['SaveModel']
-    else:
-        SaveModel = False
-
-    if 'ModelPath' in kwargs:
-        ModelPath = kwargs['ModelPath']
+def get_Bu2019inc_model(table, **kwargs):
 
     if 'doAB' in kwargs:
         doAB = kwargs['doAB']
@@ -37,81 +28,15 @@ def get_Bu2019inc_model(table, **kwargs):
     else:
         doSpec = False
 
-    if not 'n_coeff' in table.colnames:
-        if doAB:
-            table['n_coeff'] = 43
-            #table['n_coeff'] = 2
-        elif doSpec:
-            table['n_coeff'] = 21
-
-    if not 'gptype' in table.colnames:
-        table['gptype'] = 'sklearn'
+    if 'return_uncertainty' in kwargs:
+        return_uncertainty = kwargs['return_uncertainty']
+    else:
+        return_uncertainty = False
 
     if doAB:
-        if not Global.svd_mag_model == 0:
-            svd_mag_model = Global.svd_mag_model
-        else:
-            if LoadModel:
-            #if True:
-                if np.all(table['gptype'] == "sklearn"):
-                    modelfile = os.path.join(ModelPath,'Bu2019inc_mag.pkl')
-                elif np.all(table['gptype'] == "gpytorch"):
-                    modelfile = os.path.join(ModelPath,'Bu2019inc_mag_gpy.pkl')
-                with open(modelfile, 'rb') as handle:
-                    svd_mag_model = pickle.load(handle)
-            else:
-                svd_mag_model = svd_utils.calc_svd_mag(table['tini'][0], table['tmax'][0], table['dt'][0], model = "Bu2019inc", n_coeff = table['n_coeff'][0], gptype=table['gptype'])
-                if table['gptype'] == "sklearn":
-                    modelfile = os.path.join(ModelPath,'Bu2019inc_mag.pkl')
-                elif table['gptype'] == "gpytorch":
-                    modelfile = os.path.join(ModelPath,'Bu2019inc_mag_gpy.pkl')
-
-                with open(modelfile, 'wb') as handle:
-                    pickle.dump(svd_mag_model, handle,
-                                protocol=pickle.HIGHEST_PROTOCOL)
-
-            Global.svd_mag_model = svd_mag_model
-
-        if not Global.svd_lbol_model == 0:
-            svd_lbol_model = Global.svd_lbol_model
-        else:
-            if LoadModel:
-            #if True:
-                if np.all(table['gptype'] == "sklearn"):
-                    modelfile = os.path.join(ModelPath,'Bu2019inc_lbol.pkl')
-                elif np.all(table['gptype'] == "gpytorch"):
-                    modelfile = os.path.join(ModelPath,'Bu2019inc_lbol_gpy.pkl')
-
-                with open(modelfile, 'rb') as handle:
-                    svd_lbol_model = pickle.load(handle)            
-            else:
-                svd_lbol_model = svd_utils.calc_svd_lbol(table['tini'][0], table['tmax'][0], table['dt'][0], model = "Bu2019inc", n_coeff = table['n_coeff'][0], gptype=table['gptype'])
-
-                if table['gptype'] == "sklearn":
-                    modelfile = os.path.join(ModelPath,'Bu2019inc_lbol.pkl')
-                elif table['gptype'] == "gpytorch":
-                    modelfile = os.path.join(ModelPath,'Bu2019inc_lbol_gpy.pkl')
-
-                with open(modelfile, 'wb') as handle:
-                    pickle.dump(svd_lbol_model, handle,
-                                protocol=pickle.HIGHEST_PROTOCOL)
-
-            Global.svd_lbol_model = svd_lbol_model
+        svd_mag_model, svd_lbol_model = load_Bu2019inc_surrogates(table, **kwargs)
     elif doSpec:
-        if not Global.svd_spec_model == 0:
-            svd_spec_model = Global.svd_spec_model
-        else:
-            if LoadModel:
-            #if True:
-                modelfile = os.path.join(ModelPath,'Bu2019inc_spec.pkl')
-                with open(modelfile, 'rb') as handle:
-                    svd_spec_model = pickle.load(handle)
-            else:
-                svd_spec_model = svd_utils.calc_svd_spectra(table['tini'][0], table['tmax'][0], table['dt'][0], table['lambdaini'][0], table['lambdamax'][0], table['dlambda'][0], model = "Bu2019inc", n_coeff = table['n_coeff'][0])
-                modelfile = os.path.join(ModelPath,'Bu2019inc_spec.pkl')
-                with open(modelfile, 'wb') as handle:
-                    pickle.dump(svd_spec_model, handle, protocol=pickle.HIGHEST_PROTOCOL)
-            Global.svd_spec_model = svd_spec_model
+        svd_spec_model = load_Bu2019inc_surrogates(table, **kwargs)
 
     if not 'mej' in table.colnames:
         # calc the mass of ejecta
@@ -137,16 +62,49 @@ def get_Bu2019inc_model(table, **kwargs):
         lambdas = np.arange(table['lambdaini'][0], table['lambdamax'][0]+table['dlambda'][0], table['dlambda'][0])
         table['lambda'] = [np.zeros(lambdas.size)]
         table['spec'] =  [np.zeros([lambdas.size, timeseries.size])]
+        if return_uncertainty:
+            table['spec_err'] = [np.zeros([lambdas.size, timeseries.size])]
 
-    # calc lightcurve for each sample
-    for isample in range(len(table)):
-        print('Generating sample %d/%d' % (isample, len(table)))
-        if doAB:
-            table['t'][isample], table['lbol'][isample], table['mag'][isample] = svd_utils.calc_lc(table['tini'][isample], table['tmax'][isample],table['dt'][isample], [np.log10(table['mej'][isample]),table['phi'][isample],table['theta'][isample]],svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "Bu2019inc", gptype=table['gptype'][0], n_coeff_lim=table['n_coeff'][0])
-        elif doSpec:
-            table['t'][isample], table['lambda'][isample], table['spec'][isample] = svd_utils.calc_spectra(table['tini'][isample], table['tmax'][isample],table['dt'][isample], table['lambdaini'][isample], table['lambdamax'][isample]+table['dlambda'][isample], table['dlambda'][isample], [np.log10(table['mej'][isample]),table['phi'][isample],table['theta'][isample]],svd_spec_model = svd_spec_model, model = "Bu2019inc", n_coeff_lim=table['n_coeff'][0])
+    # calc lightcurve for all samples at once
+    if doAB:
+        param_matrix = np.vstack((np.log10(table['mej']),table['phi'],table['theta'])).T
+        if return_uncertainty:
+            tt, lbol, mag, mag_err = svd_utils.calc_lc_batch(table['tini'][0], table['tmax'][0], table['dt'][0], param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "Bu2019inc", gptype=table['gptype'][0], n_coeff_lim=table['n_coeff'][0], return_uncertainty=True)
+            table['mag_err'] = mag_err
+        else:
+            tt, lbol, mag = svd_utils.calc_lc_batch(table['tini'][0], table['tmax'][0], table['dt'][0], param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "Bu2019inc", gptype=table['gptype'][0], n_coeff_lim=table['n_coeff'][0])
+        table['t'][:] = tt
+        table['lbol'][:] = lbol
+        table['mag'][:] = mag
+    elif doSpec:
+        # calc spectra for each sample
+        for isample in range(len(table)):
+            print('Generating sample %d/%d' % (isample, len(table)))
+            if return_uncertainty:
+                table['t'][isample], table['lambda'][isample], table['spec'][isample], table['spec_err'][isample] = svd_utils.calc_spectra(table['tini'][isample], table['tmax'][isample],table['dt'][isample], table['lambdaini'][isample], table['lambdamax'][isample]+table['dlambda'][isample], table['dlambda'][isample], [np.log10(table['mej'][isample]),table['phi'][isample],table['theta'][isample]],svd_spec_model = svd_spec_model, model = "Bu2019inc", n_coeff_lim=table['n_coeff'][0], return_uncertainty=True)
+            else:
+                table['t'][isample], table['lambda'][isample], table['spec'][isample] = svd_utils.calc_spectra(table['tini'][isample], table['tmax'][isample],table['dt'][isample], table['lambdaini'][isample], table['lambdamax'][isample]+table['dlambda'][isample], table['dlambda'][isample], [np.log10(table['mej'][isample]),table['phi'][isample],table['theta'][isample]],svd_spec_model = svd_spec_model, model = "Bu2019inc", n_coeff_lim=table['n_coeff'][0])
 
     return table
 
+def get_Bu2019inc_model_fn(table, **kwargs):
+    """Direct evaluation of Bu2019inc for one sample, see `register_model_fn`."""
+
+    svd_mag_model, svd_lbol_model = load_Bu2019inc_surrogates(table, **kwargs)
+    tini, tmax, dt = table['tini'][0], table['tmax'][0], table['dt'][0]
+    gptype = table['gptype'][0]
+    n_coeff = table['n_coeff'][0]
+
+    def model_fn(params):
+        mej, phi, theta = params
+        if not mej > 0: return [], [], []
+        param_matrix = [[np.log10(mej),phi,theta]]
+        tt, lbol, mag = svd_utils.calc_lc_batch(tini, tmax, dt, param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "Bu2019inc", gptype=gptype, n_coeff_lim=n_coeff)
+        return tt, lbol[0], mag[0]
+
+    return model_fn
+
 register_model('Bu2019inc', KNTable, get_Bu2019inc_model,
                  usage="table")
+register_model_fn('Bu2019inc', KNTable, get_Bu2019inc_model_fn,
+                  ['mej', 'phi', 'theta'])
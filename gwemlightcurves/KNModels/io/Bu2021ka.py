@@ -6,32 +6,18 @@ import scipy.interpolate
 from scipy.interpolate import interpolate as interp
 from scipy.interpolate import griddata
 
-from .model import register_model
+from .model import register_model, register_model_fn
 from .. import KNTable
 
 from gwemlightcurves import lightcurve_utils, Global, svd_utils
 from gwemlightcurves.EjectaFits.DiUj2017 import calc_meje, calc_vej
 
-try:
-    from tensorflow.keras.models import load_model
-except:
-    print('Install tensorflow if you want to use it...')
+def load_Bu2021ka_surrogates(table, **kwargs):
+    """Surrogate models of Bu2021ka, see svd_utils.load_surrogates."""
+    return svd_utils.load_surrogates("Bu2021ka", table, n_coeff=10, **kwargs)
 
 def get_Bu2021ka_model(table, **kwargs):
 
-    if 'LoadModel' in kwargs: 
-        LoadModel = kwargs['LoadModel']
-    else:
-        LoadModel = False
-
-    if 'SaveModel' in kwargs:
-        SaveModel = kwargs['SaveModel']
-    else:
-        SaveModel = False
-
-    if 'ModelPath' in kwargs:
-        ModelPath = kwargs['ModelPath']
-
     if 'doAB' in kwargs:
         doAB = kwargs['doAB']
     else:
@@ -42,118 +28,15 @@ def get_Bu2021ka_model(table, **kwargs):
     else:
         doSpec = False
 
-    if not 'n_coeff' in table.colnames:
-        if doAB:
-            #table['n_coeff'] = 43
-            table['n_coeff'] = 10
-        elif doSpec:
-            table['n_coeff'] = 21
-
-    if not 'gptype' in table.colnames:
-        table['gptype'] = 'sklearn'
+    if 'return_uncertainty' in kwargs:
+        return_uncertainty = kwargs['return_uncertainty']
+    else:
+        return_uncertainty = False
 
     if doAB:
-        if not Global.svd_mag_model == 0:
-            svd_mag_model = Global.svd_mag_model
-        else:
-            if np.all(table['gptype'] == "sklearn"):
-                modelfile = os.path.join(ModelPath,'Bu2021ka_mag.pkl')
-            elif np.all(table['gptype'] == "gpytorch"):
-                modelfile = os.path.join(ModelPath,'Bu2021ka_mag_gpy.pkl')
-            elif np.all(table['gptype'] == "gp_api"):
-                modelfile = os.path.join(ModelPath,'Bu2021ka_mag_gpapi.pkl')
-            elif np.all(table['gptype'] == "tensorflow"):
-                modelfile = os.path.join(ModelPath,'Bu2021ka_mag_tf.pkl')
-            if LoadModel:
-                with open(modelfile, 'rb') as handle:
-                    svd_mag_model = pickle.load(handle)
-
-                if np.all(table['gptype'] == "tensorflow"):
-                    outdir = modelfile.replace(".pkl","")
-                    for filt in svd_mag_model.keys():
-                        outfile = os.path.join(outdir, f'{filt}.h5')
-                        svd_mag_model[filt]['model'] = load_model(outfile)
-
-            else:
-                svd_mag_model = svd_utils.calc_svd_mag(table['tini'][0], table['tmax'][0], table['dt'][0], model = "Bu2021ka", n_coeff = table['n_coeff'][0], gptype=table['gptype'])
-
-                if np.all(table['gptype'] == "tensorflow"):
-                    outdir = modelfile.replace(".pkl","")
-                    if not os.path.isdir(outdir):
-                        os.makedirs(outdir)
-                    for filt in svd_mag_model.keys():
-                        outfile = os.path.join(outdir, f'{filt}.h5')
-                        svd_mag_model[filt]['model'].save(outfile)
-                        del svd_mag_model[filt]['model']
-
-                with open(modelfile, 'wb') as handle:
-                    pickle.dump(svd_mag_model, handle, protocol=pickle.HIGHEST_PROTOCOL)
-
-                if np.all(table['gptype'] == "tensorflow"):
-                    for filt in svd_mag_model.keys():
-                        outfile = os.path.join(outdir, f'{filt}.h5')
-                        svd_mag_model[filt]['model'] = load_model(outfile)
-
-            if np.all(table['gptype'] == "gp_api"):
-                for filt in svd_mag_model.keys():
-                    for ii in range(len(svd_mag_model[filt]["gps"])):
-                        svd_mag_model[filt]["gps"][ii] = svd_utils.load_gpapi(svd_mag_model[filt]["gps"][ii])
-            Global.svd_mag_model = svd_mag_model
-
-        if not Global.svd_lbol_model == 0:
-            svd_lbol_model = Global.svd_lbol_model
-        else:
-            if np.all(table['gptype'] == "sklearn"):
-                modelfile = os.path.join(ModelPath,'Bu2021ka_lbol.pkl')
-            elif np.all(table['gptype'] == "gpytorch"):
-                modelfile = os.path.join(ModelPath,'Bu2021ka_lbol_gpy.pkl')
-            elif np.all(table['gptype'] == "gp_api"):
-                modelfile = os.path.join(ModelPath,'Bu2021ka_lbol_gpapi.pkl')
-            elif np.all(table['gptype'] == "tensorflow"):
-                modelfile = os.path.join(ModelPath,'Bu2021ka_lbol_tf.pkl')
-            if LoadModel:
-            #if True:
-                with open(modelfile, 'rb') as handle:
-                    svd_lbol_model = pickle.load(handle)    
-                if np.all(table['gptype'] == "tensorflow"):
-                    outdir = modelfile.replace(".pkl","")
-                    outfile = os.path.join(outdir, 'model.h5')
-                    svd_lbol_model['model'] = load_model(outfile)
-            else:
-                svd_lbol_model = svd_utils.calc_svd_lbol(table['tini'][0], table['tmax'][0], table['dt'][0], model = "Bu2021ka", n_coeff = table['n_coeff'][0], gptype=table['gptype'])
-                if np.all(table['gptype'] == "tensorflow"):
-                    outdir = modelfile.replace(".pkl","")
-                    if not os.path.isdir(outdir):
-                        os.makedirs(outdir)
-                    outfile = os.path.join(outdir, 'model.h5')
-                    svd_lbol_model['model'].save(outfile)
-                    del svd_lbol_model['model']
-                with open(modelfile, 'wb') as handle:
-                    pickle.dump(svd_lbol_model, handle, protocol=pickle.HIGHEST_PROTOCOL)
-
-                if np.all(table['gptype'] == "tensorflow"):
-                    svd_lbol_model['model'] = load_model(outfile)
-
-            if np.all(table['gptype'] == "gp_api"):
-                for ii in range(len(svd_lbol_model["gps"])):
-                    svd_lbol_model["gps"][ii] = svd_utils.load_gpapi(svd_lbol_model["gps"][ii])
-
-            Global.svd_lbol_model = svd_lbol_model
+        svd_mag_model, svd_lbol_model = load_Bu2021ka_surrogates(table, **kwargs)
     elif doSpec:
-        if not Global.svd_spec_model == 0:
-            svd_spec_model = Global.svd_spec_model
-        else:
-            if LoadModel:
-            #if True:
-                modelfile = os.path.join(ModelPath,'Bu2021ka_spec.pkl')
-                with open(modelfile, 'rb') as handle:
-                    svd_spec_model = pickle.load(handle)
-            else:
-                svd_spec_model = svd_utils.calc_svd_spectra(table['tini'][0], table['tmax'][0], table['dt'][0], table['lambdaini'][0], table['lambdamax'][0], table['dlambda'][0], model = "Bu2021ka", n_coeff = table['n_coeff'][0])
-                modelfile = os.path.join(ModelPath,'Bu2021ka_spec.pkl')
-                with open(modelfile, 'wb') as handle:
-                    pickle.dump(svd_spec_model, handle, protocol=pickle.HIGHEST_PROTOCOL)
-            Global.svd_spec_model = svd_spec_model
+        svd_spec_model = load_Bu2021ka_surrogates(table, **kwargs)
 
     if not 'mej_dyn' in table.colnames:
         # calc the mass of ejecta
@@ -180,16 +63,48 @@ def get_Bu2021ka_model(table, **kwargs):
         lambdas = np.arange(table['lambdaini'][0], table['lambdamax'][0]+table['dlambda'][0], table['dlambda'][0])
         table['lambda'] = [np.zeros(lambdas.size)]
         table['spec'] =  [np.zeros([lambdas.size, timeseries.size])]
+        if return_uncertainty:
+            table['spec_err'] = [np.zeros([lambdas.size, timeseries.size])]
 
-    # calc lightcurve for each sample
-    for isample in range(len(table)):
-        print('Generating sample %d/%d' % (isample, len(table)))
-        if doAB:
-            table['t'][isample], table['lbol'][isample], table['mag'][isample] = svd_utils.calc_lc(table['tini'][isample], table['tmax'][isample],table['dt'][isample], [np.log10(table['mej_dyn'][isample]),np.log10(table['mej_wind'][isample]),table['phi'][isample],table['theta'][isample],table['kappa'][isample]],svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "Bu2021ka", gptype=table['gptype'][0])
-        elif doSpec:
-            table['t'][isample], table['lambda'][isample], table['spec'][isample] = svd_utils.calc_spectra(table['tini'][isample], table['tmax'][isample],table['dt'][isample], table['lambdaini'][isample], table['lambdamax'][isample]+table['dlambda'][isample], table['dlambda'][isample], [np.log10(table['mej_dyn'][isample]),np.log10(table['mej_wind'][isample]),table['phi'][isample],table['theta'][isample],table['kappa'][isample]],svd_spec_model = svd_spec_model, model = "Bu2021ka")
+    # calc lightcurve for all samples at once
+    if doAB:
+        param_matrix = np.vstack((np.log10(table['mej_dyn']),np.log10(table['mej_wind']),table['phi'],table['theta'],table['kappa'])).T
+        if return_uncertainty:
+            tt, lbol, mag, mag_err = svd_utils.calc_lc_batch(table['tini'][0], table['tmax'][0], table['dt'][0], param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "Bu2021ka", gptype=table['gptype'][0], return_uncertainty=True)
+            table['mag_err'] = mag_err
+        else:
+            tt, lbol, mag = svd_utils.calc_lc_batch(table['tini'][0], table['tmax'][0], table['dt'][0], param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "Bu2021ka", gptype=table['gptype'][0])
+        table['t'][:] = tt
+        table['lbol'][:] = lbol
+        table['mag'][:] = mag
+    elif doSpec:
+        # calc spectra for each sample
+        for isample in range(len(table)):
+            print('Generating sample %d/%d' % (isample, len(table)))
+            if return_uncertainty:
+                table['t'][isample], table['lambda'][isample], table['spec'][isample], table['spec_err'][isample] = svd_utils.calc_spectra(table['tini'][isample], table['tmax'][isample],table['dt'][isample], table['lambdaini'][isample], table['lambdamax'][isample]+table['dlambda'][isample], table['dlambda'][isample], [np.log10(table['mej_dyn'][isample]),np.log10(table['mej_wind'][isample]),table['phi'][isample],table['theta'][isample],table['kappa'][isample]],svd_spec_model = svd_spec_model, model = "Bu2021ka", return_uncertainty=True)
+            else:
+                table['t'][isample], table['lambda'][isample], table['spec'][isample] = svd_utils.calc_spectra(table['tini'][isample], table['tmax'][isample],table['dt'][isample], table['lambdaini'][isample], table['lambdamax'][isample]+table['dlambda'][isample], table['dlambda'][isample], [np.log10(table['mej_dyn'][isample]),np.log10(table['mej_wind'][isample]),table['phi'][isample],table['theta'][isample],table['kappa'][isample]],svd_spec_model = svd_spec_model, model = "Bu2021ka")
 
     return table
 
+def get_Bu2021ka_model_fn(table, **kwargs):
+    """Direct evaluation of Bu2021ka for one sample, see `register_model_fn`."""
+
+    svd_mag_model, svd_lbol_model = load_Bu2021ka_surrogates(table, **kwargs)
+    tini, tmax, dt = table['tini'][0], table['tmax'][0], table['dt'][0]
+    gptype = table['gptype'][0]
+
+    def model_fn(params):
+        mej_dyn, mej_wind, phi, theta, kappa = params
+        if not mej_dyn > 0: return [], [], []
+        param_matrix = [[np.log10(mej_dyn),np.log10(mej_wind),phi,theta,kappa]]
+        tt, lbol, mag = svd_utils.calc_lc_batch(tini, tmax, dt, param_matrix, svd_mag_model = svd_mag_model, svd_lbol_model = svd_lbol_model, model = "Bu2021ka", gptype=gptype)
+        return tt, lbol[0], mag[0]
+
+    return model_fn
+
 register_model('Bu2021ka', KNTable, get_Bu2021ka_model,
                  usage="table")
+register_model_fn('Bu2021ka', KNTable, get_Bu2021ka_model_fn,
+                  ['mej_dyn', 'mej_wind', 'phi', 'theta', 'kappa'])
@@ -5,7 +5,7 @@
 import numpy as np
 import scipy
 
-from .model import register_model
+from .model import register_model, register_model_fn
 from .. import KNTable
 
 from gwemlightcurves.EjectaFits.DiUj2017 import calc_meje, calc_vej
@@ -30,80 +30,56 @@ def get_DiUj2017_model(table, **kwargs):
     table['lbol'] = [np.zeros(timeseries.size)]
     table['mag'] =  [{}]
 
-    # Loop over samples
+    # calc lightcurve for all samples at once
+    t_d, lbol_d, mag_d = calc_lc_batch(table['tini'][0],table['tmax'][0],table['dt'][0],
+                                       np.array(table['mej']),np.array(table['vej']),np.array(table['vmin']),
+                                       np.array(table['th']),np.array(table['ph']),np.array(table['kappa']),
+                                       np.array(table['eps']),np.array(table['alp']),np.array(table['eth']),
+                                       table['flgbct'][0])
     for isample in range(len(table)):
-        table['t'][isample], table['lbol'][isample], table['mag'][isample] = calc_lc(table['tini'][isample],table['tmax'][isample],
-                                                      table['dt'][isample],table['mej'][isample],table['vej'][isample],table['vmin'][isample],
-                                                      table['th'][isample],table['ph'][isample], table['kappa'][isample],
-                                                      table['eps'][isample],table['alp'][isample],table['eth'][isample],table['flgbct'][isample])
+        table['t'][isample] = t_d
+        table['lbol'][isample] = lbol_d[isample]
+        table['mag'][isample] = {ii: mag_d[isample,ii] for ii in range(9)}
     return table
 
 def calc_lc(tini,tmax,dt,mej,vej,vmin,th,ph,kappa,eps,alp,eth,flgbct):
 
-    td, bct = setbc_tabular()
-    bc = setbc()
+    t_d, lbol_d, mag_d = calc_lc_batch(tini,tmax,dt,mej,vej,vmin,th,ph,kappa,eps,alp,eth,flgbct)
 
-    lbol_d=[]
-    bc_tmp=[]
-    dc=0
-
-    t_d = np.arange(tini,tmax+dt,dt)
-
-    mag_d = {}
-    for ii in range(8):
-        mag_d[ii] = np.array([])
+    mag_new = {}
+    for ii in range(9):
+        mag_new[ii] = mag_d[0,ii]
 
-    epsBarnes = 0
-    if epsBarnes:
-        mejtab = (0.001,0.001,0.001,0.005,0.005,0.005,0.01,0.01,0.01,0.05,0.05,0.05)
-        vejtab = (0.1,0.2,0.3,0.1,0.2,0.3,0.1,0.2,0.3,0.1,0.2,0.3)
-        a      = (2.01,4.52,8.16,0.81,1.90,3.20,0.56,1.31,2.19,0.27,0.55,0.95)
-        b      = (0.28,0.62,1.19,0.19,0.28,0.45,0.17,0.21,0.31,0.10,0.13,0.15)
-        d      = (1.12,1.39,1.52,0.86,1.21,1.39,0.74,1.13,1.32,0.60,0.90,1.13)
+    return t_d, lbol_d[0], mag_new
 
-        fa     = scipy.interpolate.interp2d(mejtab,vejtab,a, kind='linear')
-        fb     = scipy.interpolate.interp2d(mejtab,vejtab,b, kind='linear')
-        fd     = scipy.interpolate.interp2d(mejtab,vejtab,d, kind='linear')
+def calc_lc_batch(tini,tmax,dt,mej,vej,vmin,th,ph,kappa,eps,alp,eth,flgbct):
+    """Light curves of N samples on a common time grid.
 
-        fam    = fa(mej,vej)
-        fbm    = fb(mej,vej)
-        fdm    = fd(mej,vej)
+    The sample parameters are scalars or arrays of length N.  Returns the
+    times (Nt,), lbol (N, Nt) and mag (N, 9, Nt), where the y-band (row 5)
+    is interpolated from its neighbouring bands.
+    """
 
-    for t in t_d:
-      if epsBarnes:
-          eth = 0.36*(np.exp(-fam*t)+ np.log(1+2*fbm*t**fdm)/(2*fbm*t**fdm))[0]
+    mej, vej, vmin, th, ph, kappa, eps, alp, eth = [np.atleast_1d(np.asarray(x, dtype=float))[:,None]
+                                                     for x in (mej, vej, vmin, th, ph, kappa, eps, alp, eth)]
 
-      lbol=kn_lbol(t,mej,vej,vmin,th,ph,kappa,eps,alp,eth)
-      lbol_d.append(lbol)
-      mbol=mag_bol(lbol,10)
-      tt=t/((mej*100.0)**(1.0/3.2))
-      bc_tmp=getBC(td,bc,bct,tt,flgbct)
+    t_d = np.arange(tini,tmax+dt,dt)
 
-      for ii in range(8):
-        if t > 2.*(mej*100)**(1.0/3.2):
-          mag_d[ii] = np.append(mag_d[ii],mbol-bc_tmp[ii])
-        else:
-          mag_d[ii] = np.append(mag_d[ii],np.nan)
+    lbol_d = kn_lbol(t_d,mej,vej,vmin,th,ph,kappa,eps,alp,eth)
+    mbol = mag_bol(lbol_d,10)
+    tt = t_d/((mej*100.0)**(1.0/3.2))
+    bc_tmp = getBC(TD,BC,BCT,tt,flgbct)
 
-    lbol_d = np.array(lbol_d)
+    mag_d = mbol - bc_tmp
+    mag_d[:,t_d <= 2.*(mej*100)**(1.0/3.2)] = np.nan
+    mag_d = np.moveaxis(mag_d,0,1)
 
     wavelengths = [3543, 4775.6, 6129.5, 7484.6, 8657.8, 12350, 16620, 21590]
     wavelength_interp = 9603.1
 
-    mag_y = np.zeros(t_d.shape)
-    for ii in range(len(t_d)):
-        mags = [mag_d[jj][ii] for jj in range(8)]
-        mag_y[ii] = np.interp(wavelength_interp,wavelengths,mags)
-    mag_new = {}
-    mag_new[0] = mag_d[0]
-    mag_new[1] = mag_d[1]
-    mag_new[2] = mag_d[2]
-    mag_new[3] = mag_d[3]
-    mag_new[4] = mag_d[4]
-    mag_new[5] = mag_y
-    mag_new[6] = mag_d[5]
-    mag_new[7] = mag_d[6]
-    mag_new[8] = mag_d[7]
+    dmag = (mag_d[:,5]-mag_d[:,4])/(wavelengths[5]-wavelengths[4])
+    mag_y = dmag*(wavelength_interp-wavelengths[4]) + mag_d[:,4]
+    mag_new = np.concatenate((mag_d[:,:5], mag_y[:,None], mag_d[:,5:]), axis=1)
 
     return t_d, lbol_d, mag_new
 
@@ -115,36 +91,24 @@ def mag_bol(lbol,d):
   return -2.5*np.log(lbol/4/np.pi/d0/d0/f0)/np.log(10.0)
 
 def getBC(td,bc,bct,tt,flgbct):
+  """Bolometric corrections at rescaled times tt, shape (8,) + tt.shape."""
 
-  if flgbct:
-    if (tt<td[0]) or (tt>td[130]):
-        return np.array([np.nan,np.nan,np.nan,np.nan,np.nan,np.nan,np.nan,np.nan])
-    else:
-      for ii in range(130):
-          if (td[ii]<=tt) and (tt<=td[ii+1]):
-              break
-      bc_tmp=np.zeros((8,))
-      fac=(tt-td[ii])/(td[ii+1]-td[ii])
-      for jj in range(8):
-          bc_tmp[jj]=(1-fac)*bct[jj][ii]+fac*bct[jj][ii+1]
-          if not np.isfinite(bc_tmp[jj]):
-              bc_tmp[jj] = np.nan
-  else:
-    if (tt<2) or (tt>15):
-        return np.array([np.nan,np.nan,np.nan,np.nan,np.nan,np.nan,np.nan,np.nan])
+  tt = np.asarray(tt, dtype=float)
+
+  with np.errstate(invalid='ignore'):
+    if flgbct:
+      ii = np.clip(np.searchsorted(td,tt)-1,0,len(td)-2)
+      fac = (tt-td[ii])/(td[ii+1]-td[ii])
+      bc_tmp = (1-fac)*bct[:,ii]+fac*bct[:,ii+1]
+      outside = (tt<td[0]) | (tt>td[-1])
     else:
-      bc_tmp=np.zeros((8,))
-      for jj in range(8):
-          if (jj == 0) and (tt>5):
-            bc_tmp[jj]=np.nan
-          elif (jj == 1) and (tt>8.5):
-            bc_tmp[jj]=np.nan
-          else:
-            bc_tmp[jj]=bc[jj][0]+bc[jj][1]*tt+bc[jj][2]*(tt**2.0)+bc[jj][3]*(tt**3.0)+bc[jj][4]*(tt**4.0)
-          if not np.isfinite(bc_tmp[jj]):
-            bc_tmp[jj] = np.nan
+      bc_tmp = np.polynomial.polynomial.polyval(tt,bc.T)
+      bc_tmp[0] = np.where(tt>5,np.nan,bc_tmp[0])
+      bc_tmp[1] = np.where(tt>8.5,np.nan,bc_tmp[1])
+      outside = (tt<2) | (tt>15)
 
-  return bc_tmp
+  bc_tmp = np.where(np.isfinite(bc_tmp),bc_tmp,np.nan)
+  return np.where(outside,np.nan,bc_tmp)
 
 def kn_lbol(t,mej,vej,vmin,th,ph,kappa,eps,alp,eth):
   c=2.99792458e10
@@ -157,15 +121,10 @@ def kn_lbol(t,mej,vej,vmin,th,ph,kappa,eps,alp,eth):
   eps0=eth*eps/eneu0*day*msun
 
   vdiff = vmax(vej,vmin)-vmin
-  if vdiff < 0:
-      tobs = 0.0
-  else:
-      tobs=(th*mej*kappa0/(2*ph*vdiff))**(1/2.0)
-
-  if (t<tobs):
-      fac=t/tobs
-  else:
-      fac=1
+  with np.errstate(divide='ignore', invalid='ignore'):
+      tobs = np.where(vdiff < 0, 0.0, (th*mej*kappa0/(2*ph*vdiff))**(1/2.0))
+  with np.errstate(divide='ignore', invalid='ignore'):
+      fac = np.where(t<tobs, t/tobs, 1)
 
   lbol=(1+th)*mej*fac*eps0*(t**(-alp))*lumu0
 
@@ -1430,5 +1389,26 @@ def setbc_tabular():
 
     return td, bct
 
+# bolometric correction tables, built once
+BC = setbc()
+TD, BCT = setbc_tabular()
+
+def get_DiUj2017_model_fn(table, **kwargs):
+    """Direct evaluation of DiUj2017 for one sample, see `register_model_fn`."""
+
+    tini, tmax, dt = table['tini'][0], table['tmax'][0], table['dt'][0]
+    flgbct = table['flgbct'][0]
+
+    def model_fn(params):
+        mej, vej, vmin, th, ph, kappa, eps, alp, eth = params
+        if not mej > 0: return [], [], []
+        t_d, lbol_d, mag_d = calc_lc_batch(tini, tmax, dt, mej, vej, vmin, th, ph, kappa, eps, alp, eth, flgbct)
+        return t_d, lbol_d[0], mag_d[0]
+
+    return model_fn
+
 register_model('DiUj2017', KNTable, get_DiUj2017_model,
                  usage="table")
+register_model_fn('DiUj2017', KNTable, get_DiUj2017_model_fn,
+                  ['mej', 'vej', 'vmin', 'th', 'ph', 'kappa', 'eps', 'alp', 'eth'],
+                  settings=['tini', 'tmax', 'dt', 'flgbct', 'n_coeff', 'gptype'])
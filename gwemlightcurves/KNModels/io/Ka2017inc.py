@@ -9,7 +9,7 @@ from scipy.interpolate import griddata
 from .model import register_model
 from .. import KNTable
 
-from gwemlightcurves import lightcurve_utils, Global, svd_utils
+from gwemlightcurves import lightcurve_utils, svd_utils, surrogate_cache
 from gwemlightcurves.EjectaFits.DiUj2017 import calc_meje, calc_vej
 
 def get_Ka2017inc_model(table, **kwargs):
@@ -51,6 +51,11 @@ def get_Ka2017inc_model(table, **kwargs):
         table['lambda'] = [np.zeros(lambdas.size)]
         table['spec'] =  [np.zeros([lambdas.size, timeseries.size])]
 
+    if 'svd_mag_color_model' in kwargs:
+        svd_mag_color_override = kwargs['svd_mag_color_model']
+    else:
+        svd_mag_color_override = 0
+
     if not 'n_coeff' in table.colnames:
         if doAB:
             table['n_coeff'] = 43
@@ -58,32 +63,38 @@ def get_Ka2017inc_model(table, **kwargs):
             table['n_coeff'] = 21
 
     if doAB:
-        if not Global.svd_mag_color_model == 0:
-            svd_mag_color_model = Global.svd_mag_color_model
+        mag_color_key = surrogate_cache.surrogate_key(table['colormodel'][0], "color", table,
+                                                      ModelPath=kwargs.get('ModelPath'),
+                                                      LoadModel=LoadModel)
+        if not svd_mag_color_override == 0:
+            svd_mag_color_model = svd_mag_color_override
+        elif table['colormodel'][0] == "a1.0":
+            svd_mag_color_model = "a1.0"
+        elif mag_color_key in surrogate_cache.surrogates:
+            svd_mag_color_model = surrogate_cache.surrogates[mag_color_key]
         else:
             #if False:
             if LoadModel:
                 modelfile = os.path.join(ModelPath,'%s.pkl' % table['colormodel'][0])
-                with open(modelfile, 'rb') as handle:
-                    svd_mag_color_model = pickle.load(handle)
+                svd_mag_color_model = svd_utils.load_svd_model(modelfile)
             else:
                 svd_mag_color_model = svd_utils.calc_svd_color_model(table['tini'][0], table['tmax'][0], table['dt'][0], model = table['colormodel'][0], n_coeff = table['n_coeff'][0])
                 modelfile = os.path.join(ModelPath,'%s.pkl' % table['colormodel'][0])
                 with open(modelfile, 'wb') as handle:
                     pickle.dump(svd_mag_color_model, handle, protocol=pickle.HIGHEST_PROTOCOL)
-            Global.svd_mag_color_model = svd_mag_color_model
+            surrogate_cache.surrogates[mag_color_key] = svd_mag_color_model
 
     table1 = KNTable.model('Ka2017', table, **kwargs)
 
     # calc lightcurve for each sample
     for isample in range(len(table)):
         if doAB:
-            if Global.svd_mag_color_model == "a1.0":
+            if svd_mag_color_model == "a1.0":
                 table['t'][isample] = table1['t'][isample]
                 table['mag'][isample] = table1['mag'][isample]
                 table['lbol'][isample] = table1['lbol'][isample]
             else:
-                table['t'][isample], table['mag'][isample] = svd_utils.calc_color(table['tini'][isample], table['tmax'][isample],table['dt'][isample], [table['iota'][isample]],svd_mag_color_model = Global.svd_mag_color_model)
+                table['t'][isample], table['mag'][isample] = svd_utils.calc_color(table['tini'][isample], table['tmax'][isample],table['dt'][isample], [table['iota'][isample]],svd_mag_color_model = svd_mag_color_model)
 
                 for ii, mag_slice in enumerate(table['mag'][isample]):
                     orig = table1['mag'][isample][ii]
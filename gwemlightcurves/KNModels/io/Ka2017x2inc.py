@@ -9,7 +9,7 @@ from scipy.interpolate import griddata
 from .model import register_model
 from .. import KNTable
 
-from gwemlightcurves import lightcurve_utils, Global, svd_utils
+from gwemlightcurves import lightcurve_utils, svd_utils
 from gwemlightcurves.EjectaFits.DiUj2017 import calc_meje, calc_vej
 
 def get_Ka2017x2inc_model(table, **kwargs):
@@ -24,9 +24,6 @@ def get_Ka2017x2inc_model(table, **kwargs):
     else:
         doSpec = False
 
-    if 'ModelPath' in kwargs:
-        ModelPath = kwargs['ModelPath']
-
     timeseries = np.arange(table['tini'][0], table['tmax'][0]+table['dt'][0], table['dt'][0])
     table['t'] = [np.zeros(timeseries.size)]
     if doAB:
@@ -47,27 +44,12 @@ def get_Ka2017x2inc_model(table, **kwargs):
     table2['vej'] = table['vej_2']
     table2['Xlan'] = table['Xlan_2']
 
-    if len(Global.svd_mag_color_models) == 0:
-        colormodels = table["colormodel"][0]
-        colormodel1, colormodel2 = colormodels[0], colormodels[1]
-
-        Global.svd_mag_color_models = []
-        for cm in colormodels:
-            modelfile = os.path.join(ModelPath,'%s.pkl' % cm)
-            with open(modelfile, 'rb') as handle:
-                svd_mag_color_model = pickle.load(handle)
-            Global.svd_mag_color_models.append(svd_mag_color_model)
-        table1['colormodel'] = [colormodel1]
-        table2['colormodel'] = [colormodel2]
+    colormodel1, colormodel2 = table["colormodel"][0][0], table["colormodel"][0][1]
+    table1['colormodel'] = [colormodel1]*len(table)
+    table2['colormodel'] = [colormodel2]*len(table)
 
-    Global.svd_mag_color_model = Global.svd_mag_color_models[0]
-    print(Global.svd_mag_color_model)
-    exit(0)
     table1 = KNTable.model('Ka2017inc', table1, **kwargs)
-    Global.svd_mag_color_model = Global.svd_mag_color_models[1]
-    print(Global.svd_mag_color_model)
     table2 = KNTable.model('Ka2017inc', table2, **kwargs)
-    exit(0)
 
     # calc lightcurve for each sample
     for isample in range(len(table)):
@@ -1,11 +1,11 @@
 # https://arxiv.org/abs/1705.07084
 
-import os, sys
+import os, sys, tempfile
 import numpy as np
 import scipy.interpolate
 from scipy.interpolate import interpolate as interp
 
-from .model import register_model
+from .model import register_model, register_model_fn
 from .. import KNTable
 
 from gwemlightcurves.EjectaFits.DiUj2017 import calc_meje, calc_vej
@@ -31,103 +31,156 @@ def get_WoKo2017_model(table, **kwargs):
     table['lbol'] = [np.zeros(timeseries.size)]
     table['mag'] =  [np.zeros([9, timeseries.size])]
 
-    # calc lightcurve for each sample
-    for isample in range(len(table)):
-        table['t'][isample], table['lbol'][isample], table['mag'][isample] = calc_lc(table['tini'][isample], table['tmax'][isample],
-                                                                     table['dt'][isample], table['mej'][isample],
-                                                                     table['vej'][isample], table['theta_r'][isample], table['kappa'][isample])
+    # calc lightcurve for all samples at once
+    table['t'][:], table['lbol'][:], table['mag'][:] = calc_lc_batch(table['tini'][0], table['tmax'][0],
+                                                                     table['dt'][0], np.array(table['mej']),
+                                                                     np.array(table['vej']), np.array(table['theta_r']), np.array(table['kappa']))
     return table
 
-def calc_lc(tini,tmax,dt,mej,vej,theta_r,kappa_r,model="DZ2"):
+MODELFILES = {"DZ2": "../data/macronova_models_wollaeger2017/DZ2_mags_2017-03-20.dat",
+              "gamA2": "../data/macronova_models_wollaeger2017/gamA2_mags_2017-03-20.dat",
+              "gamB2": "../data/macronova_models_wollaeger2017/gamB2_mags_2017-03-20.dat"}
 
-    mejconst = [-1.13,-1.01,-0.94,-0.94,-0.93,-0.93,-0.95,-0.99]
-    vejconst = [-1.28,-1.60,-1.52,-1.56,-1.61,-1.61,-1.55,-1.33]
-    kappaconst = [2.65,2.27,2.02,1.87,1.76,1.56,1.33,1.13]
+# parsed model tables and interpolants, keyed by model file
+_models = {}
+
+def load_model_data(modelfile):
+    """Read a Wollaeger et al. model table, preferring its binary copy.
 
-    if model == "DZ2":
-        mej0 = 0.013+0.005
-        vej0 = 0.132+0.08
-        kappa0 = 1.0
-        modelfile = "../data/macronova_models_wollaeger2017/DZ2_mags_2017-03-20.dat"
-    elif model == "gamA2":
-        mej0 = 0.013+0.005
-        vej0 = 0.132+0.08
-        kappa0 = 1.0
-        modelfile = "../data/macronova_models_wollaeger2017/gamA2_mags_2017-03-20.dat"
-    elif model == "gamB2":
-        mej0 = 0.013+0.005
-        vej0 = 0.132+0.08
-        kappa0 = 1.0
-        modelfile = "../data/macronova_models_wollaeger2017/gamB2_mags_2017-03-20.dat"
+    The text table is parsed once and saved next to it as ``.npy``, which
+    is used from then on as long as it is newer than the text table.
+    """
+
+    npyfile = modelfile.replace(".dat",".npy")
+    if os.path.isfile(npyfile) and (not os.path.isfile(modelfile) or
+                                    os.path.getmtime(npyfile) >= os.path.getmtime(modelfile)):
+        return np.load(npyfile)
 
     data_out = np.loadtxt(modelfile)
+    # write to a temporary file and rename it, so that concurrent fits
+    # never read a partially written copy
+    try:
+        fd, tmpname = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(npyfile)),
+                                       prefix=".%s." % os.path.basename(npyfile))
+    except OSError:
+        return data_out
+    try:
+        with os.fdopen(fd, 'wb') as fid:
+            np.save(fid, data_out)
+        os.replace(tmpname, npyfile)
+    except OSError:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+    return data_out
+
+def get_model(model="DZ2", modelfile=None):
+    """Angular bins and time interpolants of a model, built once per file.
+
+    Returns the bin centres and a list of 9 interp1d objects (log10 lbol
+    followed by the 8 bands), each interpolating all angular bins at once.
+    """
+
+    if modelfile is None:
+        modelfile = MODELFILES[model]
+    if modelfile in _models:
+        return _models[modelfile]
+
+    data_out = load_model_data(modelfile)
     ndata, nslices = data_out.shape
-    ints = np.arange(0,ndata,ndata/9)
+    nslice = ndata//9
 
-    tvec_days = np.arange(tini,tmax+dt,dt)
-    mAB = np.zeros((len(tvec_days),8))
-
-    for ii in range(len(ints)):
-        idx = np.arange(ndata/9) + ii*(ndata/9)
-        data_out_slice = data_out[idx,:]
+    interps = []
+    for ii in range(9):
+        data_out_slice = data_out[ii*nslice:(ii+1)*nslice,:]
 
         t = data_out_slice[:,1]
         data = data_out_slice[:,2:]
-        #idx = np.where((t >= 0) & (t <= 7))[0]
-        #t = t[idx]
-        #data = data[idx,:]
-        nt, nbins = data.shape
-
-        a_i = (360/(2*np.pi))*np.arccos(1 - np.arange(nbins)*2/float(nbins))
-        b_i = (360/(2*np.pi))*np.arccos(1 - (np.arange(nbins)+1)*2/float(nbins))
-        bins = (a_i + b_i)/2.0
-
-        idx = np.argsort(np.abs(bins-theta_r*2*np.pi))
-        idx1 = idx[0]
-        idx2 = idx[1]
-        weight1 = 1/np.abs(bins[idx1]-theta_r*2*np.pi)
-        weight2 = 1/np.abs(bins[idx1]-theta_r*2*np.pi)
-        if not np.isfinite(weight1):
-            weight1, weight2 = 1.0, 0.0
-        elif not np.isfinite(weight2):
-            weight1, weight2 = 0.0, 1.0
-        else:
-            weight1, weight2 = weight1/(weight1+weight2), weight2/(weight1+weight2)
-
         if ii == 0:
-            #f     = scipy.interpolate.interp2d(bins,t,np.log10(data), kind='cubic')
-            f1 = interp.interp1d(t, np.log10(data[:,idx1]), fill_value='extrapolate')
-            f2 = interp.interp1d(t, np.log10(data[:,idx2]), fill_value='extrapolate')
-        else:
-            #f     = scipy.interpolate.interp2d(bins,t,data, kind='cubic')
-            f1 = interp.interp1d(t,data[:,idx1], fill_value='extrapolate')
-            f2 = interp.interp1d(t,data[:,idx2], fill_value='extrapolate')
+            data = np.log10(data)
+        interps.append(interp.interp1d(t, data, axis=0, fill_value='extrapolate'))
+
+    nbins = data.shape[1]
+    a_i = (360/(2*np.pi))*np.arccos(1 - np.arange(nbins)*2/float(nbins))
+    b_i = (360/(2*np.pi))*np.arccos(1 - (np.arange(nbins)+1)*2/float(nbins))
+    bins = (a_i + b_i)/2.0
+
+    _models[modelfile] = (bins, interps)
+    return _models[modelfile]
+
+def calc_lc(tini,tmax,dt,mej,vej,theta_r,kappa_r,model="DZ2",modelfile=None):
+
+    tvec_days, lbol, mAB = calc_lc_batch(tini,tmax,dt,mej,vej,theta_r,kappa_r,model=model,modelfile=modelfile)
+
+    return np.squeeze(tvec_days[0]), np.squeeze(lbol[0]), mAB[0]
 
-        fam1, fam2  = f1(tvec_days), f2(tvec_days)
-        fam = weight1*fam1+weight2*fam2
+def calc_lc_batch(tini,tmax,dt,mej,vej,theta_r,kappa_r,model="DZ2",modelfile=None):
+    """Light curves of N samples from one model table.
+
+    The sample parameters are scalars or arrays of length N.  Returns the
+    rescaled times (N, Nt), lbol (N, Nt) and mag (N, 9, Nt).
+    """
+
+    mejconst = np.array([-1.13,-1.01,-0.94,-0.94,-0.93,-0.93,-0.95,-0.99])
+    vejconst = np.array([-1.28,-1.60,-1.52,-1.56,-1.61,-1.61,-1.55,-1.33])
+    kappaconst = [2.65,2.27,2.02,1.87,1.76,1.56,1.33,1.13]
+
+    mej0 = 0.013+0.005
+    vej0 = 0.132+0.08
+    kappa0 = 1.0
+
+    mej, vej, theta_r, kappa_r = [np.atleast_1d(np.asarray(x, dtype=float))[:,None]
+                                  for x in (mej, vej, theta_r, kappa_r)]
+
+    bins, interps = get_model(model=model, modelfile=modelfile)
+
+    # the two bins nearest to the viewing angle of each sample
+    dist = np.abs(bins-theta_r*2*np.pi)
+    idx = np.argsort(dist,axis=1)
+    idx1, idx2 = idx[:,0], idx[:,1]
+    # both weights use the nearest bin, so that the two bins are averaged
+    # unless the viewing angle falls on a bin centre
+    onbin = (dist[np.arange(len(idx1)),idx1] == 0)
+    weight1 = np.where(onbin, 1.0, 0.5)[:,None]
+    weight2 = np.where(onbin, 0.0, 0.5)[:,None]
+
+    tvec_days = np.arange(tini,tmax+dt,dt)
+    mAB = np.zeros((len(mej),8,len(tvec_days)))
+
+    for ii, f in enumerate(interps):
+        data = f(tvec_days)
+        fam = weight1*data[:,idx1].T+weight2*data[:,idx2].T
 
         if ii == 0:
             lbol = 10**fam
         else:
-            mAB[:,int(ii-1)] = np.squeeze(fam + mejconst[int(ii-1)]*np.log10(mej/mej0) + vejconst[int(ii-1)]*np.log10(vej/vej0)) #+ kappaconst[int(ii-1)]*np.log10(kappa_r/kappa0))
+            mAB[:,ii-1,:] = fam + mejconst[ii-1]*np.log10(mej/mej0) + vejconst[ii-1]*np.log10(vej/vej0) #+ kappaconst[int(ii-1)]*np.log10(kappa_r/kappa0))
 
     tmax = (kappa_r/10)**0.35 * (mej/10**-2)**0.318 * (vej/0.1)**-0.60
     Lmax = 2.8*10**40 * (kappa_r/10)**-0.60 * (mej/10**-2)**0.426 * (vej/0.1)**0.776
 
-    tvec_days = tvec_days*tmax/tvec_days[np.argmax(lbol)]
-    lbol = lbol*Lmax/np.max(lbol)
+    tvec_days = tvec_days*tmax/tvec_days[np.argmax(lbol,axis=1)][:,None]
+    lbol = lbol*Lmax/np.max(lbol,axis=1)[:,None]
+
+    # u-band lies blueward of the modelled bands, so np.interp holds the
+    # bluest band constant
+    mAB_new = np.concatenate((mAB[:,:1,:], mAB), axis=1)
+
+    return tvec_days, lbol, mAB_new
+
+def get_WoKo2017_model_fn(table, **kwargs):
+    """Direct evaluation of WoKo2017 for one sample, see `register_model_fn`."""
 
-    wavelengths = [4775.6, 6129.5, 7484.6, 8657.8, 9603.1, 12350, 16620, 21590]
-    wavelength_interp = 3543
+    tini, tmax, dt = table['tini'][0], table['tmax'][0], table['dt'][0]
 
-    mAB_y = np.zeros(tvec_days.shape)
-    for ii in range(len(tvec_days)):
-        mAB_y[ii] = np.interp(wavelength_interp,wavelengths,mAB[ii,:])
-    mAB_new = np.zeros((len(tvec_days),9))
-    mAB_new[:,0] = np.squeeze(mAB_y)
-    mAB_new[:,1:] = mAB
+    def model_fn(params):
+        mej, vej, theta_r, kappa = params
+        if not mej > 0: return [], [], []
+        t, lbol, mag = calc_lc_batch(tini, tmax, dt, mej, vej, theta_r, kappa)
+        return t[0], lbol[0], mag[0]
 
-    return np.squeeze(tvec_days), np.squeeze(lbol), mAB_new.T
+    return model_fn
 
 register_model('WoKo2017', KNTable, get_WoKo2017_model,
                  usage="table")
+register_model_fn('WoKo2017', KNTable, get_WoKo2017_model_fn,
+                  ['mej', 'vej', 'theta_r', 'kappa'])
@@ -26,7 +26,10 @@ from six import string_types
 from astropy.io.registry import IORegistryError
 from astropy.table import Table
 
+from gwemlightcurves import profiler
+
 _MODELS = {}
+_MODEL_FNS = {}
 
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
 
@@ -52,6 +55,7 @@ def register_model(data_format, data_class, function, force=False,
     """
     key = (data_format, data_class)
     if key not in _MODELS or force:
+        function = profiler.profiled("KNModels.%s" % data_format)(function)
         _MODELS[key] = (function, usage)
     else:
         raise IORegistryError("Fetcher for format '{0}' and class '{1}' "
@@ -85,6 +89,61 @@ def get_model(data_format, data_class):
                               % (data_format, formats))
 
 
+def register_model_fn(data_format, data_class, function, parameters,
+                      settings=('tini', 'tmax', 'dt', 'n_coeff', 'gptype'),
+                      force=False):
+    """Register a direct evaluation path next to :meth:`KNTable.model`
+
+    ``function(table, **kwargs)`` receives a one-row table holding the
+    ``settings`` columns (time grid, surrogate options, ...) and returns
+    ``model_fn(params) -> (t, lbol, mag)``, which evaluates a single
+    sample without building a table. ``params`` holds the values of the
+    ``parameters`` columns, in order, as they would be passed to
+    :meth:`KNTable.model`.
+
+    Parameters
+    ----------
+    data_format : `str`
+        name of the format, as registered with `register_model`
+
+    data_class : `type`
+        the class whose model is evaluated
+
+    function : `callable`
+        the factory of the direct evaluation function
+
+    parameters : `list` of `str`
+        names of the sample columns taken by ``model_fn``
+
+    settings : `list` of `str`, optional
+        names of the columns that configure ``model_fn``
+
+    force : `bool`, optional
+        overwrite existing registration for ``data_format`` if found,
+        default: `False`
+    """
+    key = (data_format, data_class)
+    if key not in _MODEL_FNS or force:
+        function = profiler.profiled("KNModels.%s.model_fn_setup" % data_format)(function)
+        _MODEL_FNS[key] = (function, tuple(parameters), tuple(settings))
+    else:
+        raise IORegistryError("Direct model for format '{0}' and class '{1}' "
+                              "has already been " "defined".format(
+                                  data_format, data_class))
+
+
+def get_model_fn(data_format, data_class):
+    """Return the direct evaluation factory for the given format
+
+    Returns
+    -------
+    function, parameters, settings
+        as given to `register_model_fn`, or `None` if ``data_format``
+        has no direct evaluation path
+    """
+    return _MODEL_FNS.get((data_format, data_class))
+
+
 def _update__doc__(data_class):
     header = "The available named formats are:"
     model = data_class.model
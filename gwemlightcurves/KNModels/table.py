@@ -34,89 +34,40 @@ from sklearn.gaussian_process import GaussianProcessRegressor
 from sklearn.gaussian_process.kernels import RBF, Matern, DotProduct, ConstantKernel, RationalQuadratic
 
 from gwemlightcurves import lightcurve_utils
+from gwemlightcurves.EOS.ensemble import SPEC_NSSTRUC_DIR, ensemble_file, load_ensemble
+from gwemlightcurves.EOS.family import polytrope_family, named_family, table_family
 from scipy import interpolate
 
 __author__ = 'Scott Coughlin <scott.coughlin@ligo.org>'
 __all__ = ['KNTable', 'tidal_lambda_from_tilde', 'CLove', 'EOSfit', 'get_eos_list', 'get_lalsim_eos', 'construct_eos_from_polytrope']
 
 
-def marginalize_eos_spec(row_sample, low_latency_flag=False):
+def marginalize_eos_spec(row_sample, low_latency_flag=False, eosfile=None):
+        """Samples of row_sample for every EOS of the spectral ensemble.
+
+        The EOS curves are read from the store made by pack_eos_ensemble.py,
+        by default ensemble.ensemble_file(ensemble.SPEC_NSSTRUC_DIR), once
+        per process.
+        """
+        if eosfile is None:
+                eosfile = ensemble_file(SPEC_NSSTRUC_DIR)
+        ensemble = load_ensemble(eosfile)
+        m1, m2, chi_eff = row_sample["m1"], row_sample["m2"], row_sample["chi_eff"]
+        indices = np.arange(len(ensemble))
+        lambda1s, r1s, mb1s = ensemble.lookup(indices, m1)
+        lambda2s, r2s, mb2s = ensemble.lookup(indices, m2)
+        r1s, r2s = r1s * 1000, r2s * 1000 #radius in meter
+        mbnss = ensemble.Mmax
+        idx = np.where((lambda1s >= 0.) & (lambda2s >= 0.) & (mbnss >= 0.) & (r1s >= 0.) & (r2s >= 0.) & (mb1s >= 0.) & (mb2s >= 0.))[0]
+        lambda1s, lambda2s, r1s, r2s, mb1s, mb2s, mbnss = lambda1s[idx], lambda2s[idx], r1s[idx], r2s[idx], mb1s[idx], mb2s[idx], mbnss[idx]
+        ones = np.ones(len(idx))
         if (low_latency_flag):
-                m1s, m2s, dists_mbta, chi_effs, weights_mbta, lambda1s, lambda2s, r1s, r2s, mb1s, mb2s, mbnss = [], [], [], [], [], [], [], [], [], [], [], []
-                m1, m2, dist_mbta, chi_eff, weight_mbta = row_sample["m1"], row_sample["m2"], row_sample["dist_mbta"], row_sample["chi_eff"], row_sample["weight_mbta"]
-                nsamples = 2396
-                for jj in range(nsamples):
-                        lambda1, lambda2, radius1, radius2, mbaryon1, mbaryon2, mbns = -1, -1, -1, -1, -1, -1, -1
-                        eospath = "/home/philippe.landry/nseos/eos/spec/macro_nsstruc/macro-spec_%dcr.csv" % jj
-                        data_out = np.genfromtxt(eospath, names=True, delimiter=",")
-                        marray, larray, rarray, mbararray = data_out["M"], data_out["Lambda"], data_out["R"], data_out["Mb"]
-                        mmax   = np.argmax(marray)
-                        marray, larray, rarray, mbararray = marray[0:mmax], larray[0:mmax], rarray[0:mmax], mbararray[0:mmax]
-                        f_lambda = interpolate.interp1d(marray, larray, fill_value=0, bounds_error=False)
-                        f_radius = interpolate.interp1d(marray, rarray, fill_value=0, bounds_error=False)
-                        f_mbaryon = interpolate.interp1d(marray, mbararray, fill_value=0, bounds_error=False)
-                        if float(f_lambda(m1)) > lambda1: lambda1 = f_lambda(m1)
-                        if float(f_lambda(m2)) > lambda2: lambda2 = f_lambda(m2)
-                        if float(f_radius(m1)) > radius1: radius1 = f_radius(m1)
-                        if float(f_radius(m2)) > radius2: radius2 = f_radius(m2)
-                        if float(f_mbaryon(m1)) > mbaryon1: mbaryon1 = f_mbaryon(m1)
-                        if float(f_mbaryon(m2)) > mbaryon2: mbaryon2 = f_mbaryon(m2)
-                        radius1, radius2 = radius1 * 1000, radius2 * 1000 #radius in meter
-                        if np.max(marray) > mbns: mbns = np.max(marray)
-                        
-                        if (lambda1 < 0.) or (lambda2 < 0.) or (mbns < 0.) or (radius1 < 0.) or (radius2 < 0.) or (mbaryon1 < 0.) or (mbaryon2 < 0.):
-                                continue
-                        m1s.append(m1)
-                        m2s.append(m2)
-                        dists_mbta.append(dist_mbta)
-                        chi_effs.append(chi_eff)
-                        weights_mbta.append(weight_mbta)
-                        lambda1s.append(lambda1)
-                        lambda2s.append(lambda2)
-                        r1s.append(radius1)
-                        r2s.append(radius2)
-                        mb1s.append(mbaryon1)
-                        mb2s.append(mbaryon2)
-                        mbnss.append(mbns)     
-                data = np.vstack((m1s, m2s, dists_mbta, chi_effs, weights_mbta, lambda1s, lambda2s, r1s, r2s, mb1s, mb2s, mbnss)).T 
+                dist_mbta, weight_mbta = row_sample["dist_mbta"], row_sample["weight_mbta"]
+                data = np.vstack((m1*ones, m2*ones, dist_mbta*ones, chi_eff*ones, weight_mbta*ones, lambda1s, lambda2s, r1s, r2s, mb1s, mb2s, mbnss)).T
                 results_samples = KNTable(data, names=('m1', 'm2', 'dist_mbta', 'chi_eff', 'weight_mbta', 'lambda1', 'lambda2', 'r1', 'r2', 'mb1', 'mb2', 'mbns'))
         else:
-                m1s, m2s, chi_effs, lambda1s, lambda2s, r1s, r2s, mb1s, mb2s, mbnss = [], [], [], [], [], [], [], [], [], [] 
-                m1, m2, chi_eff = row_sample["m1"], row_sample["m2"], row_sample["chi_eff"]           
-                nsamples = 2396
-                for jj in range(nsamples):
-                        lambda1, lambda2, radius1, radius2, mbaryon1, mbaryon2, mbns = -1, -1, -1, -1, -1, -1, -1
-                        eospath = "/home/philippe.landry/nseos/eos/spec/macro_nsstruc/macro-spec_%dcr.csv" % jj
-                        data_out = np.genfromtxt(eospath, names=True, delimiter=",")
-                        marray, larray, rarray, mbararray = data_out["M"], data_out["Lambda"], data_out["R"], data_out["Mb"]
-                        mmax   = np.argmax(marray)
-                        marray, larray, rarray, mbararray = marray[0:mmax], larray[0:mmax], rarray[0:mmax], mbararray[0:mmax]
-                        f_lambda = interpolate.interp1d(marray, larray, fill_value=0, bounds_error=False)
-                        f_radius = interpolate.interp1d(marray, rarray, fill_value=0, bounds_error=False)
-                        f_mbaryon = interpolate.interp1d(marray, mbararray, fill_value=0, bounds_error=False)
-                        if float(f_lambda(m1)) > lambda1: lambda1 = f_lambda(m1)
-                        if float(f_lambda(m2)) > lambda2: lambda2 = f_lambda(m2)
-                        if float(f_radius(m1)) > radius1: radius1 = f_radius(m1)
-                        if float(f_radius(m2)) > radius2: radius2 = f_radius(m2)
-                        if float(f_mbaryon(m1)) > mbaryon1: mbaryon1 = f_mbaryon(m1)
-                        if float(f_mbaryon(m2)) > mbaryon2: mbaryon2 = f_mbaryon(m2)
-                        radius1, radius2 = radius1 * 1000, radius2 * 1000 #radius in meter
-                        if np.max(marray) > mbns: mbns = np.max(marray)
-
-                        if (lambda1 < 0.) or (lambda2 < 0.) or (mbns < 0.) or (radius1 < 0.) or (radius2 < 0.) or (mbaryon1 < 0.) or (mbaryon2 < 0.):
-                                continue
-                        m1s.append(m1)
-                        m2s.append(m2)
-                        chi_effs.append(chi_eff)
-                        lambda1s.append(lambda1)
-                        lambda2s.append(lambda2)
-                        r1s.append(radius1)
-                        r2s.append(radius2)
-                        mb1s.append(mbaryon1)
-                        mb2s.append(mbaryon2)
-                        mbnss.append(mbns)
-                data = np.vstack((m1s, m2s, chi_effs, lambda1s, lambda2s, r1s, r2s, mb1s, mb2s, mbnss)).T                     
-                results_samples = KNTable(data, names=('m1', 'm2', 'chi_eff', 'lambda1', 'lambda2', 'r1', 'r2', 'mb1', 'mb2', 'mbns'))                 
+                data = np.vstack((m1*ones, m2*ones, chi_eff*ones, lambda1s, lambda2s, r1s, r2s, mb1s, mb2s, mbnss)).T
+                results_samples = KNTable(data, names=('m1', 'm2', 'chi_eff', 'lambda1', 'lambda2', 'r1', 'r2', 'mb1', 'mb2', 'mbns'))
         return results_samples          
 
 
@@ -183,11 +134,16 @@ def get_eos_list(TOV):
     Populates lists of available EOSs for each set of TOV solvers
     """
     import os
+    import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
     if TOV not in ['Monica', 'Wolfgang', 'lalsim']:
         raise ValueError('You have provided a TOV '
                          'for which we have no data '
                          'and therefore cannot '
                          'calculate the radius.')
+    # the EOS of the eos_tables.npz bundle, if it has been built with pack_eos_tables.py
+    EOS_List = et.eos_list(TOV)
+    if EOS_List is not None:
+        return EOS_List
     try:
         path = find_executable('ap4_mr.dat')
         path = path[:-10]
@@ -207,74 +163,32 @@ def construct_eos_from_polytrope(eos_name):
     """
     Uses lalsimulation to read polytrope parameters from table
     """
-    import lalsimulation as lalsim
-    from astropy.io import ascii
-    polytrope_table=np.genfromtxt(find_executable('polytrope_table.dat'), dtype=("|S10", '<f8','<f8','<f8','<f8'), names=True)
-  
-    #convert all eos names to lower case
-    for i in range(0,len(polytrope_table['eos'])):
-        polytrope_table['eos'][i]=polytrope_table['eos'][i].lower()
-
-    #convert logp from cgs to si
-    for i in range(0, len(polytrope_table['logP1'])):
-        polytrope_table['logP1'][i]=np.log10(10**(polytrope_table['logP1'][i])*0.1)
-
-    eos_indx=np.where(polytrope_table['eos']==eos_name.encode('utf-8'))[0][0]
-
-    eos=lalsim.SimNeutronStarEOS4ParameterPiecewisePolytrope(polytrope_table['logP1'][eos_indx], polytrope_table['gamma1'][eos_indx], polytrope_table['gamma2'][eos_indx], polytrope_table['gamma3'][eos_indx])
-    fam=lalsim.CreateSimNeutronStarFamily(eos)
-
-    return eos, fam
+    family = polytrope_family(eos_name.lower())
+    return family.eos, family.fam
 
 
 def get_lalsim_eos(eos_name):
     """
     EOS tables described by Ozel `here <https://arxiv.org/pdf/1603.02698.pdf>`_ and downloadable `here <http://xtreme.as.arizona.edu/NeutronStars/data/eos_tables.tar>`_. LALSim utilizes this tables, but needs some interfacing (i.e. conversion to SI units, and conversion from non monotonic to monotonic pressure density tables)
+
+    The families are cached, see gwemlightcurves.EOS.family.
     """
     import os
-    import lalsimulation
-    import lal
     obs_max_mass = 2.01 - 0.04
     print("Checking %s" % eos_name)
-    eos_fname = ""
     if os.path.exists(eos_name):
-        # NOTE: Adapted from code by Monica Rizzo
         print("Loading from %s" % eos_name)
-        bdens, press, edens = np.loadtxt(eos_name, unpack=True)
-        press *= 7.42591549e-25
-        edens *= 7.42591549e-25
-        eos_name = os.path.basename(eos_name)
-        eos_name = os.path.splitext(eos_name)[0].upper()
-
-        if not np.all(np.diff(press) > 0):
-            keep_idx = np.where(np.diff(press) > 0)[0] + 1
-            keep_idx = np.concatenate(([0], keep_idx))
-            press = press[keep_idx]
-            edens = edens[keep_idx]
-        assert np.all(np.diff(press) > 0)
-        if not np.all(np.diff(edens) > 0):
-            keep_idx = np.where(np.diff(edens) > 0)[0] + 1
-            keep_idx = np.concatenate(([0], keep_idx))
-            press = press[keep_idx]
-            edens = edens[keep_idx]
-        assert np.all(np.diff(edens) > 0)
-
-        print("Dumping to %s" % eos_fname)
-        eos_fname = "./." + eos_name + ".dat"
-        np.savetxt(eos_fname, np.transpose((press, edens)), delimiter='\t')
-        eos = lalsimulation.SimNeutronStarEOSFromFile(eos_fname)
-        fam = lalsimulation.CreateSimNeutronStarFamily(eos)
-
+        family = table_family(eos_name)
+        eos_name = family.name
     else:
-        eos = lalsimulation.SimNeutronStarEOSByName(eos_name)
-        fam = lalsimulation.CreateSimNeutronStarFamily(eos)
+        family = named_family(eos_name)
 
-    mmass = lalsimulation.SimNeutronStarMaximumMass(fam) / lal.MSUN_SI
+    mmass = family.mmax
     print("Family %s, maximum mass: %1.2f" % (eos_name, mmass))
     if np.isnan(mmass) or mmass > 3. or mmass < obs_max_mass:
         return
 
-    return eos, fam
+    return family.eos, family.fam
 
 
 
@@ -734,24 +648,15 @@ class KNTable(Table):
                             'and therefore cannot '
                             'calculate the Baryonic mass.')
 
+        import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
+        # the baryonic_mass_of_mass spline constants are computed once per EOS, we now can either take values directly from table or use the spline to extrapolate the values
         if TOV == 'Monica':
-            import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
-            import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
-            MassRadiusBaryMassTable = Table.read(find_executable(EOS + '_mr.dat'), format='ascii')
-            baryonic_mass_of_mass_const = ms.interpolate(MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['mb'])
-            # after obtaining the baryonic_mass_of_mass constants we now can either take values directly from table or use pre calculated spline to extrapolate the values
-            self['mb1'] = et.values_from_table(self['m1'], MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['mb'], baryonic_mass_of_mass_const)
-            self['mb2'] = et.values_from_table(self['m2'], MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['mb'], baryonic_mass_of_mass_const)
+            self['mb1'] = et.values_from_eos(self['m1'], EOS, TOV, 'mb')
+            self['mb2'] = et.values_from_eos(self['m2'], EOS, TOV, 'mb')
 
         if TOV == 'Wolfgang':
-
-            import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
-            import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
-            MassRadiusBaryMassTable = Table.read(find_executable(EOS + '.tidal.seq'), format='ascii')
-            baryonic_mass_of_mass_const = ms.interpolate(MassRadiusBaryMassTable['grav_mass'], MassRadiusBaryMassTable['baryonic_mass'])
-            # after obtaining the baryonic_mass_of_mass constants we now can either take values directly from table or use pre calculated spline to extrapolate the values
-            self['mb1'] = et.values_from_table(self['m1'], MassRadiusBaryMassTable['grav_mass'], MassRadiusBaryMassTable['baryonic_mass'], baryonic_mass_of_mass_const)
-            self['mb2'] = et.values_from_table(self['m2'], MassRadiusBaryMassTable['grav_mass'], MassRadiusBaryMassTable['baryonic_mass'], baryonic_mass_of_mass_const)
+            self['mb1'] = et.values_from_eos(self['m1'], EOS, TOV, 'baryonic_mass')
+            self['mb2'] = et.values_from_eos(self['m2'], EOS, TOV, 'baryonic_mass')
 
         return self
 
@@ -771,22 +676,16 @@ class KNTable(Table):
                             'and therefore cannot '
                             'calculate the radius.')
 
+        import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
         if TOV == 'Monica':
 
-            import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
-            import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
-            MassRadiusBaryMassTable = Table.read(find_executable(EOS + '_mr.dat'), format='ascii')
-            radius_of_mass_const = ms.interpolate(MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'])
-            # after obtaining the radius_of_mass constants we now can either take values directly from table or use pre calculated spline to extrapolate the values
+            # the radius_of_mass spline constants are computed once per EOS, we now can either take values directly from table or use the spline to extrapolate the values
             # also radius is in km in table. need to convert to SI (i.e. meters)
-            self['r1'] = et.values_from_table(self['m1'], MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'], radius_of_mass_const)*10**3
-            self['r2'] = et.values_from_table(self['m2'], MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'], radius_of_mass_const)*10**3
+            self['r1'] = et.values_from_eos(self['m1'], EOS, TOV, 'radius')*10**3
+            self['r2'] = et.values_from_eos(self['m2'], EOS, TOV, 'radius')*10**3
 
         elif TOV == 'Wolfgang':
 
-            import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
-            import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
-
             try:
                 import lal
                 G = lal.G_SI; c = lal.C_SI; msun = lal.MSUN_SI
@@ -795,36 +694,22 @@ class KNTable(Table):
                 import astropy.constants as C
                 G = C.G.value; c = C.c.value; msun = u.M_sun.to(u.kg)
 
-            MassRadiusBaryMassTable = Table.read(find_executable(EOS + '.tidal.seq'), format='ascii')
-            radius_of_mass_const = ms.interpolate(MassRadiusBaryMassTable['grav_mass'], MassRadiusBaryMassTable['Circumferential_radius'])
             unit_conversion = (msun * G / c**2)
-            self['r1'] = et.values_from_table(self['m1'], MassRadiusBaryMassTable['grav_mass'], MassRadiusBaryMassTable['Circumferential_radius'], radius_of_mass_const) * unit_conversion
-            self['r2'] = et.values_from_table(self['m2'], MassRadiusBaryMassTable['grav_mass'], MassRadiusBaryMassTable['Circumferential_radius'], radius_of_mass_const) * unit_conversion
+            self['r1'] = et.values_from_eos(self['m1'], EOS, TOV, 'Circumferential_radius') * unit_conversion
+            self['r2'] = et.values_from_eos(self['m2'], EOS, TOV, 'Circumferential_radius') * unit_conversion
 
         elif TOV == 'lalsim':
-            import lalsimulation as lalsim
             if polytrope==True:
-                try:
-                    import lal
-                    G = lal.G_SI; c = lal.C_SI; msun = lal.MSUN_SI
-                except:
-                    import astropy.units as u
-                    import astropy.constants as C
-                    G = C.G.value; c = C.c.value; msun = u.M_sun.to(u.kg)
-
-                ns_eos, eos_fam=construct_eos_from_polytrope(EOS)
-                self['r1'] = np.vectorize(lalsim.SimNeutronStarRadius)(self["m1"] * msun, eos_fam)
-                self['r2'] = np.vectorize(lalsim.SimNeutronStarRadius)(self["m2"] * msun, eos_fam)
+                # radius in km from the cached family, converted to SI (i.e. meters)
+                family = polytrope_family(EOS.lower())
+                self['r1'] = family.radiusofm(self["m1"])*10**3
+                self['r2'] = family.radiusofm(self["m2"])*10**3
 
             else:
-                import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
-                import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
-                MassRadiusBaryMassTable = Table.read(find_executable(EOS + '_lalsim_mr.dat'), format='ascii')
-                radius_of_mass_const = ms.interpolate(MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'])
-                # after obtaining the radius_of_mass constants we now can either take values directly from table or use pre calculated spline to extrapolate the values
+                # the radius_of_mass spline constants are computed once per EOS, we now can either take values directly from table or use the spline to extrapolate the values
                 # also radius is in km in table. need to convert to SI (i.e. meters)
-                self['r1'] = et.values_from_table(self['m1'], MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'], radius_of_mass_const)*10**3
-                self['r2'] = et.values_from_table(self['m2'], MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'], radius_of_mass_const)*10**3
+                self['r1'] = et.values_from_eos(self['m1'], EOS, TOV, 'radius')*10**3
+                self['r2'] = et.values_from_eos(self['m2'], EOS, TOV, 'radius')*10**3
 
         return self
 
@@ -844,20 +729,14 @@ class KNTable(Table):
 
         if TOV == 'Monica':
 
-            import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
             import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
-            import numpy as np
-            MassRadiusBaryMassTable = Table.read(find_executable(EOS + '_mr.dat'), format='ascii')
-
-            radius_of_mass_const = ms.interpolate(MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'])
-            energy_density_of_mass_const = ms.interpolate(MassRadiusBaryMassTable['mass'],    np.log10(MassRadiusBaryMassTable['rho_c']))
 
-            # after obtaining the radius_of_mass constants we now can either take values directly from table or use pre calculated spline to extrapolate the values
+            # the radius_of_mass and energy_density_of_mass spline constants are computed once per EOS, we now can either take values directly from table or use the spline to extrapolate the values
             # also radius is in km in table. need to convert to SI (i.e. meters)
-            self['r1'] = et.values_from_table(self['m1'], MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'], radius_of_mass_const)*10**3
-            self['r2'] = et.values_from_table(self['m2'], MassRadiusBaryMassTable['mass'], MassRadiusBaryMassTable['radius'], radius_of_mass_const)*10**3
-            self['eps01'] = 10**(et.values_from_table(self['m1'], MassRadiusBaryMassTable['mass'], np.log10(MassRadiusBaryMassTable['rho_c']), energy_density_of_mass_const))
-            self['eps02'] = 10**(et.values_from_table(self['m2'], MassRadiusBaryMassTable['mass'], np.log10(MassRadiusBaryMassTable['rho_c']), energy_density_of_mass_const))
+            self['r1'] = et.values_from_eos(self['m1'], EOS, TOV, 'radius')*10**3
+            self['r2'] = et.values_from_eos(self['m2'], EOS, TOV, 'radius')*10**3
+            self['eps01'] = 10**(et.values_from_eos(self['m1'], EOS, TOV, 'rho_c', log=True))
+            self['eps02'] = 10**(et.values_from_eos(self['m2'], EOS, TOV, 'rho_c', log=True))
    
         return self
 
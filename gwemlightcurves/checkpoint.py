@@ -0,0 +1,147 @@
+"""Atomic checkpoints for long running jobs.
+
+The helpers below let a job save its state, or each chunk of a batch as
+it completes, such that a kill at any point leaves either the previous or
+the new file: files are written to a temporary name in the same
+directory, synced, and renamed over the old one.
+
+Batch jobs split their work into chunks and run them with run_chunks,
+which skips the chunks already saved under ``checkpointDir``.  The numpy
+global random state is saved with every chunk and restored before the
+first chunk that has to be run again, so a resumed job gives the same
+result as an uninterrupted one, and a restart redoes at most the chunk
+that was running.
+"""
+
+import os, sys
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+def dump_atomic(obj, filename):
+    """Pickle ``obj`` to ``filename``, replacing it atomically."""
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    fd, tmpname = tempfile.mkstemp(dir=dirname, prefix=".%s." % os.path.basename(filename))
+    try:
+        with os.fdopen(fd, 'wb') as fid:
+            pickle.dump(obj, fid, protocol=pickle.HIGHEST_PROTOCOL)
+            fid.flush()
+            os.fsync(fid.fileno())
+        os.replace(tmpname, filename)
+    except:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        raise
+
+def load_checkpoint(filename):
+    """Object saved with dump_atomic, or None if there is no usable one."""
+
+    if not os.path.isfile(filename):
+        return None
+    try:
+        with open(filename, 'rb') as fid:
+            return pickle.load(fid)
+    except (EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        print("Ignoring unreadable checkpoint %s: %s" % (filename, e))
+        return None
+
+def remove_checkpoint(filename):
+    if os.path.isfile(filename):
+        os.remove(filename)
+
+class Checkpointer(object):
+    """Saves the state of an iterative job at most every ``interval`` seconds.
+
+    Parameters
+    ----------
+    filename : str
+        Checkpoint file.
+    interval : float
+        Minimum time between two saves; 0 saves at every call of save.
+    """
+
+    def __init__(self, filename, interval=60.0):
+        self.filename = filename
+        self.interval = interval
+        self.last = time.time()
+
+    def load(self):
+        return load_checkpoint(self.filename)
+
+    def save(self, state, force=False):
+        """Save the state returned by the callable ``state`` if due."""
+
+        if not force and time.time() - self.last < self.interval:
+            return False
+        dump_atomic(state(), self.filename)
+        self.last = time.time()
+        return True
+
+    def remove(self):
+        remove_checkpoint(self.filename)
+
+def chunk_file(checkpointDir, index):
+    return os.path.join(checkpointDir, "chunk_%06d.pkl" % index)
+
+def load_chunk(checkpointDir, index, key=None):
+    """Saved state of chunk ``index``, or None if it has to be run.
+
+    Chunks saved with another ``key`` (i.e. by a job with different
+    inputs) are ignored.
+    """
+
+    state = load_checkpoint(chunk_file(checkpointDir, index))
+    if state is None or not state.get("key") == key:
+        return None
+    return state
+
+def save_chunk(checkpointDir, index, result, key=None):
+    """Save the result of chunk ``index`` and the random state after it."""
+
+    dump_atomic({"key": key, "result": result, "random_state": np.random.get_state()},
+                chunk_file(checkpointDir, index))
+
+def run_chunks(function, chunks, checkpointDir=None, key=None):
+    """[function(chunk) for chunk in chunks], resuming from ``checkpointDir``.
+
+    Parameters
+    ----------
+    function : callable
+        Function of one chunk; its result must be picklable.
+    chunks : list
+        Inputs of the chunks, in the same order on every run.
+    checkpointDir : str, optional
+        Directory of the chunk checkpoints; None runs without checkpoints.
+    key : optional
+        Picklable description of the job inputs; chunks saved with a
+        different key are run again.
+    """
+
+    if checkpointDir is None:
+        return [function(chunk) for chunk in chunks]
+
+    results = []
+    random_state = None
+    nresumed = 0
+    for index, chunk in enumerate(chunks):
+        state = load_chunk(checkpointDir, index, key=key)
+        if state is not None:
+            results.append(state["result"])
+            random_state = state["random_state"]
+            nresumed = nresumed + 1
+            continue
+        if random_state is not None:
+            np.random.set_state(random_state)
+            random_state = None
+        results.append(function(chunk))
+        save_chunk(checkpointDir, index, results[-1], key=key)
+    if random_state is not None:
+        np.random.set_state(random_state)
+    if nresumed > 0:
+        print("Resumed %d of %d chunks from %s" % (nresumed, len(chunks), checkpointDir))
+    return results
@@ -2,6 +2,8 @@ from gwemlightcurves.KNModels import KNTable
 import numpy as np
 from scipy.interpolate import interpolate as interp
 from gwemlightcurves import lightcurve_utils
+from gwemlightcurves.EOS.EOS4ParameterPiecewisePolytrope import EOS4ParameterPiecewisePolytrope
+from gwemlightcurves.EOS.ensemble import GW170817_SPEC_DIR, GW170817_GP_DIR, ensemble_file, load_ensemble
 import os 
 
 
@@ -37,75 +39,33 @@ class EM_Counterpart():
         def __init__(self, input_samples, Xlan_fixed, phi_fixed, eostype = "spec"):
                 self.samples = KNTable.initialize_object(input_samples)
                 
-                m1s, m2s, dists_mbta = [], [], []
-                lambda1s, lambda2s, chi_effs = [], [], []
-                Xlans = []
-                mbnss = []
-                if eostype == "gp":
-                        # read Phil + Reed's EOS files
-                        filenames = glob.glob("/home/philippe.landry/gw170817eos/gp/macro/MACROdraw-*-0.csv")
-                        idxs = []
-                        for filename in filenames:
-                                filenameSplit = filename.replace(".csv","").split("/")[-1].split("-")
-                                idxs.append(int(filenameSplit[1]))
-                        idxs = np.array(idxs)
+                if eostype == "spec":
+                        ensemble = load_ensemble(ensemble_file(GW170817_SPEC_DIR))
+                elif eostype == "gp":
+                        # Phil + Reed's EOS draws
+                        ensemble = load_ensemble(ensemble_file(GW170817_GP_DIR))
                 elif eostype == "Sly":
                         eosname = "SLy"
                         eos = EOS4ParameterPiecewisePolytrope(eosname)
 
-                
-     
-                for ii, row in enumerate(self.samples):
-                        print(ii) 
-                        m1, m2, dist_mbta, chi_eff = row["m1"], row["m2"], row["dist_mbta"], row["chi_eff"]
-                        nsamples = 30
-                        if eostype == "spec":
-                                indices = np.random.randint(0, 2395, size=nsamples)
-                        elif eostype == "gp":
-                                indices = np.random.randint(0, len(idxs), size=nsamples)
-                        for jj in range(nsamples):
-                                if (eostype == "spec") or (eostype == "gp"):
-                                        index = indices[jj] 
-                                # samples lambda's from Phil + Reed's files
-                                if eostype == "spec":
-                                        eospath = "/home/philippe.landry/gw170817eos/spec/macro/macro-spec_%dcr.csv" % index
-                                        data_out = np.genfromtxt(eospath, names=True, delimiter=",")
-                                        marray, larray = data_out["M"], data_out["Lambda"]
-                                        f = interp.interp1d(marray, larray, fill_value=0, bounds_error=False)
-                                        lambda1, lambda2 = f(m1), f(m2) 
-                                        mbns = np.max(marray)   
-                                elif eostype == "gp":
-                                        lambda1, lambda2 = 0.0, 0.0
-                                        phasetr = 0
-                                        while (lambda1==0.0) or (lambda2 == 0.0):
-                                                eospath = "/home/philippe.landry/gw170817eos/gp/macro/MACROdraw-%06d-%d.csv" % (idxs[index], phasetr)
-                                                if not os.path.isfile(eospath):
-                                                        break
-                                                data_out = np.genfromtxt(eospath, names=True, delimiter=",")
-                                                marray, larray = data_out["M"], data_out["Lambda"]
-                                                f = interp.interp1d(marray, larray, fill_value=0, bounds_error=False)
-                                                lambda1_tmp, lambda2_tmp = f(m1), f(m2)
-                                                if (lambda1_tmp>0) and (lambda1==0.0):
-                                                        lambda1 = lambda1_tmp
-                                                if (lambda2_tmp>0) and (lambda2 == 0.0):
-                                                        lambda2 = lambda2_tmp
-                                                phasetr = phasetr + 1
-                                                mbns = np.max(marray)
-                                elif eostype == "Sly":
-                                        lambda1, lambda2 = eos.lambdaofm(m1), eos.lambdaofm(m2)
-
-                                m1s.append(m1)
-                                m2s.append(m2)
-                                dists_mbta.append(dist_mbta)
-                                lambda1s.append(lambda1)
-                                lambda2s.append(lambda2)
-                                chi_effs.append(chi_eff)
-                                mbnss.append(mbns)
-                                np.random.uniform(0)
-
-                       
+                nsamples = 30
+                m1, m2 = np.asarray(self.samples["m1"]), np.asarray(self.samples["m2"])
+                dist_mbta, chi_eff = np.asarray(self.samples["dist_mbta"]), np.asarray(self.samples["chi_eff"])
+                if (eostype == "spec") or (eostype == "gp"):
+                        # samples lambda's from Phil + Reed's EOS, from the least compact stable branch
+                        indices = ensemble.random_indices((len(self.samples), nsamples))
+                        lambda1s = ensemble.lookup(indices, m1[:,None])[0]
+                        lambda2s = ensemble.lookup(indices, m2[:,None])[0]
+                        mbnss = ensemble.Mmax[indices]
+                elif eostype == "Sly":
+                        lambda1s = np.outer(eos.lambdaofm(m1), np.ones(nsamples))
+                        lambda2s = np.outer(eos.lambdaofm(m2), np.ones(nsamples))
+                        mbnss = eos.maxmass()*np.ones(lambda1s.shape)
+
+                m1s, m2s = np.repeat(m1, nsamples), np.repeat(m2, nsamples)
+                dists_mbta, chi_effs = np.repeat(dist_mbta, nsamples), np.repeat(chi_eff, nsamples)
+                lambda1s, lambda2s, mbnss = lambda1s.flatten(), lambda2s.flatten(), mbnss.flatten()
 
-  
                 Xlans = [10**Xlan_fixed] * len(self.samples) * nsamples
                 phis = [phi_fixed] * len(self.samples) * nsamples 
                 thetas = 180. * np.arccos(np.random.uniform(-1., 1., len(self.samples) * nsamples)) / np.pi
@@ -4,6 +4,7 @@
 
 import os, sys, copy
 import glob
+import hashlib
 import numpy as np
 import argparse
 import pickle
@@ -20,11 +21,12 @@ import matplotlib.pyplot as plt
 from matplotlib.pyplot import cm
 import matplotlib.gridspec as gridspec
 
-from gwemlightcurves import lightcurve_utils
+from gwemlightcurves import lightcurve_utils, checkpoint
+from gwemlightcurves.EOS.ensemble import SPEC_MACRO_DIR, GP_DIR, ensemble_file, load_ensemble
 from gwemlightcurves.KNModels import KNTable
 from gwemlightcurves import __version__
 
-#from gwemlightcurves.EOS.EOS4ParameterPiecewisePolytrope import EOS4ParameterPiecewisePolytrope
+from gwemlightcurves.EOS.EOS4ParameterPiecewisePolytrope import EOS4ParameterPiecewisePolytrope
 
 
 # setting seed
@@ -52,7 +54,15 @@ theta_r = 0.0
 Ye = 0.3
 
 
-def run_EOS(EOS, m1, m2, thetas, type_set = 'None', N_EOS = 100, model_set = 'Bu2019inc', chirp_q = False):
+def run_EOS(EOS, m1, m2, thetas, type_set = 'None', N_EOS = 100, model_set = 'Bu2019inc', chirp_q = False,
+            checkpointDir = None, chunk_size = 10, eosfile = None):
+    '''
+    Ejecta samples for N_EOS EOS draws per pair of masses.
+
+    The "spec" and "gp" ensembles are read from the stores written by
+    pack_eos_ensemble.py, by default next to the CSV directories (see
+    gwemlightcurves.EOS.ensemble), or from eosfile.
+    '''
     chi = 0
     N_masses = len(m1) 
     if type_set == 'None':
@@ -114,78 +124,51 @@ def run_EOS(EOS, m1, m2, thetas, type_set = 'None', N_EOS = 100, model_set = 'Bu
     m1s, m2s, dists_mbta = [], [], []
     lambda1s, lambda2s, chi_effs = [], [], []
     mbnss = []
-    if EOS == "gp":
-        # read Phil + Reed's EOS files
-        eospostdat = np.genfromtxt("/home/philippe.landry/nseos/eos_post_PSRs+GW170817+J0030.csv",names=True,dtype=None,delimiter=",")
-        idxs = np.array(eospostdat["eos"])
-        weights = np.array([np.exp(weight) for weight in eospostdat["logweight_total"]])
+    if EOS == "spec":
+        if eosfile is None:
+            eosfile = ensemble_file(SPEC_MACRO_DIR)
+        ensemble = load_ensemble(eosfile)
+        probabilities = None
+    elif EOS == "gp":
+        # Phil + Reed's EOS draws, weighted by the posterior of eos_post_PSRs+GW170817+J0030.csv
+        if eosfile is None:
+            eosfile = ensemble_file(GP_DIR)
+        ensemble = load_ensemble(eosfile)
+        probabilities = ensemble.probabilities()
     elif EOS == "Sly":
         eosname = "SLy"
         eos = EOS4ParameterPiecewisePolytrope(eosname)
 
     Xlan_min, Xlan_max = -9, -1 
  
-    for ii, row in enumerate(samples): 
-        #m1, m2, dist_mbta, chi_eff = row["m1"], row["m2"], row["dist_mbta"], row["chi_eff"]
-        m1, m2, chi_eff = row["m1"], row["m2"], row["chi_eff"]
-        if EOS == "spec":
-            indices = np.random.randint(0, 2396, size=nsamples)
-        elif EOS == "gp":
-            indices = np.random.choice(np.arange(0,len(idxs)), size=nsamples,replace=True,p=weights/np.sum(weights))
-        for jj in range(nsamples):
-            if (EOS == "spec") or (EOS == "gp"):
-                index = indices[jj] 
-                lambda1, lambda2 = -1, -1
-                mbns = -1
-            # samples lambda's from Phil + Reed's files
-            if EOS == "spec":
-                while (lambda1 < 0.) or (lambda2 < 0.) or (mbns < 0.):
-                    eospath = "/home/philippe.landry/nseos/eos/spec/macro/macro-spec_%dcr.csv" % index
-                    data_out = np.genfromtxt(eospath, names=True, delimiter=",")
-                    marray, larray = data_out["M"], data_out["Lambda"]
-                    f = interp.interp1d(marray, larray, fill_value=0, bounds_error=False)
-                    if float(f(m1)) > lambda1: lambda1 = f(m1)
-                    if float(f(m2)) > lambda2: lambda2 = f(m2)
-                    if np.max(marray) > mbns: mbns = np.max(marray)
+    def draw_EOS(rows):
+        '''N_EOS draws of the tidal deformabilities and maximum mass for each row'''
+        m1, m2, chi_eff = np.asarray(rows["m1"]), np.asarray(rows["m2"]), np.asarray(rows["chi_eff"])
+        if (EOS == "spec") or (EOS == "gp"):
+            # samples lambda's from Phil + Reed's EOS, from the least compact stable branch;
+            # the EOS returning a negative Lambda or Mmax are redrawn
+            indices, (lambda1s, lambda2s), radii, mbaryons = ensemble.draw([m1, m2], nsamples, probabilities=probabilities)
+            mbnss = ensemble.Mmax[indices] # global maximum mass
+        elif EOS == "Sly":
+            lambda1s = np.outer(eos.lambdaofm(m1), np.ones(nsamples))
+            lambda2s = np.outer(eos.lambdaofm(m2), np.ones(nsamples))
+            mbnss = eos.maxmass()*np.ones(lambda1s.shape)
 
-                    if (lambda1 < 0.) or (lambda2 < 0.) or (mbns < 0.):
-                        index = int(np.random.randint(0, 2396, size=1)) # pick a different EOS if it returns negative Lambda or Mmax
-                        lambda1, lambda2 = -1, -1
-                        mbns = -1
+        m1s, m2s = np.repeat(m1, nsamples), np.repeat(m2, nsamples)
+        chi_effs = np.repeat(chi_eff, nsamples)
+        #Xlans = 10**np.random.uniform(Xlan_min, Xlan_max, len(m1s))
+        Xlans = Xlan*np.ones(len(m1s))
+        return (list(m1s), list(m2s), list(lambda1s.flatten()), list(lambda2s.flatten()),
+                list(chi_effs), list(Xlans), list(mbnss.flatten()))
+
+    # the draws are done in chunks of masses, saved in checkpointDir if given
+    chunks = [samples[k:k+chunk_size] for k in range(0, len(samples), chunk_size)]
+    key = (EOS, N_EOS, chunk_size, eosfile, hashlib.sha1(np.ascontiguousarray(data).tobytes()).hexdigest())
+    for result in checkpoint.run_chunks(draw_EOS, chunks, checkpointDir=checkpointDir, key=key):
+        for values, draws in zip((m1s, m2s, lambda1s, lambda2s, chi_effs, Xlans, mbnss), result):
+            values.extend(draws)
 
-            elif EOS == "gp":
-                while (lambda1 < 0.) or (lambda2 < 0.) or (mbns < 0.):
-                    phasetr = 0
-                    eospath = "/home/philippe.landry/nseos/eos/gp/mrgagn/DRAWmod1000-%06d/MACROdraw-%06d/MACROdraw-%06d-%d.csv" % (idxs[index]/1000, idxs[index], idxs[index], phasetr)
-                    while os.path.isfile(eospath):
-                        data_out = np.genfromtxt(eospath, names=True, delimiter=",")
-                        marray, larray = data_out["M"], data_out["Lambda"]
-                        f = interp.interp1d(marray, larray, fill_value=0, bounds_error=False)
-                        if float(f(m1)) > lambda1: lambda1 = f(m1) # pick lambda from least compact stable branch
-                        if float(f(m2)) > lambda2: lambda2 = f(m2)
-                        if np.max(marray) > mbns: mbns = np.max(marray) # get global maximum mass
-                    
-                        phasetr += 1 # check all stable branches
-                        eospath = "/home/philippe.landry/nseos/eos/gp/mrgagn/DRAWmod1000-%06d/MACROdraw-%06d/MACROdraw-%06d-%d.csv" % (idxs[index]/1000, idxs[index], idxs[index], phasetr)
-                    if (lambda1 < 0.) or (lambda2 < 0.) or (mbns < 0.):
-                        index = int(np.random.choice(np.arange(0,len(idxs)), size=1,replace=True,p=weights/np.sum(weights))) # pick a different EOS if it returns negative Lambda or Mmax
-                        lambda1, lambda2 = -1, -1
-                        mbns = -1
-                    
-            elif EOS == "Sly":
-                lambda1, lambda2 = eos.lambdaofm(m1), eos.lambdaofm(m2)
-                mbns = eos.maxmass()
 
-            m1s.append(m1)
-            m2s.append(m2)
-            #dists_mbta.append(dist_mbta)
-            lambda1s.append(lambda1)
-            lambda2s.append(lambda2)
-            chi_effs.append(chi_eff)
-            #Xlans.append(10**np.random.uniform(Xlan_min, Xlan_max))
-            Xlans.append(Xlan)
-            mbnss.append(mbns)
-    
     #thetas = 180. * np.arccos(np.random.uniform(-1., 1., len(samples) * nsamples)) / np.pi
     idx_thetas = np.where(thetas > 90.)[0]
     thetas[idx_thetas] = 180. - thetas[idx_thetas]
@@ -6,10 +6,12 @@ import scipy.stats as ss
 import matplotlib.pyplot as plt
 from joblib import Parallel, delayed
 import pickle
+import hashlib
 
 ### non-standard libraries
 from gwemlightcurves.KNModels import KNTable
 from gwemlightcurves import __version__
+from gwemlightcurves import checkpoint
 #from gwemlightcurves.EOS.EOS4ParameterPiecewisePolytrope import EOS4ParameterPiecewisePolytrope
 
 
@@ -26,8 +28,29 @@ Types = ['BNS_alsing']
 #Types = ['NSBH_LRR'] 
 #Types = ['Event']
  
+def save_lightcurves(data, Type):
+    for sample in data:
+        mag = sample['mag']
+        t = sample['t']
+        sample_length = len(mag[0])
+
+        mej = sample['mej'] * np.ones(sample_length)
+        phi = sample['phi'] * np.ones(sample_length)
+        theta = sample['theta'] * np.ones(sample_length)
+        id_label = sample['sample_id'] * np.ones(sample_length)
+
+        sample_name = f'./lightcurves_parallel/phi45_updated/{Type}/lc_{Type}_mej_{mej[0]}_theta_{theta[0]}_phi_{phi[0]}_ID_{id_label[0]}.pickle'
+        lightcurve_data = np.column_stack((t, mag[0], mag[1], mag[2], mag[3], mag[4], mag[5], mag[6], mag[7], mag[8], mej, theta, phi, id_label))
+        checkpoint.dump_atomic(lightcurve_data, sample_name)
+
+def lc_chunk(index, samples, Type, model, kwargs, checkpointDir, key):
+    '''lightcurves of one chunk of samples, marked as done in checkpointDir once saved'''
+    data = KNTable.model(model, samples, **kwargs)
+    save_lightcurves(data, Type)
+    checkpoint.save_chunk(checkpointDir, index, len(data), key=key)
+
 #for Type in Types:
-def mej_to_lc(Type):
+def mej_to_lc(Type, chunk_size=10):
     print(f'Initializing {Type}')
     #mej_theta_data=np.loadtxt('./mej_theta_data/N_50/mej_theta_data_BNS_alsing.txt')
     mej_theta_data=np.loadtxt(f'./mej_theta_data/EOS_test/mej_theta_data_{Type}.txt')
@@ -94,51 +117,18 @@ def mej_to_lc(Type):
     model = "Bu2019inc"
     model_tables = {}
 
-    sample_split = []
-
     N_parallel = 16
     #N_parallel = 4
-    #split up samples between cores
-    N_per_core = int(l/N_parallel)
-    for k in range(N_per_core, l, N_per_core):
-        sample_split.append(samples[(k-N_per_core):k])
-    if k < (l):
-        sample_split.append(samples[k:l])
-    print(f'Running on {N_parallel} cores for ~{N_per_core} samples each')
-    mag_data = []
-    t_data = [] 
-    parallel_data = (Parallel(n_jobs=N_parallel)(delayed(KNTable.model)(model, s, **kwargs) for s in sample_split))
-    
-    t_list, u_list, g_list, r_list, i_list = [], [], [], [], []
-    z_list, y_list, J_list, H_list, K_list = [], [], [], [], []
-
-    #Type = 'BNS_alsing'
-    mags = []
-    print('saving to pickle files')
-    for data in parallel_data:
-        for sample in data:
-            mag = sample['mag']
-            t = sample['t']
-            sample_length = len(mag[0])
-            
-            mej = sample['mej'] * np.ones(sample_length)
-            phi = sample['phi'] * np.ones(sample_length)
-            theta = sample['theta'] * np.ones(sample_length)
-            id_label = sample['sample_id'] * np.ones(sample_length)       
- 
-            sample_name = f'./lightcurves_parallel/phi45_updated/{Type}/lc_{Type}_mej_{mej[0]}_theta_{theta[0]}_phi_{phi[0]}_ID_{id_label[0]}.pickle'
-            data_lists = [u_list, g_list, r_list, i_list, z_list, y_list, J_list, H_list, K_list]
-             
-            #for i, band in enumerate(mag):
-                #data_lists[i].append(band)
-                #data_lists[i] = np.concatenate((data_lists[i], band))
-
-            #lightcurve_data = np.column_stack((t, data_lists[0], data_lists[1], data_lists[2], data_lists[3], data_lists[4], data_lists[5], data_lists[6], data_lists[7], data_lists[8], mej, theta, phi))
-            
-            lightcurve_data = np.column_stack((t, mag[0], mag[1], mag[2], mag[3], mag[4], mag[5], mag[6], mag[7], mag[8], mej, theta, phi, id_label))
-            with open(sample_name, 'wb') as filename:
-                pickle.dump(lightcurve_data,filename, protocol=pickle.HIGHEST_PROTOCOL)
-                #pickle.dump(lightcurve_data,filename)
+    #split up samples into small chunks, handed out to the cores as they
+    #free up and each marked as done as soon as it is saved
+    sample_split = [samples[k:k+chunk_size] for k in range(0, l, chunk_size)]
+    print(f'Running {len(sample_split)} chunks of {chunk_size} samples on {N_parallel} cores')
+    # chunks already saved by an interrupted run are skipped
+    checkpointDir = f'./checkpoints/mej_to_lc/{Type}'
+    key = (model, chunk_size, hashlib.sha1(np.ascontiguousarray(mej_theta_data).tobytes()).hexdigest())
+    todo = [k for k in range(len(sample_split)) if checkpoint.load_chunk(checkpointDir, k, key=key) is None]
+    print(f'{len(sample_split)-len(todo)} of {len(sample_split)} chunks already done')
+    Parallel(n_jobs=N_parallel)(delayed(lc_chunk)(k, sample_split[k], Type, model, kwargs, checkpointDir, key) for k in todo)
 
     #return has_remnant
 
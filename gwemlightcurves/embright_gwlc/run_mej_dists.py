@@ -57,6 +57,11 @@ mass_draws = 10
 #mass_draws = 20
 uniform_mass_draws = mass_draws
 
+'''
+Directory where the EOS draws are checkpointed, so that a pre-empted job resumes where it stopped; None disables it
+'''
+checkpointDir = './checkpoints'
+
 #mass = np.linspace(-5, .5, mass_points) 
 all_samples = []
 
@@ -153,7 +158,7 @@ z_dist = zhu_dist(a=2.8,b=25)
 ns_astro_mass_dist = ss.norm(1.33, 0.09)
 bh_astro_mass_dist = ss.pareto(b=1.3)
 
-def calc_mej_from_masses(m1, m2, thetas, Type, Type_set, EOS):
+def calc_mej_from_masses(m1, m2, thetas, Type, Type_set, EOS, checkpointDir=None):
     '''
     '''
     
@@ -166,7 +171,7 @@ def calc_mej_from_masses(m1, m2, thetas, Type, Type_set, EOS):
     #m2m = m2[i]
     m1m = m1
     m2m = m2
-    samples = run_EOS(EOS, m1m, m2m, thetas, N_EOS = N_EOS, type_set=Type)
+    samples = run_EOS(EOS, m1m, m2m, thetas, N_EOS = N_EOS, type_set=Type, checkpointDir=checkpointDir)
     
     if Type == 'BNS':
         idx = np.where((samples['lambda2'] > 0) | (samples['lambda1'] > 0))[0]
@@ -184,8 +189,11 @@ def calc_mej_from_masses(m1, m2, thetas, Type, Type_set, EOS):
     return samples
 
 
-def run_theoretical(Type, EOS, mass_draws=mass_draws):
+def run_theoretical(Type, EOS, mass_draws=mass_draws, checkpointDir=None):
     '''function to generate mass grid using EOS, should probably be left as is
+
+    with checkpointDir, the EOS draws are saved there in chunks so that an
+    interrupted run resumes where it stopped
     '''
     Type_set=Type
 
@@ -329,7 +337,9 @@ def run_theoretical(Type, EOS, mass_draws=mass_draws):
 
     #--------------------------------------------------------
 
-    samples = calc_mej_from_masses(m1, m2, all_thetas_list, Type, Type_set, EOS) 
+    if checkpointDir is not None:
+        checkpointDir = os.path.join(checkpointDir, str(Type_set))
+    samples = calc_mej_from_masses(m1, m2, all_thetas_list, Type, Type_set, EOS, checkpointDir=checkpointDir) 
     
     #parallel implementation
     #100 thetas -- correct
@@ -383,7 +393,7 @@ def run_prob(mass, coverage_factors = False, Type = None):
     #---------------------------------------------------------------------
     EOS_type = 'gp'
     #EOS_type = 'Sly'
-    all_data = run_theoretical(Type, EOS_type)
+    all_data = run_theoretical(Type, EOS_type, checkpointDir=checkpointDir)
     shape = np.shape(all_data)
     num = 1
  
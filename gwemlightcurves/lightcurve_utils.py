@@ -719,42 +719,36 @@ def get_legend(model):
 
     return legend_name
 
+# model bands u (0) g (1) r (2) i (3) z (4) y (5) J (6) H (7) K (8) that
+# are averaged for each observed band
+MAG_BANDS = {"u": (0,), "g": (1,), "r": (2,), "i": (3,), "z": (4,),
+             "y": (5,), "J": (6,), "H": (7,), "K": (8,),
+             "w": (1,2,3),
+             "U": (0,), "UVW2": (0,), "UVW1": (0,), "UVM2": (0,),
+             "B": (1,),
+             "c": (1,2), "V": (1,2), "F606W": (1,2),
+             "o": (2,3),
+             "R": (4,),
+             "I": (4,5), "F814W": (4,5),
+             "F160W": (7,)}
+
 def get_mag(mag,key):
-    if key == "u":
-        magave = 1.0*mag[0]
-    elif key == "g":
-        magave = 1.0*mag[1]
-    elif key == "r":
-        magave = 1.0*mag[2]
-    elif key == "i":
-        magave = 1.0*mag[3]
-    elif key == "z":
-        magave = 1.0*mag[4]
-    elif key == "y":
-        magave = 1.0*mag[5]
-    elif key == "J":
-        magave = 1.0*mag[6]
-    elif key == "H":
-        magave = 1.0*mag[7]
-    elif key == "K":
-        magave = 1.0*mag[8]
-    elif key == "w": 
-        magave = (mag[1]+mag[2]+mag[3])/3.0
-    elif key in ["U","UVW2","UVW1","UVM2"]:
-        magave = 1.0*mag[0]
-    elif key == "B":
-        magave = 1.0*mag[1]
-    elif key in ["c","V","F606W"]:
-        magave = (mag[1]+mag[2])/2.0
-    elif key == "o":
-        magave = (mag[2]+mag[3])/2.0
-    elif key == "R":
-        magave = 1.0*mag[4]
-    elif key in ["I","F814W"]:
-        magave = (mag[4]+mag[5])/2.0
-    elif key == "F160W":
-        magave = 1.0*mag[7]
-    return magave
+    bands = MAG_BANDS[key]
+    magave = mag[bands[0]]
+    for ii in bands[1:]:
+        magave = magave + mag[ii]
+    return magave/float(len(bands))
+
+def get_mag_weights(key):
+    """Model bands and weights that get_mag combines for key.
+
+    Returns a list of (band index, weight) pairs, or None if the band is
+    not modelled.
+    """
+    if not key in MAG_BANDS:
+        return None
+    bands = MAG_BANDS[key]
+    return [(ii, 1.0/len(bands)) for ii in bands]
 
 def get_med(magtable, errorbudget = 0.0, filts = ["u","g","r","i","z","y","J","H","K"]):
 
@@ -0,0 +1,119 @@
+"""Opt-in timing of the likelihood evaluation.
+
+The stages of a fit (surrogate loading, GP predictions, SVD
+reconstruction and interpolation in svd_utils, the KNModels loaders,
+table construction in sampler.model.generate_lightcurve and the
+chi-square in sampler.loglike.calc_prob) record their number of calls and
+cumulative wall time when profiling is enabled, either with the
+``GWEMLIGHTCURVES_PROFILE`` environment variable:
+
+    GWEMLIGHTCURVES_PROFILE=1 python run_lightcurves_models.py ...
+
+or with ``--doProfile`` on the bin/run_* scripts, which call enable().
+backends.run_sampler prints the summary at the end of the sampler run
+and writes it to ``<basename>profile.json``.
+
+Times are inclusive: a stage running inside another (calc_lc inside a
+KNModels loader inside generate_lightcurve) is counted in both.  The
+statistics are per process, so likelihood batches farmed out to a pool
+are only seen by the workers; profile with n_cpu=1.  When disabled, a
+profiled function costs one extra call and a flag test.
+"""
+
+import os, sys
+import functools
+import json
+import time
+
+_enabled = not os.environ.get("GWEMLIGHTCURVES_PROFILE", "0") in ["", "0"]
+
+# stage name -> [number of calls, cumulative seconds]
+stats = {}
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    stats.clear()
+
+def record(name, seconds, calls=1):
+    """Add ``calls`` calls taking ``seconds`` in total to stage ``name``."""
+
+    if name in stats:
+        entry = stats[name]
+        entry[0] = entry[0] + calls
+        entry[1] = entry[1] + seconds
+    else:
+        stats[name] = [calls, seconds]
+
+def profiled(name):
+    """Decorator recording the calls of a function as stage ``name``."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+class _Stage(object):
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullStage(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_null_stage = _NullStage()
+
+def stage(name):
+    """Context manager recording a block as stage ``name``."""
+
+    if not _enabled:
+        return _null_stage
+    return _Stage(name)
+
+def summary():
+    """Table of the stages, by decreasing cumulative time."""
+
+    lines = ["%-45s %10s %12s %12s" % ("stage", "calls", "total [s]", "per call [ms]")]
+    for name, (calls, seconds) in sorted(stats.items(), key=lambda x: -x[1][1]):
+        lines.append("%-45s %10d %12.4f %12.4f" % (name, calls, seconds, 1e3*seconds/max(calls, 1)))
+    return "\n".join(lines)
+
+def dump(filename=None):
+    """Print the summary and write the statistics as JSON to ``filename``."""
+
+    print(summary())
+    if filename is not None:
+        data = dict((name, {"calls": calls, "seconds": seconds})
+                    for name, (calls, seconds) in stats.items())
+        with open(filename, 'w') as fid:
+            json.dump(data, fid, indent=2, sort_keys=True)
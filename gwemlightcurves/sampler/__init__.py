@@ -20,7 +20,9 @@
 """Gravitational-wave Electromagnetic Optimization
 """
 
+from .context import *
 from .model import *
 from .loglike import *
 from .prior import *
+from .specs import *
 
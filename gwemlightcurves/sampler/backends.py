@@ -0,0 +1,450 @@
+"""Sampler backends for the lightcurve fits.
+
+run.multinest builds a Problem (parameter names, labels, prior transform
+and log-likelihood) and hands it to one of the backends below:
+
+multinest
+    pymultinest.
+nested
+    A pure-Python nested sampler with a single bounding ellipsoid
+    (dynesty-style), proposing points in batches.
+ensemble
+    A pure-Python affine-invariant ensemble sampler (emcee-style stretch
+    move), moving half of the walkers per likelihood batch.
+
+The pure-Python backends evaluate each batch of proposals through
+Problem.log_likelihood_batch, which can farm the batch out to a
+multiprocessing pool.  All backends leave their equal weight posterior
+samples in ``<basename>post_equal_weights.dat`` (parameters followed by
+the log-likelihood), so the post-processing in run.multinest is the same
+for every sampler.
+
+Like MultiNest with ``resume = True``, the pure-Python backends resume an
+interrupted run: every ``checkpoint_interval`` seconds they save their
+state (live points or walkers, random state, ...) atomically to
+``<basename>checkpoint.pkl``, which is removed once the run completes.
+"""
+
+import os, sys
+import multiprocessing
+
+import numpy as np
+from scipy.special import logsumexp
+
+from gwemlightcurves import checkpoint, profiler
+from . import constraints
+
+try:
+    import pymultinest
+except:
+    print('Install pymultinest if you want to use it...')
+
+class Problem(object):
+    """Parameter space and likelihood of one fit.
+
+    Parameters
+    ----------
+    parameters : list
+        Parameter names.
+    labels : list
+        Plot labels of the parameters.
+    loglike, prior : callable
+        MultiNest style ``(cube, ndim, nparams)`` callbacks; ``prior``
+        transforms the unit cube in place and ``loglike`` returns the
+        log-likelihood of the transformed cube.
+    loglike_batch, prior_batch : callable, optional
+        Vectorized versions taking (N, ndim) arrays.  When missing the
+        batch methods loop over the callbacks.
+    constraint : callable, optional
+        Vectorized function of an (N, ndim) array of transformed points,
+        False where the log-likelihood is -inf.  Such points are rejected
+        before evaluating the likelihood and counted under ``name`` in
+        sampler.constraints.
+    name : str, optional
+        Name of the fit in the constraint counts.
+    """
+
+    def __init__(self, parameters, labels, loglike, prior,
+                 loglike_batch=None, prior_batch=None, constraint=None,
+                 name="likelihood"):
+        self.parameters = list(parameters)
+        self.labels = list(labels)
+        self.loglike = loglike
+        self.prior = prior
+        self.loglike_batch = loglike_batch
+        self.prior_batch = prior_batch
+        self.constraint = constraint
+        self.name = name
+
+    @property
+    def n_params(self):
+        return len(self.parameters)
+
+    def prior_transform(self, u):
+        x = np.array(u, dtype=float)
+        self.prior(x, self.n_params, self.n_params)
+        return x
+
+    def allowed(self, x):
+        """Boolean mask of the rows of ``x`` passing the constraint."""
+
+        x = np.atleast_2d(x)
+        if self.constraint is None:
+            return np.ones(len(x), dtype=bool)
+        mask = np.broadcast_to(np.asarray(self.constraint(x), dtype=bool), (len(x),))
+        constraints.record(self.name, len(x), len(x) - np.count_nonzero(mask))
+        return mask
+
+    def log_likelihood(self, x):
+        x = np.array(x, dtype=float)
+        if self.constraint is not None and not self.allowed(x)[0]:
+            return -np.inf
+        prob = self.loglike(x, self.n_params, self.n_params)
+        if np.isnan(prob):
+            return -np.inf
+        return prob
+
+    def multinest_loglike(self, cube, ndim, nparams):
+        """MultiNest callback: the pre-checked ``loglike``."""
+
+        if self.constraint is not None:
+            x = np.array([cube[ii] for ii in range(ndim)])
+            if not self.allowed(x)[0]:
+                return -np.inf
+        return self.loglike(cube, ndim, nparams)
+
+    def prior_transform_batch(self, u):
+        u = np.atleast_2d(u)
+        if self.prior_batch is not None:
+            return self.prior_batch(u)
+        return np.array([self.prior_transform(x) for x in u])
+
+    def _log_likelihood_chunk(self, x):
+        if self.loglike_batch is not None:
+            prob = np.asarray(self.loglike_batch(x), dtype=float)
+            return np.where(np.isnan(prob), -np.inf, prob)
+        prob = np.array([self.loglike(y.copy(), self.n_params, self.n_params) for y in x])
+        return np.where(np.isnan(prob), -np.inf, prob)
+
+    def log_likelihood_batch(self, x, pool=None):
+        """Log-likelihood of each row of the (N, ndim) array ``x``.
+
+        The points failing the constraint are rejected first; with a
+        pool, the remaining ones are split into one chunk per worker.
+        """
+
+        x = np.atleast_2d(x)
+        if len(x) == 0:
+            return np.zeros(0)
+        prob = -np.inf*np.ones(len(x))
+        idx = np.where(self.allowed(x))[0]
+        if len(idx) == 0:
+            return prob
+        if pool is None:
+            prob[idx] = self._log_likelihood_chunk(x[idx])
+            return prob
+        nchunks = min(len(idx), getattr(pool, '_processes', 1) or 1)
+        chunks = np.array_split(x[idx], nchunks)
+        prob[idx] = np.concatenate(pool.map(self._log_likelihood_chunk, chunks))
+        return prob
+
+def write_posterior(filename, samples, loglikelihood):
+    """Write equal weight samples in the MultiNest post_equal_weights format."""
+
+    data = np.hstack((samples, np.asarray(loglikelihood)[:,None]))
+    np.savetxt(filename, data, fmt='%.18e')
+
+def resample_equal(logwt, rstate=np.random):
+    """Indices of equal weight samples drawn from weighted samples.
+
+    Systematic resampling, keeping about the effective sample size.
+    """
+
+    weights = np.exp(logwt - logsumexp(logwt))
+    weights = weights/np.sum(weights)
+    nsamples = int(np.round(1.0/np.sum(weights**2)))
+    nsamples = max(nsamples, 1)
+    positions = (rstate.uniform() + np.arange(nsamples))/nsamples
+    idx = np.searchsorted(np.cumsum(weights), positions)
+    idx = np.minimum(idx, len(weights)-1)
+    return idx
+
+class MultiNestBackend(object):
+    """pymultinest.run on the Problem callbacks."""
+
+    name = "multinest"
+
+    def run(self, problem, outputfiles_basename, n_live_points=100,
+            evidence_tolerance=0.5, max_iter=0, pool=None, resume=True, **kwargs):
+        pymultinest.run(problem.multinest_loglike, problem.prior, problem.n_params,
+                        importance_nested_sampling = False, resume = resume,
+                        verbose = True, sampling_efficiency = 'parameter',
+                        n_live_points = n_live_points,
+                        outputfiles_basename = outputfiles_basename,
+                        evidence_tolerance = evidence_tolerance,
+                        multimodal = False, max_iter = max_iter)
+
+class NestedBackend(object):
+    """Nested sampling with a single bounding ellipsoid.
+
+    Replacement points are drawn uniformly from the ellipsoid bounding
+    the live points (enlarged by ``enlarge`` in volume), ``batch_size`` at
+    a time.  Proposals that beat the current likelihood threshold but are
+    not used yet are kept for the following iterations: a point drawn
+    uniformly from a larger region, conditioned on the current one, is
+    still a valid draw.
+    """
+
+    name = "nested"
+
+    def __init__(self, enlarge=1.25, batch_size=None, seed=None, checkpoint_interval=60.0):
+        self.enlarge = enlarge
+        self.batch_size = batch_size
+        self.seed = seed
+        self.checkpoint_interval = checkpoint_interval
+
+    def _bound(self, live_u):
+        ndim = live_u.shape[1]
+        mean = np.mean(live_u, axis=0)
+        cov = np.atleast_2d(np.cov(live_u, rowvar=False))
+        cov = cov + 1e-12*np.eye(ndim)
+        icov = np.linalg.inv(cov)
+        delta = live_u - mean
+        scale = np.max(np.einsum('ij,jk,ik->i', delta, icov, delta))
+        scale = scale*self.enlarge**(2.0/ndim)
+        chol = np.linalg.cholesky(cov*scale)
+        return mean, chol
+
+    def _propose(self, live_u, nprop, rstate):
+        ndim = live_u.shape[1]
+        mean, chol = self._bound(live_u)
+        z = rstate.normal(size=(nprop, ndim))
+        z = z/np.linalg.norm(z, axis=1)[:,None]
+        z = z*rstate.uniform(size=(nprop,1))**(1.0/ndim)
+        u = mean + z.dot(chol.T)
+        return u[np.all((u > 0) & (u < 1), axis=1)]
+
+    def run(self, problem, outputfiles_basename, n_live_points=100,
+            evidence_tolerance=0.5, max_iter=0, pool=None, resume=True, **kwargs):
+        rstate = np.random.RandomState(self.seed)
+        ndim = problem.n_params
+        nlive = n_live_points
+        batch_size = self.batch_size
+        if batch_size is None:
+            batch_size = max(ndim, 1)*(getattr(pool, '_processes', 1) or 1)
+
+        checkpointer = checkpoint.Checkpointer('%scheckpoint.pkl' % outputfiles_basename,
+                                               interval=self.checkpoint_interval)
+        state = None
+        if resume:
+            state = checkpointer.load()
+        if state is not None and not (state["sampler"] == self.name and
+                                      state["live_u"].shape == (nlive, ndim)):
+            state = None
+
+        if state is None:
+            live_u = rstate.uniform(size=(nlive, ndim))
+            live_x = problem.prior_transform_batch(live_u)
+            live_logl = problem.log_likelihood_batch(live_x, pool=pool)
+
+            queue_u = np.zeros((0, ndim))
+            queue_x = np.zeros((0, ndim))
+            queue_logl = np.zeros(0)
+
+            dead_x, dead_logl, dead_logwt = [], [], []
+            logz, logvol, ncall, it = -np.inf, 0.0, nlive, 0
+        else:
+            live_u, live_x, live_logl = state["live_u"], state["live_x"], state["live_logl"]
+            queue_u, queue_x, queue_logl = state["queue_u"], state["queue_x"], state["queue_logl"]
+            dead_x, dead_logl, dead_logwt = state["dead_x"], state["dead_logl"], state["dead_logwt"]
+            logz, logvol, ncall, it = state["logz"], state["logvol"], state["ncall"], state["it"]
+            rstate.set_state(state["rstate"])
+            print('nested: resuming at iteration %d' % it)
+
+        def get_state():
+            return {"sampler": self.name, "rstate": rstate.get_state(),
+                    "live_u": live_u, "live_x": live_x, "live_logl": live_logl,
+                    "queue_u": queue_u, "queue_x": queue_x, "queue_logl": queue_logl,
+                    "dead_x": dead_x, "dead_logl": dead_logl, "dead_logwt": dead_logwt,
+                    "logz": logz, "logvol": logvol, "ncall": ncall, "it": it}
+
+        logdvol = np.log(1.0 - np.exp(-1.0/nlive))
+        while True:
+            checkpointer.save(get_state)
+            worst = np.argmin(live_logl)
+            logl_min = live_logl[worst]
+
+            logwt = logvol + logdvol + logl_min
+            logz = np.logaddexp(logz, logwt)
+            dead_x.append(live_x[worst].copy())
+            dead_logl.append(logl_min)
+            dead_logwt.append(logwt)
+            logvol = logvol - 1.0/nlive
+            it = it + 1
+
+            dlogz = np.logaddexp(logz, np.max(live_logl) + logvol) - logz
+            if dlogz < evidence_tolerance:
+                break
+            if max_iter > 0 and it >= max_iter:
+                break
+
+            keep = (queue_logl > logl_min) | np.isneginf(logl_min)
+            queue_u, queue_x, queue_logl = queue_u[keep], queue_x[keep], queue_logl[keep]
+            while len(queue_logl) == 0:
+                u = self._propose(live_u, batch_size, rstate)
+                if len(u) == 0: continue
+                x = problem.prior_transform_batch(u)
+                logl = problem.log_likelihood_batch(x, pool=pool)
+                ncall = ncall + len(u)
+                keep = (logl > logl_min) | np.isneginf(logl_min)
+                queue_u, queue_x, queue_logl = u[keep], x[keep], logl[keep]
+
+            live_u[worst], live_x[worst], live_logl[worst] = queue_u[0], queue_x[0], queue_logl[0]
+            queue_u, queue_x, queue_logl = queue_u[1:], queue_x[1:], queue_logl[1:]
+
+        # the remaining live points share the last prior volume
+        logwt = logvol - np.log(nlive) + live_logl
+        logz = np.logaddexp(logz, logsumexp(logwt))
+        samples = np.vstack((np.array(dead_x), live_x))
+        logl = np.concatenate((dead_logl, live_logl))
+        logwt = np.concatenate((dead_logwt, logwt))
+
+        idx = resample_equal(logwt, rstate=rstate)
+        write_posterior('%spost_equal_weights.dat' % outputfiles_basename,
+                        samples[idx], logl[idx])
+        checkpointer.remove()
+        print('nested: %d iterations, %d likelihood calls, log(Z) = %.3f' % (it, ncall, logz))
+        return logz
+
+class EnsembleBackend(object):
+    """Affine-invariant ensemble sampler (stretch move) on the unit cube.
+
+    Walkers live on the unit cube, so the log-probability is the
+    log-likelihood of the transformed point inside the cube and -inf
+    outside.  Each step moves the two halves of the ensemble in turn,
+    evaluating one likelihood batch per half.
+    """
+
+    name = "ensemble"
+
+    def __init__(self, a=2.0, nsteps=1000, burnin=0.5, thin=1, seed=None,
+                 checkpoint_interval=60.0):
+        self.a = a
+        self.nsteps = nsteps
+        self.burnin = burnin
+        self.thin = thin
+        self.seed = seed
+        self.checkpoint_interval = checkpoint_interval
+
+    def _log_prob(self, problem, u, pool):
+        logp = -np.inf*np.ones(len(u))
+        x = np.zeros(u.shape)
+        inside = np.all((u > 0) & (u < 1), axis=1)
+        if np.any(inside):
+            x[inside] = problem.prior_transform_batch(u[inside])
+            logp[inside] = problem.log_likelihood_batch(x[inside], pool=pool)
+        return logp, x
+
+    def run(self, problem, outputfiles_basename, n_live_points=100,
+            evidence_tolerance=0.5, max_iter=0, pool=None, resume=True, **kwargs):
+        rstate = np.random.RandomState(self.seed)
+        ndim = problem.n_params
+        nwalkers = max(n_live_points, 2*ndim + 2)
+        nwalkers = nwalkers + nwalkers % 2
+        nsteps = self.nsteps
+        if max_iter > 0:
+            nsteps = max_iter
+
+        checkpointer = checkpoint.Checkpointer('%scheckpoint.pkl' % outputfiles_basename,
+                                               interval=self.checkpoint_interval)
+        state = None
+        if resume:
+            state = checkpointer.load()
+        if state is not None and not (state["sampler"] == self.name and
+                                      state["u"].shape == (nwalkers, ndim) and
+                                      state["nsteps"] == nsteps):
+            state = None
+
+        if state is None:
+            u = rstate.uniform(size=(nwalkers, ndim))
+            logp, x = self._log_prob(problem, u, pool)
+            chain_x, chain_logp = [], []
+            naccept, start = 0, 0
+        else:
+            u, x, logp = state["u"], state["x"], state["logp"]
+            chain_x, chain_logp = state["chain_x"], state["chain_logp"]
+            naccept, start = state["naccept"], state["step"]
+            rstate.set_state(state["rstate"])
+            print('ensemble: resuming at step %d' % start)
+
+        def get_state():
+            return {"sampler": self.name, "rstate": rstate.get_state(), "nsteps": nsteps,
+                    "u": u, "x": x, "logp": logp, "chain_x": chain_x,
+                    "chain_logp": chain_logp, "naccept": naccept, "step": step}
+
+        halves = [np.arange(0, nwalkers//2), np.arange(nwalkers//2, nwalkers)]
+        for step in range(start, nsteps):
+            checkpointer.save(get_state)
+            for s, c in [(0, 1), (1, 0)]:
+                active, other = halves[s], halves[c]
+                zz = ((self.a - 1.0)*rstate.uniform(size=len(active)) + 1)**2/self.a
+                partners = other[rstate.randint(len(other), size=len(active))]
+                u_new = u[partners] - zz[:,None]*(u[partners] - u[active])
+                logp_new, x_new = self._log_prob(problem, u_new, pool)
+
+                lnpdiff = (ndim - 1.0)*np.log(zz) + logp_new - logp[active]
+                accept = np.log(rstate.uniform(size=len(active))) < lnpdiff
+                accept = accept & np.isfinite(logp_new)
+                idx = active[accept]
+                u[idx], x[idx], logp[idx] = u_new[accept], x_new[accept], logp_new[accept]
+                naccept = naccept + np.sum(accept)
+
+            if step >= self.burnin*nsteps and (step % self.thin) == 0:
+                chain_x.append(x.copy())
+                chain_logp.append(logp.copy())
+
+        samples = np.concatenate(chain_x)
+        logl = np.concatenate(chain_logp)
+        write_posterior('%spost_equal_weights.dat' % outputfiles_basename,
+                        samples, logl)
+        checkpointer.remove()
+        print('ensemble: %d steps, acceptance fraction %.3f' % (nsteps, naccept/float(nsteps*nwalkers)))
+
+backends = {"multinest": MultiNestBackend,
+            "nested": NestedBackend,
+            "ensemble": EnsembleBackend}
+
+def get_backend(name, **kwargs):
+    if not name in backends:
+        raise ValueError("Sampler %s unknown; use one of %s" % (name, ",".join(sorted(backends.keys()))))
+    return backends[name](**kwargs)
+
+def run_sampler(sampler, problem, outputfiles_basename, n_cpu=1, **kwargs):
+    """Sample ``problem`` with the backend ``sampler``.
+
+    ``n_cpu`` > 1 evaluates the likelihood batches of the pure-Python
+    backends on a multiprocessing pool.  The workers are forked, so they
+    inherit the data and surrogates already loaded in this process.
+    With profiling enabled the timings of the run are printed and saved
+    to ``<basename>profile.json``; the points rejected by the constraint
+    pre-check are printed and saved to ``<basename>constraints.json``.
+    """
+
+    backend = get_backend(sampler)
+    constraints.reset()
+    try:
+        if n_cpu > 1 and not sampler == "multinest":
+            pool = multiprocessing.Pool(n_cpu)
+            try:
+                return backend.run(problem, outputfiles_basename, pool=pool, **kwargs)
+            finally:
+                pool.close()
+                pool.join()
+        return backend.run(problem, outputfiles_basename, **kwargs)
+    finally:
+        if profiler.is_enabled():
+            profiler.dump('%sprofile.json' % outputfiles_basename)
+            profiler.reset()
+        if constraints.stats:
+            constraints.dump('%sconstraints.json' % outputfiles_basename)
+            constraints.reset()
@@ -0,0 +1,70 @@
+"""Constraint pre-check of the likelihoods.
+
+Several fits have parameter combinations of zero prior probability: the
+heavier component first in the masses fits (prior_DiUj2017), the
+ordering of the lanthanide fractions and velocities of the two and three
+component Ka2017 fits and the jet inside the line of sight of BoxFit.
+These constraints are declared per model, as functions of arrays of
+model arguments (ModelSpec.constraint), and backends.Problem
+rejects the points failing them before any model evaluation.  In a batch the rejected
+points are dropped before the batch is split over the pool, so that the
+workers only get the points needing a light curve.
+
+The number of points checked and rejected is counted per fit, in the
+main process; run_sampler prints it at the end of the run and writes it
+to ``<basename>constraints.json``.
+"""
+
+import json
+
+import numpy as np
+
+# fit name -> [points checked, points rejected]
+stats = {}
+
+def record(name, checked, rejected):
+    checked, rejected = int(checked), int(rejected)
+    if name in stats:
+        entry = stats[name]
+        entry[0] = entry[0] + checked
+        entry[1] = entry[1] + rejected
+    else:
+        stats[name] = [checked, rejected]
+
+def reset():
+    stats.clear()
+
+def summary():
+    lines = ["%-30s %10s %10s %8s" % ("constraint pre-check", "checked", "rejected", "saved")]
+    for name, (checked, rejected) in sorted(stats.items()):
+        lines.append("%-30s %10d %10d %7.1f%%" % (name, checked, rejected,
+                                                  100.0*rejected/max(checked, 1)))
+    return "\n".join(lines)
+
+def dump(filename=None):
+    """Print the summary and write the counts as JSON to ``filename``."""
+
+    print(summary())
+    if filename is not None:
+        data = dict((name, {"checked": checked, "rejected": rejected})
+                    for name, (checked, rejected) in stats.items())
+        with open(filename, 'w') as fid:
+            json.dump(data, fid, indent=2, sort_keys=True)
+
+def constraint_masses(m1, mb1, c1, m2, *args):
+    # prior_DiUj2017, for arrays
+    return m1 >= m2
+
+def constraint_2Component(mej_1, vej_1, Xlan_1, mej_2, vej_2, Xlan_2, *args):
+    # prior_2Component and prior_2ComponentVel, for arrays
+    return (Xlan_1 >= Xlan_2) & (vej_1 < vej_2)
+
+def constraint_3Component(mej_1, vej_1, Xlan_1, mej_2, vej_2, Xlan_2,
+                          mej_3, vej_3, Xlan_3, *args):
+    # prior_3Component and prior_3ComponentVel, for arrays
+    return ((Xlan_1 > Xlan_2) & (Xlan_3 > Xlan_2) &
+            (vej_1 < vej_2) & (vej_1 < vej_3))
+
+def constraint_boxfit(theta_0, E, n, theta_obs, *args):
+    # the line of sight outside of the jet core, for arrays
+    return theta_0 <= theta_obs
@@ -0,0 +1,147 @@
+"""Data, surrogates and settings of one likelihood.
+
+A LikelihoodContext carries the configuration of one fit (the event
+data, error budget, prior ranges, surrogate model directory, ...) under
+the names of the gwemlightcurves.Global variables:
+
+    context = LikelihoodContext(data_out=data_out, filters=filters,
+                                doLightcurves=1, errorbudget=1.0)
+    problem = get_spec("Ka2017", "ejecta").problem(context=context)
+
+Functions taking ``context=None`` fall back to the context bound to the
+current thread with use_context, and then to ``global_context``, which
+reads and writes gwemlightcurves.Global, so code setting Global keeps
+working unchanged.  The model functions of sampler.model have fixed
+signatures and always look the context up that way.
+
+Pickled contexts (e.g. sent to a process pool) leave their compiled
+observations behind; they are compiled again on first use.  The
+surrogates are read from ``ModelPath`` into the per-process
+gwemlightcurves.surrogate_cache, which forked workers inherit.
+"""
+
+import copy
+import contextlib
+import threading
+
+from gwemlightcurves import Global
+from .observations import compile_observations, observations_uptodate, get_observations
+
+# settings of a LikelihoodContext and their defaults, as in Global
+_defaults = {
+    "data_out": 0,
+    "filters": 0,
+    "doLightcurves": 0,
+    "doLuminosity": 0,
+    "doWaveformExtrapolate": 0,
+    "errorbudget": 0,
+    "ZPRange": 0,
+    "T0Range": 0,
+    "Xlan": 0,
+    "T": 0,
+    "phi": -1,
+    "theta": -1,
+    "mdyn": -1,
+    "n_coeff": 0,
+    "gptype": "sklearn",
+    "ModelPath": 0,
+    "colormodel": 0,
+}
+
+class LikelihoodContext(object):
+    """Settings of one fit, with the names of the Global variables.
+
+    Parameters
+    ----------
+    **kwargs
+        Any of the settings in ``LikelihoodContext.settings``; the others
+        take the default value of the corresponding Global variable.
+    """
+
+    settings = tuple(sorted(_defaults))
+
+    def __init__(self, **kwargs):
+        for key in kwargs:
+            if not key in _defaults:
+                raise TypeError("Unknown likelihood setting %s" % key)
+        for key in self.settings:
+            setattr(self, key, kwargs.get(key, copy.copy(_defaults[key])))
+        self._observations = None
+
+    @classmethod
+    def from_global(cls):
+        """Snapshot of the current Global settings."""
+
+        context = cls(**dict((key, getattr(Global, key, _defaults[key]))
+                             for key in cls.settings))
+        context._observations = Global.observations
+        return context
+
+    def replace(self, **kwargs):
+        """Copy of the context with some settings replaced."""
+
+        for key in kwargs:
+            if not key in _defaults:
+                raise TypeError("Unknown likelihood setting %s" % key)
+        context = copy.copy(self)
+        context.__dict__.update(kwargs)
+        return context
+
+    @property
+    def observations(self):
+        """data_out compiled for calc_prob, compiled on first use."""
+
+        if not observations_uptodate(self._observations, self.data_out,
+                                     filters=self.filters, doLuminosity=self.doLuminosity):
+            self._observations = compile_observations(self.data_out, filters=self.filters,
+                                                      doLuminosity=self.doLuminosity)
+        return self._observations
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_observations"] = None
+        return state
+
+class GlobalContext(object):
+    """The Global variables seen as a LikelihoodContext."""
+
+    def __getattr__(self, name):
+        return getattr(Global, name)
+
+    def __setattr__(self, name, value):
+        setattr(Global, name, value)
+
+    @property
+    def observations(self):
+        return get_observations()
+
+    def replace(self, **kwargs):
+        return LikelihoodContext.from_global().replace(**kwargs)
+
+    def __reduce__(self):
+        return "global_context"
+
+global_context = GlobalContext()
+
+_local = threading.local()
+
+def get_context(context=None):
+    """``context``, else the one bound by use_context, else global_context."""
+
+    if context is not None:
+        return context
+    context = getattr(_local, "context", None)
+    if context is not None:
+        return context
+    return global_context
+
+@contextlib.contextmanager
+def use_context(context):
+    """Bind ``context`` to the current thread for the duration of a block."""
+
+    previous = getattr(_local, "context", None)
+    _local.context = context
+    try:
+        yield context
+    finally:
+        _local.context = previous
@@ -0,0 +1,213 @@
+"""Fit one model to many events.
+
+fit_events fits a set of transients (the GRBs in lightcurves/GRB*.dat,
+ATLAS or ZTF candidates, ...) in one process.  It loads the surrogate
+models once, by evaluating the model in the parent process, and then fits
+the events on a pool of ``n_proc`` forked workers:
+
+    summary = fit_events("Bu2019inc", ["../lightcurves/GRB060614.dat",
+                                       "../lightcurves/GRB150101B.dat"],
+                         "../plots/events", catalog="../lightcurves/GRB.dat",
+                         sampler="nested", n_proc=2, errorbudget=1.0)
+
+The workers inherit the surrogate_cache of the parent, so the surrogate
+arrays are shared copy-on-write (and the ones of converted surrogates,
+which are memory mapped, through the page cache).  Each event gets its
+own LikelihoodContext.  The equal weight posterior of each event is
+written to ``<outputDir>/<name>/2-post_equal_weights.dat`` and a table of
+evidences and posterior quantiles to ``<outputDir>/summary.dat``.
+"""
+
+import os, sys
+import multiprocessing
+import traceback
+
+import numpy as np
+from astropy.table import Table
+
+from gwemlightcurves import lightcurve_utils
+from . import backends
+from .context import LikelihoodContext, use_context
+from .specs import get_spec, model_specs
+
+def read_catalog(filename):
+    """Filters, T0 (MJD) and distance (Mpc) of the events in a catalog.
+
+    The catalog has one line per event, as lightcurves/GRB.dat:
+    ``name filt1,filt2,... T0 distance``.
+    """
+
+    catalog = {}
+    lines = [line.rstrip('\n') for line in open(filename)]
+    for line in filter(None, lines):
+        lineSplit = list(filter(None, line.split(" ")))
+        catalog[lineSplit[0]] = {"filters": lineSplit[1].split(","),
+                                 "T0": float(lineSplit[2]),
+                                 "distance": float(lineSplit[3])}
+    return catalog
+
+def load_event(filename, T0=0.0, distance=None, filters=None, tmin=0.0, tmax=np.inf):
+    """data_out of an event file, as run_lightcurves_models.py builds it.
+
+    Times are taken relative to ``T0``, magnitudes made absolute with
+    ``distance`` (Mpc) if given, and observations outside [tmin, tmax],
+    without an error or in other bands than ``filters`` dropped.
+    """
+
+    data_out = lightcurve_utils.loadEvent(filename)
+    for key in list(data_out.keys()):
+        if filters is not None and not key in filters:
+            del data_out[key]
+            continue
+        data = data_out[key]
+        data[:,0] = data[:,0] - T0
+        if distance is not None:
+            data[:,1] = data[:,1] - 5*(np.log10(distance*1e6) - 1)
+        idx = np.where((data[:,0] >= tmin) & (data[:,0] <= tmax) & ~np.isnan(data[:,2]))[0]
+        if len(idx) == 0:
+            del data_out[key]
+            continue
+        data_out[key] = data[idx,:]
+    return data_out
+
+def event_name(filename):
+    return os.path.splitext(os.path.basename(filename))[0]
+
+def warm_surrogates(spec, context):
+    """Evaluate ``spec`` once so that its surrogates are loaded in this process."""
+
+    cube = 0.5*np.ones(spec.n_params)
+    spec.prior(cube, spec.n_params, spec.n_params, context=context)
+    t0, args, zp = spec.model_values(cube, context)
+    with use_context(context):
+        spec.model(*args)
+
+def _fit_event(task):
+    """Fit one event; runs in the worker processes."""
+
+    name, model, mode, context, basename, sampler, kwargs = task
+    spec = get_spec(model, mode)
+    row = {"name": name, "status": "ok", "logz": np.nan, "n_samples": 0}
+    try:
+        logz = backends.run_sampler(sampler, spec.problem(context), basename, n_cpu=1, **kwargs)
+        if logz is not None:
+            row["logz"] = logz
+        data = np.atleast_2d(np.loadtxt('%spost_equal_weights.dat' % basename))
+    except Exception as e:
+        traceback.print_exc()
+        row["status"] = "%s: %s" % (type(e).__name__, e)
+        return row
+
+    row["n_samples"] = len(data)
+    row["maxlogl"] = np.max(data[:,-1])
+    for ii, parameter in enumerate(spec.names):
+        lower, median, upper = np.percentile(data[:,ii], [16, 50, 84])
+        row[parameter] = median
+        row[parameter + "_lower"] = median - lower
+        row[parameter + "_upper"] = upper - median
+    return row
+
+def summary_table(rows, names):
+    """Table of the fit summaries ``rows`` with the parameters ``names``."""
+
+    columns = ["name", "status", "n_obs", "n_samples", "logz", "maxlogl"]
+    for parameter in names:
+        columns = columns + [parameter, parameter + "_lower", parameter + "_upper"]
+    data = {}
+    for column in columns:
+        if column in ["name", "status"]:
+            data[column] = [str(row.get(column, "")) for row in rows]
+        elif column in ["n_obs", "n_samples"]:
+            data[column] = [int(row.get(column, 0)) for row in rows]
+        else:
+            data[column] = [float(row.get(column, np.nan)) for row in rows]
+    return Table(data, names=columns)
+
+def fit_events(model, filenames, outputDir, mode="ejecta", catalog=None,
+               filters=None, T0=0.0, distance=None, tmin=0.0, tmax=np.inf,
+               sampler="nested", n_proc=1, n_live_points=100,
+               evidence_tolerance=0.5, max_iter=0, **settings):
+    """Fit ``model`` to each of the events in ``filenames``.
+
+    Parameters
+    ----------
+    model, mode : str
+        Model fit, one of sampler.model_specs.
+    filenames : list
+        Event files in the lightcurve_utils.loadEvent format.
+    outputDir : str
+        Directory of the per-event posteriors and of summary.dat.
+    catalog : str, optional
+        read_catalog file giving the filters, T0 and distance of the
+        events; events it does not list use ``filters``, ``T0`` and
+        ``distance``.
+    sampler : str
+        Backend of sampler.backends.
+    n_proc : int
+        Number of events fitted at the same time.
+    **settings
+        LikelihoodContext settings shared by all the fits (errorbudget,
+        ZPRange, T0Range, n_coeff, ...).
+
+    Returns
+    -------
+    astropy.table.Table
+        One row per event: status, number of observations and samples,
+        log evidence, maximum log-likelihood and the posterior medians
+        with their distance to the 16 and 84 percentiles.
+    """
+
+    if not (model, mode) in model_specs:
+        raise ValueError("No model specification for %s (%s)" % (model, mode))
+    spec = get_spec(model, mode)
+    settings.setdefault("doLightcurves", 1)
+    settings.setdefault("T0Range", 0.1)
+    settings.setdefault("ZPRange", 5.0)
+    if catalog is not None:
+        catalog = read_catalog(catalog)
+    else:
+        catalog = {}
+
+    tasks, n_obs = [], {}
+    kwargs = {"n_live_points": n_live_points, "evidence_tolerance": evidence_tolerance,
+              "max_iter": max_iter}
+    for filename in filenames:
+        name = event_name(filename)
+        event = catalog.get(name, {"filters": filters, "T0": T0, "distance": distance})
+        data_out = load_event(filename, T0=event["T0"], distance=event["distance"],
+                              filters=event["filters"], tmin=tmin, tmax=tmax)
+        n_obs[name] = int(np.sum([len(data_out[key]) for key in data_out]))
+        if n_obs[name] == 0:
+            print("No observations of %s left, skipping..." % name)
+            continue
+        context = LikelihoodContext(data_out=data_out, filters=list(data_out.keys()), **settings)
+        eventDir = os.path.join(outputDir, name)
+        if not os.path.isdir(eventDir):
+            os.makedirs(eventDir)
+        tasks.append((name, model, mode, context, os.path.join(eventDir, "2-"), sampler, kwargs))
+
+    if len(tasks) > 0:
+        warm_surrogates(spec, tasks[0][3])
+
+    if n_proc > 1 and len(tasks) > 1:
+        # forked workers share the surrogates loaded above
+        if "fork" in multiprocessing.get_all_start_methods():
+            mp = multiprocessing.get_context("fork")
+        else:
+            mp = multiprocessing.get_context()
+        pool = mp.Pool(min(n_proc, len(tasks)))
+        try:
+            rows = pool.map(_fit_event, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        rows = [_fit_event(task) for task in tasks]
+
+    for row in rows:
+        row["n_obs"] = n_obs[row["name"]]
+    summary = summary_table(rows, spec.names)
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+    summary.write(os.path.join(outputDir, "summary.dat"), format='ascii', overwrite=True)
+    return summary
@@ -1,25 +1,89 @@
 
 import numpy as np
 from gwemlightcurves.KNModels import KNTable
+from gwemlightcurves.KNModels.io.model import get_model_fn as get_registered_model_fn
 from astropy.table import Table, Column
-from gwemlightcurves import SALT2, BOXFit, TrPi2018, Global
-
+from gwemlightcurves import SALT2, BOXFit, TrPi2018, profiler, Global
+from gwemlightcurves import surrogate_cache
+from .context import get_context, use_context
+
+# direct evaluation functions, see get_model_fn.  They hold on to the
+# surrogates they were built with, so they are dropped whenever
+# surrogate_cache evicts surrogates, and rebuilt (reloading the surrogates)
+# on next use.
+_model_fns = surrogate_cache.SurrogateCache(max_entries=32)
+surrogate_cache.surrogates.on_evict.append(_model_fns.clear)
+
+def get_model_fn(model,samples,context=None):
+    """Direct evaluation function of ``model`` for ``samples``.
+
+    Returns ``(model_fn, parameters)`` as registered with
+    `register_model_fn`, or None if the model has no direct path or
+    ``samples`` does not hold exactly its parameters and settings (for
+    example the component masses, which only the table path converts to
+    ejecta properties).  The functions are built once per model, settings
+    and surrogate source (see `loader_kwargs`).  At most the 32 most
+    recently used functions are kept.
+    """
+
+    context = get_context(context)
+
+    registered = get_registered_model_fn(model, KNTable)
+    if registered is None:
+        return None
+    function, parameters, settings = registered
+    if not set(parameters) <= set(samples) <= set(parameters) | set(settings):
+        return None
+
+    config = tuple((key, samples[key]) for key in settings if key in samples)
+    kwargs = loader_kwargs(context)
+    key = (model, config, tuple(sorted(kwargs.items())))
+    model_fn = _model_fns.get(key)
+    if model_fn is None:
+        t = Table()
+        for name, val in config:
+            t.add_column(Column(data=[val],name=name))
+        model_fn = function(t, **kwargs)
+        model_fn = profiler.profiled("KNModels.%s.model_fn" % model)(model_fn)
+        _model_fns[key] = model_fn
+    return model_fn, parameters
+
+def loader_kwargs(context):
+    """Surrogate source of the context, as KNTable.model keyword arguments.
+
+    With ``ModelPath`` set the surrogates are loaded from the models saved
+    there; ``phi`` selects the surrogate of Bu2019.
+    """
+    kwargs = {}
+    if not context.ModelPath == 0:
+        kwargs["LoadModel"] = True
+        kwargs["ModelPath"] = context.ModelPath
+    if not context.phi == -1:
+        kwargs["phi"] = context.phi
+    return kwargs
+
+@profiler.profiled("sampler.generate_lightcurve")
 def generate_lightcurve(model,samples):
 
-    t = Table()
-    for key in samples.keys():
-        val = samples[key]
-        t.add_column(Column(data=[val],name=key))
-    samples = t
+    context = get_context()
+    samples = dict(samples)
+    if context.n_coeff > 0:
+        samples["n_coeff"] = context.n_coeff
+    samples["gptype"] = context.gptype
+
+    direct = get_model_fn(model, samples, context)
+    if direct is not None:
+        model_fn, parameters = direct
+        return model_fn(np.array([samples[key] for key in parameters]))
 
-    if Global.n_coeff > 0:
-        samples["n_coeff"] = Global.n_coeff
-    try:
-        samples["gptype"] = Global.gptype
-    except:
-        pass
+    with profiler.stage("sampler.table_construction"):
+        t = Table()
+        for key in samples.keys():
+            val = samples[key]
+            t.add_column(Column(data=[val],name=key))
+        samples = t
 
-    model_table = KNTable.model(model, samples)
+    model_table = KNTable.model(model, samples, **loader_kwargs(context))
 
     if len(model_table) == 0:
         return [], [], []
@@ -311,6 +375,7 @@ def Ka2017inc_model_ejecta(mej,vej,Xlan,iota):
     samples['vej'] = vej
     samples['Xlan'] = Xlan
     samples['iota'] = iota
+    samples['colormodel'] = get_context().colormodel
 
     model = "Ka2017inc"
     t, lbol, mag = generate_lightcurve(model,samples)
@@ -319,11 +384,7 @@ def Ka2017inc_model_ejecta(mej,vej,Xlan,iota):
 
 def Bu2019rb_model_ejecta(mej_1,mej_2,phi,theta,a):
 
-    Global.svd_mag_model = Global.svd_mag_model_1
-    Global.svd_lbol_model = Global.svd_lbol_model_1
     tmag_1, lbol_1, mag_1 = Bu2019bc_model_ejecta(mej_1,phi,theta)
-    Global.svd_mag_model = Global.svd_mag_model_2
-    Global.svd_lbol_model = Global.svd_lbol_model_2
     tmag_2, lbol_2, mag_2 = Bu2019re_model_ejecta(mej_2,a,theta)
 
     tmag = tmag_1
@@ -413,12 +474,8 @@ def Wo2020dw_model_ejecta(mej,rwind,theta):
 
 def Wo2020_model_ejecta(mej_1,mej_2,sd,a,rwind,theta):
 
-    Global.svd_mag_model = Global.svd_mag_model_1
-    Global.svd_lbol_model = Global.svd_lbol_model_1
     tmag_1, lbol_1, mag_1 = Wo2020dyn_model_ejecta(mej_1,sd,a,theta)
-    Global.svd_mag_model = Global.svd_mag_model_2
-    Global.svd_lbol_model = Global.svd_lbol_model_2
-    tmag_2, lbol_2, mag_2 = Wo2020dw_model_ejecta(mej_2,rwind,theta)                                                    
+    tmag_2, lbol_2, mag_2 = Wo2020dw_model_ejecta(mej_2,rwind,theta)
     tmag = tmag_1
     lbol = lbol_1 + lbol_2
     mag = -2.5*np.log10(10**(-mag_1*0.4) + 10**(-mag_2*0.4))
@@ -495,10 +552,11 @@ def Ka2017x2_model_ejecta(mej_1,vej_1,Xlan_1,mej_2,vej_2,Xlan_2):
 
 def Ka2017x2inc_model_ejecta(mej_1,vej_1,Xlan_1,mej_2,vej_2,Xlan_2,iota):
 
-    Global.svd_mag_color_model = Global.svd_mag_color_models[0]
-    tmag_1, lbol_1, mag_1 = Ka2017inc_model_ejecta(mej_1,vej_1,Xlan_1,iota)
-    Global.svd_mag_color_model = Global.svd_mag_color_models[1]
-    tmag_2, lbol_2, mag_2 = Ka2017inc_model_ejecta(mej_2,vej_2,Xlan_2,iota)
+    context = get_context()
+    with use_context(context.replace(colormodel=context.colormodel[0])):
+        tmag_1, lbol_1, mag_1 = Ka2017inc_model_ejecta(mej_1,vej_1,Xlan_1,iota)
+    with use_context(context.replace(colormodel=context.colormodel[1])):
+        tmag_2, lbol_2, mag_2 = Ka2017inc_model_ejecta(mej_2,vej_2,Xlan_2,iota)
 
     tmag = tmag_1
     lbol = lbol_1 + lbol_2
@@ -520,13 +578,14 @@ def Ka2017x3_model_ejecta(mej_1,vej_1,Xlan_1,mej_2,vej_2,Xlan_2,mej_3,vej_3,Xlan
 
 def Ka2017x3inc_model_ejecta(mej_1,vej_1,Xlan_1,mej_2,vej_2,Xlan_2,mej_3,vej_3,Xlan_3,iota):
 
-    Global.svd_mag_color_model = Global.svd_mag_color_models[0]
-    tmag_1, lbol_1, mag_1 = Ka2017inc_model_ejecta(mej_1,vej_1,Xlan_1,iota)
-    Global.svd_mag_color_model = Global.svd_mag_color_models[1]
-    tmag_2, lbol_2, mag_2 = Ka2017inc_model_ejecta(mej_2,vej_2,Xlan_2,iota)
-    Global.svd_mag_color_model = Global.svd_mag_color_models[2]
+    context = get_context()
+    with use_context(context.replace(colormodel=context.colormodel[0])):
+        tmag_1, lbol_1, mag_1 = Ka2017inc_model_ejecta(mej_1,vej_1,Xlan_1,iota)
+    with use_context(context.replace(colormodel=context.colormodel[1])):
+        tmag_2, lbol_2, mag_2 = Ka2017inc_model_ejecta(mej_2,vej_2,Xlan_2,iota)
     iota_mod = np.mod(iota-90,180)
-    tmag_3, lbol_3, mag_3 = Ka2017inc_model_ejecta(mej_3,vej_3,Xlan_3,iota_mod)
+    with use_context(context.replace(colormodel=context.colormodel[2])):
+        tmag_3, lbol_3, mag_3 = Ka2017inc_model_ejecta(mej_3,vej_3,Xlan_3,iota_mod)
 
     tmag = tmag_1
     lbol = lbol_1 + lbol_2 + lbol_3
@@ -0,0 +1,171 @@
+"""Observations compiled once for the sampler likelihood.
+
+An ObservationSet holds the data of Global.data_out as flat arrays (one
+entry per observation), with the model band combination of each filter
+resolved up front, so that calc_prob reduces to one gather over the model
+magnitudes.
+"""
+
+import numpy as np
+from scipy.interpolate import interpolate as interp
+
+from gwemlightcurves import lightcurve_utils, Global
+
+class ObservationSet(object):
+    """Flattened photometry of one event.
+
+    Attributes
+    ----------
+    keys : list
+        Filters with at least one usable observation, in data order.
+    t, y, sigma_y : ndarray
+        Time, magnitude and magnitude error of each observation; upper
+        limits have an infinite error.
+    band : ndarray
+        Index into ``keys`` of each observation.
+    band_idx, band_weights : ndarray
+        (nkeys, 3) model bands and weights combined for each filter.
+    chisquare_norm : ndarray
+        Per-observation chi-square normalization, 1/(n-1) for a filter
+        with n observations.
+    """
+
+    def __init__(self, data_out, filters):
+        self.data_out = data_out
+        self.filters = list(filters)
+
+        keys, t, y, sigma_y, band = [], [], [], [], []
+        band_idx, band_weights, chisquare_norm = [], [], []
+        for key in data_out:
+            samples = data_out[key]
+            idx = np.where(~np.isnan(samples[:,1]))[0]
+            if len(idx) == 0: continue
+            if not key in self.filters: continue
+            weights = lightcurve_utils.get_mag_weights(key)
+            if weights is None: continue
+
+            # pad to three bands, repeating the first one with zero weight
+            # so that NaN in unused bands does not propagate
+            weights = weights + [(weights[0][0], 0.0)]*(3-len(weights))
+
+            t.append(samples[idx,0])
+            y.append(samples[idx,1])
+            sigma_y.append(samples[idx,2])
+            band.append(len(keys)*np.ones(len(idx), dtype=int))
+            band_idx.append([w[0] for w in weights])
+            band_weights.append([w[1] for w in weights])
+            if len(idx) == 1:
+                chisquare_norm.append(np.ones(1))
+            else:
+                chisquare_norm.append(np.ones(len(idx))/float(len(idx)-1))
+            keys.append(key)
+
+        self.keys = keys
+        if len(keys) == 0:
+            self.t, self.y, self.sigma_y = np.zeros(0), np.zeros(0), np.zeros(0)
+            self.band = np.zeros(0, dtype=int)
+            self.band_idx = np.zeros((0,3), dtype=int)
+            self.band_weights = np.zeros((0,3))
+            self.chisquare_norm = np.zeros(0)
+        else:
+            self.t = np.concatenate(t)
+            self.y = np.concatenate(y)
+            self.sigma_y = np.concatenate(sigma_y)
+            self.band = np.concatenate(band)
+            self.band_idx = np.array(band_idx, dtype=int)
+            self.band_weights = np.array(band_weights)
+            self.chisquare_norm = np.concatenate(chisquare_norm)
+
+    def __len__(self):
+        return len(self.t)
+
+    def matches(self, data_out, filters):
+        return (self.data_out is data_out) and (self.filters == list(filters))
+
+    def model_mags(self, mag):
+        """Model magnitudes (nkeys, Nt) of each filter from the (9, Nt) bands."""
+        mag = np.asarray(mag)
+        return np.sum(self.band_weights[:,:,None]*mag[self.band_idx], axis=1)
+
+    def interp_mags(self, tmag, mag, extrapolate=False):
+        """Model magnitudes at the observation times.
+
+        Equivalent to linearly interpolating each filter over the finite
+        model points only, as calc_prob did with interp1d.
+        """
+
+        magave = self.model_mags(mag)
+        nt = len(tmag)
+        t = self.t
+
+        hi = np.clip(np.searchsorted(tmag, t), 1, nt-1)
+        lo = hi-1
+        y_lo = magave[self.band, lo]
+        y_hi = magave[self.band, hi]
+        with np.errstate(invalid='ignore'):
+            slope = (y_hi-y_lo)/(tmag[hi]-tmag[lo])
+            maginterp = slope*(t-tmag[lo]) + y_lo
+        outside = (t < tmag[0]) | (t > tmag[-1])
+        if not extrapolate:
+            maginterp[outside] = np.nan
+            redo = ~outside & ~(np.isfinite(y_lo) & np.isfinite(y_hi))
+        else:
+            redo = ~(np.isfinite(y_lo) & np.isfinite(y_hi))
+
+        # brackets touching non-finite model points need the finite points
+        # of their filter only
+        for key in np.unique(self.band[redo]):
+            rows = np.where(redo & (self.band == key))[0]
+            ii = np.where(np.isfinite(magave[key]))[0]
+            if len(ii) == 0:
+                maginterp[rows] = np.nan
+                continue
+            if extrapolate:
+                f = interp.interp1d(tmag[ii], magave[key][ii], fill_value='extrapolate')
+            else:
+                f = interp.interp1d(tmag[ii], magave[key][ii], fill_value=np.nan, bounds_error = False)
+            maginterp[rows] = f(t[rows])
+
+        return maginterp
+
+class LuminositySet(object):
+    """Bolometric luminosity observations of one event."""
+
+    def __init__(self, data_out):
+        self.data_out = data_out
+
+        y = data_out["Lbol"]
+        idx = np.where(~np.isnan(y))[0]
+        self.t = data_out["tt"][idx]
+        self.y = y[idx]
+        self.sigma_y = data_out["Lbol_err"][idx]
+
+        self.log_y = np.log10(self.y)
+        self.sigma_log_y = np.abs(self.sigma_y/(self.y*np.log(10)))
+
+    def __len__(self):
+        return len(self.t)
+
+    def matches(self, data_out, filters=None):
+        return self.data_out is data_out
+
+def compile_observations(data_out, filters=None, doLuminosity=False):
+    """Compile data_out into a LuminositySet or ObservationSet."""
+    if doLuminosity:
+        return LuminositySet(data_out)
+    return ObservationSet(data_out, filters)
+
+def observations_uptodate(obs, data_out, filters=None, doLuminosity=False):
+    """Whether ``obs`` was compiled from ``data_out`` with these settings."""
+    if doLuminosity:
+        return isinstance(obs, LuminositySet) and obs.matches(data_out)
+    return isinstance(obs, ObservationSet) and obs.matches(data_out, filters)
+
+def get_observations():
+    """The compiled observations of Global.data_out, compiled on first use."""
+
+    if not observations_uptodate(Global.observations, Global.data_out,
+                                 filters=Global.filters, doLuminosity=Global.doLuminosity):
+        Global.observations = compile_observations(Global.data_out, filters=Global.filters,
+                                                   doLuminosity=Global.doLuminosity)
+    return Global.observations
@@ -0,0 +1,616 @@
+"""Declarative specifications of the sampled models.
+
+Each ModelSpec lists the sampled parameters of one model fit (names,
+labels, prior ranges, whether the model takes 10**value) and the
+sampler.model function evaluating the lightcurve.  The MultiNest style
+prior and likelihood callbacks, their batch versions, the parameter
+labels and the backends.Problem of the fit are all generated from it, so
+adding a model fit is one register_spec call.
+
+The first parameter of every fit is the time offset T0 and the last one
+the zero point ZP; the remaining ones are passed, in order, to the model
+function (through an ``arguments`` function where the model takes more
+quantities than are sampled, as for the baryonic masses of the EOSFit
+fits).  A zero point sampled in the unit interval (``ZP(norm=True)``)
+is mapped to a N(0, ZPRange) offset with scipy.special.ndtri, without
+building a scipy.stats distribution per call.
+
+The settings (ZPRange, T0Range, the pinning Xlan, phi, ... and the
+error budget, unless it is sampled) come from the LikelihoodContext given to ``problem``, or
+from Global through sampler.context when there is none.  The old
+myloglike_<model>_<mode> and myprior_<model>_<mode> names are kept as
+aliases of the generated callbacks.
+"""
+
+import functools
+
+import numpy as np
+import scipy.special
+
+from gwemlightcurves import lightcurve_utils
+from . import backends
+from .constraints import (constraint_2Component, constraint_3Component,
+                          constraint_masses, constraint_boxfit)
+from .context import get_context, use_context
+from .model import *
+from .loglike import calc_prob
+from .prior import BatchPrior
+
+class Parameter(object):
+    """One sampled parameter, uniform in [minimum, maximum].
+
+    Parameters
+    ----------
+    name, label : str
+        Parameter name and plot label.
+    minimum, maximum : float
+        Prior range.
+    log : bool
+        The parameter is sampled in log10 and the model gets 10**value.
+    fixed : str, optional
+        Name of a context setting that pins the parameter, when it is
+        not equal to ``unset``, to a range of ``width`` around its value.
+    fixed_linear : bool
+        The pinning setting is in linear units while the parameter is
+        sampled in log10.
+    """
+
+    def __init__(self, name, label, minimum, maximum, log=False,
+                 fixed=None, unset=-1, width=0.1, fixed_linear=False):
+        self.name = name
+        self.label = label
+        self.minimum = minimum
+        self.maximum = maximum
+        self.log = log
+        self.fixed = fixed
+        self.unset = unset
+        self.width = width
+        self.fixed_linear = fixed_linear
+
+    def fixed_value(self, context):
+        if self.fixed is None:
+            return None
+        value = getattr(context, self.fixed)
+        if value == self.unset:
+            return None
+        return value
+
+    def bounds(self, context):
+        return self.minimum, self.maximum
+
+    def transform(self, u, context):
+        """Unit cube to sampled value."""
+
+        value = self.fixed_value(context)
+        if value is not None:
+            x = u*self.width + value - self.width/2.0
+            if self.fixed_linear:
+                x = np.log10(x)
+            return x
+        lower, upper = self.bounds(context)
+        return u*(upper - lower) + lower
+
+    def to_model(self, x, context):
+        """Sampled value to model value."""
+
+        if self.log:
+            return 10**x
+        return x
+
+class T0(Parameter):
+    """Time offset, uniform in +/- T0Range."""
+
+    def __init__(self):
+        Parameter.__init__(self, "t0", r"$T_0$", None, None)
+
+    def bounds(self, context):
+        return -context.T0Range, context.T0Range
+
+class ZP(Parameter):
+    """Zero point offset.
+
+    Uniform in +/- ZPRange, or with ``norm`` sampled in the unit
+    interval and mapped to a N(0, ZPRange) offset.
+    """
+
+    def __init__(self, norm=False):
+        Parameter.__init__(self, "zp", "ZP", None, None)
+        self.norm = norm
+
+    def bounds(self, context):
+        if self.norm:
+            return 0.0, 1.0
+        return -context.ZPRange, context.ZPRange
+
+    def to_model(self, x, context):
+        if self.norm:
+            return scipy.special.ndtri(x)*context.ZPRange
+        return x
+
+def log_mej(name="mej", label=r"${\rm log}_{10} (M_{\rm ej})$", minimum=-5.0, maximum=0.0, **kwargs):
+    return Parameter(name, label, minimum, maximum, log=True, **kwargs)
+
+def log_xlan(name="xlan", label=r"${\rm log}_{10} (X_{\rm lan})$", minimum=-9.0, maximum=-1.0, **kwargs):
+    return Parameter(name, label, minimum, maximum, log=True, **kwargs)
+
+def vej(name="vej", label=r"$v_{\rm ej}$", minimum=0.0, maximum=0.3):
+    return Parameter(name, label, minimum, maximum)
+
+def phi(minimum, maximum, label=r"$\Phi$"):
+    return Parameter("phi", label, minimum, maximum, fixed="phi")
+
+def theta(label=r"$\Theta$", fixed="theta"):
+    return Parameter("theta", label, 0.0, 90.0, fixed=fixed)
+
+class ModelSpec(object):
+    """Sampled parameters and model function of one model fit.
+
+    Parameters
+    ----------
+    name : str
+        Model name, as given to --model.
+    mode : str
+        Fit mode ("ejecta", "masses", "EOSFit" or "BNSFit"), or None for
+        the fits taking neither ejecta nor masses (SN, afterglows).
+    model : callable
+        sampler.model function returning (tmag, lbol, mag).
+    parameters : list
+        Parameters passed to ``model``; T0 is prepended and ``zp``
+        appended.
+    zp : ZP, optional
+        Zero point parameter, uniform in +/- ZPRange by default.
+    constraint : callable, optional
+        Array-safe function of the model arguments, False where the
+        likelihood is -inf without evaluating the model (see
+        sampler.constraints).
+    arguments : callable, optional
+        Array-safe function of the values of ``parameters`` returning the
+        arguments of ``model``; by default they are passed as they are.
+    errorbudget : Parameter, optional
+        Sampled error budget, inserted before ``zp``; by default the
+        error budget of the context is used.
+    """
+
+    def __init__(self, name, mode, model, parameters, zp=None, constraint=None,
+                 arguments=None, errorbudget=None):
+        if zp is None:
+            zp = ZP()
+        self.name = name
+        self.mode = mode
+        self.model = model
+        self.parameters = [T0()] + list(parameters) + [zp]
+        if errorbudget is not None:
+            self.parameters.insert(-1, errorbudget)
+        self.n_args = len(parameters)
+        self.constraint = constraint
+        self.arguments = arguments
+        self.errorbudget = errorbudget
+
+    @property
+    def names(self):
+        return [p.name for p in self.parameters]
+
+    @property
+    def labels(self):
+        return [p.label for p in self.parameters]
+
+    @property
+    def n_params(self):
+        return len(self.parameters)
+
+    def prior(self, cube, ndim, nparams, context=None):
+        context = get_context(context)
+        for ii, p in enumerate(self.parameters):
+            cube[ii] = p.transform(cube[ii], context)
+
+    def model_values(self, cube, context=None):
+        """T0, model arguments and zero point of a transformed cube.
+
+        ``cube`` may also be the transpose of an (N, ndim) batch.
+        """
+
+        context = get_context(context)
+        values = [p.to_model(cube[ii], context) for ii, p in enumerate(self.parameters)]
+        args = values[1:1+self.n_args]
+        if self.arguments is not None:
+            args = list(self.arguments(*args))
+        return values[0], args, values[-1]
+
+    def errorbudget_value(self, cube, context=None):
+        """Error budget of a transformed cube (or the transpose of a batch)."""
+
+        context = get_context(context)
+        if self.errorbudget is None:
+            return context.errorbudget
+        return self.errorbudget.to_model(cube[self.n_params-2], context)
+
+    def posterior(self, data, context=None):
+        """T0, model arguments and zero point of the samples ``data``.
+
+        ``data`` holds one transformed point per row, as in the posterior
+        files of the samplers (further columns, like the likelihood, are
+        ignored).  Returns an array with one row per point.
+        """
+
+        t0, args, zp = self.model_values(np.atleast_2d(data).T, context)
+        return np.column_stack([t0] + list(args) + [zp])
+
+    def allowed_batch(self, x, context=None):
+        """Constraint of the (N, ndim) batch ``x`` of transformed points."""
+
+        t0, args, zp = self.model_values(np.atleast_2d(x).T, context)
+        return self.constraint(*args)
+
+    def loglike(self, cube, ndim, nparams, context=None):
+        context = get_context(context)
+        t0, args, zp = self.model_values(cube, context)
+        if self.constraint is not None and not self.constraint(*args):
+            return -np.inf
+        with use_context(context):
+            tmag, lbol, mag = self.model(*args)
+        return calc_prob(tmag, lbol, mag, t0, zp,
+                         errorbudget = self.errorbudget_value(cube, context),
+                         context=context)
+
+    def loglike_batch(self, x, context=None):
+        context = get_context(context)
+        x = np.atleast_2d(x)
+        t0, args, zp = self.model_values(x.T, context)
+        errorbudget = np.broadcast_to(self.errorbudget_value(x.T, context), len(x))
+        prob = -np.inf*np.ones(len(x))
+        if self.constraint is not None:
+            idx = np.where(self.constraint(*args))[0]
+        else:
+            idx = np.arange(len(x))
+        with use_context(context):
+            for ii in idx:
+                tmag, lbol, mag = self.model(*[arg[ii] for arg in args])
+                prob[ii] = calc_prob(tmag, lbol, mag, t0[ii], zp[ii],
+                                     errorbudget = errorbudget[ii], context=context)
+        return prob
+
+    def problem(self, context=None):
+        """The backends.Problem of this fit.
+
+        With a ``context`` the callbacks are bound to it, otherwise they
+        follow Global (or the context bound with use_context) at call time.
+        """
+
+        loglike, prior, loglike_batch = self.loglike, self.prior, self.loglike_batch
+        constraint = None
+        if self.constraint is not None:
+            constraint = self.allowed_batch
+        if context is not None:
+            loglike = functools.partial(loglike, context=context)
+            prior = functools.partial(prior, context=context)
+            loglike_batch = functools.partial(loglike_batch, context=context)
+            if constraint is not None:
+                constraint = functools.partial(constraint, context=context)
+        name = self.name
+        if self.mode is not None:
+            name = "%s_%s" % (self.name, self.mode)
+        return backends.Problem(self.names, self.labels, loglike, prior,
+                                loglike_batch=loglike_batch,
+                                prior_batch=BatchPrior(prior),
+                                constraint=constraint, name=name)
+
+model_specs = {}
+
+def register_spec(spec):
+    key = (spec.name, spec.mode)
+    if key in model_specs:
+        raise ValueError("Model specification %s (%s) already defined" % key)
+    model_specs[key] = spec
+
+def get_spec(model, mode):
+    return model_specs[(model, mode)]
+
+iota = Parameter("iota", r"$\iota$", 0.0, 180.0)
+log_kappa_r = Parameter("kappa_r", r"${\rm log}_{10} \kappa_{\rm r}$", -1.0, 2.0, log=True)
+
+def two_components(mej_range=(-5.0, -1.0), xlan_range=(-5.0, 0.0)):
+    params = []
+    for ii in [1, 2]:
+        params += [log_mej("mej%d" % ii, r"${\rm log}_{10} (M_{\rm ej %d})$" % ii, *mej_range),
+                   vej("vej%d" % ii, r"$v_{\rm ej %d}$" % ii),
+                   log_xlan("xlan%d" % ii, r"${\rm log}_{10} (X_{\rm lan %d})$" % ii, *xlan_range)]
+    return params
+
+def three_components():
+    params = two_components(mej_range=(-5.0, -1.0))
+    params += [log_mej("mej3", r"${\rm log}_{10} (M_{\rm ej 3})$", -5.0, -1.0),
+               vej("vej3", r"$v_{\rm ej 3}$"),
+               log_xlan("xlan3", r"${\rm log}_{10} (X_{\rm lan 3})$", -5.0, 0.0)]
+    return params
+
+def bulla_two_components(phi_range=(30.0, 60.0), theta_fixed="theta", mdyn_fixed=None,
+                         mej_dyn_range=(-3.0, -1.0), mej_wind_range=(-3.0, -1.0),
+                         labels=[r"${\rm log}_{10} (M_{\rm ej,dyn})$", r"${\rm log}_{10} (M_{\rm ej,wind})$",
+                                 r"$\Phi$", r"$\Theta$"]):
+    mej_dyn = log_mej("mej_dyn", labels[0], *mej_dyn_range)
+    if mdyn_fixed is not None:
+        mej_dyn = log_mej("mej_dyn", labels[0], *mej_dyn_range, fixed=mdyn_fixed,
+                          width=0.0002, fixed_linear=True)
+    return [mej_dyn, log_mej("mej_wind", labels[1], *mej_wind_range),
+            phi(*phi_range, label=labels[2]), theta(label=labels[3], fixed=theta_fixed)]
+
+bulla_units = [r"${\rm log}_{10} (M_{\rm ej,dyn} / M_\odot)$", r"${\rm log}_{10} (M_{\rm ej,wind} / M_\odot)$",
+               r"$\Phi {\rm [deg]}$", r"$\Theta {\rm [deg]}$"]
+
+register_spec(ModelSpec("KaKy2016", "ejecta", KaKy2016_model_ejecta,
+    [log_mej(), vej(maximum=1.0),
+     Parameter("th", r"$\theta_{\rm ej}$", 0.0, np.pi/2),
+     Parameter("ph", r"$\phi_{\rm ej}$", 0.0, 2*np.pi)]))
+
+register_spec(ModelSpec("DiUj2017", "ejecta", DiUj2017_model_ejecta,
+    [log_mej(), vej(maximum=1.0),
+     Parameter("th", r"$\theta_{\rm ej}$", 0.0, np.pi/2),
+     Parameter("ph", r"$\phi_{\rm ej}$", 0.0, 2*np.pi)]))
+
+register_spec(ModelSpec("BaKa2016", "ejecta", BaKa2016_model_ejecta,
+    [log_mej(), vej()]))
+
+register_spec(ModelSpec("Ka2017", "ejecta", Ka2017_model_ejecta,
+    [log_mej(minimum=-3.0), vej(), log_xlan(fixed="Xlan", unset=0)],
+    zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Ka2017inc", "ejecta", Ka2017inc_model_ejecta,
+    [log_mej(minimum=-5.0, maximum=-1.0), vej(), log_xlan(), iota]))
+
+register_spec(ModelSpec("Ka2017_A", "ejecta", Ka2017_A_model,
+    [log_mej(minimum=-5.0, maximum=-1.0), vej(), log_xlan(),
+     Parameter("A", r"${\rm log}_{10} (A)$", 0.0, 10.0, log=True)]))
+
+register_spec(ModelSpec("Ka2017x2", "ejecta", Ka2017x2_model_ejecta,
+    two_components(), constraint=constraint_2Component))
+
+register_spec(ModelSpec("Ka2017x2inc", "ejecta", Ka2017x2inc_model_ejecta,
+    two_components() + [iota], constraint=constraint_2Component))
+
+register_spec(ModelSpec("Ka2017x3", "ejecta", Ka2017x3_model_ejecta,
+    [log_mej("mej1", r"${\rm log}_{10} (M_{\rm ej 1})$"),
+     vej("vej1", r"$v_{\rm ej 1}$", 0.2, 0.3),
+     log_xlan("xlan1", r"${\rm log}_{10} (X_{\rm lan 1})$", -2.0, 0.0),
+     log_mej("mej2", r"${\rm log}_{10} (M_{\rm ej 2})$"),
+     vej("vej2", r"$v_{\rm ej 2}$", 0.2, 0.3),
+     log_xlan("xlan2", r"${\rm log}_{10} (X_{\rm lan 2})$", -5.0, -1.0),
+     log_mej("mej3", r"${\rm log}_{10} (M_{\rm ej 3})$"),
+     vej("vej3", r"$v_{\rm ej 3}$", 0.0, 0.2),
+     log_xlan("xlan3", r"${\rm log}_{10} (X_{\rm lan 3})$", -5.0, 0.0)]))
+
+register_spec(ModelSpec("Ka2017x3inc", "ejecta", Ka2017x3inc_model_ejecta,
+    three_components() + [iota], constraint=constraint_3Component))
+
+register_spec(ModelSpec("Bu2019", "ejecta", Bu2019_model_ejecta,
+    [log_mej(minimum=-3.0, maximum=-1.0),
+     Parameter("T", r"${\rm log}_{10} (T_{\rm eff})$", 3.0, 4.0, log=True, fixed="T", unset=0)],
+    zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Bu2019inc", "ejecta", Bu2019inc_model_ejecta,
+    [log_mej(minimum=-3.0, maximum=-1.0), phi(15.0, 30.0),
+     Parameter("theta", r"$\Theta$", 0.0, 15.0, fixed="theta")],
+    zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Bu2019lf", "ejecta", Bu2019lf_model_ejecta,
+    bulla_two_components(theta_fixed=None), zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Bu2019lr", "ejecta", Bu2019lr_model_ejecta,
+    bulla_two_components(theta_fixed=None), zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Bu2019lm", "ejecta", Bu2019lm_model_ejecta,
+    bulla_two_components(phi_range=(15.0, 75.0), mdyn_fixed="mdyn",
+                         mej_wind_range=(-3.0, 0.0), labels=bulla_units),
+    zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Bu2021ka", "ejecta", Bu2021ka_model_ejecta,
+    bulla_two_components(phi_range=(15.0, 75.0), mdyn_fixed="mdyn",
+                         mej_wind_range=(-3.0, 0.0), labels=bulla_units) +
+    [Parameter("kappa", r"$\kappa$", 0.5, 1.5)],
+    zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Bu2019lw", "ejecta", Bu2019lw_model_ejecta,
+    [log_mej("mej_wind", r"${\rm log}_{10} (M_{\rm ej,wind})$", -3.0, 0.0),
+     phi(30.0, 60.0), theta()],
+    zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Bu2019nsbh", "ejecta", Bu2019nsbh_model_ejecta,
+    [log_mej("mej_dyn", r"${\rm log}_{10} (M_{\rm ej,dyn})$", -3.0, -0.5),
+     log_mej("mej_wind", r"${\rm log}_{10} (M_{\rm ej,wind})$", -3.0, -0.5),
+     theta()]))
+
+def bulla_red_blue():
+    return [log_mej("mej_1", r"${\rm log}_{10} (M_{\rm ej,1})$", -3.0, 0.0),
+            log_mej("mej_2", r"${\rm log}_{10} (M_{\rm ej,2})$", -3.0, 0.0),
+            phi(15.0, 75.0), theta(), Parameter("a", "a", 1.0, 10.0)]
+
+register_spec(ModelSpec("Bu2019rb", "ejecta", Bu2019rb_model_ejecta, bulla_red_blue()))
+register_spec(ModelSpec("Bu2019rp", "ejecta", Bu2019rp_model_ejecta, bulla_red_blue()))
+register_spec(ModelSpec("Bu2019rpd", "ejecta", Bu2019rp_model_ejecta, bulla_red_blue()))
+
+register_spec(ModelSpec("Bu2019rps", "ejecta", Bu2019rps_model_ejecta,
+    [log_mej("mej_1", r"${\rm log}_{10} (M_{\rm ej,1})$", -3.0, 0.0),
+     log_mej("mej_2", r"${\rm log}_{10} (M_{\rm ej,2})$", -3.0, 0.0),
+     Parameter("a", "a", 1.0, 10.0)]))
+
+# the torus sd range extends +/- 0.002 outside of the grid
+sd = Parameter("sd", r"$\sigma_{\rm tor}$", 0.012, 0.073)
+wollaeger_a = Parameter("a", "a", 0.25, 2.0)
+rwind = Parameter("rwind", r"$R_{\rm wind}$", 0.1, 0.35)
+
+register_spec(ModelSpec("Wo2020", "ejecta", Wo2020_model_ejecta,
+    [log_mej("mej_1", r"${\rm log}_{10} (M_{\rm ej,1})$", -3.0, 0.0),
+     log_mej("mej_2", r"${\rm log}_{10} (M_{\rm ej,2})$", -3.0, 0.0),
+     sd, wollaeger_a, rwind, theta()]))
+
+register_spec(ModelSpec("Wo2020dyn", "ejecta", Wo2020dyn_model_ejecta,
+    [log_mej(minimum=-3.0), sd, wollaeger_a, theta()]))
+
+register_spec(ModelSpec("Wo2020dw", "ejecta", Wo2020dw_model_ejecta,
+    [log_mej(minimum=-3.0), rwind, theta()]))
+
+register_spec(ModelSpec("Bu2019re", "ejecta", Bu2019re_model_ejecta,
+    [log_mej(minimum=-3.0), Parameter("a", "a", 1.0, 10.0), theta()]))
+
+register_spec(ModelSpec("Bu2019bc", "ejecta", Bu2019bc_model_ejecta,
+    [log_mej(minimum=-3.0), phi(15.0, 75.0), theta()]))
+
+register_spec(ModelSpec("Bu2019op", "ejecta", Bu2019op_model_ejecta,
+    [Parameter("kappaLF", r"${\rm log}_{10} (\kappa_{\rm LF})$", 1.0, 5.0, log=True),
+     Parameter("gammaLF", r"$\gamma_{\rm LF}$", -0.7, 0.0),
+     Parameter("kappaLR", r"${\rm log}_{10} (\kappa_{\rm LR})$", 1.0, 5.0, log=True),
+     Parameter("gammaLR", r"$\gamma_{\rm LR}$", -1.0, 0.0)],
+    zp=ZP(norm=True)))
+
+register_spec(ModelSpec("Bu2019ops", "ejecta", Bu2019ops_model_ejecta,
+    [Parameter("kappaLF", r"${\rm log}_{10} (\kappa_{\rm LF})$", 0.0, 4.0, log=True),
+     Parameter("kappaLR", r"${\rm log}_{10} (\kappa_{\rm LR})$", 0.0, 4.0, log=True),
+     Parameter("gammaLR", r"$\gamma_{\rm LR}$", -1.0, 0.0)],
+    zp=ZP(norm=True)))
+
+register_spec(ModelSpec("RoFe2017", "ejecta", RoFe2017_model_ejecta,
+    [log_mej(), vej(), Parameter("xlan", "$X_{\\rm lan}$", 0.0, 1.0)]))
+
+register_spec(ModelSpec("Me2017", "ejecta", Me2017_model_ejecta,
+    [log_mej(minimum=-5.0, maximum=1.0), vej(minimum=0.05),
+     Parameter("beta", r"$\alpha$", 1.0, 5.0), log_kappa_r]))
+
+register_spec(ModelSpec("Me2017_A", "ejecta", Me2017_A_model,
+    [log_mej(minimum=-5.0, maximum=1.0), vej(),
+     Parameter("beta", r"$\alpha$", 1.0, 5.0), log_kappa_r,
+     Parameter("A", "A", 0.0, 10.0, log=True)]))
+
+register_spec(ModelSpec("Me2017x2", "ejecta", Me2017x2_model_ejecta,
+    [log_mej("mej1", r"${\rm log}_{10} (M_{\rm ej 1})$", -5.0, -1.0),
+     vej("vej1", r"$v_{\rm ej 1}$"),
+     Parameter("beta1", r"$\alpha_1$", 1.0, 5.0),
+     Parameter("kappa_r1", r"${\rm log}_{10} \kappa_{\rm r 1}$", 0.0, 2.0, log=True),
+     log_mej("mej2", r"${\rm log}_{10} (M_{\rm ej 2})$", -5.0, -1.0),
+     vej("vej2", r"$v_{\rm ej 2}$"),
+     Parameter("beta2", r"$\alpha_2$", 1.0, 5.0),
+     Parameter("kappa_r2", r"${\rm log}_{10} \kappa_{\rm r 2}$", -1.0, 0.0, log=True)]))
+
+register_spec(ModelSpec("WoKo2017", "ejecta", WoKo2017_model_ejecta,
+    [log_mej(), vej(), Parameter("beta", r"$\theta$", 0.0, 180.0), log_kappa_r]))
+
+register_spec(ModelSpec("SmCh2017", "ejecta", SmCh2017_model_ejecta,
+    [log_mej(), vej(), Parameter("beta", r"$\beta$", -5.0, 5.0), log_kappa_r]))
+
+register_spec(ModelSpec("Ka2017x2", "ejecta_sigma", Ka2017x2_model_ejecta,
+    two_components(), constraint=constraint_2Component,
+    errorbudget=Parameter("sigma", r"$\sigma$", 0.0, 2.0)))
+
+# fits of the binary parameters; the EOSFit ones derive the baryonic masses
+# from the gravitational masses and compactnesses
+def mass(name, label):
+    return Parameter(name, label, 1.0, 3.0)
+
+def compactness(name, label):
+    return Parameter(name, label, 0.08, 0.24)
+
+def binary(eos=False):
+    params = []
+    for ii in [1, 2]:
+        params.append(mass("m%d" % ii, r"$M_{\rm %d}$" % ii))
+        if not eos:
+            params.append(mass("mb%d" % ii, r"$M_{\rm b%d}$" % ii))
+        params.append(compactness("c%d" % ii, r"$C_{\rm %d}$" % ii))
+    return params
+
+def eos_arguments(m1, c1, m2, c2, *args):
+    return (m1, lightcurve_utils.EOSfit(m1,c1), c1,
+            m2, lightcurve_utils.EOSfit(m2,c2), c2) + args
+
+def eos_arguments_KaKy2016(q, chi_eff, mns, c, *args):
+    return (q, chi_eff, mns, lightcurve_utils.EOSfit(mns,c), c) + args
+
+def register_binary_specs(name, model, parameters, modes=("masses", "EOSFit")):
+    for mode in modes:
+        if mode == "masses":
+            register_spec(ModelSpec(name, mode, model, binary() + parameters,
+                                    constraint=constraint_masses))
+        else:
+            register_spec(ModelSpec(name, mode, model, binary(eos=True) + parameters,
+                                    constraint=constraint_masses,
+                                    arguments=eos_arguments))
+
+theta_ej = Parameter("th", r"$\theta_{\rm ej}$", 0.0, np.pi/2)
+phi_ej = Parameter("ph", r"$\phi_{\rm ej}$", 0.0, 2*np.pi)
+log_kappa_r_masses = Parameter("kappa_r", r"${\rm log}_{10} \kappa_{\rm r}$", -1.0, 2.0, log=True)
+
+kaky2016_binary = [Parameter("q", r"$q$", 3.0, 9.0),
+                   Parameter("chi_eff", r"$\chi_{\rm eff}$", 0.0, 0.75),
+                   mass("mns", r"$M_{\rm ns}$")]
+kaky2016_ejecta = [Parameter("c", r"$C$", 0.1, 0.2), theta_ej, phi_ej]
+register_spec(ModelSpec("KaKy2016", "masses", KaKy2016_model,
+    kaky2016_binary + [mass("mb", r"$M_{\rm b}$")] + kaky2016_ejecta))
+register_spec(ModelSpec("KaKy2016", "EOSFit", KaKy2016_model,
+    kaky2016_binary + kaky2016_ejecta, arguments=eos_arguments_KaKy2016))
+
+register_binary_specs("DiUj2017", DiUj2017_model, [theta_ej, phi_ej])
+register_binary_specs("BaKa2016", BaKa2016_model, [])
+register_binary_specs("Ka2017", Ka2017_model,
+    [log_xlan("xlan", "$X_{\rm lan}$", -5.0, 0.0)])
+register_spec(ModelSpec("Ka2017", "BNSFit", Ka2017_model,
+    binary(eos=True) + [log_xlan("xlan", "Xlan", -5.0, 0.0)],
+    constraint=constraint_masses, arguments=eos_arguments))
+register_binary_specs("RoFe2017", RoFe2017_model, [Parameter("ye", "Ye", 0.0, 1.0)])
+register_binary_specs("Me2017", Me2017_model,
+    [Parameter("beta", r"$\alpha$", 1.0, 5.0), log_kappa_r_masses])
+register_binary_specs("WoKo2017", WoKo2017_model,
+    [Parameter("beta", r"$\theta$", 0.0, 180.0), log_kappa_r_masses])
+register_binary_specs("SmCh2017", SmCh2017_model,
+    [Parameter("beta", r"$\beta$", -5.0, 5.0), log_kappa_r_masses])
+
+# fits of other transients, which are not run in an ejecta or masses mode
+def sn_model_fit(z, x0, x1, c):
+    return sn_model(z, 0.0, x0, x1, c)
+
+register_spec(ModelSpec("SN", None, sn_model_fit,
+    [Parameter("z", r"$z$", 0.0, 10.0), Parameter("x0", r"$x_0$", 0.0, 10.0),
+     Parameter("x1", r"$x_1$", 0.0, 10.0), Parameter("c", r"$c$", 0.0, 10.0)]))
+
+register_spec(ModelSpec("BoxFit", None, boxfit_model,
+    [Parameter("theta_0", r"$theta_0$", 0.0, np.pi/4.0),
+     Parameter("E", r"$E$", 49.0, 53.0, log=True),
+     Parameter("n", r"$n$", -4.0, 0.0, log=True),
+     Parameter("theta_obs", r"$theta_{\rm obs}$", 0.0, np.pi/4.0),
+     Parameter("p", "$p$", 2.1, 2.2),
+     Parameter("epsilon_B", "$epsilon_B$", -4.0, -1.0, log=True),
+     Parameter("epsilon_E", "$epsilon_E$", -4.0, -1.0, log=True),
+     Parameter("ksi_N", "$ksi_N$", -4.0, 0.0, log=True)],
+    constraint=constraint_boxfit))
+
+def trpi2018(E0_range=(49.0, 55.0)):
+    return [Parameter("theta_v", r"$\theta_v$", 0.0, np.pi/4.0),
+            Parameter("E0", r"$E_0$", E0_range[0], E0_range[1], log=True),
+            Parameter("theta_c", r"$\theta_c$", 0.0, np.pi/4.0),
+            Parameter("theta_w", r"$\theta_w$", 0.0, np.pi/4.0),
+            Parameter("n", r"$n$", -4.0, 0.0, log=True),
+            Parameter("p", r"$p$", 2.1, 2.5),
+            Parameter("epsilon_E", r"$\epsilon_E$", -4.0, 0.0, log=True),
+            Parameter("epsilon_B", r"$\epsilon_B$", -4.0, 0.0, log=True)]
+
+register_spec(ModelSpec("TrPi2018", None, TrPi2018_model, trpi2018()))
+
+register_spec(ModelSpec("Ka2017_TrPi2018", None, Ka2017_TrPi2018_model,
+    [log_mej(minimum=-3.0), vej(), log_xlan()] + trpi2018()))
+
+register_spec(ModelSpec("Ka2017_TrPi2018_A", None, Ka2017_TrPi2018_A_model,
+    [log_mej(), vej(), log_xlan()] + trpi2018() +
+    [Parameter("A", r"${\rm log}_{10} (A)$", 0.0, 10.0, log=True)]))
+
+register_spec(ModelSpec("Bu2019inc_TrPi2018", None, Bu2019inc_TrPi2018_model,
+    [log_mej(minimum=-3.0), phi(0.0, 90.0)] + trpi2018()))
+
+# keep the names of the hand-written callbacks these specifications replace
+for _spec in list(model_specs.values()):
+    if _spec.mode == "BNSFit":
+        # fitted with the EOSFit callbacks before
+        continue
+    _name = _spec.name
+    if _spec.mode not in [None, "masses"]:
+        _name = "%s_%s" % (_spec.name, _spec.mode)
+    globals()["myloglike_%s" % _name] = _spec.loglike
+    globals()["myprior_%s" % _name] = _spec.prior
+myloglike_sn, myprior_sn = myloglike_SN, myprior_SN
+myloglike_boxfit, myprior_boxfit = myloglike_BoxFit, myprior_BoxFit
@@ -0,0 +1,155 @@
+"""Process-wide cache of SVD surrogate models.
+
+The KNModels loaders fetch their surrogates through ``surrogates``, a
+cache keyed by model and time grid, with LRU eviction and a memory
+budget.  Explicit surrogates can still be passed to KNTable.model as
+``svd_*_model`` keyword arguments.
+
+The default budget is 4096 MB and can be changed with the
+``GWEMLIGHTCURVES_SURROGATE_CACHE_MB`` environment variable.
+"""
+
+import os, sys
+import collections
+
+import numpy as np
+
+def estimate_nbytes(obj, _seen=None):
+    """Rough estimate of the private memory held by a surrogate model.
+
+    Memory-mapped arrays are counted as zero as they live in the shared
+    page cache rather than on the heap of this process.
+    """
+
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.memmap):
+        return 0
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return obj.nbytes + sum(estimate_nbytes(x, _seen) for x in obj.flat)
+        return obj.nbytes
+    elif isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(x, _seen) for x in obj.values())
+    elif isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(x, _seen) for x in obj)
+    elif hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + estimate_nbytes(vars(obj), _seen)
+    else:
+        return sys.getsizeof(obj)
+
+class SurrogateCache(object):
+    """LRU cache of surrogate models with a memory budget.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Memory budget; least recently used entries are evicted once the
+        estimated size of the cache exceeds it.  The most recently added
+        entry is never evicted.  None disables the budget.
+    max_entries : int, optional
+        Maximum number of cached surrogates.  None disables the limit.
+
+    Functions appended to ``on_evict`` are called without arguments
+    whenever entries are evicted or the cache is cleared, so that caches
+    holding on to the surrogates (e.g. the direct evaluation functions of
+    sampler.model) can drop them as well.
+    """
+
+    def __init__(self, max_bytes=None, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.on_evict = []
+        self._entries = collections.OrderedDict()
+        self._nbytes = {}
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        value = self._entries[key]
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self._entries:
+            del self._entries[key]
+        self._entries[key] = value
+        self._nbytes[key] = estimate_nbytes(value)
+        self._evict()
+
+    def __delitem__(self, key):
+        del self._entries[key]
+        del self._nbytes[key]
+
+    def get(self, key, default=None):
+        if key in self._entries:
+            return self[key]
+        return default
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    @property
+    def nbytes(self):
+        return sum(self._nbytes.values())
+
+    def clear(self):
+        self._entries.clear()
+        self._nbytes.clear()
+        self._notify()
+
+    def _evict(self):
+        evicted = False
+        while len(self._entries) > 1:
+            too_many = (self.max_entries is not None and len(self._entries) > self.max_entries)
+            too_big = (self.max_bytes is not None and self.nbytes > self.max_bytes)
+            if not (too_many or too_big):
+                break
+            key = next(iter(self._entries))
+            del self[key]
+            evicted = True
+        if evicted:
+            self._notify()
+
+    def _notify(self):
+        for fn in self.on_evict:
+            fn()
+
+def surrogate_key(model, kind, table, ModelPath=None, LoadModel=False):
+    """Cache key of the surrogate ``kind`` of ``model`` used for ``table``.
+
+    The key holds everything that changes the surrogate built by the
+    loaders: the model name, the kind ("mag", "lbol", "spec", "color"), the
+    gp type, the number of coefficients, the time (and wavelength) grid,
+    the model directory and whether the surrogate is loaded or trained.
+    """
+
+    if 'gptype' in table.colnames:
+        gptype = str(table['gptype'][0])
+    else:
+        gptype = "sklearn"
+    if 'n_coeff' in table.colnames:
+        n_coeff = int(table['n_coeff'][0])
+    else:
+        n_coeff = None
+
+    if ModelPath is not None:
+        ModelPath = os.path.abspath(ModelPath)
+
+    key = (model, kind, gptype, n_coeff,
+           float(table['tini'][0]), float(table['tmax'][0]), float(table['dt'][0]),
+           ModelPath, bool(LoadModel))
+    if kind == "spec":
+        key = key + (float(table['lambdaini'][0]), float(table['lambdamax'][0]),
+                     float(table['dlambda'][0]))
+    return key
+
+surrogates = SurrogateCache(max_bytes=int(float(os.environ.get('GWEMLIGHTCURVES_SURROGATE_CACHE_MB', 4096))*1024**2))
@@ -2,6 +2,7 @@
 
 import os, sys, glob
 import json
+import pickle
 import numpy as np
 seed = 0
 random_state = np.random.RandomState(seed)
@@ -10,11 +11,13 @@ import scipy.interpolate
 from scipy.interpolate import interpolate as interp
 from scipy.interpolate import griddata
 import scipy.signal
+import scipy.linalg
+from scipy.spatial.distance import cdist
 
-from gwemlightcurves import lightcurve_utils, Global
+from gwemlightcurves import lightcurve_utils, profiler, Global
 
 from sklearn.gaussian_process import GaussianProcessRegressor
-from sklearn.gaussian_process.kernels import RBF, Matern, DotProduct, ConstantKernel, RationalQuadratic
+from sklearn.gaussian_process.kernels import RBF, Matern, DotProduct, ConstantKernel, RationalQuadratic, Product
 from sklearn.model_selection import train_test_split
 
 try:
@@ -1231,13 +1234,17 @@ def calc_color(tini,tmax,dt,param_list,svd_mag_color_model=None, model = "a2.0")
         #    param_list_postprocess[i] = (param_list_postprocess[i]-param_mins[i])/(param_maxs[i]-param_mins[i])
 
         param_list_postprocess = (param_list_postprocess-param_mins)/(param_maxs-param_mins)
-        cAproj = np.zeros((n_coeff,))
-        cAstd = np.zeros((n_coeff,))
-        for i in range(n_coeff):
-            gp = gps[i]
-            y_pred, sigma2_pred = gp.predict(np.atleast_2d(param_list_postprocess), return_std=True)
-            cAproj[i] = y_pred
-            cAstd[i] = sigma2_pred
+        if is_frozen_gps(gps):
+            cAproj, cAstd = predict_frozen_gps(gps, param_list_postprocess, n_coeff=n_coeff, return_std=True)
+            cAproj, cAstd = cAproj[:,0], cAstd[:,0]
+        else:
+            cAproj = np.zeros((n_coeff,))
+            cAstd = np.zeros((n_coeff,))
+            for i in range(n_coeff):
+                gp = gps[i]
+                y_pred, sigma2_pred = gp.predict(np.atleast_2d(param_list_postprocess), return_std=True)
+                cAproj[i] = y_pred[0]
+                cAstd[i] = sigma2_pred[0]
 
         coverrors = np.dot(VA[:,:n_coeff],np.dot(np.power(np.diag(cAstd[:n_coeff]),2),VA[:,:n_coeff].T))
         errors = np.diag(coverrors)
@@ -1257,8 +1264,10 @@ def calc_color(tini,tmax,dt,param_list,svd_mag_color_model=None, model = "a2.0")
     return np.squeeze(tt), mAB
 
 
+@profiler.profiled("svd_utils.calc_lc")
 def calc_lc(tini,tmax,dt,param_list,svd_mag_model=None,svd_lbol_model=None,
-            model = "BaKa2016", gptype="sklearn", n_coeff_lim=None):
+            model = "BaKa2016", gptype="sklearn", n_coeff_lim=None,
+            return_uncertainty=False):
 
     tt = np.arange(tini,tmax+dt,dt)
 
@@ -1269,6 +1278,8 @@ def calc_lc(tini,tmax,dt,param_list,svd_mag_model=None,svd_lbol_model=None,
 
     filters = ["u","g","r","i","z","y","J","H","K"]
     mAB = np.zeros((9,len(tt)))
+    if return_uncertainty:
+        mAB_err = np.zeros((9,len(tt)))
     for jj,filt in enumerate(filters):
         if n_coeff_lim is None:
             n_coeff = svd_mag_model[filt]["n_coeff"]
@@ -1294,23 +1305,32 @@ def calc_lc(tini,tmax,dt,param_list,svd_mag_model=None,svd_lbol_model=None,
             model = svd_mag_model[filt]["model"]
             cAproj = model.predict(np.atleast_2d(param_list_postprocess)).T.flatten()
             cAstd = np.ones((n_coeff,))
+        elif gptype == "sklearn" and is_frozen_gps(gps):
+            if return_uncertainty:
+                cAproj, cAstd = predict_frozen_gps(gps, param_list_postprocess, n_coeff=n_coeff, return_std=True)
+                cAproj, cAstd = cAproj[:,0], cAstd[:,0]
+            else:
+                cAproj = predict_frozen_gps(gps, param_list_postprocess, n_coeff=n_coeff)[:,0]
         else:
             cAproj = np.zeros((n_coeff,))
             cAstd = np.zeros((n_coeff,))
             for i in range(n_coeff):
                 gp = gps[i]
                 if gptype == "sklearn":
-                    y_pred, sigma2_pred = gp.predict(np.atleast_2d(param_list_postprocess), return_std=True)
-                    cAproj[i] = y_pred
-                    cAstd[i] = sigma2_pred
+                    if return_uncertainty:
+                        y_pred, sigma2_pred = gp.predict(np.atleast_2d(param_list_postprocess), return_std=True)
+                        cAstd[i] = sigma2_pred[0]
+                    else:
+                        y_pred = gp.predict(np.atleast_2d(param_list_postprocess))
+                    cAproj[i] = y_pred[0]
                 elif gptype == "gp_api":
                     y_pred = gp.mean(np.atleast_2d(param_list_postprocess))
-    
-                    y_samples_test = gp.rvs(100, np.atleast_2d(param_list_postprocess), random_state=random_state)
-                    y_90_lo_test, y_90_hi_test = np.percentile(y_samples_test, [5, 95], axis=1)    
-            
-                    cAproj[i] = y_pred
-                    cAstd[i] = y_90_hi_test - y_90_lo_test
+                    cAproj[i] = y_pred[0]
+
+                    if return_uncertainty:
+                        y_samples_test = gp.rvs(100, np.atleast_2d(param_list_postprocess), random_state=random_state)
+                        y_90_lo_test, y_90_hi_test = np.percentile(y_samples_test, [5, 95], axis=1)    
+                        cAstd[i] = y_90_hi_test[0] - y_90_lo_test[0]
                 elif gptype == "gpytorch":
                     likelihood = gpytorch.likelihoods.GaussianLikelihood()
                     model = ExactGPModel(torch.from_numpy(param_array_postprocess).float(),
@@ -1322,17 +1342,10 @@ def calc_lc(tini,tmax,dt,param_list,svd_mag_model=None,svd_lbol_model=None,
                     likelihood.eval()
     
                     f_preds = model(torch.from_numpy(np.atleast_2d(param_list_postprocess)).float())
-                    y_preds = likelihood(model(torch.from_numpy(np.atleast_2d(param_list_postprocess)).float()))
-                    f_mean = f_preds.mean
-                    f_var = f_preds.variance
-                    f_covar = f_preds.covariance_matrix               
-    
-                    cAproj[i] = f_mean
-                    cAstd[i] = f_var
+                    cAproj[i] = f_preds.mean.detach().numpy()[0]
+                    if return_uncertainty:
+                        cAstd[i] = np.sqrt(f_preds.variance.detach().numpy()[0])
 
-        coverrors = np.dot(VA[:,:n_coeff],np.dot(np.power(np.diag(cAstd[:n_coeff]),2),VA[:,:n_coeff].T))
-        errors = np.diag(coverrors)
-    
         mag_back = np.dot(VA[:,:n_coeff],cAproj)
         mag_back = mag_back*(maxs-mins)+mins
         #mag_back = scipy.signal.medfilt(mag_back,kernel_size=3)
@@ -1345,12 +1358,24 @@ def calc_lc(tini,tmax,dt,param_list,svd_mag_model=None,svd_lbol_model=None,
             maginterp = f(tt)
         mAB[jj,:] = maginterp
 
+        if return_uncertainty:
+            coverrors = np.dot(VA[:,:n_coeff],np.dot(np.power(np.diag(cAstd[:n_coeff]),2),VA[:,:n_coeff].T))
+            errors = np.sqrt(np.diag(coverrors))*(maxs-mins)
+            if len(ii) < 2:
+                errinterp = np.nan*np.ones(tt.shape)
+            else:
+                f = interp.interp1d(tt_interp[ii], errors[ii], fill_value='extrapolate')
+                errinterp = f(tt)
+            mAB_err[jj,:] = errinterp
+
     if n_coeff_lim is None:
         n_coeff = svd_lbol_model["n_coeff"]
     else:
         n_coeff = n_coeff_lim
 
     param_array = svd_lbol_model["param_array"]
+    if gptype == "gpytorch":
+        param_array_postprocess = svd_lbol_model["param_array_postprocess"]
     cAmat = svd_lbol_model["cAmat"]
     VA = svd_lbol_model["VA"]
     param_mins = svd_lbol_model["param_mins"]
@@ -1364,24 +1389,22 @@ def calc_lc(tini,tmax,dt,param_list,svd_mag_model=None,svd_lbol_model=None,
     for i in range(len(param_mins)):
         param_list_postprocess[i] = (param_list_postprocess[i]-param_mins[i])/(param_maxs[i]-param_mins[i])
 
+    # only the mean is needed for lbol, so the predictive std is never computed
     if gptype == "tensorflow":
         model = svd_lbol_model["model"]
         cAproj = model.predict(np.atleast_2d(param_list_postprocess)).T.flatten()
+    elif gptype == "sklearn" and is_frozen_gps(gps):
+        cAproj = predict_frozen_gps(gps, param_list_postprocess, n_coeff=n_coeff)[:,0]
     else:
         cAproj = np.zeros((n_coeff,))
         for i in range(n_coeff):
             gp = gps[i]
             if gptype == "sklearn":
-                y_pred, sigma2_pred = gp.predict(np.atleast_2d(param_list_postprocess), return_std=True)
-                cAproj[i] = y_pred
+                y_pred = gp.predict(np.atleast_2d(param_list_postprocess))
+                cAproj[i] = y_pred[0]
             elif gptype == "gp_api":
                 y_pred = gp.mean(np.atleast_2d(param_list_postprocess))
-    
-                y_samples_test = gp.rvs(100, np.atleast_2d(param_list_postprocess), random_state=random_state)
-                y_90_lo_test, y_90_hi_test = np.percentile(y_samples_test, [5, 95], axis=1)
-    
-                cAproj[i] = y_pred
-                cAstd[i] = y_90_hi_test - y_90_lo_test
+                cAproj[i] = y_pred[0]
             elif gptype == "gpytorch":
                 likelihood = gpytorch.likelihoods.GaussianLikelihood()
                 model = ExactGPModel(torch.from_numpy(param_array_postprocess).float(),
@@ -1393,13 +1416,7 @@ def calc_lc(tini,tmax,dt,param_list,svd_mag_model=None,svd_lbol_model=None,
                 likelihood.eval()
     
                 f_preds = model(torch.from_numpy(np.atleast_2d(param_list_postprocess)).float())
-                y_preds = likelihood(model(torch.from_numpy(np.atleast_2d(param_list_postprocess)).float()))
-                f_mean = f_preds.mean
-                f_var = f_preds.variance
-                f_covar = f_preds.covariance_matrix
-    
-                cAproj[i] = f_mean
-                cAstd[i] = f_var
+                cAproj[i] = f_preds.mean.detach().numpy()[0]
 
     lbol_back = np.dot(VA[:,:n_coeff],cAproj)
     lbol_back = lbol_back*(maxs-mins)+mins
@@ -1413,9 +1430,166 @@ def calc_lc(tini,tmax,dt,param_list,svd_mag_model=None,svd_lbol_model=None,
         lbolinterp = 10**f(tt)
     lbol = lbolinterp
 
+    if return_uncertainty:
+        return np.squeeze(tt), np.squeeze(lbol), mAB, mAB_err
     return np.squeeze(tt), np.squeeze(lbol), mAB
 
-def calc_spectra(tini,tmax,dt,lambdaini,lambdamax,dlambda,param_list,svd_spec_model=None,model = "BaKa2016"):
+@profiler.profiled("svd_utils.gp_predict")
+def calc_coeffs_batch(svd_model,param_matrix_postprocess,n_coeff,gptype="sklearn",
+                      return_std=False):
+
+    # one predict per coefficient for all rows of param_matrix_postprocess,
+    # returning the (n_coeff, nsamples) matrix of projected coefficients
+    # (and their predictive stds if return_std is set)
+    X = np.atleast_2d(param_matrix_postprocess)
+    nsamples = X.shape[0]
+
+    if gptype == "tensorflow":
+        model = svd_model["model"]
+        cAproj = model.predict(X).T[:n_coeff,:]
+        if return_std:
+            return cAproj, np.ones((n_coeff,nsamples))
+        return cAproj
+
+    gps = svd_model["gps"]
+    if gptype == "sklearn" and is_frozen_gps(gps):
+        return predict_frozen_gps(gps, X, n_coeff=n_coeff, return_std=return_std)
+
+    cAproj = np.zeros((n_coeff,nsamples))
+    cAstd = np.zeros((n_coeff,nsamples))
+    for i in range(n_coeff):
+        gp = gps[i]
+        if gptype == "sklearn":
+            if return_std:
+                cAproj[i,:], cAstd[i,:] = gp.predict(X, return_std=True)
+            else:
+                cAproj[i,:] = gp.predict(X)
+        elif gptype == "gp_api":
+            cAproj[i,:] = gp.mean(X)
+            if return_std:
+                y_samples_test = gp.rvs(100, X, random_state=random_state)
+                y_90_lo_test, y_90_hi_test = np.percentile(y_samples_test, [5, 95], axis=1)
+                cAstd[i,:] = y_90_hi_test - y_90_lo_test
+        elif gptype == "gpytorch":
+            param_array_postprocess = svd_model["param_array_postprocess"]
+            cAmat = svd_model["cAmat"]
+            likelihood = gpytorch.likelihoods.GaussianLikelihood()
+            model = ExactGPModel(torch.from_numpy(param_array_postprocess).float(),
+                                 torch.from_numpy(cAmat[i,:]).float(), likelihood)
+            model.load_state_dict(gp)
+
+            # Get into evaluation (predictive posterior) mode
+            model.eval()
+            likelihood.eval()
+
+            f_preds = model(torch.from_numpy(X).float())
+            cAproj[i,:] = f_preds.mean.detach().numpy()
+            if return_std:
+                cAstd[i,:] = np.sqrt(f_preds.variance.detach().numpy())
+
+    if return_std:
+        return cAproj, cAstd
+    return cAproj
+
+@profiler.profiled("svd_utils.interpolation")
+def interp_batch(tt_interp,data_back,tt):
+
+    # data_back is (len(tt_interp), nsamples); returns (nsamples, len(tt))
+    nsamples = data_back.shape[1]
+    datainterp = np.nan*np.ones((nsamples,len(tt)))
+
+    good = np.all(~np.isnan(data_back),axis=0)
+    if len(tt_interp) >= 2 and np.any(good):
+        f = interp.interp1d(tt_interp, data_back[:,good], axis=0, fill_value='extrapolate')
+        datainterp[good,:] = f(tt).T
+
+    # samples with missing points fall back to the per-sample interpolation
+    for kk in np.where(~good)[0]:
+        ii = np.where(~np.isnan(data_back[:,kk]))[0]
+        if len(ii) < 2:
+            continue
+        f = interp.interp1d(tt_interp[ii], data_back[ii,kk], fill_value='extrapolate')
+        datainterp[kk,:] = f(tt)
+
+    return datainterp
+
+@profiler.profiled("svd_utils.calc_lc_batch")
+def calc_lc_batch(tini,tmax,dt,param_matrix,svd_mag_model=None,svd_lbol_model=None,
+                  model = "BaKa2016", gptype="sklearn", n_coeff_lim=None,
+                  return_uncertainty=False):
+
+    tt = np.arange(tini,tmax+dt,dt)
+
+    if svd_mag_model == None:
+        svd_mag_model = calc_svd_mag(tini,tmax,dt,model=model)
+    if svd_lbol_model == None:
+        svd_lbol_model = calc_svd_lbol(tini,tmax,dt,model=model)
+
+    param_matrix = np.atleast_2d(np.array(param_matrix,dtype=float))
+    nsamples = param_matrix.shape[0]
+
+    filters = ["u","g","r","i","z","y","J","H","K"]
+    mAB = np.zeros((nsamples,9,len(tt)))
+    if return_uncertainty:
+        mAB_err = np.zeros((nsamples,9,len(tt)))
+    for jj,filt in enumerate(filters):
+        if n_coeff_lim is None:
+            n_coeff = svd_mag_model[filt]["n_coeff"]
+        else:
+            n_coeff = n_coeff_lim
+        VA = svd_mag_model[filt]["VA"]
+        param_mins = svd_mag_model[filt]["param_mins"]
+        param_maxs = svd_mag_model[filt]["param_maxs"]
+        mins = svd_mag_model[filt]["mins"]
+        maxs = svd_mag_model[filt]["maxs"]
+        tt_interp = svd_mag_model[filt]["tt"]
+
+        param_matrix_postprocess = (param_matrix-param_mins)/(param_maxs-param_mins)
+        if return_uncertainty:
+            cAproj, cAstd = calc_coeffs_batch(svd_mag_model[filt], param_matrix_postprocess, n_coeff, gptype=gptype, return_std=True)
+        else:
+            cAproj = calc_coeffs_batch(svd_mag_model[filt], param_matrix_postprocess, n_coeff, gptype=gptype)
+
+        with profiler.stage("svd_utils.svd_reconstruction"):
+            mag_back = np.dot(VA[:,:n_coeff],cAproj)
+            mag_back = mag_back*(maxs-mins)[:,np.newaxis]+mins[:,np.newaxis]
+
+        mAB[:,jj,:] = interp_batch(tt_interp, mag_back, tt)
+
+        if return_uncertainty:
+            # diagonal of VA diag(cAstd**2) VA^T for every sample
+            errors = np.sqrt(np.dot(VA[:,:n_coeff]**2,cAstd**2))
+            errors = errors*(maxs-mins)[:,np.newaxis]
+            errors[np.isnan(mag_back)] = np.nan
+            mAB_err[:,jj,:] = interp_batch(tt_interp, errors, tt)
+
+    if n_coeff_lim is None:
+        n_coeff = svd_lbol_model["n_coeff"]
+    else:
+        n_coeff = n_coeff_lim
+
+    VA = svd_lbol_model["VA"]
+    param_mins = svd_lbol_model["param_mins"]
+    param_maxs = svd_lbol_model["param_maxs"]
+    mins = svd_lbol_model["mins"]
+    maxs = svd_lbol_model["maxs"]
+    tt_interp = svd_lbol_model["tt"]
+
+    param_matrix_postprocess = (param_matrix-param_mins)/(param_maxs-param_mins)
+    cAproj = calc_coeffs_batch(svd_lbol_model, param_matrix_postprocess, n_coeff, gptype=gptype)
+
+    with profiler.stage("svd_utils.svd_reconstruction"):
+        lbol_back = np.dot(VA[:,:n_coeff],cAproj)
+        lbol_back = lbol_back*(maxs-mins)[:,np.newaxis]+mins[:,np.newaxis]
+
+    lbol = 10**interp_batch(tt_interp, lbol_back, tt)
+
+    if return_uncertainty:
+        return np.squeeze(tt), lbol, mAB, mAB_err
+    return np.squeeze(tt), lbol, mAB
+
+def calc_spectra(tini,tmax,dt,lambdaini,lambdamax,dlambda,param_list,svd_spec_model=None,model = "BaKa2016",
+                 gptype="sklearn", n_coeff_lim=None, return_uncertainty=False):
 
     tt = np.arange(tini,tmax+dt,dt)
     #lambdas = np.arange(lambdaini,lambdamax+dlambda,dlambda)
@@ -1425,8 +1599,13 @@ def calc_spectra(tini,tmax,dt,lambdaini,lambdamax,dlambda,param_list,svd_spec_mo
         svd_spec_model = calc_svd_spec(tini,tmax,dt,lambdaini,lambdamax,dlambda,model=model)
  
     spec = np.zeros((len(lambdas),len(tt)))
+    if return_uncertainty:
+        spec_err = np.zeros((len(lambdas),len(tt)))
     for jj,lambda_d in enumerate(lambdas):
-        n_coeff = svd_spec_model[lambda_d]["n_coeff"]
+        if n_coeff_lim is None:
+            n_coeff = svd_spec_model[lambda_d]["n_coeff"]
+        else:
+            n_coeff = n_coeff_lim
         param_array = svd_spec_model[lambda_d]["param_array"]
         cAmat = svd_spec_model[lambda_d]["cAmat"]
         cAstd = svd_spec_model[lambda_d]["cAstd"]
@@ -1442,11 +1621,23 @@ def calc_spectra(tini,tmax,dt,lambdaini,lambdamax,dlambda,param_list,svd_spec_mo
         for i in range(len(param_mins)):
             param_list_postprocess[i] = (param_list_postprocess[i]-param_mins[i])/(param_maxs[i]-param_mins[i])
 
-        cAproj = np.zeros((n_coeff,))
-        for i in range(n_coeff):
-            gp = gps[i]
-            y_pred, sigma2_pred = gp.predict(np.atleast_2d(param_list_postprocess), return_std=True)
-            cAproj[i] = y_pred
+        if is_frozen_gps(gps):
+            if return_uncertainty:
+                cAproj, cAstd = predict_frozen_gps(gps, param_list_postprocess, n_coeff=n_coeff, return_std=True)
+                cAproj, cAstd = cAproj[:,0], cAstd[:,0]
+            else:
+                cAproj = predict_frozen_gps(gps, param_list_postprocess, n_coeff=n_coeff)[:,0]
+        else:
+            cAproj = np.zeros((n_coeff,))
+            cAstd = np.zeros((n_coeff,))
+            for i in range(n_coeff):
+                gp = gps[i]
+                if return_uncertainty:
+                    y_pred, sigma2_pred = gp.predict(np.atleast_2d(param_list_postprocess), return_std=True)
+                    cAstd[i] = sigma2_pred[0]
+                else:
+                    y_pred = gp.predict(np.atleast_2d(param_list_postprocess))
+                cAproj[i] = y_pred[0]
 
         spectra_back = np.dot(VA[:,:n_coeff],cAproj)
         spectra_back = spectra_back*(maxs-mins)+mins
@@ -1465,6 +1656,16 @@ def calc_spectra(tini,tmax,dt,lambdaini,lambdamax,dlambda,param_list,svd_spec_mo
             specinterp = 10**f(tt)
         spec[jj,:] = specinterp
 
+        if return_uncertainty:
+            # uncertainty on log10 of the spectra, in dex
+            errors = np.sqrt(np.dot(VA[:,:n_coeff]**2,cAstd[:n_coeff]**2))*(maxs-mins)
+            if len(ii) < 2:
+                errinterp = np.nan*np.ones(tt.shape)
+            else:
+                f = interp.interp1d(tt_interp[ii], errors[ii], fill_value='extrapolate')
+                errinterp = f(tt)
+            spec_err[jj,:] = errinterp
+
     for jj, t in enumerate(tt):
         spectra_back = np.log10(spec[:,jj])
         spectra_back[~np.isfinite(spectra_back)] = -99.0
@@ -1480,6 +1681,8 @@ def calc_spectra(tini,tmax,dt,lambdaini,lambdamax,dlambda,param_list,svd_spec_mo
             specinterp = 10**f(lambdas)
         spec[:,jj] = specinterp
 
+    if return_uncertainty:
+        return np.squeeze(tt), np.squeeze(lambdas), spec, spec_err
     return np.squeeze(tt), np.squeeze(lambdas), spec
 
 def load_gpapi(gp):
@@ -1516,3 +1719,408 @@ def load_gpapi(gp):
                            hypercube_rescale=hypercube_rescale,
                            param_names=param_names,
                            metadata=metadata)
+
+def freeze_gps(gps, n_coeff=None, store_std=True):
+
+    # Pack a list of fitted sklearn GaussianProcessRegressors with
+    # (ConstantKernel *) RationalQuadratic kernels into contiguous arrays,
+    # so that all coefficients can be predicted with a single kernel
+    # evaluation. The Cholesky factors are only kept if store_std is set.
+    if n_coeff is None:
+        n_coeff = len(gps)
+    gps = gps[:n_coeff]
+
+    X_train = np.asarray(gps[0].X_train_, dtype=float)
+    n_train = X_train.shape[0]
+
+    frozen = {}
+    frozen["frozen_version"] = 1
+    frozen["X_train"] = X_train
+    frozen["alpha"] = np.zeros((n_coeff,n_train))
+    frozen["constant_value"] = np.ones((n_coeff,))
+    frozen["length_scale"] = np.zeros((n_coeff,))
+    frozen["rq_alpha"] = np.zeros((n_coeff,))
+    frozen["y_train_mean"] = np.zeros((n_coeff,))
+    frozen["y_train_std"] = np.ones((n_coeff,))
+    if store_std:
+        frozen["L"] = np.zeros((n_coeff,n_train,n_train))
+
+    for i, gp in enumerate(gps):
+        if not np.array_equal(gp.X_train_, X_train):
+            raise ValueError("All GPs must share the same training inputs to be frozen")
+
+        kernel = gp.kernel_
+        if isinstance(kernel, Product) and isinstance(kernel.k1, ConstantKernel):
+            frozen["constant_value"][i] = kernel.k1.constant_value
+            kernel = kernel.k2
+        if not isinstance(kernel, RationalQuadratic):
+            raise ValueError("Only (ConstantKernel *) RationalQuadratic kernels can be frozen, not %s" % gp.kernel_)
+        frozen["length_scale"][i] = kernel.length_scale
+        frozen["rq_alpha"][i] = kernel.alpha
+
+        frozen["alpha"][i,:] = np.ravel(gp.alpha_)
+        frozen["y_train_mean"][i] = np.ravel(getattr(gp, "_y_train_mean", 0.0))[0]
+        frozen["y_train_std"][i] = np.ravel(getattr(gp, "_y_train_std", 1.0))[0]
+        if store_std:
+            frozen["L"][i,:,:] = gp.L_
+
+    return frozen
+
+def is_frozen_gps(gps):
+
+    return isinstance(gps, dict) and "frozen_version" in gps
+
+def freeze_svd_model(svd_model, store_std=True):
+
+    # Return a copy of an svd_*_model with every list of sklearn GPs replaced
+    # by its frozen counterpart; works for the lbol (single entry) as well as
+    # the per-filter and per-wavelength layouts.
+    if "gps" in svd_model:
+        svd_model_frozen = dict(svd_model)
+        if not is_frozen_gps(svd_model["gps"]):
+            svd_model_frozen["gps"] = freeze_gps(svd_model["gps"],
+                                                 n_coeff=svd_model["n_coeff"],
+                                                 store_std=store_std)
+        return svd_model_frozen
+
+    svd_model_frozen = {}
+    for key in svd_model.keys():
+        svd_model_frozen[key] = freeze_svd_model(svd_model[key], store_std=store_std)
+    return svd_model_frozen
+
+def predict_frozen_gps(frozen_gps, X, n_coeff=None, return_std=False):
+
+    # returns the (n_coeff, nsamples) predictive means (and stds)
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    if n_coeff is None:
+        n_coeff = len(frozen_gps["alpha"])
+
+    X_train = frozen_gps["X_train"]
+    alpha = frozen_gps["alpha"][:n_coeff]
+    constant_value = frozen_gps["constant_value"][:n_coeff,np.newaxis,np.newaxis]
+    rq_alpha = frozen_gps["rq_alpha"][:n_coeff,np.newaxis,np.newaxis]
+    length_scale = frozen_gps["length_scale"][:n_coeff,np.newaxis,np.newaxis]
+    y_train_mean = frozen_gps["y_train_mean"][:n_coeff,np.newaxis]
+    y_train_std = frozen_gps["y_train_std"][:n_coeff,np.newaxis]
+
+    if return_std and not "L" in frozen_gps:
+        raise ValueError("Frozen GPs were built without the Cholesky factors needed for return_std; convert the surrogate again with store_std=True")
+
+    nsamples = X.shape[0]
+    n_train = X_train.shape[0]
+    y_mean = np.zeros((n_coeff,nsamples))
+    if return_std:
+        y_std = np.zeros((n_coeff,nsamples))
+
+    # keep the (n_coeff, chunk, n_train) kernel tensor to a few tens of MB
+    chunk = max(1, int(2**22/max(1,n_coeff*n_train)))
+    for start in range(0, nsamples, chunk):
+        X_chunk = X[start:start+chunk]
+        dists = cdist(X_chunk, X_train, metric='sqeuclidean')
+        K_trans = constant_value*(1.0 + dists[np.newaxis,:,:]/(2*rq_alpha*length_scale**2))**(-rq_alpha)
+        y_mean[:,start:start+chunk] = np.einsum('knt,kt->kn', K_trans, alpha)
+        if return_std:
+            for i in range(n_coeff):
+                V = scipy.linalg.solve_triangular(frozen_gps["L"][i], K_trans[i].T, lower=True, check_finite=False)
+                y_var = constant_value[i,0,0] - np.einsum("ij,ij->j", V, V)
+                y_var[y_var < 0] = 0.0
+                y_std[i,start:start+chunk] = np.sqrt(y_var)
+
+    y_mean = y_train_std*y_mean + y_train_mean
+    if return_std:
+        return y_mean, y_std*y_train_std
+    return y_mean
+
+# Versioned on-disk format for the numeric content of an svd_*_model: a
+# directory of .npy files (one subdirectory per filter or wavelength) plus a
+# surrogate.json index. Arrays are opened with np.load(mmap_mode='r'), so
+# processes on one node share a single page-cache copy of each file.
+SURROGATE_VERSION = 1
+SURROGATE_ARRAYS = ["VA", "cAmat", "cAstd", "param_array",
+                    "param_array_postprocess", "param_mins", "param_maxs",
+                    "mins", "maxs", "tt"]
+
+def get_surrogate_path(model, kind, modelpath="../output/svdmodels"):
+
+    return os.path.join(modelpath, '%s_%s.surrogate' % (model, kind))
+
+def get_color_surrogate_path(colormodel, modelpath="../output/svdmodels"):
+
+    return os.path.join(modelpath, '%s.surrogate' % colormodel)
+
+def write_surrogate_entry(svd_model, outdir, store_std=True):
+
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+
+    gps = svd_model["gps"]
+    if not is_frozen_gps(gps):
+        gps = freeze_gps(gps, n_coeff=svd_model["n_coeff"], store_std=store_std)
+
+    arrays = []
+    for name in SURROGATE_ARRAYS:
+        if not name in svd_model: continue
+        np.save(os.path.join(outdir, '%s.npy' % name), np.asarray(svd_model[name], dtype=float))
+        arrays.append(name)
+    gp_arrays = []
+    for name in gps.keys():
+        if name == "frozen_version": continue
+        np.save(os.path.join(outdir, 'gps_%s.npy' % name), np.asarray(gps[name], dtype=float))
+        gp_arrays.append(name)
+
+    return {"n_coeff": int(svd_model["n_coeff"]),
+            "frozen_version": gps["frozen_version"],
+            "arrays": arrays,
+            "gp_arrays": gp_arrays}
+
+def read_surrogate_entry(indir, entry, mmap_mode='r'):
+
+    svd_model = {}
+    svd_model["n_coeff"] = entry["n_coeff"]
+    for name in entry["arrays"]:
+        svd_model[name] = np.load(os.path.join(indir, '%s.npy' % name), mmap_mode=mmap_mode)
+    gps = {}
+    gps["frozen_version"] = entry["frozen_version"]
+    for name in entry["gp_arrays"]:
+        gps[name] = np.load(os.path.join(indir, 'gps_%s.npy' % name), mmap_mode=mmap_mode)
+    svd_model["gps"] = gps
+
+    return svd_model
+
+def save_surrogate(svd_model, model, kind, modelpath="../output/svdmodels",
+                   store_std=True, surrogatepath=None):
+
+    if surrogatepath is None:
+        surrogatepath = get_surrogate_path(model, kind, modelpath=modelpath)
+    if os.path.isdir(surrogatepath):
+        raise ValueError('Surrogate %s already exists' % surrogatepath)
+
+    # write into a temporary directory first so that readers never see a
+    # half-written store
+    tmppath = '%s.tmp%d' % (surrogatepath, os.getpid())
+    os.makedirs(tmppath)
+
+    metadata = {}
+    metadata["version"] = SURROGATE_VERSION
+    metadata["model"] = model
+    metadata["kind"] = kind
+    if "gps" in svd_model:
+        metadata["keys"] = None
+        metadata["entries"] = [write_surrogate_entry(svd_model, tmppath, store_std=store_std)]
+    else:
+        keys = list(svd_model.keys())
+        metadata["keys"] = [key if isinstance(key, str) else float(key) for key in keys]
+        metadata["entries"] = []
+        for ii, key in enumerate(keys):
+            outdir = os.path.join(tmppath, '%d' % ii)
+            metadata["entries"].append(write_surrogate_entry(svd_model[key], outdir, store_std=store_std))
+
+    with open(os.path.join(tmppath, 'surrogate.json'), 'w') as fid:
+        json.dump(metadata, fid, indent=1)
+    os.rename(tmppath, surrogatepath)
+
+    return surrogatepath
+
+def read_surrogate(surrogatepath, mmap_mode='r'):
+
+    with open(os.path.join(surrogatepath, 'surrogate.json'), 'r') as fid:
+        metadata = json.load(fid)
+    if metadata["version"] > SURROGATE_VERSION:
+        raise ValueError('Surrogate %s has version %d, this version of gwemlightcurves reads up to %d' % (surrogatepath, metadata["version"], SURROGATE_VERSION))
+
+    if metadata["keys"] is None:
+        return read_surrogate_entry(surrogatepath, metadata["entries"][0], mmap_mode=mmap_mode)
+
+    svd_model = {}
+    for ii, (key, entry) in enumerate(zip(metadata["keys"], metadata["entries"])):
+        indir = os.path.join(surrogatepath, '%d' % ii)
+        svd_model[key] = read_surrogate_entry(indir, entry, mmap_mode=mmap_mode)
+    return svd_model
+
+def load_surrogate(model, kind, modelpath="../output/svdmodels", mmap_mode='r'):
+
+    surrogatepath = get_surrogate_path(model, kind, modelpath=modelpath)
+    if not os.path.isdir(surrogatepath):
+        raise IOError('No surrogate found at %s; convert the pickle with convert_surrogate first' % surrogatepath)
+    return read_surrogate(surrogatepath, mmap_mode=mmap_mode)
+
+def convert_surrogate(model, kind, modelpath="../output/svdmodels",
+                      store_std=True):
+
+    modelfile = os.path.join(modelpath, '%s_%s.pkl' % (model, kind))
+    with open(modelfile, 'rb') as handle:
+        svd_model = pickle.load(handle)
+    return save_surrogate(svd_model, model, kind, modelpath=modelpath,
+                          store_std=store_std)
+
+def convert_color_surrogate(colormodel, modelpath="../output/svdmodels",
+                            store_std=True):
+
+    # colour models (e.g. Ka2017inc's) are pickled as <colormodel>.pkl
+    # rather than <model>_<kind>.pkl
+    modelfile = os.path.join(modelpath, '%s.pkl' % colormodel)
+    with open(modelfile, 'rb') as handle:
+        svd_model = pickle.load(handle)
+    surrogatepath = get_color_surrogate_path(colormodel, modelpath=modelpath)
+    return save_surrogate(svd_model, colormodel, "color", modelpath=modelpath,
+                          store_std=store_std, surrogatepath=surrogatepath)
+
+@profiler.profiled("svd_utils.load_svd_model")
+def load_svd_model(modelfile, mmap_mode='r'):
+
+    # prefer a converted surrogate store next to the pickle if there is one,
+    # unless the pickle was retrained after the conversion
+    surrogatepath = modelfile.replace(".pkl", ".surrogate")
+    if os.path.isdir(surrogatepath) and (not os.path.isfile(modelfile) or
+            os.path.getmtime(os.path.join(surrogatepath, 'surrogate.json')) >= os.path.getmtime(modelfile)):
+        return read_surrogate(surrogatepath, mmap_mode=mmap_mode)
+
+    with open(modelfile, 'rb') as handle:
+        svd_model = pickle.load(handle)
+    return svd_model
+
+# suffixes of the mag and lbol surrogate pickles trained with each gptype
+SURROGATE_GPTYPE_SUFFIXES = {"sklearn": "",
+                             "gpytorch": "_gpy",
+                             "gp_api": "_gpapi",
+                             "tensorflow": "_tf"}
+
+def get_surrogate_modelfile(stem, kind, gptype="sklearn",
+                            modelpath="../output/svdmodels"):
+
+    if kind == "spec":
+        return os.path.join(modelpath, '%s_spec.pkl' % stem)
+    return os.path.join(modelpath, '%s_%s%s.pkl' % (stem, kind, SURROGATE_GPTYPE_SUFFIXES[gptype]))
+
+def tensorflow_models(svd_model, kind, modelfile):
+    """(entry, h5 file) of the keras models of a tensorflow surrogate."""
+
+    outdir = modelfile.replace(".pkl","")
+    if kind == "lbol":
+        return [(svd_model, os.path.join(outdir, 'model.h5'))]
+    return [(svd_model[filt], os.path.join(outdir, '%s.h5' % filt)) for filt in svd_model.keys()]
+
+def train_surrogate(model, kind, table, gptype="sklearn"):
+
+    tini, tmax, dt = table['tini'][0], table['tmax'][0], table['dt'][0]
+    n_coeff = table['n_coeff'][0]
+    if kind == "mag":
+        return calc_svd_mag(tini, tmax, dt, model = model, n_coeff = n_coeff, gptype=gptype)
+    elif kind == "lbol":
+        return calc_svd_lbol(tini, tmax, dt, model = model, n_coeff = n_coeff, gptype=gptype)
+    elif kind == "spec":
+        return calc_svd_spectra(tini, tmax, dt, table['lambdaini'][0], table['lambdamax'][0], table['dlambda'][0], model = model, n_coeff = n_coeff)
+    raise ValueError('Unknown surrogate kind %s' % kind)
+
+def load_surrogate_kind(model, kind, table, stem=None, LoadModel=False,
+                        SaveModel=False, ModelPath=None, override=0):
+    """Surrogate ``kind`` ("mag", "lbol" or "spec") of ``model``, see load_surrogates."""
+
+    from gwemlightcurves import surrogate_cache
+
+    if stem is None:
+        stem = model
+    if not override == 0:
+        return override
+
+    key = surrogate_cache.surrogate_key(stem, kind, table, ModelPath=ModelPath,
+                                        LoadModel=LoadModel)
+    if key in surrogate_cache.surrogates:
+        return surrogate_cache.surrogates[key]
+
+    gptype = str(table['gptype'][0])
+    if LoadModel or SaveModel:
+        if ModelPath is None:
+            raise ValueError('Cannot load or save model without specifying ModelPath')
+        modelfile = get_surrogate_modelfile(stem, kind, gptype=gptype, modelpath=ModelPath)
+
+    if LoadModel:
+        svd_model = load_svd_model(modelfile)
+        if gptype == "tensorflow":
+            from tensorflow.keras.models import load_model
+            for entry, outfile in tensorflow_models(svd_model, kind, modelfile):
+                entry['model'] = load_model(outfile)
+    else:
+        svd_model = train_surrogate(model, kind, table, gptype=gptype)
+        if SaveModel:
+            if gptype == "tensorflow":
+                # the keras models are saved next to the pickle
+                models = tensorflow_models(svd_model, kind, modelfile)
+                for entry, outfile in models:
+                    if not os.path.isdir(os.path.dirname(outfile)):
+                        os.makedirs(os.path.dirname(outfile))
+                    entry['model'].save(outfile)
+                keras_models = [entry.pop('model') for entry, outfile in models]
+            with open(modelfile, 'wb') as handle:
+                pickle.dump(svd_model, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            if gptype == "tensorflow":
+                for (entry, outfile), keras_model in zip(models, keras_models):
+                    entry['model'] = keras_model
+
+    if gptype == "gp_api":
+        entries = [svd_model] if kind == "lbol" else svd_model.values()
+        for entry in entries:
+            for ii in range(len(entry["gps"])):
+                entry["gps"][ii] = load_gpapi(entry["gps"][ii])
+
+    surrogate_cache.surrogates[key] = svd_model
+    return svd_model
+
+def load_surrogates(model, table, stem=None, n_coeff=43, modelfiles=True,
+                    **kwargs):
+    """Surrogate models of ``model`` for the time grid of ``table``.
+
+    Returns the mag and lbol surrogates, or the spectral surrogate with
+    doSpec.  Surrogates are taken from gwemlightcurves.surrogate_cache if
+    they are there; otherwise they are read from
+    ``<ModelPath>/<stem>_<kind>.pkl`` (or its converted surrogate store)
+    with LoadModel, or trained and, with SaveModel, pickled there.
+    Missing n_coeff and gptype columns are added to ``table``.
+
+    Parameters
+    ----------
+    model : str
+        Name of the model grid the surrogates are trained on.
+    table : KNTable
+        Samples, giving the time (and wavelength) grid and gptype.
+    stem : str, optional
+        File name stem of the pickles, ``model`` by default.
+    n_coeff : int, optional
+        Default number of coefficients of the mag and lbol surrogates;
+        the spectral surrogates default to 21.
+    modelfiles : bool, optional
+        False for the models whose surrogates are only trained in
+        process; LoadModel and SaveModel are then ignored.
+    **kwargs
+        The keyword arguments of KNTable.model: LoadModel, SaveModel,
+        ModelPath, doAB, doSpec and the svd_mag_model, svd_lbol_model and
+        svd_spec_model overrides.
+    """
+
+    doAB = kwargs.get('doAB', True)
+    doSpec = kwargs.get('doSpec', False)
+    files = {'LoadModel': modelfiles and kwargs.get('LoadModel', False),
+             'SaveModel': modelfiles and kwargs.get('SaveModel', False),
+             'ModelPath': kwargs.get('ModelPath', None)}
+
+    if not 'n_coeff' in table.colnames:
+        if doAB:
+            table['n_coeff'] = n_coeff
+        elif doSpec:
+            table['n_coeff'] = 21
+
+    if not 'gptype' in table.colnames:
+        table['gptype'] = 'sklearn'
+
+    if doAB:
+        svd_mag_model = load_surrogate_kind(model, "mag", table, stem=stem,
+                                            override=kwargs.get('svd_mag_model', 0),
+                                            **files)
+        svd_lbol_model = load_surrogate_kind(model, "lbol", table, stem=stem,
+                                             override=kwargs.get('svd_lbol_model', 0),
+                                             **files)
+        return svd_mag_model, svd_lbol_model
+    elif doSpec:
+        return load_surrogate_kind(model, "spec", table, stem=stem,
+                                   override=kwargs.get('svd_spec_model', 0),
+                                   **files)
@@ -98,6 +98,9 @@ setup(
     packages=find_packages(),
     scripts=get_scripts(),
     include_package_data=True,
+    # input/ is not a package, the EOS bundle is installed next to the
+    # interpreter, where eos_tools.bundle_path looks for it
+    data_files=[('share/gwemlightcurves', ['input/eos_tables.npz'])],
 
     # dependencies
     cmdclass=CMDCLASS,
@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+
+from gwemlightcurves.KNModels.io import DiUj2017
+
+
+class TestDiUj2017(unittest.TestCase):
+
+    # (mej, vej, th, ph) rows and light curves at t[IDX] from the
+    # original per-timestep calc_lc
+    PARAMS = np.array([[0.005, 0.15, 0.2, 3.14],
+                       [0.01, 0.2, 0.5, 2.0],
+                       [0.05, 0.25, 0.1, 3.0]])
+    IDX = [6, 9, 12, 15, 18]
+    LBOL = np.array([
+        [2.424156697e+40, 1.509681467e+40, 1.075966921e+40, 8.264534767e+39, 6.658019319e+39],
+        [5.857130371e+40, 3.774203668e+40, 2.689917302e+40, 2.066133692e+40, 1.66450483e+40],
+        [2.222143639e+41, 1.383874678e+41, 9.863030107e+40, 7.575823537e+40, 6.103184375e+40],
+    ])
+    MAG = np.array([
+        [
+            [-1.924562266, np.nan, np.nan, np.nan, np.nan],
+            [-6.399890973, -2.789766805, -0.61677482, np.nan, np.nan],
+            [-9.688188387, -7.309320059, -5.018638483, -3.952940903, -3.667801079],
+            [-11.83894702, -10.20307895, -8.627850381, -7.327854068, -6.251365752],
+            [-13.34275725, -12.32550327, -10.87621992, -9.61698604, -8.413731618],
+            [-13.41938099, -12.49498703, -11.18964359, -10.02188792, -8.930438571],
+            [-13.64203807, -12.98748143, -12.10040576, -11.19847203, -10.43191147],
+            [-12.88072461, -12.59253701, -12.38344078, -12.0341821, -11.60259933],
+            [-12.10176693, -13.16606343, -13.35115717, -13.32391429, -13.21909105],
+        ],
+        [
+            [-4.261762445, 0.5005358712, np.nan, np.nan, np.nan],
+            [-8.454921502, -5.633641144, -2.827788737, -1.294764935, np.nan],
+            [-11.22223642, -9.523876833, -7.517201747, -5.700971832, -4.810239263],
+            [-13.14503314, -11.93937426, -10.55369783, -9.322602532, -8.27999035],
+            [-14.4615034, -13.71122633, -12.74594174, -11.57074733, -10.55533326],
+            [-14.46261531, -13.81733438, -12.94514368, -11.88574427, -10.94196251],
+            [-14.46584635, -14.12566846, -13.52399464, -12.80107812, -12.06544912],
+            [-13.57818214, -13.45926157, -13.25858749, -13.09294246, -12.82449512],
+            [-12.2117889, -13.32345743, -13.97370536, -14.06510363, -14.04986764],
+        ],
+        [
+            [np.nan, -6.059439118, -3.723848819, -0.2575768684, np.nan],
+            [np.nan, -9.816697408, -8.159378205, -6.396535527, -4.671129989],
+            [np.nan, -12.40309415, -11.33950371, -10.28432039, -9.055723735],
+            [np.nan, -14.21563621, -13.4351289, -12.69822189, -11.86859879],
+            [np.nan, -15.48915041, -14.89388678, -14.46854931, -13.9411253],
+            [np.nan, -15.43951016, -14.95918571, -14.57450338, -14.09556161],
+            [np.nan, -15.29526305, -15.14893461, -14.88239003, -14.54433033],
+            [np.nan, -14.28912757, -14.36838869, -14.21537007, -14.08247547],
+            [np.nan, -12.71214307, -13.45048887, -14.07626142, -14.56099784],
+        ],
+    ])
+
+
+    def test_getBC(self):
+        td, bct = DiUj2017.TD, DiUj2017.BCT
+        # on the table nodes the corrections are the tabulated values
+        bc = DiUj2017.getBC(td, DiUj2017.BC, bct, td[10:20], 1)
+        np.testing.assert_allclose(bc, bct[:, 10:20])
+        # half way between nodes they are the mean of their neighbours
+        tt = 0.5*(td[10:20] + td[11:21])
+        bc = DiUj2017.getBC(td, DiUj2017.BC, bct, tt, 1)
+        np.testing.assert_allclose(bc, 0.5*(bct[:, 10:20] + bct[:, 11:21]))
+        # outside the table there is no correction
+        self.assertTrue(np.all(np.isnan(DiUj2017.getBC(td, DiUj2017.BC, bct, td[-1]+1.0, 1))))
+
+    def test_calc_lc_batch(self):
+        mej = np.array([0.005, 0.01, 0.05])
+        vej = np.array([0.15, 0.2, 0.25])
+        t, lbol, mag = DiUj2017.calc_lc_batch(0.1, 14.0, 0.1, mej, vej, 0.02,
+                                              0.2, 3.14, 10.0, 1.58e10, 1.2,
+                                              0.5, 1)
+        self.assertEqual(lbol.shape, (3, len(t)))
+        self.assertEqual(mag.shape, (3, 9, len(t)))
+        for i in range(3):
+            t_i, lbol_i, mag_i = DiUj2017.calc_lc(0.1, 14.0, 0.1, mej[i], vej[i],
+                                                 0.02, 0.2, 3.14, 10.0, 1.58e10,
+                                                 1.2, 0.5, 1)
+            np.testing.assert_allclose(lbol[i], lbol_i)
+            for ii in range(9):
+                np.testing.assert_allclose(mag[i, ii], mag_i[ii])
+
+    def test_calc_lc_reference(self):
+        mej, vej, th, ph = self.PARAMS.T
+        t, lbol, mag = DiUj2017.calc_lc_batch(0.1, 14.0, 0.5, mej, vej, 0.02, th,
+                                              ph, 10.0, 1.58e10, 1.2, 0.5, 1)
+        np.testing.assert_allclose(t[self.IDX], 0.1 + 0.5*np.array(self.IDX))
+        np.testing.assert_allclose(lbol[:, self.IDX], self.LBOL, rtol=1e-8)
+        np.testing.assert_allclose(mag[:, :, self.IDX], self.MAG, rtol=1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+
+from gwemlightcurves.KNModels.io import KaKy2016
+
+
+class TestKaKy2016(unittest.TestCase):
+
+    # (mej, vej, th, ph) rows and light curves at t[IDX] from the
+    # original per-timestep calc_lc
+    PARAMS = np.array([[0.005, 0.15, 0.2, 3.14],
+                       [0.01, 0.2, 0.5, 2.0],
+                       [0.05, 0.25, 0.1, 3.0]])
+    IDX = [6, 9, 12, 15, 18]
+    LBOL = np.array([
+        [2.424156697e+40, 1.509681467e+40, 1.075966921e+40, 8.264534767e+39, 6.658019319e+39],
+        [5.487332697e+40, 3.774203668e+40, 2.689917302e+40, 2.066133692e+40, 1.66450483e+40],
+        [2.222143639e+41, 1.383874678e+41, 9.863030107e+40, 7.575823537e+40, 6.103184375e+40],
+    ])
+    MAG = np.array([
+        [
+            [-8.847945255, -6.217308934, -4.858833921, -3.405167528, 0.6470192505],
+            [-10.54458975, -8.325432092, -6.675028472, -5.542650473, -3.969892399],
+            [-11.77130163, -10.22264348, -8.935028645, -7.892599459, -6.539892399],
+            [-12.68127229, -11.61746884, -10.78441459, -9.898685496, -8.96222721],
+            [-13.49270705, -12.78081994, -12.21269627, -11.46837502, -10.56035318],
+            [-13.38081295, -12.8703124, -12.34542127, -11.70563208, -10.88934489],
+            [-13.05566548, -13.13036406, -12.73110021, -12.3950655, -11.84534544],
+            [-11.60611871, -12.1822942, -12.20116085, -12.14858716, -12.12142832],
+            [-9.644281726, -10.7223475, -11.54275378, -12.18428042, -12.52439296],
+        ],
+        [
+            [-10.64816485, -8.474899055, -6.504283411, -5.546865097, -4.308227827],
+            [-12.15178223, -10.29405012, -8.625116744, -7.374248552, -6.49444142],
+            [-13.06366875, -11.81287162, -10.63678341, -9.632429039, -8.781722973],
+            [-13.74729942, -12.86890647, -12.17733897, -11.48475691, -10.76521812],
+            [-14.30397051, -13.90254465, -13.39456119, -12.91574881, -12.31871326],
+            [-14.07384575, -13.90144708, -13.49185115, -13.04979449, -12.53737954],
+            [-13.40513771, -13.8982577, -13.77456119, -13.43931113, -13.17279093],
+            [-11.51539962, -12.69844492, -12.90928341, -12.91299551, -12.8699754],
+            [-9.624942214, -10.9523652, -11.58372785, -12.26564768, -12.80104336],
+        ],
+        [
+            [np.nan, -12.10795697, -10.55033306, -9.236089796, -7.964124101],
+            [np.nan, -13.40792125, -12.23497342, -11.05400911, -10.03681513],
+            [np.nan, -14.15589239, -13.38991471, -12.57162468, -11.84705675],
+            [np.nan, -14.74431827, -14.26425179, -13.626767, -13.16135455],
+            [np.nan, -15.20115021, -15.02004086, -14.65965297, -14.30215793],
+            [np.nan, -14.92231042, -14.88250074, -14.65805972, -14.38505289],
+            [np.nan, -14.11204381, -14.48282979, -14.65343, -14.62593323],
+            [np.nan, -12.19502284, -12.95785878, -13.45262882, -13.64565235],
+            [np.nan, -10.63338709, -10.96796538, -11.70545022, -12.11806249],
+        ],
+    ])
+
+
+    def test_getBC(self):
+        td, bc = KaKy2016.TD, KaKy2016.BC
+        # on the table nodes the corrections are the tabulated values
+        np.testing.assert_allclose(KaKy2016.getBC(td, bc, td[10:20]),
+                                   bc[:, 10:20])
+        # half way between nodes they are the mean of their neighbours
+        tt = 0.5*(td[10:20] + td[11:21])
+        np.testing.assert_allclose(KaKy2016.getBC(td, bc, tt),
+                                   0.5*(bc[:, 10:20] + bc[:, 11:21]))
+        # outside the table there is no correction
+        self.assertTrue(np.all(np.isnan(KaKy2016.getBC(td, bc, td[0]-1.0))))
+
+    def test_calc_lc_batch(self):
+        mej = np.array([0.005, 0.01, 0.05])
+        vej = np.array([0.15, 0.2, 0.25])
+        t, lbol, mag = KaKy2016.calc_lc_batch(0.1, 14.0, 0.1, mej, vej, 0.02,
+                                              0.2, 3.14, 10.0, 1.58e10, 1.2,
+                                              0.5)
+        self.assertEqual(lbol.shape, (3, len(t)))
+        self.assertEqual(mag.shape, (3, 9, len(t)))
+        for i in range(3):
+            t_i, lbol_i, mag_i = KaKy2016.calc_lc(0.1, 14.0, 0.1, mej[i], vej[i],
+                                                 0.02, 0.2, 3.14, 10.0, 1.58e10,
+                                                 1.2, 0.5)
+            np.testing.assert_allclose(lbol[i], lbol_i)
+            for ii in range(9):
+                np.testing.assert_allclose(mag[i, ii], mag_i[ii])
+
+    def test_calc_lc_reference(self):
+        mej, vej, th, ph = self.PARAMS.T
+        t, lbol, mag = KaKy2016.calc_lc_batch(0.1, 14.0, 0.5, mej, vej, 0.02, th,
+                                              ph, 10.0, 1.58e10, 1.2, 0.5)
+        np.testing.assert_allclose(t[self.IDX], 0.1 + 0.5*np.array(self.IDX))
+        np.testing.assert_allclose(lbol[:, self.IDX], self.LBOL, rtol=1e-8)
+        np.testing.assert_allclose(mag[:, :, self.IDX], self.MAG, rtol=1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+import numpy as np
+
+from gwemlightcurves.KNModels.io import Me2017
+
+
+class TestMe2017(unittest.TestCase):
+
+    # light curves at t[IDX] of the test_calc_lc_batch samples, computed
+    # with the per-sample calc_lc of the original implementation
+    IDX = [2, 14, 29, 49, 65]
+    T = np.array([3.000000000e-01, 1.500000000e+00, 3.000000000e+00, 5.000000000e+00, 6.600000000e+00])
+    LBOL = np.array([
+        [4.797511491e+40, 4.076274633e+40, 2.717591171e+40, 1.533619468e+40, 9.778109491e+39],
+        [3.206463573e+41, 2.567350899e+41, 1.388677431e+41, 5.887959216e+40, 3.216557280e+40],
+        [4.548490888e+40, 1.385526461e+40, 3.798128351e+39, 1.363016774e+39, 8.162869691e+38],
+        [2.712446863e+41, 4.364627515e+40, 1.304580180e+40, 5.257491101e+39, 3.244326575e+39],
+        [1.746224928e+41, 2.037406749e+40, 5.973215728e+39, 2.409539910e+39, 1.483249903e+39],
+    ])
+    TOBS = np.array([
+        [5.020196125e+03, 3.040733066e+03, 2.259681446e+03, 1.691946798e+03, 1.395553939e+03],
+        [8.953789774e+03, 5.003896369e+03, 3.418975000e+03, 2.344874656e+03, 1.837988990e+03],
+        [5.003898599e+03, 2.539527989e+03, 1.459905291e+03, 8.752521752e+02, 6.701648554e+02],
+        [1.065945081e+04, 3.655744810e+03, 1.911356825e+03, 1.179626009e+03, 9.100052090e+02],
+        [7.781473447e+03, 2.679116999e+03, 1.393988840e+03, 8.605307684e+02, 6.634366947e+02],
+    ])
+    MAG = np.array([
+        [
+            [-1.104459329e+01, -7.317411897e+00, -3.145836436e+00, 2.777463574e+00, 7.973975540e+00],
+            [-1.234532008e+01, -1.009411808e+01, -7.218350568e+00, -2.987883608e+00, 7.776354417e-01],
+            [-1.298152053e+01, -1.166188227e+01, -9.608473124e+00, -6.452769661e+00, -3.595797977e+00],
+            [-1.326529122e+01, -1.253288609e+01, -1.100363169e+01, -8.534143553e+00, -6.257380775e+00],
+            [-1.337180755e+01, -1.299296924e+01, -1.178361070e+01, -9.734412608e+00, -7.813250159e+00],
+            [-1.340459121e+01, -1.324383824e+01, -1.223419095e+01, -1.044856195e+01, -8.750660173e+00],
+            [-1.336287181e+01, -1.363220354e+01, -1.302355392e+01, -1.177227931e+01, -1.052862894e+01],
+            [-1.314482735e+01, -1.377650797e+01, -1.351440901e+01, -1.273450384e+01, -1.189604339e+01],
+            [-1.284553286e+01, -1.370071693e+01, -1.365590492e+01, -1.317812241e+01, -1.260395154e+01],
+        ],
+        [
+            [-1.447072925e+01, -1.285122252e+01, -9.746043398e+00, -4.534708937e+00, 2.586081191e-01],
+            [-1.479785851e+01, -1.415930317e+01, -1.210808842e+01, -8.423933094e+00, -4.971371849e+00],
+            [-1.483682091e+01, -1.480009837e+01, -1.341305501e+01, -1.069769680e+01, -8.096351106e+00],
+            [-1.475530198e+01, -1.508672430e+01, -1.411720644e+01, -1.201860041e+01, -9.960667865e+00],
+            [-1.464693989e+01, -1.519493710e+01, -1.447605781e+01, -1.275315891e+01, -1.102793434e+01],
+            [-1.454912652e+01, -1.522875725e+01, -1.466410523e+01, -1.317530887e+01, -1.165861483e+01],
+            [-1.425371359e+01, -1.518905918e+01, -1.492759527e+01, -1.390729853e+01, -1.281276453e+01],
+            [-1.382437024e+01, -1.497269862e+01, -1.496570392e+01, -1.434810544e+01, -1.362457266e+01],
+            [-1.339437635e+01, -1.467443997e+01, -1.482413773e+01, -1.445795479e+01, -1.397104681e+01],
+        ],
+        [
+            [-1.097217977e+01, -4.061270587e+00, 7.801401712e+00, 2.690136401e+01, 4.174153541e+01],
+            [-1.228025941e+01, -7.577856933e+00, 9.651336965e-01, 1.484902527e+01, 2.570329073e+01],
+            [-1.292105397e+01, -9.615077891e+00, -3.179687276e+00, 7.392481438e+00, 1.571606491e+01],
+            [-1.320767951e+01, -1.078509045e+01, -5.695273889e+00, 2.761956482e+00, 9.469389911e+00],
+            [-1.331589208e+01, -1.142742801e+01, -7.161659821e+00, -7.515817087e-04, 5.716078284e+00],
+            [-1.334971209e+01, -1.179191391e+01, -8.042881430e+00, -1.696035563e+00, 3.398702307e+00],
+            [-1.331001374e+01, -1.240778903e+01, -9.706468828e+00, -5.017678461e+00, -1.190206756e+00],
+            [-1.309365294e+01, -1.274774906e+01, -1.097163201e+01, -7.769933071e+00, -5.080651748e+00],
+            [-1.279539416e+01, -1.279410583e+01, -1.161254586e+01, -9.394638595e+00, -7.462769645e+00],
+        ],
+        [
+            [-1.433366946e+01, -9.035304742e+00, 4.859755562e-01, 1.371095290e+01, 2.420172250e+01],
+            [-1.447250045e+01, -1.118151184e+01, -4.505923826e+00, 5.019338255e+00, 1.264679858e+01],
+            [-1.439928985e+01, -1.234987469e+01, -7.479745706e+00, -3.034562911e-01, 5.506067216e+00],
+            [-1.425041168e+01, -1.296755464e+01, -9.247542041e+00, -3.571321377e+00, 1.077227150e+00],
+            [-1.410275586e+01, -1.327413740e+01, -1.025567661e+01, -5.498800889e+00, -1.561860113e+00],
+            [-1.398112520e+01, -1.342985390e+01, -1.084926017e+01, -6.669569202e+00, -3.179511133e+00],
+            [-1.363941436e+01, -1.362937679e+01, -1.192812624e+01, -8.922762707e+00, -6.343008473e+00],
+            [-1.317121285e+01, -1.361342162e+01, -1.267336618e+01, -1.071589774e+01, -8.953241898e+00],
+            [-1.271686669e+01, -1.343848538e+01, -1.297705366e+01, -1.170424915e+01, -1.048352819e+01],
+        ],
+        [
+            [-1.367142928e+01, -5.153723221e+00, 8.539753033e+00, 2.707240745e+01, 4.171766612e+01],
+            [-1.418086485e+01, -8.436426924e+00, 1.334241465e+00, 1.479724941e+01, 2.550690984e+01],
+            [-1.432956434e+01, -1.032520772e+01, -3.045014990e+00, 7.199235922e+00, 1.541015510e+01],
+            [-1.431426315e+01, -1.140059011e+01, -5.710316492e+00, 2.478365278e+00, 9.093532480e+00],
+            [-1.424457723e+01, -1.198516195e+01, -7.268465152e+00, -3.397193011e-01, 5.297347135e+00],
+            [-1.417020026e+01, -1.231357949e+01, -8.207306402e+00, -2.069779335e+00, 2.953046767e+00],
+            [-1.392026631e+01, -1.285702753e+01, -9.988189032e+00, -5.462264432e+00, -1.690710150e+00],
+            [-1.352892354e+01, -1.313440896e+01, -1.135820977e+01, -8.278140638e+00, -5.630418311e+00],
+            [-1.312260913e+01, -1.314155183e+01, -1.206782776e+01, -9.945154415e+00, -8.045331161e+00],
+        ],
+    ])
+
+    def test_calc_lc_batch(self):
+        rng = np.random.RandomState(1)
+        nsamples = 5
+        mej = 10**rng.uniform(-3, -1, nsamples)
+        vej = rng.uniform(0.05, 0.3, nsamples)
+        beta = rng.uniform(1, 5, nsamples)
+        kappa_r = 10**rng.uniform(-1, 2, nsamples)
+
+        with np.errstate(all='ignore'):
+            t, lbol, mag, Tobs = Me2017.calc_lc_batch(0.1, 7.0, 0.1, mej, vej,
+                                                      beta, kappa_r)
+        np.testing.assert_allclose(t[self.IDX], self.T)
+        np.testing.assert_allclose(lbol[:, self.IDX], self.LBOL, rtol=1e-8)
+        np.testing.assert_allclose(Tobs[:, self.IDX], self.TOBS, rtol=1e-8)
+        np.testing.assert_allclose(mag[:, :, self.IDX], self.MAG, rtol=1e-8)
+
+        # calc_lc is the batch of one
+        with np.errstate(all='ignore'):
+            for i in range(nsamples):
+                t_i, lbol_i, mag_i, Tobs_i = Me2017.calc_lc(
+                    0.1, 7.0, 0.1, mej[i], vej[i], beta[i], kappa_r[i])
+                np.testing.assert_array_equal(t_i, t)
+                np.testing.assert_array_equal(lbol_i, lbol[i])
+                np.testing.assert_array_equal(mag_i, mag[i])
+                np.testing.assert_array_equal(Tobs_i, Tobs[i])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gwemlightcurves.KNModels.io import WoKo2017
+
+
+class TestWoKo2017(unittest.TestCase):
+
+    # light curves at t[IDX] of the test_calc_lc_batch samples on the
+    # synthetic table, from the original per-sample calc_lc
+    IDX = [2, 8, 14, 20, 26]
+    T = np.array([
+        [0.1094870226, 0.4080879934, 0.7066889642, 1.005289935, 1.303890906],
+        [0.05147016673, 0.1918433487, 0.3322165307, 0.4725897127, 0.6129628947],
+        [21.25163723, 79.21064784, 137.1696585, 195.1286691, 253.0876797],
+    ])
+    LBOL = np.array([
+        [1.457759704e+39, 1.853388445e+39, 1.580766621e+39, 1.147487557e+39, 9.39943398e+38],
+        [9.667362149e+39, 4.818556642e+39, 2.695766798e+40, 6.290693512e+39, 7.68875707e+38],
+        [1.503060696e+39, 4.139739189e+38, 1.86140428e+39, 2.553459908e+38, 1.056462733e+39],
+    ])
+    MAG = np.array([
+        [
+            [-11.44217869, -12.35798236, -11.95735193, -11.19077887, -12.41528674],
+            [-11.44217869, -12.35798236, -11.95735193, -11.19077887, -12.41528674],
+            [-11.7718535, -12.46372158, -11.65284172, -11.06757533, -11.06397346],
+            [-13.87628844, -11.78534404, -10.82583631, -13.31416909, -12.56424282],
+            [-12.56082194, -12.55151539, -12.08478945, -11.67139297, -10.88652227],
+            [-12.21284057, -12.79883687, -12.21935606, -11.55375507, -10.10358595],
+            [-10.65979762, -12.58121707, -12.15486941, -12.58118111, -13.69848319],
+            [-11.79599734, -11.96260855, -12.17968945, -11.63588239, -11.38533084],
+            [-11.77732328, -12.53276254, -10.85590306, -12.61714648, -11.76255776],
+        ],
+        [
+            [-14.12000404, -13.960196, -11.6367374, -12.55352688, -12.05318277],
+            [-14.12000404, -13.960196, -11.6367374, -12.55352688, -12.05318277],
+            [-12.13497491, -12.59647504, -12.75745546, -13.63736056, -12.35511291],
+            [-12.0246552, -12.29997275, -13.94729362, -12.84590797, -13.55766724],
+            [-13.17441272, -11.53041279, -12.42200722, -11.88636519, -10.06466403],
+            [-13.01895072, -11.21461797, -13.61149943, -13.1870606, -12.444271],
+            [-13.66917604, -12.9928221, -12.59405408, -13.32142605, -11.02319498],
+            [-13.62809398, -12.2871195, -12.67059763, -12.78933371, -14.07005351],
+            [-12.31666111, -12.74763251, -12.7417004, -14.24650746, -12.75607413],
+        ],
+        [
+            [-15.97996573, -14.52023597, -11.65576016, -14.99113097, -14.08182419],
+            [-15.97996573, -14.52023597, -11.65576016, -14.99113097, -14.08182419],
+            [-12.56000442, -15.42580292, -15.50527785, -12.22031178, -15.84328676],
+            [-13.88856941, -14.437881, -11.63256079, -12.27467182, -13.9700797],
+            [-14.73371547, -11.87932996, -13.46539482, -12.74640058, -14.36111993],
+            [-13.90909952, -13.01304428, -12.45658509, -13.02876139, -14.92695382],
+            [-14.76917712, -14.39184195, -13.25562768, -13.59555334, -12.31760529],
+            [-13.67648051, -13.75895207, -14.00016581, -13.84984223, -14.50934584],
+            [-15.72945477, -12.76370759, -13.28840889, -13.532453, -13.42730402],
+        ],
+    ])
+
+
+    def setUp(self):
+        # synthetic table in the layout of the Wollaeger et al. files:
+        # 9 slices (lbol and 8 bands) of (index, time, angular bins)
+        rng = np.random.RandomState(0)
+        nt, nbins = 30, 54
+        t = np.linspace(0.05, 20, nt)
+        slices = []
+        for ii in range(9):
+            if ii == 0:
+                data = 10**rng.uniform(38, 42, (nt, nbins))
+            else:
+                data = rng.uniform(-16, -10, (nt, nbins))
+            slices.append(np.column_stack([np.full(nt, ii), t, data]))
+        self.tmpdir = tempfile.mkdtemp()
+        self.modelfile = os.path.join(self.tmpdir, 'DZ2_mags_2017-03-20.dat')
+        np.savetxt(self.modelfile, np.vstack(slices))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_model_cached(self):
+        model = WoKo2017.get_model(modelfile=self.modelfile)
+        self.assertIs(WoKo2017.get_model(modelfile=self.modelfile), model)
+        self.assertTrue(os.path.isfile(self.modelfile.replace('.dat', '.npy')))
+
+    def test_load_model_data(self):
+        data_out = WoKo2017.load_model_data(self.modelfile)
+        # the binary copy is renamed into place, no temporary file is left
+        self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                         ['DZ2_mags_2017-03-20.dat', 'DZ2_mags_2017-03-20.npy'])
+        np.testing.assert_array_equal(WoKo2017.load_model_data(self.modelfile), data_out)
+
+    def test_calc_lc_batch(self):
+        mej = np.array([0.005, 0.01, 0.05])
+        vej = np.array([0.1, 0.2, 0.3])
+        theta_r = np.array([0.0, 5.0, 12.0])
+        kappa_r = np.array([1.0, 10.0, 100.0])
+        t, lbol, mag = WoKo2017.calc_lc_batch(0.1, 14.0, 0.1, mej, vej,
+                                              theta_r, kappa_r,
+                                              modelfile=self.modelfile)
+        self.assertEqual(mag.shape, (3, 9, t.shape[1]))
+        for i in range(3):
+            t_i, lbol_i, mag_i = WoKo2017.calc_lc(0.1, 14.0, 0.1, mej[i],
+                                                  vej[i], theta_r[i],
+                                                  kappa_r[i],
+                                                  modelfile=self.modelfile)
+            np.testing.assert_allclose(t[i], t_i)
+            np.testing.assert_allclose(lbol[i], lbol_i)
+            np.testing.assert_allclose(mag[i], mag_i)
+
+    def test_calc_lc_reference(self):
+        mej = np.array([0.005, 0.01, 0.05])
+        vej = np.array([0.1, 0.2, 0.3])
+        theta_r = np.array([0.0, 5.0, 12.0])
+        kappa_r = np.array([1.0, 10.0, 100.0])
+        t, lbol, mag = WoKo2017.calc_lc_batch(0.1, 14.0, 0.5, mej, vej,
+                                              theta_r, kappa_r,
+                                              modelfile=self.modelfile)
+        np.testing.assert_allclose(t[:, self.IDX], self.T, rtol=1e-8)
+        np.testing.assert_allclose(lbol[:, self.IDX], self.LBOL, rtol=1e-8)
+        np.testing.assert_allclose(mag[:, :, self.IDX], self.MAG, rtol=1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
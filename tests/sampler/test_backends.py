@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import multiprocessing
+import unittest
+
+import numpy as np
+
+from gwemlightcurves.sampler import backends
+
+
+MU = np.array([0.2, -0.1])
+SIGMA = np.array([0.05, 0.1])
+
+
+def toy_prior(cube, ndim, nparams):
+    cube[0] = cube[0]*2.0 - 1.0
+    cube[1] = cube[1]*2.0 - 1.0
+
+
+def toy_loglike(cube, ndim, nparams):
+    x = np.array([cube[0], cube[1]])
+    return -0.5*np.sum(((x-MU)/SIGMA)**2 + np.log(2*np.pi*SIGMA**2))
+
+
+def toy_problem():
+    return backends.Problem(["x", "y"], ["x", "y"], toy_loglike, toy_prior)
+
+
+class Interrupt(Exception):
+    pass
+
+
+def interrupted_problem(ncalls):
+    calls = []
+
+    def loglike(cube, ndim, nparams):
+        calls.append(1)
+        if len(calls) >= ncalls:
+            raise Interrupt()
+        return toy_loglike(cube, ndim, nparams)
+
+    return backends.Problem(["x", "y"], ["x", "y"], loglike, toy_prior)
+
+
+class TestBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.plotDir = tempfile.mkdtemp()
+        self.basename = os.path.join(self.plotDir, "2-")
+
+    def tearDown(self):
+        shutil.rmtree(self.plotDir)
+
+    def read_posterior(self):
+        return np.loadtxt(self.basename + "post_equal_weights.dat")
+
+    def test_problem_batch(self):
+        problem = toy_problem()
+        u = np.random.RandomState(0).uniform(size=(5, 2))
+        x = problem.prior_transform_batch(u)
+        np.testing.assert_allclose(x, 2*u - 1)
+        logl = problem.log_likelihood_batch(x)
+        np.testing.assert_allclose(logl, [toy_loglike(y, 2, 2) for y in x])
+
+    def test_nested(self):
+        backend = backends.get_backend("nested")
+        backend.seed = 1
+        logz = backend.run(toy_problem(), self.basename, n_live_points=200,
+                           evidence_tolerance=0.01)
+        # the gaussian is well inside the prior of volume 4
+        self.assertAlmostEqual(logz, -np.log(4.0), delta=0.3)
+        data = self.read_posterior()
+        self.assertEqual(data.shape[1], 3)
+        np.testing.assert_allclose(np.mean(data[:, :2], axis=0), MU, atol=0.03)
+        np.testing.assert_allclose(np.std(data[:, :2], axis=0), SIGMA, rtol=0.25)
+
+    def test_ensemble_pool(self):
+        backend = backends.get_backend("ensemble")
+        backend.seed = 1
+        pool = multiprocessing.Pool(2)
+        try:
+            backend.run(toy_problem(), self.basename, n_live_points=20,
+                        max_iter=300, pool=pool)
+        finally:
+            pool.close()
+            pool.join()
+        data = self.read_posterior()
+        np.testing.assert_allclose(np.mean(data[:, :2], axis=0), MU, atol=0.03)
+        np.testing.assert_allclose(np.std(data[:, :2], axis=0), SIGMA, rtol=0.25)
+
+    def test_resume(self):
+        kwargs = {"n_live_points": 20, "evidence_tolerance": 0.5, "max_iter": 100}
+        # interrupt the runs about half way through
+        for name, ncalls in [("nested", 80), ("ensemble", 1000)]:
+            backend = backends.get_backend(name, seed=1, checkpoint_interval=0.0)
+            backend.run(toy_problem(), self.basename, **kwargs)
+            expected = self.read_posterior()
+
+            basename = os.path.join(self.plotDir, "%s-" % name)
+            backend = backends.get_backend(name, seed=1, checkpoint_interval=0.0)
+            self.assertRaises(Interrupt, backend.run, interrupted_problem(ncalls),
+                              basename, **kwargs)
+            self.assertTrue(os.path.isfile(basename + "checkpoint.pkl"))
+            backend = backends.get_backend(name, seed=1, checkpoint_interval=0.0)
+            backend.run(toy_problem(), basename, **kwargs)
+            np.testing.assert_allclose(np.loadtxt(basename + "post_equal_weights.dat"),
+                                       expected, err_msg=name)
+            self.assertFalse(os.path.isfile(basename + "checkpoint.pkl"))
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, backends.get_backend, "foo")
+
+
+if __name__ == '__main__':
+    unittest.main()
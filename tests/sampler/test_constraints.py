@@ -0,0 +1,94 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gwemlightcurves.sampler import backends, constraints, loglike, run, specs
+from gwemlightcurves.sampler.context import LikelihoodContext
+
+ncalls = [0]
+
+
+def toy_model(mej, vej):
+    ncalls[0] = ncalls[0] + 1
+    tmag = np.arange(0.1, 10.0, 0.1)
+    mag = 17.0 + vej*tmag*np.ones((9, 1)) - 2.5*np.log10(mej/0.01)
+    return tmag, np.ones(tmag.shape), mag
+
+
+def slow_ejecta(mej, vej):
+    return vej > 0.1
+
+
+class TestConstraints(unittest.TestCase):
+
+    def setUp(self):
+        constraints.reset()
+        ncalls[0] = 0
+        data_out = {"g": np.array([[1.0, 18.0, 0.1], [2.0, 18.6, 0.1]])}
+        self.context = LikelihoodContext(data_out=data_out, filters=["g"], doLightcurves=1,
+                                         errorbudget=1.0, T0Range=0.1, ZPRange=2.0)
+        self.spec = specs.ModelSpec("toy", "ejecta", toy_model,
+                                    [specs.log_mej(minimum=-3.0, maximum=-1.0), specs.vej()],
+                                    constraint=slow_ejecta)
+        u = np.random.RandomState(0).uniform(size=(50, 4))
+        self.problem = self.spec.problem(self.context)
+        self.x = self.problem.prior_transform_batch(u)
+        self.nrejected = np.sum(self.x[:, 2] <= 0.1)
+
+    def tearDown(self):
+        constraints.reset()
+
+    def test_batch(self):
+        prob = self.problem.log_likelihood_batch(self.x)
+        self.assertTrue(np.all(np.isneginf(prob[self.x[:, 2] <= 0.1])))
+        self.assertTrue(np.all(np.isfinite(prob[self.x[:, 2] > 0.1])))
+        # the model is only evaluated for the points passing the constraint
+        self.assertEqual(ncalls[0], 50 - self.nrejected)
+        self.assertEqual(constraints.stats["toy_ejecta"], [50, self.nrejected])
+
+        self.assertTrue(np.isneginf(self.problem.log_likelihood(self.x[np.argmin(self.x[:, 2])])))
+        self.assertEqual(constraints.stats["toy_ejecta"], [51, self.nrejected + 1])
+
+    def test_pool(self):
+        expected = self.problem.log_likelihood_batch(self.x)
+        constraints.reset()
+        pool = multiprocessing.get_context("fork").Pool(2)
+        try:
+            prob = self.problem.log_likelihood_batch(self.x, pool=pool)
+        finally:
+            pool.close()
+            pool.join()
+        np.testing.assert_allclose(prob, expected)
+        # the points are rejected in this process, before the pool
+        self.assertEqual(constraints.stats["toy_ejecta"], [50, self.nrejected])
+
+    def test_masses(self):
+        problem = run.get_problem("Me2017", "masses")
+        x = np.array([[0.0, 1.4, 1.5, 0.15, 1.2, 1.3, 0.15, 3.0, 1.0, 0.0],
+                      [0.0, 1.2, 1.3, 0.15, 1.4, 1.5, 0.15, 3.0, 1.0, 0.0]])
+        np.testing.assert_array_equal(problem.allowed(x), [True, False])
+        self.assertEqual(constraints.stats["Me2017_masses"], [2, 1])
+        # m1 < m2 is rejected before the light curve and the data are needed
+        self.assertTrue(np.isneginf(specs.myloglike_Me2017(x[1], 10, 10)))
+
+    def test_run_sampler(self):
+        plotDir = tempfile.mkdtemp()
+        try:
+            basename = os.path.join(plotDir, "2-")
+            backends.run_sampler("nested", self.problem, basename,
+                                 n_live_points=20, max_iter=50)
+            data = json.load(open(basename + "constraints.json"))
+        finally:
+            shutil.rmtree(plotDir)
+        self.assertTrue(data["toy_ejecta"]["rejected"] > 0)
+        self.assertTrue(data["toy_ejecta"]["checked"] >= 20)
+        self.assertEqual(constraints.stats, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
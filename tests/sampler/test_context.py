@@ -0,0 +1,124 @@
+import pickle
+import threading
+import unittest
+
+import numpy as np
+
+from gwemlightcurves import Global
+from gwemlightcurves.sampler import specs, loglike
+from gwemlightcurves.sampler.context import (LikelihoodContext, get_context,
+                                             global_context, use_context)
+
+
+def toy_model(mej, vej):
+    tmag = np.arange(0.1, 10.0, 0.1)
+    mag = 17.0 + vej*tmag*np.ones((9, 1)) - 2.5*np.log10(mej/0.01)
+    return tmag, np.ones(tmag.shape), mag
+
+
+def toy_data(shift):
+    return {
+        "g": np.array([[1.0, 18.0 + shift, 0.1], [2.0, 18.6 + shift, 0.1]]),
+        "r": np.array([[1.5, 18.2 + shift, 0.05], [4.0, 19.0 + shift, 0.2]]),
+    }
+
+
+class TestLikelihoodContext(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = specs.ModelSpec(
+            "toy", "ejecta", toy_model,
+            [specs.log_mej(minimum=-3.0, maximum=-1.0), specs.vej()],
+            zp=specs.ZP(norm=True))
+        self.contexts = []
+        for shift in [0.0, 1.0]:
+            data_out = toy_data(shift)
+            self.contexts.append(LikelihoodContext(
+                data_out=data_out, filters=list(data_out.keys()),
+                doLightcurves=1, errorbudget=1.0, T0Range=0.1, ZPRange=2.0))
+        u = np.random.RandomState(0).uniform(size=(10, 4))
+        self.x = self.spec.problem(self.contexts[0]).prior_transform_batch(u)
+
+    def tearDown(self):
+        Global.data_out = 0
+        Global.filters = 0
+        Global.doLightcurves = 0
+        Global.observations = 0
+        Global.errorbudget = 0
+        Global.T0Range, Global.ZPRange = 0, 0
+
+    def loglikes(self, context):
+        return [self.spec.loglike(y.copy(), 4, 4, context=context) for y in self.x]
+
+    def test_matches_global(self):
+        context = self.contexts[1]
+        Global.data_out = context.data_out
+        Global.filters = context.filters
+        Global.doLightcurves = 1
+        Global.errorbudget = 1.0
+        Global.T0Range, Global.ZPRange = 0.1, 2.0
+        expected = [self.spec.loglike(y.copy(), 4, 4) for y in self.x]
+        np.testing.assert_allclose(self.loglikes(context), expected)
+        # the two events give different likelihoods in the same process
+        self.assertFalse(np.allclose(self.loglikes(self.contexts[0]), expected))
+
+    def test_problem_bound(self):
+        problem = self.spec.problem(self.contexts[0])
+        np.testing.assert_allclose(problem.log_likelihood_batch(self.x),
+                                   self.loglikes(self.contexts[0]))
+        cube = np.array([0.5, 0.25, 0.5, 0.3])
+        problem.prior(cube, 4, 4)
+        self.assertAlmostEqual(cube[0], 0.0)
+
+    def test_pickle(self):
+        context = self.contexts[1]
+        self.assertTrue(context.observations is not None)
+        copied = pickle.loads(pickle.dumps(context))
+        self.assertTrue(copied._observations is None)
+        np.testing.assert_allclose(self.loglikes(copied), self.loglikes(context))
+        self.assertTrue(pickle.loads(pickle.dumps(global_context)) is global_context)
+
+    def test_threads(self):
+        expected = [self.loglikes(context) for context in self.contexts]
+        results = {}
+
+        def work(i):
+            with use_context(self.contexts[i % 2]):
+                results[i] = [self.spec.loglike(y.copy(), 4, 4) for y in self.x]
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for i in range(6):
+            np.testing.assert_allclose(results[i], expected[i % 2])
+
+    def test_global_shim(self):
+        self.assertTrue(get_context() is global_context)
+        global_context.errorbudget = 0.5
+        self.assertEqual(Global.errorbudget, 0.5)
+        Global.ZPRange = 3.0
+        self.assertEqual(get_context().ZPRange, 3.0)
+        self.assertEqual(LikelihoodContext.from_global().ZPRange, 3.0)
+        with use_context(self.contexts[0]):
+            self.assertTrue(get_context() is self.contexts[0])
+        self.assertTrue(get_context() is global_context)
+        self.assertRaises(TypeError, LikelihoodContext, foo=1)
+
+    def test_calc_prob(self):
+        tmag, lbol, mag = toy_model(0.01, 0.1)
+        context = self.contexts[0]
+        with use_context(self.contexts[1]):
+            prob = loglike.calc_prob(tmag, lbol, mag, 0.0, 0.0,
+                                     errorbudget=1.0, context=context)
+        self.assertAlmostEqual(
+            prob, loglike.calc_prob(tmag, lbol, mag, 0.0, 0.0,
+                                    errorbudget=1.0, context=context))
+        self.assertNotAlmostEqual(
+            prob, loglike.calc_prob(tmag, lbol, mag, 0.0, 0.0, errorbudget=1.0,
+                                    context=self.contexts[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
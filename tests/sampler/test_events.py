@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from astropy.time import Time
+
+from gwemlightcurves.sampler import events, specs
+
+
+def toy_model(mej, vej):
+    tmag = np.arange(0.1, 10.0, 0.1)
+    mag = 17.0 + vej*tmag*np.ones((9, 1)) - 2.5*np.log10(mej/0.01)
+    return tmag, np.ones(tmag.shape), mag
+
+
+specs.register_spec(specs.ModelSpec(
+    "toy_events", "ejecta", toy_model,
+    [specs.log_mej(minimum=-3.0, maximum=-1.0), specs.vej()]))
+
+
+def write_event(filename, T0, shift):
+    fid = open(filename, 'w')
+    for t, filt, mag, dmag in [(1.0, "g", 18.0, 0.1), (2.0, "g", 18.3, 0.1),
+                               (1.5, "r", 18.2, 0.05), (4.0, "r", 18.6, 0.2),
+                               (3.0, "r", 19.0, np.nan), (30.0, "r", 25.0, 0.1),
+                               (2.0, "K", 17.0, 0.1)]:
+        isot = Time(T0 + t, format='mjd').isot
+        fid.write('%s %s %.5f %.5f\n' % (isot, filt, mag + shift, dmag))
+    fid.close()
+
+
+class TestFitEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.plotDir = tempfile.mkdtemp()
+        self.filenames = []
+        fid = open(os.path.join(self.plotDir, "catalog.dat"), 'w')
+        for name, T0, shift in [("evA", 57000.0, 0.0), ("evB", 57100.0, 1.0)]:
+            filename = os.path.join(self.plotDir, "%s.dat" % name)
+            write_event(filename, T0, shift)
+            # at 10 pc the magnitudes are absolute already
+            fid.write('%s g,r %.5f 1e-5\n' % (name, T0))
+            self.filenames.append(filename)
+        fid.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.plotDir)
+
+    def test_load_event(self):
+        catalog = events.read_catalog(os.path.join(self.plotDir, "catalog.dat"))
+        self.assertEqual(catalog["evB"]["filters"], ["g", "r"])
+        self.assertEqual(catalog["evB"]["T0"], 57100.0)
+        data_out = events.load_event(self.filenames[1], T0=57100.0, distance=10.0,
+                                     filters=["g", "r"], tmin=0.0, tmax=7.0)
+        self.assertEqual(sorted(data_out.keys()), ["g", "r"])
+        self.assertEqual(data_out["r"].shape, (2, 3))
+        np.testing.assert_allclose(data_out["g"][:, 0], [1.0, 2.0], atol=1e-6)
+        np.testing.assert_allclose(data_out["g"][:, 1], [19.0 - 30.0, 19.3 - 30.0])
+
+    def test_fit_events(self):
+        outputDir = os.path.join(self.plotDir, "fits")
+        summary = events.fit_events(
+            "toy_events", self.filenames, outputDir,
+            catalog=os.path.join(self.plotDir, "catalog.dat"), tmin=0.0, tmax=7.0,
+            sampler="nested", n_proc=2, n_live_points=50, evidence_tolerance=1.0,
+            errorbudget=0.1, ZPRange=0.1)
+        self.assertEqual(list(summary["name"]), ["evA", "evB"])
+        self.assertEqual(list(summary["status"]), ["ok", "ok"])
+        self.assertEqual(list(summary["n_obs"]), [4, 4])
+        self.assertTrue(np.all(np.isfinite(summary["logz"])))
+        for name in ["evA", "evB"]:
+            data = np.loadtxt(os.path.join(outputDir, name, "2-post_equal_weights.dat"))
+            self.assertEqual(data.shape[1], 5)
+        # with the zero point pinned, the events are one magnitude apart in mej
+        self.assertTrue(summary["mej"][1] < summary["mej"][0])
+        self.assertTrue(os.path.isfile(os.path.join(outputDir, "summary.dat")))
+
+    def test_unknown_model(self):
+        self.assertRaises(ValueError, events.fit_events, "foo", self.filenames,
+                          self.plotDir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+import numpy as np
+import scipy.stats
+from scipy.interpolate import interp1d
+
+from gwemlightcurves import Global, lightcurve_utils
+from gwemlightcurves.sampler import loglike, observations
+
+
+def reference_prob(tmag, mag, t0, zp, data_out, errorbudget):
+    # per-filter evaluation, as calc_prob did before the observations were
+    # compiled
+    tmag = tmag + t0
+    chisquare, gaussprob, nsamples = 0.0, 0.0, 0
+    for key in data_out:
+        samples = data_out[key]
+        idx = np.where(~np.isnan(samples[:, 1]))[0]
+        t, y, sigma_y = samples[idx, 0], samples[idx, 1], samples[idx, 2]
+        magave = lightcurve_utils.get_mag(mag, key)
+        ii = np.where(np.isfinite(magave))[0]
+        f = interp1d(tmag[ii], magave[ii], fill_value=np.nan,
+                     bounds_error=False)
+        maginterp = f(t) + zp
+        sigma = np.sqrt(errorbudget**2 + sigma_y**2)
+        chisquarevals = ((y-maginterp)/sigma)**2
+        upper = ~np.isfinite(sigma)
+        gaussprob += np.sum(np.log(
+            1-scipy.stats.norm.cdf(y[upper], maginterp[upper], errorbudget)))
+        chisquare += np.sum(chisquarevals)/max(len(y)-1, 1)
+        nsamples += len(y)
+    return (scipy.stats.chi2.logpdf(chisquare, 1) + gaussprob -
+            (nsamples/2.0)*np.log(2.0*np.pi*errorbudget**2))
+
+
+class TestCalcProb(unittest.TestCase):
+
+    def setUp(self):
+        self.data_out = {
+            "g": np.array([[1.0, 18.0, 0.1], [2.0, 18.6, 0.1],
+                           [3.0, np.nan, 0.1]]),
+            "r": np.array([[1.5, 18.2, 0.05], [4.0, 19.0, 0.2]]),
+            "K": np.array([[2.5, 17.5, 0.1]]),
+            "w": np.array([[1.2, 18.1, 0.1], [5.0, 19.5, np.inf]]),
+        }
+        Global.data_out = self.data_out
+        Global.filters = list(self.data_out.keys())
+        Global.doLightcurves = 1
+        Global.doLuminosity = 0
+        Global.doWaveformExtrapolate = 0
+
+        self.tmag = np.arange(0.1, 10.0, 0.1)
+        rng = np.random.RandomState(0)
+        self.mag = (17.0 + rng.uniform(0.2, 0.6, (9, 1))*self.tmag +
+                    rng.uniform(-1, 1, (9, 1)))
+        # non-finite model points are skipped by the interpolation
+        self.mag[1, :3] = np.nan
+        self.mag[3, 30] = np.inf
+
+    def tearDown(self):
+        Global.data_out = 0
+        Global.filters = 0
+        Global.doLightcurves = 0
+        Global.observations = 0
+
+    def test_calc_prob(self):
+        lbol = np.ones(self.tmag.shape)
+        for t0, zp in [(0.0, 0.0), (-0.2, 0.3)]:
+            prob = loglike.calc_prob(self.tmag, lbol, self.mag, t0, zp,
+                                     errorbudget=1.0)
+            expected = reference_prob(self.tmag, self.mag, t0, zp,
+                                      self.data_out, 1.0)
+            self.assertTrue(np.isfinite(prob))
+            self.assertAlmostEqual(prob, expected, places=8)
+
+    def test_compiled_once(self):
+        obs = observations.get_observations()
+        self.assertIs(observations.get_observations(), obs)
+        self.assertEqual(len(obs), 7)
+        self.assertEqual(obs.keys, ["g", "r", "K", "w"])
+
+        Global.data_out = dict(self.data_out)
+        del Global.data_out["K"]
+        self.assertIsNot(observations.get_observations(), obs)
+
+
+
+class TestMagWeights(unittest.TestCase):
+
+    def test_get_mag(self):
+        # the compiled observations weight the bands as get_mag does
+        mag = np.random.RandomState(1).normal(size=(9, 20))
+        for key in lightcurve_utils.MAG_BANDS:
+            weights = lightcurve_utils.get_mag_weights(key)
+            expected = sum(weight*mag[ii] for ii, weight in weights)
+            np.testing.assert_allclose(lightcurve_utils.get_mag(mag, key),
+                                       expected, rtol=1e-14)
+        self.assertIsNone(lightcurve_utils.get_mag_weights("X"))
+
+if __name__ == '__main__':
+    unittest.main()
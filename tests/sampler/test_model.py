@@ -1,5 +1,12 @@
 import unittest
+
+import numpy as np
+from astropy.table import Table
+
+from gwemlightcurves import surrogate_cache
+from gwemlightcurves.KNModels import KNTable
 from gwemlightcurves.sampler import model
+from gwemlightcurves.sampler.context import LikelihoodContext
 
 
 class TestModel(unittest.TestCase):
@@ -18,6 +25,54 @@ class TestModel(unittest.TestCase):
             ("The model should return magnitudes in 9 frequency bands, "
              "but got {}.".format(len(mag))))
 
+    def test_direct_path(self):
+        samples = {'tini': 0.1, 'tmax': 50.0, 'dt': 0.1, 'mej': 0.01,
+                   'vej': 0.1, 'th': 0.2, 'ph': 1.0, 'vmin': 0.0,
+                   'kappa': 10.0, 'eps': 1.58e10, 'alp': 1.2, 'eth': 0.5}
+        self.assertIsNotNone(model.get_model_fn('KaKy2016', samples))
+        t, lbol, mag = model.generate_lightcurve('KaKy2016', samples)
+
+        table = KNTable.model('KaKy2016', Table(dict((k, [v]) for k, v in samples.items())))
+        np.testing.assert_allclose(t, table['t'][0])
+        np.testing.assert_allclose(lbol, table['lbol'][0])
+        np.testing.assert_allclose(mag, [table['mag'][0][ii] for ii in range(9)])
+
+        samples['mej'] = -0.01
+        self.assertEqual(model.generate_lightcurve('KaKy2016', samples), ([], [], []))
+
+    def test_model_fns_follow_surrogate_cache(self):
+        # the cached direct evaluation functions hold on to their
+        # surrogates, so they go when surrogate_cache evicts surrogates
+        samples = {'tini': 0.1, 'tmax': 50.0, 'dt': 0.1, 'mej': 0.01,
+                   'vej': 0.1, 'th': 0.2, 'ph': 1.0, 'vmin': 0.0,
+                   'kappa': 10.0, 'eps': 1.58e10, 'alp': 1.2, 'eth': 0.5}
+        model_fn, _ = model.get_model_fn('KaKy2016', samples)
+        self.assertIs(model.get_model_fn('KaKy2016', samples)[0], model_fn)
+        surrogate_cache.surrogates.clear()
+        self.assertEqual(len(model._model_fns), 0)
+        self.assertIsNot(model.get_model_fn('KaKy2016', samples)[0], model_fn)
+
+    def test_model_fns_key(self):
+        # a different surrogate source gives a new function
+        samples = {'tini': 0.1, 'tmax': 50.0, 'dt': 0.1, 'mej': 0.01,
+                   'vej': 0.1, 'th': 0.2, 'ph': 1.0, 'vmin': 0.0,
+                   'kappa': 10.0, 'eps': 1.58e10, 'alp': 1.2, 'eth': 0.5}
+        context = LikelihoodContext()
+        model_fn, _ = model.get_model_fn('KaKy2016', samples, context)
+        context.ModelPath = 'svdmodels'
+        self.assertIsNot(model.get_model_fn('KaKy2016', samples, context)[0],
+                         model_fn)
+        self.assertEqual(model.loader_kwargs(context),
+                         {'LoadModel': True, 'ModelPath': 'svdmodels'})
+
+    def test_table_fallback(self):
+        # component masses are only converted to ejecta by the table path
+        samples = {'tini': 0.1, 'tmax': 50.0, 'dt': 0.1, 'm1': 1.4, 'mb1': 1.5,
+                   'c1': 0.15, 'm2': 1.3, 'mb2': 1.4, 'c2': 0.16,
+                   'beta': 3.0, 'kappa_r': 10.0}
+        self.assertIsNone(model.get_model_fn('Me2017', samples))
+        self.assertIsNone(model.get_model_fn('Ka2017x2', samples))
+
 
 if __name__ == '__main__':
     unittest.main()
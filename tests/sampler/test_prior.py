@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from gwemlightcurves import Global
+from gwemlightcurves import sampler
+from gwemlightcurves.sampler import prior
+
+
+class TestBatchPrior(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = dict((k, getattr(Global, k)) for k in
+                          ["T0Range", "ZPRange", "Xlan", "T", "phi", "theta", "mdyn"])
+
+    def tearDown(self):
+        for k, v in self.saved.items():
+            setattr(Global, k, v)
+
+    def check_all_priors(self):
+        u = np.random.RandomState(0).uniform(size=(20, 14))
+        names = [n for n in dir(sampler) if n.startswith("myprior_")]
+        self.assertTrue(len(names) > 50)
+        for name in names:
+            myprior = getattr(sampler, name)
+            expected = u.copy()
+            for row in expected:
+                myprior(row, 14, 14)
+            np.testing.assert_allclose(prior.BatchPrior(myprior)(u), expected,
+                                       err_msg=name)
+
+    def test_defaults(self):
+        Global.T0Range, Global.ZPRange = 0.1, 5.0
+        Global.Xlan, Global.T, Global.phi, Global.theta, Global.mdyn = 0, 0, -1, -1, -1
+        self.check_all_priors()
+
+    def test_fixed(self):
+        Global.T0Range, Global.ZPRange = 0.5, 1.0
+        Global.Xlan, Global.T, Global.phi, Global.theta, Global.mdyn = -4, 3.5, 30.0, 20.0, 0.01
+        self.check_all_priors()
+
+    def test_input_unchanged(self):
+        u = np.random.RandomState(1).uniform(size=(4, 5))
+        v = u.copy()
+        prior.BatchPrior(sampler.myprior_Ka2017_ejecta)(u)
+        np.testing.assert_array_equal(u, v)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import inspect
+import unittest
+
+import numpy as np
+import scipy.stats
+
+from gwemlightcurves import Global
+from gwemlightcurves.sampler import specs, loglike
+
+
+def toy_model(mej, vej):
+    tmag = np.arange(0.1, 10.0, 0.1)
+    mag = 17.0 + vej*tmag*np.ones((9, 1)) - 2.5*np.log10(mej/0.01)
+    return tmag, np.ones(tmag.shape), mag
+
+
+class TestModelSpec(unittest.TestCase):
+
+    def setUp(self):
+        self.data_out = {
+            "g": np.array([[1.0, 18.0, 0.1], [2.0, 18.6, 0.1]]),
+            "r": np.array([[1.5, 18.2, 0.05], [4.0, 19.0, 0.2]]),
+        }
+        Global.data_out = self.data_out
+        Global.filters = list(self.data_out.keys())
+        Global.doLightcurves = 1
+        Global.doLuminosity = 0
+        Global.doWaveformExtrapolate = 0
+        Global.errorbudget = 1.0
+        Global.T0Range, Global.ZPRange = 0.1, 2.0
+
+        self.spec = specs.ModelSpec(
+            "toy", "ejecta", toy_model,
+            [specs.log_mej(minimum=-3.0, maximum=-1.0), specs.vej()],
+            zp=specs.ZP(norm=True),
+            constraint=lambda mej, vej: vej > 0.05)
+
+    def tearDown(self):
+        Global.data_out = 0
+        Global.filters = 0
+        Global.doLightcurves = 0
+        Global.observations = 0
+        Global.errorbudget = 0
+        Global.T0Range, Global.ZPRange = 0, 0
+
+    def test_registry(self):
+        spec = specs.get_spec("Ka2017", "ejecta")
+        self.assertEqual(spec.names, ["t0", "mej", "vej", "xlan", "zp"])
+        self.assertEqual(len(spec.labels), spec.n_params)
+        problem = spec.problem()
+        self.assertEqual(problem.n_params, 5)
+        self.assertRaises(ValueError, specs.register_spec, spec)
+
+    def test_argument_order(self):
+        # the sampled parameters reach the model functions in the order of
+        # their arguments; a few keep their historical names
+        renamed = {("RoFe2017", "xlan"): "ye", ("WoKo2017", "beta"): "theta_r",
+                   ("SmCh2017", "beta"): "slope_r"}
+        def normalize(name):
+            return name.lower().replace("_", "")
+        for (name, mode), spec in specs.model_specs.items():
+            if spec.arguments is not None:
+                continue
+            arguments = [normalize(arg) for arg in inspect.signature(spec.model).parameters]
+            names = [normalize(renamed.get((name, p), p)) for p in spec.names[1:1+spec.n_args]]
+            self.assertEqual(arguments, names, msg="%s (%s)" % (name, mode))
+
+    def test_bu2019re_arguments(self):
+        spec = specs.get_spec("Bu2019re", "ejecta")
+        calls = []
+        spec = specs.ModelSpec(spec.name, spec.mode,
+                               lambda *args: calls.append(args) or toy_model(0.01, 0.1),
+                               spec.parameters[1:-1], zp=spec.parameters[-1])
+        cube = np.array([0.5, 0.5, 0.0, 1.0, 0.5])
+        spec.prior(cube, 5, 5)
+        spec.loglike(cube, 5, 5)
+        mej, a, theta = calls[0]
+        self.assertAlmostEqual(mej, 10**-1.5)
+        self.assertEqual((a, theta), (1.0, 90.0))
+
+    def test_loglike(self):
+        cube = np.array([0.5, 0.25, 0.5, 0.3])
+        self.spec.prior(cube, 4, 4)
+        np.testing.assert_allclose(cube, [0.0, -2.5, 0.15, 0.3])
+        zp = scipy.stats.norm(0.0, Global.ZPRange).ppf(0.3)
+        tmag, lbol, mag = toy_model(10**-2.5, 0.15)
+        expected = loglike.calc_prob(tmag, lbol, mag, 0.0, zp, errorbudget=1.0)
+        self.assertAlmostEqual(self.spec.loglike(cube, 4, 4), expected)
+
+    def test_posterior(self):
+        # multinest output rows: T0, the sampled parameters, ZP, logL
+        data = np.array([[0.05, -2.5, 0.15, 0.3, -10.0],
+                         [-0.05, -2.0, 0.1, 0.5, -12.0]])
+        samples = self.spec.posterior(data)
+        zp = scipy.stats.norm(0.0, Global.ZPRange).ppf(0.3)
+        np.testing.assert_allclose(samples[0], [0.05, 10**-2.5, 0.15, zp])
+        np.testing.assert_allclose(samples[1], [-0.05, 0.01, 0.1, 0.0], atol=1e-12)
+        t0, (mej, vej), zp_best = self.spec.model_values(data[0])
+        self.assertAlmostEqual(zp_best, zp)
+        self.assertAlmostEqual(mej, 10**-2.5)
+
+    def test_batch(self):
+        problem = self.spec.problem()
+        u = np.random.RandomState(0).uniform(size=(20, 4))
+        x = problem.prior_transform_batch(u)
+        prob = problem.log_likelihood_batch(x)
+        expected = [self.spec.loglike(y.copy(), 4, 4) for y in x]
+        np.testing.assert_allclose(prob, expected)
+        # the constraint rejects the slow ejecta without a model call
+        self.assertTrue(np.all(np.isneginf(prob[x[:, 2] <= 0.05])))
+        self.assertTrue(np.all(np.isfinite(prob[x[:, 2] > 0.05])))
+
+
+if __name__ == '__main__':
+    unittest.main()
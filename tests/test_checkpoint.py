@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gwemlightcurves import checkpoint
+
+
+class Interrupt(Exception):
+    pass
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.checkpointDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.checkpointDir)
+
+    def test_dump_atomic(self):
+        filename = os.path.join(self.checkpointDir, "sub", "state.pkl")
+        checkpoint.dump_atomic({"a": np.arange(3)}, filename)
+        checkpoint.dump_atomic({"a": np.arange(4)}, filename)
+        np.testing.assert_array_equal(checkpoint.load_checkpoint(filename)["a"], np.arange(4))
+        self.assertEqual(os.listdir(os.path.dirname(filename)), ["state.pkl"])
+        # a truncated file is ignored rather than failing the resume
+        open(filename, 'wb').write(b'\x80\x04')
+        self.assertTrue(checkpoint.load_checkpoint(filename) is None)
+        self.assertTrue(checkpoint.load_checkpoint(filename + ".missing") is None)
+
+    def draw(self, chunk):
+        self.ncalls = self.ncalls + 1
+        if self.ncalls == self.fail_at:
+            raise Interrupt()
+        return chunk + np.random.uniform(size=len(chunk))
+
+    def test_run_chunks(self):
+        chunks = [np.arange(3)*k for k in range(5)]
+
+        self.ncalls, self.fail_at = 0, -1
+        np.random.seed(1)
+        expected = checkpoint.run_chunks(self.draw, chunks)
+        after = np.random.uniform()
+
+        np.random.seed(1)
+        self.ncalls, self.fail_at = 0, 4
+        self.assertRaises(Interrupt, checkpoint.run_chunks, self.draw, chunks,
+                          checkpointDir=self.checkpointDir, key="job")
+        # the resumed run only redoes the interrupted chunk and gives the same draws
+        np.random.seed(2)
+        self.ncalls, self.fail_at = 0, -1
+        results = checkpoint.run_chunks(self.draw, chunks,
+                                        checkpointDir=self.checkpointDir, key="job")
+        self.assertEqual(self.ncalls, 2)
+        for result, value in zip(results, expected):
+            np.testing.assert_array_equal(result, value)
+        self.assertEqual(np.random.uniform(), after)
+
+        # chunks of another job are not reused
+        self.ncalls = 0
+        checkpoint.run_chunks(self.draw, chunks, checkpointDir=self.checkpointDir, key="other")
+        self.assertEqual(self.ncalls, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from astropy.table import Table
+
+import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
+import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
+from gwemlightcurves.KNModels import KNTable
+from gwemlightcurves.KNModels.table import get_eos_list
+
+INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input")
+
+
+class TestEOSBundle(unittest.TestCase):
+
+    def setUp(self):
+        self.outputDir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.outputDir, et.BUNDLE_NAME)
+        et.save_eos_bundle(et.pack_eos_tables(INPUT), self.filename)
+        et._bundle.clear()
+        et._splines.clear()
+        et.load_eos_bundle(self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.outputDir)
+        et._bundle.clear()
+        et._splines.clear()
+
+    def test_eos_list(self):
+        monica = sorted(os.path.basename(f)[:-len("_mr.dat")] for f in glob.glob(os.path.join(INPUT, "Monica", "*_mr.dat")))
+        self.assertEqual(get_eos_list("Monica"), monica)
+        self.assertEqual(get_eos_list("Wolfgang"), ["H4", "SHT_cold_beta", "ap4", "ms1b"])
+        self.assertTrue("pal6" in get_eos_list("lalsim"))
+        with self.assertRaises(ValueError):
+            get_eos_list("other")
+
+    def test_table_spline(self):
+        for EOS, TOV, column, log in [("sly", "Monica", "radius", False),
+                                      ("sly", "Monica", "rho_c", True),
+                                      ("ap4", "Wolfgang", "baryonic_mass", False),
+                                      ("ap4", "lalsim", "radius", False)]:
+            filename, mass_column = et.TABLES[TOV]
+            table = Table.read(os.path.join(INPUT, TOV, filename % EOS), format='ascii')
+            values = np.array(table[column])
+            if log:
+                values = np.log10(values)
+            mass_table, value_table, consts = et.table_spline(EOS, TOV, column, log=log)
+            np.testing.assert_array_equal(mass_table, table[mass_column])
+            np.testing.assert_allclose(value_table, values, rtol=1e-15)
+            np.testing.assert_allclose(consts, ms.interpolate(table[mass_column], values), rtol=1e-12)
+        # the header with units of pal6 is read too
+        mass_table, value_table, consts = et.table_spline("pal6", "lalsim", "radius")
+        self.assertEqual(len(mass_table), len(value_table))
+
+    def test_stale_bundle(self):
+        # a table changed after packing makes the bundle fall back to the tables
+        os.makedirs(os.path.join(self.outputDir, "Monica"))
+        tablename = os.path.join(self.outputDir, "Monica", "sly_mr.dat")
+        shutil.copy(os.path.join(INPUT, "Monica", "sly_mr.dat"), tablename)
+        self.assertFalse(et.bundle_is_stale(self.filename))
+        mtime = os.path.getmtime(self.filename) + 10
+        os.utime(tablename, (mtime, mtime))
+        self.assertTrue(et.bundle_is_stale(self.filename))
+        et._bundle.clear()
+        self.assertIsNone(et.load_eos_bundle(self.filename))
+
+    def test_calc_radius(self):
+        # the tables are not on the path, only in the bundle
+        path = os.environ.get("PATH", "")
+        os.environ["PATH"] = ""
+        try:
+            samples = KNTable({"m1": [1.2, 1.4], "m2": [1.0, 1.1]})
+            samples = samples.calc_radius_and_epsilon_c("sly", "Monica")
+            samples = samples.calc_baryonic_mass("ap4", "Wolfgang")
+        finally:
+            os.environ["PATH"] = path
+        self.assertTrue(np.all(samples["r1"] > 1e4))
+        self.assertTrue(np.all(samples["eps01"] > 1e14))
+        self.assertTrue(np.all(samples["mb1"] > samples["m1"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from scipy import interpolate
+
+from gwemlightcurves.EOS import ensemble
+
+EOS_SAMPLES = os.path.join(os.path.dirname(__file__), "..", "gwemlightcurves",
+                           "embright_gwlc", "EOS_samples_unit_test")
+
+
+class TestEOSEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        # the unit test draws, laid out as the GP ensemble, the first one with two branches
+        self.eosDir = tempfile.mkdtemp()
+        self.filenames = sorted(glob.glob(os.path.join(EOS_SAMPLES, "MACROdraw-*-0.csv")))
+        self.eos = [int(os.path.basename(f).split("-")[1]) for f in self.filenames]
+        for eos, filename in zip(self.eos, self.filenames):
+            branchfile = ensemble.gp_branch_file(self.eosDir, eos, 0)
+            os.makedirs(os.path.dirname(branchfile))
+            shutil.copy(filename, branchfile)
+        shutil.copy(self.filenames[1], ensemble.gp_branch_file(self.eosDir, self.eos[0], 1))
+        self.posterior = os.path.join(self.eosDir, "posterior.csv")
+        with open(self.posterior, 'w') as fid:
+            fid.write("eos,logweight_total\n")
+            for ii, eos in enumerate(self.eos):
+                fid.write("%d,%f\n" % (eos, -0.1*ii))
+
+    def tearDown(self):
+        shutil.rmtree(self.eosDir)
+
+    def test_ingest_gp(self):
+        eos_ensemble = ensemble.ingest_gp(self.eosDir, self.posterior)
+        self.assertEqual(len(eos_ensemble), len(self.eos))
+        np.testing.assert_array_equal(eos_ensemble.nbranch, [2] + [1]*(len(self.eos)-1))
+        np.testing.assert_allclose(eos_ensemble.probabilities(),
+                                   np.exp(-0.1*np.arange(len(self.eos)))/np.sum(np.exp(-0.1*np.arange(len(self.eos)))))
+
+        filename = ensemble.ensemble_file(os.path.join(self.eosDir, "mrgagn"))
+        eos_ensemble.save(filename)
+        eos_ensemble = ensemble.load_ensemble(filename)
+        self.assertTrue(ensemble.load_ensemble(filename) is eos_ensemble)
+
+        masses = np.array([0.5, 1.2, 1.4, 1.9, 5.0])
+        for ii, filename in enumerate(self.filenames):
+            data_out = np.genfromtxt(filename, names=True, delimiter=",")
+            marray = data_out["M"]
+            mmax = np.max(marray)
+            if ii == 0:
+                mmax = max(mmax, np.max(np.genfromtxt(self.filenames[1], names=True, delimiter=",")["M"]))
+            self.assertEqual(eos_ensemble.Mmax[ii], mmax)
+            lambdas, radii, mbaryons = eos_ensemble.values(ii, masses)
+            for column, values in zip(["Lambda", "R", "Mb"], [lambdas, radii, mbaryons]):
+                f = interpolate.interp1d(marray, data_out[column], fill_value=0, bounds_error=False)
+                expected = f(masses)
+                if ii == 0:
+                    data_out1 = np.genfromtxt(self.filenames[1], names=True, delimiter=",")
+                    f = interpolate.interp1d(data_out1["M"], data_out1[column], fill_value=0, bounds_error=False)
+                    expected = np.maximum(expected, f(masses))
+                np.testing.assert_allclose(values, expected, rtol=1e-10)
+
+    def test_lookup(self):
+        eos_ensemble = ensemble.ingest_gp(self.eosDir, self.posterior)
+        rng = np.random.RandomState(0)
+        masses = rng.uniform(0.05, 2.5, size=(20, 1))
+        indices = rng.randint(0, len(eos_ensemble), size=7)
+        lambdas, radii, mbaryons = eos_ensemble.lookup(indices, masses)
+        self.assertEqual(lambdas.shape, (20, 7))
+        for kk, index in enumerate(indices):
+            expected = eos_ensemble.values(index, masses[:,0])
+            for values, expected_values in zip([lambdas, radii, mbaryons], expected):
+                self.assertTrue(np.all(values[:,kk] >= 0))
+                np.testing.assert_allclose(values[:,kk], expected_values, rtol=1e-10)
+        # at the points of a branch, and at its ends
+        marray, larray, rarray, mbararray = eos_ensemble.branch(3)
+        np.testing.assert_allclose(eos_ensemble.lookup(3, marray)[0], larray, rtol=1e-10)
+
+    def test_read_branch(self):
+        # the branch stops at the maximum mass, inclusive, and is sorted
+        filename = os.path.join(self.eosDir, "branch.csv")
+        with open(filename, 'w') as fid:
+            fid.write("R,M,Lambda\n")
+            for R, M, Lambda in [(12.0, 1.0, 900.0), (13.0, 0.5, 9000.0),
+                                 (11.5, 2.0, 10.0), (11.0, 1.9, 5.0)]:
+                fid.write("%f,%f,%f\n" % (R, M, Lambda))
+        marray, larray, rarray, mbararray = ensemble.read_branch(filename)
+        np.testing.assert_array_equal(marray, [0.5, 1.0, 2.0])
+        np.testing.assert_array_equal(larray, [9000.0, 900.0, 10.0])
+        np.testing.assert_array_equal(rarray, [13.0, 12.0, 11.5])
+        np.testing.assert_array_equal(mbararray, [0.0, 0.0, 0.0])
+        eos_ensemble = ensemble.EOSEnsemble.from_branches([[[marray, larray, rarray, mbararray]]])
+        self.assertEqual(eos_ensemble.Mmax[0], 2.0)
+        self.assertAlmostEqual(eos_ensemble.values(0, [2.0])[0][0], 10.0)
+
+    def test_draw(self):
+        branches = [ensemble.read_branch(filename) for filename in self.filenames]
+        # EOS 0 and 2 have no branch, EOS 1 only covers light stars
+        light = [curve[branches[1][0] < 1.0] for curve in branches[1]]
+        eos_ensemble = ensemble.EOSEnsemble.from_branches([[], [light], []] + [[b] for b in branches[2:]])
+        m1, m2 = np.array([1.2, 1.5, 1.3]), np.array([1.1, 1.0, 1.2])
+        np.random.seed(1)
+        indices, (lambda1, lambda2), radii, mbaryons = eos_ensemble.draw([m1, m2], 50)
+        self.assertEqual(indices.shape, (3, 50))
+        self.assertFalse(np.any(indices == 0) or np.any(indices == 2))
+        # outside of its branch, EOS 1 has Lambda = 0, which is kept
+        self.assertTrue(np.any(indices == 1))
+        np.testing.assert_array_equal(lambda1[indices == 1], 0)
+        self.assertTrue(np.all(lambda1 >= 0) and np.all(lambda2 >= 0))
+        np.testing.assert_allclose(lambda1, eos_ensemble.lookup(indices, m1[:,None])[0])
+        np.testing.assert_allclose(radii[1], eos_ensemble.lookup(indices, m2[:,None])[1])
+
+        indices, lambdas, radii, mbaryons = eos_ensemble.draw([m1], 10, probabilities=[0, 0, 0, 1] + [0]*(len(eos_ensemble)-4))
+        self.assertTrue(np.all(indices == 3))
+
+    def test_marginalize_eos_spec(self):
+        from gwemlightcurves.KNModels.table import marginalize_eos_spec
+        branches = [[ensemble.read_branch(filename)] for filename in self.filenames]
+        eosfile = os.path.join(self.eosDir, "spec.npz")
+        ensemble.EOSEnsemble.from_branches([[]] + branches).save(eosfile)
+        row = {"m1": 1.4, "m2": 1.2, "chi_eff": 0.0}
+        samples = marginalize_eos_spec(row, eosfile=eosfile)
+        self.assertEqual(len(samples), len(branches))
+        for ii, sample in enumerate(samples):
+            lambdas, radii, mbaryons = ensemble.load_ensemble(eosfile).values(ii+1, [1.4, 1.2])
+            self.assertAlmostEqual(sample["lambda1"], lambdas[0])
+            self.assertAlmostEqual(sample["r2"], 1000*radii[1])
+
+    def test_missing(self):
+        with self.assertRaises(IOError):
+            ensemble.load_ensemble(os.path.join(self.eosDir, "missing.npz"))
+        eos_ensemble = ensemble.EOSEnsemble.from_branches([[], [ensemble.read_branch(self.filenames[0])]])
+        self.assertEqual(eos_ensemble.Mmax[0], -1)
+        np.testing.assert_array_equal(eos_ensemble.values(0, [1.4])[0], [-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import unittest
+
+import numpy as np
+
+from gwemlightcurves.EOS import family
+from gwemlightcurves.EOS.EOS4ParameterPiecewisePolytrope import EOS4ParameterPiecewisePolytrope
+
+INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input", "lalsim")
+
+
+class TestTOVFamily(unittest.TestCase):
+
+    def setUp(self):
+        # a smooth synthetic family, R and k2 decreasing with the mass
+        x = np.linspace(0.0, 1.0, 200)
+        self.masses = 0.5 + 1.7*(1.0 - (1.0 - x)**2)
+        self.radii = 13.0 - 1.5*(self.masses - 0.5)**2
+        self.k2s = 0.15 - 0.05*self.masses
+        self.family = family.TOVFamily(self.masses, self.radii, self.k2s, name="toy")
+        self.path = os.environ.get("PATH", "")
+        family._polytrope_table.clear()
+
+    def tearDown(self):
+        os.environ["PATH"] = self.path
+        family._polytrope_table.clear()
+
+    def test_queries(self):
+        m = np.array([0.4, 0.5, 1.0, 1.4, 2.2, 2.3])
+        r = self.family.radiusofm(m)
+        k2 = self.family.k2ofm(m)
+        lambdas = self.family.lambdaofm(m)
+        inside = (m >= 0.5) & (m <= 2.2)
+        np.testing.assert_array_equal(r[~inside], -1)
+        np.testing.assert_array_equal(lambdas[~inside], -1)
+        np.testing.assert_allclose(r[inside], 13.0 - 1.5*(m[inside] - 0.5)**2, rtol=1e-4)
+        np.testing.assert_allclose(k2[inside], 0.15 - 0.05*m[inside], rtol=1e-10)
+        np.testing.assert_allclose(lambdas[inside], family.tidal_deformability(m[inside], r[inside], k2[inside]), rtol=1e-3)
+        # scalar masses give floats, as the lalsimulation calls did
+        self.assertTrue(isinstance(self.family.lambdaofm(1.4), float))
+        self.assertEqual(self.family.maxmass(), 2.2)
+
+    def test_polytrope_parameters(self):
+        os.environ["PATH"] = INPUT + os.pathsep + self.path
+        # logP1 is converted to SI, the names are matched without regard to case
+        np.testing.assert_allclose(family.polytrope_parameters("SLy"), (33.384, 3.005, 2.988, 2.851))
+        self.assertEqual(family.polytrope_parameters("sly"), family.polytrope_parameters("SLy"))
+        with self.assertRaises(ValueError):
+            family.polytrope_parameters("not_an_eos")
+
+    def test_cache(self):
+        os.environ["PATH"] = INPUT + os.pathsep + self.path
+        key = ("polytrope", family.polytrope_parameters("SLy"), family.NGRID)
+        family._families[key] = self.family
+        try:
+            self.assertTrue(family.polytrope_family("SLy") is self.family)
+            self.assertTrue(family.polytrope_family(parameters=key[1]) is self.family)
+            eos = EOS4ParameterPiecewisePolytrope("SLy")
+            self.assertEqual(eos.maxmass(), 2.2)
+            np.testing.assert_array_equal(eos.lambdaofm([1.2, 1.4]), self.family.lambdaofm([1.2, 1.4]))
+        finally:
+            del family._families[key]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import unittest
+
+import numpy as np
+from astropy.table import Table
+
+import gwemlightcurves.EOS.TOV.Monica.MonotonicSpline as ms
+import gwemlightcurves.EOS.TOV.Monica.eos_tools as et
+from gwemlightcurves.KNModels import KNTable
+
+INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input")
+
+
+def reference_interpolate(x_values, y_values):
+    # the scalar loops of the original MonotonicSpline.interpolate
+    n = len(x_values)
+    h, m, consts = np.zeros(n), np.zeros(n), np.zeros((n, 3))
+    for i in range(n-1):
+        h[i] = x_values[i+1] - x_values[i]
+        if h[i] == 0:
+            h[i] = 10**-4
+        m[i] = (y_values[i+1] - y_values[i])/h[i]
+    for i in range(1, n-1):
+        if m[i-1]*m[i] > 0.:
+            beta = (3.*m[i-1]*m[i])/(max(m[i-1], m[i]) + 2.*min(m[i-1], m[i]))
+            if m[i] > 0:
+                consts[i, 0] = min(max(0., beta), 3.*min(m[i-1], m[i]))
+            else:
+                consts[i, 0] = max(min(0., beta), 3.*max(m[i-1], m[i]))
+    for i in range(n-1):
+        consts[i, 1] = (3*m[i] - consts[i+1, 0] - 2.*consts[i, 0])/h[i]
+        consts[i, 2] = (consts[i+1, 0] + consts[i, 0] - 2.*m[i])/h[i]**2
+    return consts
+
+
+def reference_value(imass, mass_table, value_table, consts):
+    # one mass at a time, as the original values_from_table
+    if imass > mass_table.max():
+        return 10**-6
+    if imass in mass_table:
+        return value_table[np.where(mass_table == imass)[0][0]]
+    value = 0.
+    for i in range(len(mass_table)-1):
+        if mass_table[i] < imass < mass_table[i+1]:
+            dm = imass - mass_table[i]
+            value = value_table[i] + consts[i, 0]*dm + consts[i, 1]*dm**2 + consts[i, 2]*dm**3
+    return value
+
+
+class TestMonotonicSpline(unittest.TestCase):
+
+    def setUp(self):
+        # past the maximum mass the Monica tables turn over
+        self.table = Table.read(os.path.join(INPUT, "Monica", "sly_mr.dat"), format='ascii')
+        self.path = os.environ.get("PATH", "")
+        et._splines.clear()
+
+    def tearDown(self):
+        os.environ["PATH"] = self.path
+        et._splines.clear()
+
+    def test_interpolate(self):
+        for column in ["radius", "mb"]:
+            np.testing.assert_allclose(ms.interpolate(self.table["mass"], self.table[column]),
+                                       reference_interpolate(np.array(self.table["mass"]), np.array(self.table[column])),
+                                       rtol=1e-12)
+        # repeated masses and flat values
+        x = np.array([0., 1., 1., 2., 3., 4.])
+        y = np.array([0., 1., 2., 2., 2., 5.])
+        np.testing.assert_allclose(ms.interpolate(x, y), reference_interpolate(x, y), rtol=1e-12)
+
+    def test_values_from_table(self):
+        mass_table, value_table = np.array(self.table["mass"]), np.array(self.table["radius"])
+        consts = ms.interpolate(mass_table, value_table)
+        masses = np.concatenate((np.random.RandomState(0).uniform(0.0, 2.5, 200), mass_table[[3, 40]]))
+        values = et.values_from_table(masses, mass_table, value_table, consts)
+        expected = [reference_value(m, mass_table, value_table, consts) for m in masses]
+        np.testing.assert_allclose(values, expected, rtol=1e-12)
+
+    def test_calc_radius(self):
+        os.environ["PATH"] = os.path.join(INPUT, "Monica") + os.pathsep + self.path
+        samples = KNTable({"m1": [1.2, 1.4, 2.5], "m2": [1.0, 1.1, 1.2]})
+        samples = samples.calc_radius("sly", "Monica")
+        samples = samples.calc_baryonic_mass("sly", "Monica")
+        mass_table, radius_table = np.array(self.table["mass"]), np.array(self.table["radius"])
+        consts = ms.interpolate(mass_table, radius_table)
+        np.testing.assert_allclose(samples["r1"], [1000*reference_value(m, mass_table, radius_table, consts) for m in [1.2, 1.4, 2.5]])
+        self.assertTrue(np.all(samples["mb1"][:2] > samples["m1"][:2]))
+        # the table is read and the spline made once
+        spline = et.table_spline("sly", "Monica", "radius")
+        samples.calc_radius("sly", "Monica")
+        self.assertTrue(et.table_spline("sly", "Monica", "radius") is spline)
+        self.assertEqual(sorted(et._splines.keys()), [("sly", "Monica", "mb", False), ("sly", "Monica", "radius", False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gwemlightcurves import profiler
+from gwemlightcurves.sampler import backends, specs
+from gwemlightcurves.sampler.context import LikelihoodContext
+
+
+@profiler.profiled("test.square")
+def square(x):
+    return x*x
+
+
+def toy_model(mej, vej):
+    tmag = np.arange(0.1, 10.0, 0.1)
+    mag = 17.0 + vej*tmag*np.ones((9, 1)) - 2.5*np.log10(mej/0.01)
+    return tmag, np.ones(tmag.shape), mag
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.enabled = profiler.is_enabled()
+        profiler.reset()
+
+    def tearDown(self):
+        if self.enabled:
+            profiler.enable()
+        else:
+            profiler.disable()
+        profiler.reset()
+
+    def test_disabled(self):
+        profiler.disable()
+        self.assertEqual(square(3), 9)
+        with profiler.stage("test.block"):
+            pass
+        self.assertEqual(profiler.stats, {})
+
+    def test_enabled(self):
+        profiler.enable()
+        for x in range(5):
+            square(x)
+        with profiler.stage("test.block"):
+            square(2)
+        self.assertEqual(profiler.stats["test.square"][0], 6)
+        self.assertEqual(profiler.stats["test.block"][0], 1)
+        self.assertTrue(profiler.stats["test.block"][1] >= 0.0)
+        self.assertTrue("test.square" in profiler.summary())
+        self.assertEqual(square.__name__, "square")
+
+    def test_sampler_run(self):
+        profiler.enable()
+        data_out = {"g": np.array([[1.0, 18.0, 0.1], [2.0, 18.6, 0.1]])}
+        context = LikelihoodContext(data_out=data_out, filters=["g"], doLightcurves=1,
+                                    errorbudget=1.0, T0Range=0.1, ZPRange=2.0)
+        spec = specs.ModelSpec("toy", "ejecta", toy_model,
+                               [specs.log_mej(minimum=-3.0, maximum=-1.0), specs.vej()])
+        plotDir = tempfile.mkdtemp()
+        try:
+            basename = os.path.join(plotDir, "2-")
+            backends.run_sampler("nested", spec.problem(context), basename,
+                                 n_live_points=20, max_iter=50)
+            data = json.load(open(basename + "profile.json"))
+        finally:
+            shutil.rmtree(plotDir)
+        self.assertTrue(data["sampler.calc_prob"]["calls"] >= 20)
+        # the statistics are reset after each run
+        self.assertEqual(profiler.stats, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+from astropy.table import Table
+
+from gwemlightcurves import surrogate_cache
+
+
+class TestSurrogateCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = surrogate_cache.SurrogateCache(max_entries=2)
+        cache["a"] = {"VA": np.zeros(10)}
+        cache["b"] = {"VA": np.zeros(10)}
+        # touch "a" so that "b" is the least recently used entry
+        cache["a"]
+        cache["c"] = {"VA": np.zeros(10)}
+        self.assertEqual(cache.keys(), ["a", "c"])
+
+    def test_memory_budget(self):
+        cache = surrogate_cache.SurrogateCache(max_bytes=12000)
+        cache["a"] = {"VA": np.zeros(1000)}
+        cache["b"] = {"VA": np.zeros(1000)}
+        self.assertEqual(cache.keys(), ["b"])
+        # an entry larger than the budget is still kept on its own
+        cache["c"] = {"VA": np.zeros(10000)}
+        self.assertEqual(cache.keys(), ["c"])
+
+    def test_on_evict(self):
+        cache = surrogate_cache.SurrogateCache(max_entries=1)
+        calls = []
+        cache.on_evict.append(lambda: calls.append(1))
+        cache["a"] = {"VA": np.zeros(10)}
+        self.assertEqual(len(calls), 0)
+        cache["b"] = {"VA": np.zeros(10)}
+        self.assertEqual(len(calls), 1)
+        cache.clear()
+        self.assertEqual(len(calls), 2)
+
+    def test_key(self):
+        table = Table({'tini': [0.1], 'tmax': [14.0], 'dt': [0.1],
+                       'n_coeff': [10], 'gptype': ["sklearn"]})
+        key1 = surrogate_cache.surrogate_key("Bu2019inc", "mag", table)
+        key2 = surrogate_cache.surrogate_key("Bu2019lm", "mag", table)
+        table['dt'] = 0.2
+        key3 = surrogate_cache.surrogate_key("Bu2019inc", "mag", table)
+        self.assertEqual(len(set([key1, key2, key3])), 3)
+
+    def test_key_source(self):
+        # surrogates of different directories, loaded or trained, are kept
+        # apart
+        table = Table({'tini': [0.1], 'tmax': [14.0], 'dt': [0.1],
+                       'n_coeff': [10], 'gptype': ["sklearn"]})
+        keys = [surrogate_cache.surrogate_key("Bu2019inc", "mag", table,
+                                              ModelPath=path, LoadModel=load)
+                for path in [None, "a", "b"] for load in [False, True]]
+        self.assertEqual(len(set(keys)), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
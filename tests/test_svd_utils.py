@@ -0,0 +1,263 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RationalQuadratic
+
+from astropy.table import Table
+
+from gwemlightcurves import svd_utils, surrogate_cache
+
+
+def make_svd_model(param_array, data, tt, n_coeff):
+    # Same construction as svd_utils.calc_svd_mag/calc_svd_lbol, applied to
+    # an in-memory training set instead of the model grids in ../output.
+    param_array_postprocess = np.array(param_array)
+    param_mins = np.min(param_array_postprocess, axis=0)
+    param_maxs = np.max(param_array_postprocess, axis=0)
+    param_array_postprocess = ((param_array_postprocess - param_mins) /
+                               (param_maxs - param_mins))
+
+    mins, maxs = np.min(data, axis=0), np.max(data, axis=0)
+    data_postprocess = (data - mins) / (maxs - mins)
+    UA, sA, VA = np.linalg.svd(data_postprocess, full_matrices=True)
+    VA = VA.T
+    cAmat = np.dot(data_postprocess, VA[:, :n_coeff]).T
+
+    gps = []
+    for i in range(n_coeff):
+        kernel = 1.0 * RationalQuadratic(length_scale=1.0, alpha=0.1)
+        gp = GaussianProcessRegressor(kernel=kernel, n_restarts_optimizer=0)
+        gp.fit(param_array_postprocess, cAmat[i, :])
+        gps.append(gp)
+
+    return {"n_coeff": n_coeff,
+            "param_array": param_array,
+            "param_array_postprocess": param_array_postprocess,
+            "cAmat": cAmat,
+            "VA": VA,
+            "param_mins": param_mins,
+            "param_maxs": param_maxs,
+            "mins": mins,
+            "maxs": maxs,
+            "gps": gps,
+            "tt": tt}
+
+
+def make_svd_models(nsamples=20, n_coeff=5, seed=0):
+    rng = np.random.RandomState(seed)
+    tt = np.arange(0.0, 14.0 + 0.5, 0.5)
+    param_array = rng.uniform(size=(nsamples, 2))
+    param_array[:, 0] = -3.0 + 2.0 * param_array[:, 0]
+
+    filters = ["u", "g", "r", "i", "z", "y", "J", "H", "K"]
+    svd_mag_model = {}
+    for jj, filt in enumerate(filters):
+        mags = (-15.0 + jj * 0.1 - param_array[:, [0]]
+                + param_array[:, [1]] * np.log1p(tt)[np.newaxis, :])
+        svd_mag_model[filt] = make_svd_model(param_array, mags, tt, n_coeff)
+    lbol = 41.0 + param_array[:, [0]] - 0.5 * param_array[:, [1]] * tt
+    svd_lbol_model = make_svd_model(param_array, lbol, tt, n_coeff)
+
+    return svd_mag_model, svd_lbol_model
+
+
+class TestCalcLcBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.svd_mag_model, cls.svd_lbol_model = make_svd_models()
+        rng = np.random.RandomState(1)
+        cls.param_matrix = np.vstack((rng.uniform(-3.0, -1.0, size=7),
+                                      rng.uniform(0.0, 1.0, size=7))).T
+
+    def test_matches_calc_lc(self):
+        t, lbol, mag = svd_utils.calc_lc_batch(
+            0.0, 14.0, 0.1, self.param_matrix,
+            svd_mag_model=self.svd_mag_model,
+            svd_lbol_model=self.svd_lbol_model)
+        self.assertEqual(lbol.shape, (7, len(t)))
+        self.assertEqual(mag.shape, (7, 9, len(t)))
+        for ii, param_list in enumerate(self.param_matrix):
+            t1, lbol1, mag1 = svd_utils.calc_lc(
+                0.0, 14.0, 0.1, param_list,
+                svd_mag_model=self.svd_mag_model,
+                svd_lbol_model=self.svd_lbol_model)
+            np.testing.assert_allclose(t, t1)
+            np.testing.assert_allclose(lbol[ii], lbol1, rtol=1e-6)
+            np.testing.assert_allclose(mag[ii], mag1, rtol=1e-6)
+
+    def test_return_uncertainty(self):
+        t, lbol, mag, mag_err = svd_utils.calc_lc_batch(
+            0.0, 14.0, 0.1, self.param_matrix,
+            svd_mag_model=self.svd_mag_model,
+            svd_lbol_model=self.svd_lbol_model,
+            return_uncertainty=True)
+        self.assertEqual(mag_err.shape, mag.shape)
+        self.assertTrue(np.all(mag_err >= 0))
+        t1, lbol1, mag1, mag_err1 = svd_utils.calc_lc(
+            0.0, 14.0, 0.1, self.param_matrix[0],
+            svd_mag_model=self.svd_mag_model,
+            svd_lbol_model=self.svd_lbol_model,
+            return_uncertainty=True)
+        np.testing.assert_allclose(mag_err[0], mag_err1, rtol=1e-5,
+                                   atol=1e-6)
+
+
+class TestFrozenGPs(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.svd_mag_model, cls.svd_lbol_model = make_svd_models()
+        cls.svd_mag_model_frozen = svd_utils.freeze_svd_model(
+            cls.svd_mag_model)
+        cls.svd_lbol_model_frozen = svd_utils.freeze_svd_model(
+            cls.svd_lbol_model)
+
+    def test_predict_matches_sklearn(self):
+        gps = self.svd_mag_model["r"]["gps"]
+        frozen = self.svd_mag_model_frozen["r"]["gps"]
+        X = np.random.RandomState(2).uniform(size=(11, 2))
+        y_mean, y_std = svd_utils.predict_frozen_gps(frozen, X,
+                                                     return_std=True)
+        for i, gp in enumerate(gps):
+            mean, std = gp.predict(X, return_std=True)
+            np.testing.assert_allclose(y_mean[i], mean, rtol=1e-8, atol=1e-12)
+            np.testing.assert_allclose(y_std[i], std, rtol=1e-6, atol=1e-10)
+
+    def test_calc_lc_accepts_frozen(self):
+        param_list = [-2.0, 0.3]
+        t1, lbol1, mag1 = svd_utils.calc_lc(
+            0.0, 14.0, 0.1, param_list,
+            svd_mag_model=self.svd_mag_model,
+            svd_lbol_model=self.svd_lbol_model)
+        t2, lbol2, mag2 = svd_utils.calc_lc(
+            0.0, 14.0, 0.1, param_list,
+            svd_mag_model=self.svd_mag_model_frozen,
+            svd_lbol_model=self.svd_lbol_model_frozen)
+        np.testing.assert_allclose(lbol2, lbol1, rtol=1e-6)
+        np.testing.assert_allclose(mag2, mag1, rtol=1e-8)
+
+
+class TestSurrogateStore(unittest.TestCase):
+    def test_round_trip(self):
+        svd_mag_model, svd_lbol_model = make_svd_models()
+        param_list = [-1.5, 0.7]
+        t1, lbol1, mag1 = svd_utils.calc_lc(
+            0.0, 14.0, 0.1, param_list,
+            svd_mag_model=svd_mag_model, svd_lbol_model=svd_lbol_model)
+
+        with tempfile.TemporaryDirectory() as modelpath:
+            for kind, svd_model in [("mag", svd_mag_model),
+                                    ("lbol", svd_lbol_model)]:
+                modelfile = os.path.join(modelpath, 'Test_%s.pkl' % kind)
+                with open(modelfile, 'wb') as handle:
+                    pickle.dump(svd_model, handle)
+                svd_utils.convert_surrogate("Test", kind, modelpath=modelpath)
+
+            svd_mag_model_mmap = svd_utils.load_surrogate(
+                "Test", "mag", modelpath=modelpath)
+            svd_lbol_model_mmap = svd_utils.load_svd_model(
+                os.path.join(modelpath, 'Test_lbol.pkl'))
+            self.assertIsInstance(svd_mag_model_mmap["r"]["VA"], np.memmap)
+            self.assertIsInstance(svd_lbol_model_mmap["gps"]["alpha"],
+                                  np.memmap)
+
+            t2, lbol2, mag2 = svd_utils.calc_lc(
+                0.0, 14.0, 0.1, param_list,
+                svd_mag_model=svd_mag_model_mmap,
+                svd_lbol_model=svd_lbol_model_mmap)
+            np.testing.assert_allclose(lbol2, lbol1, rtol=1e-6)
+            np.testing.assert_allclose(mag2, mag1, rtol=1e-8)
+
+            # converted stores keep the factors for the uncertainties
+            t1, lbol1, mag1, mag_err1 = svd_utils.calc_lc(
+                0.0, 14.0, 0.1, param_list,
+                svd_mag_model=svd_mag_model, svd_lbol_model=svd_lbol_model,
+                return_uncertainty=True)
+            t2, lbol2, mag2, mag_err2 = svd_utils.calc_lc(
+                0.0, 14.0, 0.1, param_list,
+                svd_mag_model=svd_mag_model_mmap,
+                svd_lbol_model=svd_lbol_model_mmap,
+                return_uncertainty=True)
+            np.testing.assert_allclose(mag_err2, mag_err1, rtol=1e-5,
+                                       atol=1e-6)
+
+    def test_stale_surrogate(self):
+        # a pickle retrained after the conversion is used instead of the
+        # outdated store; the store keeps the factors for the uncertainties
+        svd_mag_model, svd_lbol_model = make_svd_models()
+        with tempfile.TemporaryDirectory() as modelpath:
+            modelfile = os.path.join(modelpath, 'Test_lbol.pkl')
+            with open(modelfile, 'wb') as handle:
+                pickle.dump(svd_lbol_model, handle)
+            surrogatepath = svd_utils.convert_surrogate("Test", "lbol",
+                                                        modelpath=modelpath)
+            svd_lbol_model_mmap = svd_utils.load_svd_model(modelfile)
+            self.assertIn("L", svd_lbol_model_mmap["gps"])
+
+            mtime = os.path.getmtime(os.path.join(surrogatepath, 'surrogate.json'))
+            os.utime(modelfile, (mtime + 10, mtime + 10))
+            svd_lbol_model_pkl = svd_utils.load_svd_model(modelfile)
+            self.assertIsInstance(svd_lbol_model_pkl["gps"], list)
+
+    def test_color_model(self):
+        # colour models are keyed by filter like the mag models
+        svd_color_model, _ = make_svd_models()
+        with tempfile.TemporaryDirectory() as modelpath:
+            modelfile = os.path.join(modelpath, 'TestColor.pkl')
+            with open(modelfile, 'wb') as handle:
+                pickle.dump(svd_color_model, handle)
+            surrogatepath = svd_utils.convert_color_surrogate(
+                "TestColor", modelpath=modelpath)
+            self.assertEqual(surrogatepath,
+                             os.path.join(modelpath, 'TestColor.surrogate'))
+
+            svd_color_model_mmap = svd_utils.load_svd_model(modelfile)
+            self.assertEqual(sorted(svd_color_model_mmap.keys()),
+                             sorted(svd_color_model.keys()))
+            self.assertIsInstance(svd_color_model_mmap["r"]["VA"], np.memmap)
+            np.testing.assert_allclose(svd_color_model_mmap["r"]["VA"],
+                                       svd_color_model["r"]["VA"])
+
+
+class TestLoadSurrogates(unittest.TestCase):
+    def test_load_model(self):
+        svd_mag_model, svd_lbol_model = make_svd_models()
+        table = Table({'tini': [0.0], 'tmax': [14.0], 'dt': [0.1]})
+        with tempfile.TemporaryDirectory() as modelpath:
+            for kind, svd_model in [("mag", svd_mag_model),
+                                    ("lbol", svd_lbol_model)]:
+                modelfile = os.path.join(modelpath, 'Test_%s.pkl' % kind)
+                with open(modelfile, 'wb') as handle:
+                    pickle.dump(svd_model, handle)
+
+            surrogate_cache.surrogates.clear()
+            mag, lbol = svd_utils.load_surrogates("Test", table,
+                                                  LoadModel=True,
+                                                  ModelPath=modelpath)
+            self.assertEqual(table['n_coeff'][0], 43)
+            self.assertEqual(table['gptype'][0], "sklearn")
+            np.testing.assert_allclose(mag["r"]["VA"],
+                                       svd_mag_model["r"]["VA"])
+            np.testing.assert_allclose(lbol["VA"], svd_lbol_model["VA"])
+
+            # the second call comes from the cache, not the files
+            os.remove(os.path.join(modelpath, 'Test_mag.pkl'))
+            mag2, lbol2 = svd_utils.load_surrogates("Test", table,
+                                                    LoadModel=True,
+                                                    ModelPath=modelpath)
+            self.assertIs(mag2, mag)
+            self.assertIs(lbol2, lbol)
+        surrogate_cache.surrogates.clear()
+
+    def test_no_modelpath(self):
+        table = Table({'tini': [0.0], 'tmax': [14.0], 'dt': [0.1]})
+        surrogate_cache.surrogates.clear()
+        with self.assertRaises(ValueError):
+            svd_utils.load_surrogates("Test", table, LoadModel=True)
+
+
+if __name__ == '__main__':
+    unittest.main()